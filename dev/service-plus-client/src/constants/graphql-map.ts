@@ -35,173 +35,173 @@ export const GRAPHQL_MAP = {
         }
     `,
     createAdminUser: gql`
-        mutation CreateAdminUser($db_name: String!, $schema: String, $value: String!) {
-            createAdminUser(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateAdminUser($db_name: String!, $schema: String, $value: Generic!) {
+            createAdminUser(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createBuSchemaAndFeedSeedData: gql`
-        mutation CreateBuSchemaAndFeedSeedData($db_name: String!, $schema: String, $value: String!) {
-            createBuSchemaAndFeedSeedData(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateBuSchemaAndFeedSeedData($db_name: String!, $schema: String, $value: Generic!) {
+            createBuSchemaAndFeedSeedData(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createClient: gql`
-        mutation CreateClient($db_name: String!, $schema: String, $value: String!) {
-            createClient(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateClient($db_name: String!, $schema: String, $value: Generic!) {
+            createClient(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createBusinessUser: gql`
-        mutation CreateBusinessUser($db_name: String!, $schema: String, $value: String!) {
-            createBusinessUser(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateBusinessUser($db_name: String!, $schema: String, $value: Generic!) {
+            createBusinessUser(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createServiceDb: gql`
-        mutation CreateServiceDb($db_name: String!, $schema: String, $value: String!) {
-            createServiceDb(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateServiceDb($db_name: String!, $schema: String, $value: Generic!) {
+            createServiceDb(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     feedBuSeedData: gql`
-        mutation FeedBuSeedData($db_name: String!, $schema: String, $value: String!) {
-            feedBuSeedData(db_name: $db_name, schema: $schema, value: $value)
+        mutation FeedBuSeedData($db_name: String!, $schema: String, $value: Generic!) {
+            feedBuSeedData(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     seedSecurityData: gql`
-        mutation SeedSecurityData($db_name: String!, $schema: String, $value: String!) {
-            seedSecurityData(db_name: $db_name, schema: $schema, value: $value)
+        mutation SeedSecurityData($db_name: String!, $schema: String, $value: Generic!) {
+            seedSecurityData(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     deleteBuSchema: gql`
-        mutation DeleteBuSchema($db_name: String!, $schema: String, $value: String!) {
-            deleteBuSchema(db_name: $db_name, schema: $schema, value: $value)
+        mutation DeleteBuSchema($db_name: String!, $schema: String, $value: Generic!) {
+            deleteBuSchema(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     deleteClient: gql`
-        mutation DeleteClient($db_name: String!, $schema: String, $value: String!) {
-            deleteClient(db_name: $db_name, schema: $schema, value: $value)
+        mutation DeleteClient($db_name: String!, $schema: String, $value: Generic!) {
+            deleteClient(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     dropDatabase: gql`
-        mutation DropDatabase($db_name: String!, $schema: String, $value: String!) {
-            dropDatabase(db_name: $db_name, schema: $schema, value: $value)
+        mutation DropDatabase($db_name: String!, $schema: String, $value: Generic!) {
+            dropDatabase(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     genericBatchQuery: gql`
-        query GenericBatchQuery($db_name: String!, $items: [String!]!) {
-            genericBatchQuery(db_name: $db_name, items: $items)
+        query GenericBatchQuery($db_name: String!, $items: [Generic!]!) {
+            genericBatchQuery(db_name: $db_name, itemsJson: $items)
         }
     `,
     genericQuery: gql`
-        query GenericQuery($db_name: String!, $schema: String, $value: String!) {
-            genericQuery(db_name: $db_name, schema: $schema, value: $value)
+        query GenericQuery($db_name: String!, $schema: String, $value: Generic!) {
+            genericQuery(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     genericUpdate: gql`
-        mutation GenericUpdate($db_name: String!, $schema: String, $value: String!) {
-            genericUpdate(db_name: $db_name, schema: $schema, value: $value)
+        mutation GenericUpdate($db_name: String!, $schema: String, $value: Generic!) {
+            genericUpdate(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     genericUpdateScript: gql`
-        mutation GenericUpdateScript($db_name: String!, $schema: String, $value: String!) {
-            genericUpdateScript(db_name: $db_name, schema: $schema, value: $value)
+        mutation GenericUpdateScript($db_name: String!, $schema: String, $value: Generic!) {
+            genericUpdateScript(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     deleteUnusedPartsByBrand: gql`
-        mutation DeleteUnusedPartsByBrand($db_name: String!, $schema: String, $value: String!) {
-            deleteUnusedPartsByBrand(db_name: $db_name, schema: $schema, value: $value)
+        mutation DeleteUnusedPartsByBrand($db_name: String!, $schema: String, $value: Generic!) {
+            deleteUnusedPartsByBrand(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     importSpareParts: gql`
-        mutation ImportSpareParts($db_name: String!, $schema: String, $value: String!) {
-            importSpareParts(db_name: $db_name, schema: $schema, value: $value)
+        mutation ImportSpareParts($db_name: String!, $schema: String, $value: Generic!) {
+            importSpareParts(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     mailAdminCredentials: gql`
-        mutation MailAdminCredentials($db_name: String!, $schema: String, $value: String!) {
-            mailAdminCredentials(db_name: $db_name, schema: $schema, value: $value)
+        mutation MailAdminCredentials($db_name: String!, $schema: String, $value: Generic!) {
+            mailAdminCredentials(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     mailBusinessUserCredentials: gql`
-        mutation MailBusinessUserCredentials($db_name: String!, $schema: String, $value: String!) {
-            mailBusinessUserCredentials(db_name: $db_name, schema: $schema, value: $value)
+        mutation MailBusinessUserCredentials($db_name: String!, $schema: String, $value: Generic!) {
+            mailBusinessUserCredentials(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     setUserBuRole: gql`
-        mutation SetUserBuRole($db_name: String!, $schema: String, $value: String!) {
-            setUserBuRole(db_name: $db_name, schema: $schema, value: $value)
+        mutation SetUserBuRole($db_name: String!, $schema: String, $value: Generic!) {
+            setUserBuRole(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createSalesInvoice: gql`
-        mutation CreateSalesInvoice($db_name: String!, $schema: String, $value: String!) {
-            createSalesInvoice(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateSalesInvoice($db_name: String!, $schema: String, $value: Generic!) {
+            createSalesInvoice(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createJobInvoice: gql`
-        mutation CreateJobInvoice($db_name: String!, $schema: String, $value: String!) {
-            createJobInvoice(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateJobInvoice($db_name: String!, $schema: String, $value: Generic!) {
+            createJobInvoice(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     regenerateJobInvoice: gql`
-        mutation RegenerateJobInvoice($db_name: String!, $schema: String, $value: String!) {
-            regenerateJobInvoice(db_name: $db_name, schema: $schema, value: $value)
+        mutation RegenerateJobInvoice($db_name: String!, $schema: String, $value: Generic!) {
+            regenerateJobInvoice(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createJobPayment: gql`
-        mutation CreateJobPayment($db_name: String!, $schema: String, $value: String!) {
-            createJobPayment(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateJobPayment($db_name: String!, $schema: String, $value: Generic!) {
+            createJobPayment(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createSingleJob: gql`
-        mutation CreateSingleJob($db_name: String!, $schema: String, $value: String!) {
-            createSingleJob(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateSingleJob($db_name: String!, $schema: String, $value: Generic!) {
+            createSingleJob(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     createJobBatch: gql`
-        mutation CreateJobBatch($db_name: String!, $schema: String, $value: String!) {
-            createJobBatch(db_name: $db_name, schema: $schema, value: $value)
+        mutation CreateJobBatch($db_name: String!, $schema: String, $value: Generic!) {
+            createJobBatch(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     updateJob: gql`
-        mutation UpdateJob($db_name: String!, $schema: String, $value: String!) {
-            updateJob(db_name: $db_name, schema: $schema, value: $value)
+        mutation UpdateJob($db_name: String!, $schema: String, $value: Generic!) {
+            updateJob(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     updateOpeningJob: gql`
-        mutation UpdateOpeningJob($db_name: String!, $schema: String, $value: String!) {
-            updateOpeningJob(db_name: $db_name, schema: $schema, value: $value)
+        mutation UpdateOpeningJob($db_name: String!, $schema: String, $value: Generic!) {
+            updateOpeningJob(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     updateJobBatch: gql`
-        mutation UpdateJobBatch($db_name: String!, $schema: String, $value: String!) {
-            updateJobBatch(db_name: $db_name, schema: $schema, value: $value)
+        mutation UpdateJobBatch($db_name: String!, $schema: String, $value: Generic!) {
+            updateJobBatch(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     deleteJobBatch: gql`
-        mutation DeleteJobBatch($db_name: String!, $schema: String, $value: String!) {
-            deleteJobBatch(db_name: $db_name, schema: $schema, value: $value)
+        mutation DeleteJobBatch($db_name: String!, $schema: String, $value: Generic!) {
+            deleteJobBatch(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     deliverJob: gql`
-        mutation DeliverJob($db_name: String!, $schema: String, $value: String!) {
-            deliverJob(db_name: $db_name, schema: $schema, value: $value)
+        mutation DeliverJob($db_name: String!, $schema: String, $value: Generic!) {
+            deliverJob(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     undoJobTransaction: gql`
-        mutation UndoJobTransaction($db_name: String!, $schema: String, $value: String!) {
-            undoJobTransaction(db_name: $db_name, schema: $schema, value: $value)
+        mutation UndoJobTransaction($db_name: String!, $schema: String, $value: Generic!) {
+            undoJobTransaction(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     undeliverJob: gql`
-        mutation UndeliverJob($db_name: String!, $schema: String, $value: String!) {
-            undeliverJob(db_name: $db_name, schema: $schema, value: $value)
+        mutation UndeliverJob($db_name: String!, $schema: String, $value: Generic!) {
+            undeliverJob(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     accountsPosting: gql`
-        mutation AccountsPosting($db_name: String!, $schema: String, $value: String!) {
-            accountsPosting(db_name: $db_name, schema: $schema, value: $value)
+        mutation AccountsPosting($db_name: String!, $schema: String, $value: Generic!) {
+            accountsPosting(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     sendWhatsappCompletion: gql`
-        mutation SendWhatsappCompletion($db_name: String!, $schema: String, $value: String!) {
-            sendWhatsappCompletion(db_name: $db_name, schema: $schema, value: $value)
+        mutation SendWhatsappCompletion($db_name: String!, $schema: String, $value: Generic!) {
+            sendWhatsappCompletion(db_name: $db_name, schema: $schema, valueJson: $value)
         }
     `,
     accountsPostingProgress: gql`
@@ -67,7 +67,7 @@ export const MailBusinessUserCredentialsDialog = ({
                 variables: {
                     db_name: dbName,
                     schema: "security",
-                    value: encodeURIComponent(JSON.stringify({ id: user.id })),
+                    value: { id: user.id },
                 },
             });
             const emailSent = result.data?.mailBusinessUserCredentials?.email_sent ?? false;
@@ -533,10 +533,9 @@ export const SalesEntrySection = () => {
                         },
                     },
                 };
-                const encoded = encodeURIComponent(JSON.stringify(sqlObject));
                 await apolloClient.mutate({
                     mutation:  GRAPHQL_MAP.createSalesInvoice,
-                    variables: { db_name: dbName, schema, value: encoded },
+                    variables: { db_name: dbName, schema, value: sqlObject },
                 });
                 toast.success(MESSAGES.SUCCESS_SALES_CREATED);
                 handleReset();
@@ -199,7 +199,7 @@ export const BatchJobSection = ({ initialEditBatchNo, onEditBatchNoApplied, onRe
                     qty:                 r.qty,
                 }));
 
-                const payload = encodeURIComponent(JSON.stringify({
+                const payload = {
                     batch_no: editBatchNo,
                     sharedData: {
                         branch_id:             branchId,
@@ -210,7 +210,7 @@ export const BatchJobSection = ({ initialEditBatchNo, onEditBatchNoApplied, onRe
                         performed_by_user_id:  currentUser?.id ?? null,
                     },
                     addedJobs, updatedJobs, deletedJobIds,
-                }));
+                };
 
                 await apolloClient.mutate({
                     mutation:  GRAPHQL_MAP.updateJobBatch,
@@ -227,7 +227,7 @@ export const BatchJobSection = ({ initialEditBatchNo, onEditBatchNoApplied, onRe
                     setMode(editSourceMode);
                 }
             } else {
-                const payload = encodeURIComponent(JSON.stringify({
+                const payload = {
                     sharedData: {
                         branch_id:             branchId,
                         division_id:           values.division_id ?? defaultDivisionId,
@@ -249,7 +249,7 @@ export const BatchJobSection = ({ initialEditBatchNo, onEditBatchNoApplied, onRe
                         remarks:                  r.remarks || null,
                         qty:                 r.qty,
                     })),
-                }));
+                };
 
                 const result  = await apolloClient.mutate({
                     mutation:  GRAPHQL_MAP.createJobBatch,
@@ -401,7 +401,7 @@ export const BatchJobSection = ({ initialEditBatchNo, onEditBatchNoApplied, onRe
         if (!deleteBatchNo || !dbName || !schema) return;
         setDeleting(true);
         try {
-            const payload = encodeURIComponent(JSON.stringify({ batch_no: deleteBatchNo }));
+            const payload = { batch_no: deleteBatchNo };
             await apolloClient.mutate({
                 mutation: GRAPHQL_MAP.deleteJobBatch,
                 variables: { db_name: dbName, schema, value: payload },
@@ -431,7 +431,7 @@ export const BatchJobSection = ({ initialEditBatchNo, onEditBatchNoApplied, onRe
                     console.warn(`Failed to delete files for job ${deleteJobId}: ${(err as Error).message}`);
                 }
             }
-            const payload = encodeURIComponent(JSON.stringify({ tableName: "job", deletedIds: [deleteJobId] }));
+            const payload = { tableName: "job", deletedIds: [deleteJobId] };
             await apolloClient.mutate({
                 mutation: GRAPHQL_MAP.genericUpdate,
                 variables: { db_name: dbName, schema, value: payload },
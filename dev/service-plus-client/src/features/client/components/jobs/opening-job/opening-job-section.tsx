@@ -367,10 +367,9 @@ export const OpeningJobSection = () => {
                         performed_by_user_id:     currentUser?.id ?? null,
                     },
                 };
-                const encoded = encodeURIComponent(JSON.stringify(sqlObject));
                 await apolloClient.mutate({
                     mutation:  GRAPHQL_MAP.createSingleJob,
-                    variables: { db_name: dbName, schema, value: encoded },
+                    variables: { db_name: dbName, schema, value: sqlObject },
                 });
                 toast.success(MESSAGES.SUCCESS_OPENING_JOB_CREATED);
             }
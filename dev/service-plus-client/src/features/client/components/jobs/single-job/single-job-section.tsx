@@ -226,10 +226,9 @@ export const SingleJobSection = ({ onNavigateToBatchEdit, forceView, onViewModeA
                         address_snapshot:         values.address_snapshot?.trim() || null,
                     },
                 };
-                const encoded  = encodeURIComponent(JSON.stringify(sqlObject));
                 await apolloClient.mutate({
                     mutation:  GRAPHQL_MAP.createSingleJob,
-                    variables: { db_name: dbName, schema, value: encoded },
+                    variables: { db_name: dbName, schema, value: sqlObject },
                 });
                 toast.success(MESSAGES.SUCCESS_JOB_CREATED);
                 setQuickInfoKey(k => k + 1);
@@ -107,7 +107,7 @@ export const DeleteBrandPartsWizardDialog = ({
                 variables: {
                     db_name: dbName,
                     schema:  schema_,
-                    value:   encodeURIComponent(JSON.stringify({ brand_id: brand.id })),
+                    value:   { brand_id: brand.id },
                 },
             });
             const data = result.data as { deleteUnusedPartsByBrand?: { deleted_count?: number } } | null;
@@ -41,7 +41,11 @@ import { MESSAGES } from "@/constants/messages";
 import { SQL_MAP } from "@/constants/sql-map";
 import { GRAPHQL_MAP } from "@/constants/graphql-map";
 import type { BrandOption } from "@/features/client/types/model";
-import type { ImportPartsResult, ParsedPart } from "@/features/client/types/import-parts";
+import type {
+    ImportPartsResult,
+    ImportSparePartsResponse,
+    ParsedPart,
+} from "@/features/client/types/import-parts";
 
 type ImportPartDialogPropsType = {
     brands: BrandOption[];
@@ -390,6 +394,9 @@ export const ImportPartDialog = ({
         setProgressLabel("");
         try {
             const validParts = parsedParts.filter((p) => p.isValid);
+            const invalidParts = parsedParts.filter((p) => !p.isValid);
+            const rejectedRows: { row: number; reason: string }[] = [];
+            let importedCount = 0;
 
             if (validParts.length > 0) {
                 const xDataList = validParts.map((p) => {
@@ -414,14 +421,22 @@ export const ImportPartDialog = ({
 
                 for (let i = 0; i < total; i += CHUNK) {
                     const chunk = xDataList.slice(i, i + CHUNK);
-                    await apolloClient.mutate({
+                    const res = await apolloClient.mutate({
                         mutation: GRAPHQL_MAP.importSpareParts,
                         variables: {
                             db_name,
                             schema,
-                            value: encodeURIComponent(JSON.stringify(chunk)),
+                            value: chunk,
                         },
                     });
+                    const data = res.data as { importSpareParts?: ImportSparePartsResponse } | null;
+                    const chunkResult = data?.importSpareParts;
+                    importedCount += (chunkResult?.success_count ?? 0) + (chunkResult?.updated_count ?? 0);
+                    // The server numbers rejected rows from 1 within the chunk.
+                    for (const r of chunkResult?.rejected ?? []) {
+                        const part = validParts[i + r.row - 1];
+                        rejectedRows.push({ row: part?.rowNumber ?? i + r.row, reason: r.reason });
+                    }
                     const done = Math.min(i + CHUNK, total);
                     setImportProgress(Math.round((done / total) * 100));
                     setProgressLabel(`Importing ${done} of ${total} rows…`);
@@ -429,12 +444,13 @@ export const ImportPartDialog = ({
             }
 
             setImportResult({
-                success_count: validParts.length,
-                skip_count: parsedParts.filter((p) => !p.isValid).length,
-                error_count: parsedParts.filter((p) => !p.isValid).length,
-                errors: parsedParts
-                    .filter((p) => !p.isValid)
-                    .map((p) => ({ row: p.rowNumber, reason: p.errors.join(", ") })),
+                success_count: importedCount,
+                skip_count: invalidParts.length + rejectedRows.length,
+                error_count: invalidParts.length + rejectedRows.length,
+                errors: [
+                    ...invalidParts.map((p) => ({ row: p.rowNumber, reason: p.errors.join(", ") })),
+                    ...rejectedRows,
+                ].sort((a, b) => a.row - b.row),
             });
             goTo(5); // Show Results
         } catch (error) {
@@ -810,13 +826,39 @@ export const ImportPartDialog = ({
                 return (
                     <div className="flex flex-col gap-4">
                         <div className="flex flex-col items-center justify-center p-6 text-center">
-                             <CheckCircle2Icon className="h-16 w-16 mb-4 text-emerald-600" />
-                             <h3 className="text-lg font-semibold text-(--cl-text) mb-2">Import Successful</h3>
+                             {importResult.skip_count > 0 ? (
+                                 <AlertCircleIcon className="h-16 w-16 mb-4 text-amber-500" />
+                             ) : (
+                                 <CheckCircle2Icon className="h-16 w-16 mb-4 text-emerald-600" />
+                             )}
+                             <h3 className="text-lg font-semibold text-(--cl-text) mb-2">
+                                 {importResult.skip_count > 0 ? "Import Completed" : "Import Successful"}
+                             </h3>
                              <p className="text-sm text-(--cl-text-muted)">
                                  {importResult.success_count} rows were successfully imported.
                                  {importResult.skip_count > 0 && ` ${importResult.skip_count} rows were skipped.`}
                              </p>
                         </div>
+                        {importResult.errors.length > 0 && (
+                            <div className="max-h-48 overflow-y-auto rounded-xl border border-(--cl-border)">
+                                <Table>
+                                    <TableHeader>
+                                        <TableRow className="bg-(--cl-surface-3) hover:bg-(--cl-surface-3)">
+                                            <TableHead className="text-xs font-semibold uppercase text-(--cl-text-muted)">Row</TableHead>
+                                            <TableHead className="text-xs font-semibold uppercase text-(--cl-text-muted)">Reason</TableHead>
+                                        </TableRow>
+                                    </TableHeader>
+                                    <TableBody>
+                                        {importResult.errors.map((e, i) => (
+                                            <TableRow key={i} className="border-b border-(--cl-border) last:border-b-0 hidden-scrollbar">
+                                                <TableCell className="w-10 py-1.5 text-xs text-(--cl-text-muted)">{e.row}</TableCell>
+                                                <TableCell className="py-1.5 text-xs text-(--cl-text)">{e.reason}</TableCell>
+                                            </TableRow>
+                                        ))}
+                                    </TableBody>
+                                </Table>
+                            </div>
+                        )}
                     </div>
                 );
 
@@ -22,3 +22,11 @@ export type ImportPartsResult = {
     error_count: number;
     errors: { row: number; reason: string }[];
 };
+
+// importSpareParts mutation result, per request; rejected rows are numbered
+// from 1 within the records sent.
+export type ImportSparePartsResponse = {
+    success_count: number;
+    updated_count: number;
+    rejected: { row: number; reason: string }[];
+};
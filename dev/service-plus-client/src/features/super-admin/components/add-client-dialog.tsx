@@ -215,7 +215,7 @@ export const AddClientDialog = ({ onOpenChange, onSuccess, open }: AddClientDial
 				variables: {
 					db_name: "",
 					schema: "public",
-					value: encodeURIComponent(JSON.stringify(payload)),
+					value: payload,
 				},
 			});
 
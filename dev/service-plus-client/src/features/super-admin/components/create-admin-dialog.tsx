@@ -214,13 +214,13 @@ export const CreateAdminDialog = ({
 				variables: {
 					db_name: client.db_name,
 					schema: "security",
-					value: encodeURIComponent(JSON.stringify({
+					value: {
 						client_id: client.id,
 						email: data.email,
 						full_name: data.full_name,
 						mobile: data.mobile || null,
 						username: data.username,
-					})),
+					},
 				},
 			});
 			if (result.error) {
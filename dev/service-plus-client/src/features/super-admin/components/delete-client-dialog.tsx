@@ -130,7 +130,7 @@ export const DeleteClientDialog = ({ client, onOpenChange, onSuccess, open }: De
 				variables: {
 					db_name: "",
 					schema: "public",
-					value: encodeURIComponent(JSON.stringify({ client_id: client.id })),
+					value: { client_id: client.id },
 				},
 			});
 			if (result.error) {
@@ -227,7 +227,7 @@ export const InitializeClientDialog = ({
 				variables: {
 					db_name: "",
 					schema: "public",
-					value: encodeURIComponent(JSON.stringify({ client_id: client.id, new_db_name: data.db_name })),
+					value: { client_id: client.id, new_db_name: data.db_name },
 				},
 			});
 			if (result.error) {
@@ -254,13 +254,13 @@ export const InitializeClientDialog = ({
 				variables: {
 					db_name: activeDb,
 					schema: "security",
-					value: encodeURIComponent(JSON.stringify({
+					value: {
 						client_id: client.id,
 						email: data.email,
 						full_name: data.full_name,
 						mobile: data.mobile || null,
 						username: data.username,
-					})),
+					},
 				},
 			});
 			if (result.error) {
@@ -75,7 +75,7 @@ export const MailAdminCredentialsDialog = ({
                 variables: {
                     db_name: dbName,
                     schema: "security",
-                    value: encodeURIComponent(JSON.stringify({ client_id: clientId, id: admin.id })),
+                    value: { client_id: clientId, id: admin.id },
                 },
             });
             if (result.error) {
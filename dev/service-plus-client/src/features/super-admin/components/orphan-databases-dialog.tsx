@@ -57,7 +57,7 @@ export const OrphanDatabasesDialog = ({ databases, onOpenChange, onSuccess, open
 				variables: {
 					db_name: "",
 					schema: "public",
-					value: encodeURIComponent(JSON.stringify({ db_name: deletingDb })),
+					value: { db_name: deletingDb },
 				},
 			});
 			if (result.error) {
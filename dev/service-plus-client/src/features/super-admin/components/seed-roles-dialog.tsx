@@ -79,7 +79,7 @@ export const SeedRolesDialog = ({
 				variables: {
 					db_name: client.db_name,
 					schema: "security",
-					value: encodeURIComponent(JSON.stringify({ stage: "access_rights" })),
+					value: { stage: "access_rights" },
 				},
 			});
 			if (result.error) {
@@ -154,7 +154,7 @@ export const SeedRolesDialog = ({
 				variables: {
 					db_name: client.db_name,
 					schema: "security",
-					value: encodeURIComponent(JSON.stringify({ stage: "roles" })),
+					value: { stage: "roles" },
 				},
 			});
 			if (result.error) {
@@ -1,29 +1,26 @@
-import _ from "lodash";
-
 export const graphQlUtils = {
 
-    buildGenericBatchItem: ({ sqlId, sqlArgs, schema }: GenericBatchItemType): string => {
+    buildGenericBatchItem: ({ sqlId, sqlArgs, schema }: GenericBatchItemType): GenericValueType => {
         return encodeObj({ sqlId, sqlArgs, schema })
     },
 
-    buildGenericQueryValue: ({ sqlArgs, sqlId }: GenericQueryValueType): string => {
+    buildGenericQueryValue: ({ sqlArgs, sqlId }: GenericQueryValueType): GenericValueType => {
         return encodeObj({
             sqlArgs,
             sqlId,
         })
     },
 
-    buildGenericUpdateValue: (sqlObject: SqlObjectType): string => {
-        return encodeObj(sqlObject as Record<string, unknown>)
+    buildGenericUpdateValue: (sqlObject: SqlObjectType): GenericValueType => {
+        return encodeObj(sqlObject as GenericValueType)
     }
 }
 
-export function encodeObj(obj: Record<string, unknown>): string {
-    let ret = ''
-    if (!_.isEmpty(obj)) {
-        ret = encodeURIComponent(JSON.stringify(obj))
-    }
-    return ret
+// Resolver `value` / `items` entries go out as plain JSON objects, bound to the
+// Generic `valueJson` / `itemsJson` arguments (see GRAPHQL_MAP), so the server
+// parses them once with the request body instead of unquoting a string.
+export function encodeObj(obj: GenericValueType): GenericValueType {
+    return obj
 }
 
 export type GenericBatchItemType = {
@@ -36,6 +33,8 @@ export type GenericBatchQueryDataType = { genericBatchQuery: unknown[][] | null
 
 export type GenericQueryData<T> = { genericQuery: T[] | null };
 
+export type GenericValueType = Record<string, unknown>;
+
 export type GenericQueryValueType = {
     sqlArgs?: Record<string, unknown>;
     sqlId: string;
@@ -0,0 +1,41 @@
+"""
+JSON response bodies rendered with orjson when it is installed.
+
+genericQuery results are long lists of flat rows (ints, the floats that
+_FloatNumericLoader returns for NUMERIC, ISO date strings), and the stdlib
+encoder is the slowest step between the database and the socket for them.
+orjson encodes those types natively, several times faster. It is an optional
+dependency: without it FastJSONResponse renders exactly like Starlette's
+JSONResponse.
+
+FastAPI routes with a response_model are left alone — FastAPI already
+serializes those straight to bytes through Pydantic, and a custom response
+class would switch that path off.
+"""
+
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # NamedTuples such as graphql-core's SourceLocation in error "locations":
+    # json.dumps writes them as arrays, orjson only handles plain tuples.
+    if isinstance(value, tuple):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        # Non-str keys are stringified, as json.dumps does.
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,527 @@
+"""
+COPY-based bulk ingestion into BU tables.
+
+copy_records() streams records into an unconstrained staging table with
+COPY FROM STDIN (binary), validates them there set-based, and then inserts
+(or merges) the surviving rows into the target table in one statement.
+Records may come from any iterable or generator; each record is coerced and
+written as it is consumed, so the payload is never copied into a second
+in-memory list.
+
+Rows that would fail are reported back instead of aborting the whole load:
+
+* values that cannot be coerced to the column type (checked client-side
+  while streaming, before anything is sent);
+* missing values for NOT NULL columns without a default;
+* text longer than varchar(n) / numbers wider than numeric(p, s);
+* CHECK and FOREIGN KEY constraints whose columns are all loaded;
+* duplicate conflict keys inside the payload (the first occurrence wins);
+* rows whose conflict key already exists (insert mode only).
+
+In upsert mode rows whose conflict key exists update the existing row
+(columns missing from the record keep their current value) and the rest are
+inserted. Postgres 14 has no MERGE, so this is an UPDATE ... FROM staging
+followed by an INSERT ... ON CONFLICT DO NOTHING, both in one transaction.
+
+copy_records() raises psycopg.NotSupportedError, before anything is
+staged, when a loaded column has a type it has no coercion for;
+bulk_insert_records() in psycopg_driver is the multi-row INSERT fallback for
+those tables.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Iterable, Mapping, Sequence, TypedDict
+from uuid import UUID
+
+import psycopg
+import psycopg.sql as pgsql
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
+
+from app.db.connection import result_cache
+from app.db.connection.psycopg_driver import (
+    get_client_db_connection,
+    get_service_db_connection,
+    set_search_path,
+)
+from app.logger import logger
+
+_STAGE_TABLE: str = "_bulk_copy_stage"
+_REJECT_TABLE: str = "_bulk_copy_reject"
+
+_COLUMNS_SQL: str = """
+    SELECT a.attname                          AS name,
+           a.atttypid::int                    AS oid,
+           format_type(a.atttypid, NULL)      AS base_type,
+           t.typname                          AS type_name,
+           a.atttypmod                        AS typmod,
+           a.attnotnull                       AS not_null,
+           pg_get_expr(d.adbin, d.adrelid)    AS default_expr,
+           a.attidentity <> '' OR a.attgenerated <> '' AS system_valued
+      FROM pg_attribute a
+      JOIN pg_type t ON t.oid = a.atttypid
+      LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+     WHERE a.attrelid = to_regclass(quote_ident(%(table)s))
+       AND a.attnum > 0
+       AND NOT a.attisdropped
+     ORDER BY a.attnum
+"""
+
+_CONSTRAINTS_SQL: str = """
+    SELECT c.contype                                   AS kind,
+           c.conname                                   AS name,
+           pg_get_expr(c.conbin, c.conrelid)           AS check_expr,
+           c.confrelid::regclass::text                 AS ref_table,
+           ARRAY(SELECT attname FROM unnest(c.conkey) WITH ORDINALITY k(n, i)
+                   JOIN pg_attribute ON attrelid = c.conrelid AND attnum = k.n
+                  ORDER BY k.i)::text[]                AS columns,
+           ARRAY(SELECT attname FROM unnest(c.confkey) WITH ORDINALITY k(n, i)
+                   JOIN pg_attribute ON attrelid = c.confrelid AND attnum = k.n
+                  ORDER BY k.i)::text[]                AS ref_columns
+      FROM pg_constraint c
+     WHERE c.conrelid = to_regclass(quote_ident(%(table)s))
+       AND c.contype IN ('c', 'f')
+"""
+
+
+class CopyResult(TypedDict):
+    inserted: int
+    updated:  int
+    rejected: list[dict]   # [{"row": 1-based input position, "reason": str}]
+
+
+# ─── Client-side coercion ──────────────────────────────────────────────────────
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise ValueError
+
+
+def _to_decimal(value: Any) -> Decimal:
+    if isinstance(value, bool):
+        raise ValueError
+    try:
+        result = Decimal(str(value).strip())
+    except InvalidOperation as e:
+        raise ValueError from e
+    if not result.is_finite():
+        raise ValueError
+    return result
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError
+    return float(value)
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ("true", "t", "yes", "y", "1"):
+        return True
+    if isinstance(value, str) and value.strip().lower() in ("false", "f", "no", "n", "0"):
+        return False
+    raise ValueError
+
+
+def _to_text(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        raise ValueError
+    return value if isinstance(value, str) else str(value)
+
+
+def _to_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def _to_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).strip())
+
+
+def _to_json(value: Any) -> Jsonb:
+    return Jsonb(json.loads(value) if isinstance(value, str) else value)
+
+
+def _to_uuid(value: Any) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+_COERCERS: dict[str, Callable[[Any], Any]] = {
+    "int2": _to_int,
+    "int4": _to_int,
+    "int8": _to_int,
+    "numeric": _to_decimal,
+    "float4": _to_float,
+    "float8": _to_float,
+    "bool": _to_bool,
+    "text": _to_text,
+    "varchar": _to_text,
+    "bpchar": _to_text,
+    "date": _to_date,
+    "timestamp": _to_datetime,
+    "timestamptz": _to_datetime,
+    "json": _to_json,
+    "jsonb": _to_json,
+    "uuid": _to_uuid,
+}
+
+
+# ─── Validation SQL ────────────────────────────────────────────────────────────
+
+
+def _reject_sql(condition: pgsql.Composable, reason: pgsql.Composable) -> pgsql.Composed:
+    return pgsql.SQL(
+        "INSERT INTO {rej} (_row, reason) SELECT s._row, {reason} FROM {stage} s WHERE {cond}"
+    ).format(
+        rej=pgsql.Identifier(_REJECT_TABLE),
+        stage=pgsql.Identifier(_STAGE_TABLE),
+        reason=reason,
+        cond=condition,
+    )
+
+
+def _validation_statements(
+    table_name: str,
+    columns: list[dict],
+    constraints: list[dict],
+    conflict_keys: Sequence[str],
+) -> list[pgsql.Composed]:
+    """Set-based checks run against the staging table, one INSERT into rejects each."""
+    loaded = {c["name"] for c in columns}
+    statements: list[pgsql.Composed] = []
+
+    for col in columns:
+        ident = pgsql.SQL("s.{}").format(pgsql.Identifier(col["name"]))
+        if col["not_null"] and col["default_expr"] is None:
+            statements.append(_reject_sql(
+                pgsql.SQL("{} IS NULL").format(ident),
+                pgsql.Literal(f"missing {col['name']}"),
+            ))
+        typmod = col["typmod"]
+        if typmod > 4 and col["type_name"] in ("varchar", "bpchar"):
+            statements.append(_reject_sql(
+                pgsql.SQL("length({}) > {}").format(ident, pgsql.Literal(typmod - 4)),
+                pgsql.Literal(f"{col['name']} longer than {typmod - 4} characters"),
+            ))
+        elif typmod > 4 and col["type_name"] == "numeric":
+            precision, scale = (typmod - 4) >> 16, (typmod - 4) & 0xFFFF
+            statements.append(_reject_sql(
+                pgsql.SQL("abs(round({}, {})) >= 10::numeric ^ {}").format(
+                    ident, pgsql.Literal(scale), pgsql.Literal(precision - scale)
+                ),
+                pgsql.Literal(f"{col['name']} out of range for numeric({precision},{scale})"),
+            ))
+
+    for con in constraints:
+        if not set(con["columns"]) <= loaded:
+            continue
+        if con["kind"] == "c":
+            # conbin is deparsed against bare column names; the staging table
+            # uses the same names, so the expression evaluates unchanged.
+            statements.append(_reject_sql(
+                pgsql.SQL("NOT ({})").format(pgsql.SQL(con["check_expr"])),
+                pgsql.Literal(f"violates {con['name']}"),
+            ))
+        else:
+            present = pgsql.SQL(" AND ").join(
+                pgsql.SQL("s.{} IS NOT NULL").format(pgsql.Identifier(c)) for c in con["columns"]
+            )
+            matches = pgsql.SQL(" AND ").join(
+                pgsql.SQL("r.{} = s.{}").format(pgsql.Identifier(rc), pgsql.Identifier(c))
+                for c, rc in zip(con["columns"], con["ref_columns"])
+            )
+            statements.append(_reject_sql(
+                pgsql.SQL("{} AND NOT EXISTS (SELECT 1 FROM {} r WHERE {})").format(
+                    present, pgsql.SQL(con["ref_table"]), matches
+                ),
+                pgsql.Literal(f"unknown {', '.join(con['columns'])}"),
+            ))
+
+    if conflict_keys:
+        keys = pgsql.SQL(", ").join(pgsql.Identifier(k) for k in conflict_keys)
+        statements.append(pgsql.SQL(
+            "INSERT INTO {rej} (_row, reason) "
+            "SELECT _row, 'duplicate of row ' || first_row FROM ("
+            "  SELECT _row, min(_row) OVER (PARTITION BY {keys}) AS first_row"
+            "    FROM {stage} s"
+            "   WHERE NOT EXISTS (SELECT 1 FROM {rej} r WHERE r._row = s._row)"
+            ") d WHERE _row <> first_row"
+        ).format(
+            rej=pgsql.Identifier(_REJECT_TABLE),
+            stage=pgsql.Identifier(_STAGE_TABLE),
+            keys=keys,
+        ))
+
+    logger.debug("bulk copy into %s: %d validation statement(s)", table_name, len(statements))
+    return statements
+
+
+# ─── Engine ────────────────────────────────────────────────────────────────────
+
+
+def _coerced_rows(
+    records: Iterable[Mapping[str, Any]],
+    columns: list[dict],
+    rejected: list[dict],
+) -> Iterable[tuple]:
+    """Yield (row_no, *values) per record; records that fail coercion go to `rejected`."""
+    coercers = [(c["name"], _COERCERS[c["type_name"]]) for c in columns]
+    for row_no, record in enumerate(records, start=1):
+        if not isinstance(record, Mapping):
+            rejected.append({"row": row_no, "reason": "record is not an object"})
+            continue
+        values: list[Any] = [row_no]
+        for name, coerce in coercers:
+            value = record.get(name)
+            if value is None or value == "":
+                values.append(None)
+                continue
+            try:
+                values.append(coerce(value))
+            except (ValueError, TypeError, OverflowError):
+                rejected.append({"row": row_no, "reason": f"invalid value for {name}"})
+                break
+        else:
+            yield tuple(values)
+
+
+def _merge_sql(
+    table_name: str,
+    columns: list[dict],
+    conflict_keys: Sequence[str],
+    upsert: bool,
+) -> tuple[pgsql.Composed | None, pgsql.Composed]:
+    """(UPDATE for upsert mode or None, INSERT from staging returning counts)."""
+    target = pgsql.Identifier(table_name)
+    stage = pgsql.Identifier(_STAGE_TABLE)
+    rej = pgsql.Identifier(_REJECT_TABLE)
+    not_rejected = pgsql.SQL(
+        "NOT EXISTS (SELECT 1 FROM {} r WHERE r._row = s._row)"
+    ).format(rej)
+    key_match = pgsql.SQL(" AND ").join(
+        pgsql.SQL("t.{0} = s.{0}").format(pgsql.Identifier(k)) for k in conflict_keys
+    )
+
+    update_sql = None
+    if upsert:
+        settable = [c["name"] for c in columns if c["name"] not in conflict_keys]
+        update_sql = pgsql.SQL(
+            "UPDATE {target} t SET {sets} FROM {stage} s WHERE {match} AND {ok} RETURNING s._row"
+        ).format(
+            target=target,
+            sets=pgsql.SQL(", ").join(
+                pgsql.SQL("{0} = COALESCE(s.{0}, t.{0})").format(pgsql.Identifier(n))
+                for n in settable
+            ),
+            stage=stage,
+            match=key_match,
+            ok=not_rejected,
+        )
+
+    select_list = pgsql.SQL(", ").join(
+        pgsql.SQL("COALESCE(s.{}, {})").format(
+            pgsql.Identifier(c["name"]), pgsql.SQL(c["default_expr"])
+        )
+        if c["default_expr"] is not None
+        else pgsql.SQL("s.{}").format(pgsql.Identifier(c["name"]))
+        for c in columns
+    )
+    col_list = pgsql.SQL(", ").join(pgsql.Identifier(c["name"]) for c in columns)
+    if not conflict_keys:
+        insert_sql = pgsql.SQL(
+            "WITH ins AS (INSERT INTO {target} ({cols}) SELECT {vals} FROM {stage} s "
+            "WHERE {ok} ORDER BY s._row RETURNING 1) SELECT count(*) AS inserted FROM ins"
+        ).format(target=target, cols=col_list, vals=select_list, stage=stage, ok=not_rejected)
+        return update_sql, insert_sql
+
+    keys = pgsql.SQL(", ").join(pgsql.Identifier(k) for k in conflict_keys)
+    insert_sql = pgsql.SQL(
+        "WITH ins AS ("
+        "  INSERT INTO {target} ({cols}) SELECT {vals} FROM {stage} s WHERE {ok}"
+        "  ORDER BY s._row ON CONFLICT ({keys}) DO NOTHING RETURNING {keys}"
+        "), lost AS ("
+        "  INSERT INTO {rej} (_row, reason)"
+        "  SELECT s._row, 'already exists' FROM {stage} s WHERE {ok}"
+        "     AND NOT EXISTS (SELECT 1 FROM ins t WHERE {match})"
+        "  RETURNING 1"
+        ") SELECT (SELECT count(*) FROM ins) AS inserted"
+    ).format(
+        target=target, cols=col_list, vals=select_list, stage=stage, ok=not_rejected,
+        keys=keys, rej=rej, match=key_match,
+    )
+    return update_sql, insert_sql
+
+
+async def _stage_and_merge(
+    cur: psycopg.AsyncCursor,
+    table_name: str,
+    load: list[dict],
+    records: Iterable[Mapping[str, Any]],
+    conflict_keys: Sequence[str],
+    upsert: bool,
+    rejected: list[dict],
+) -> tuple[int, int, int]:
+    """COPY records into staging, validate, merge; returns (staged, inserted, updated)."""
+    await cur.execute(_CONSTRAINTS_SQL, {"table": table_name})
+    constraints = await cur.fetchall()
+
+    await cur.execute(pgsql.SQL(
+        "CREATE TEMP TABLE {} (_row int4, {}) ON COMMIT DROP"
+    ).format(
+        pgsql.Identifier(_STAGE_TABLE),
+        pgsql.SQL(", ").join(
+            pgsql.SQL("{} {}").format(pgsql.Identifier(c["name"]), pgsql.SQL(c["base_type"]))
+            for c in load
+        ),
+    ))
+    await cur.execute(pgsql.SQL(
+        "CREATE TEMP TABLE {} (_row int4, reason text) ON COMMIT DROP"
+    ).format(pgsql.Identifier(_REJECT_TABLE)))
+
+    copy_sql = pgsql.SQL("COPY {} (_row, {}) FROM STDIN (FORMAT BINARY)").format(
+        pgsql.Identifier(_STAGE_TABLE),
+        pgsql.SQL(", ").join(pgsql.Identifier(c["name"]) for c in load),
+    )
+    staged = 0
+    async with cur.copy(copy_sql) as copy:
+        copy.set_types([23] + [c["oid"] for c in load])
+        for row in _coerced_rows(records, load, rejected):
+            await copy.write_row(row)
+            staged += 1
+
+    for statement in _validation_statements(table_name, load, constraints, conflict_keys):
+        await cur.execute(statement)
+
+    update_sql, insert_sql = _merge_sql(table_name, load, conflict_keys, upsert)
+    updated = 0
+    if update_sql is not None:
+        await cur.execute(update_sql)
+        updated = cur.rowcount
+        # Updated rows must not be inserted again.
+        await cur.execute(pgsql.SQL(
+            "DELETE FROM {stage} s USING {target} t WHERE {match}"
+        ).format(
+            stage=pgsql.Identifier(_STAGE_TABLE),
+            target=pgsql.Identifier(table_name),
+            match=pgsql.SQL(" AND ").join(
+                pgsql.SQL("t.{0} = s.{0}").format(pgsql.Identifier(k))
+                for k in conflict_keys
+            ),
+        ))
+    await cur.execute(insert_sql)
+    inserted = (await cur.fetchone())["inserted"]
+
+    await cur.execute(pgsql.SQL(
+        "SELECT _row, string_agg(reason, '; ' ORDER BY reason) AS reason "
+        "FROM {} GROUP BY _row"
+    ).format(pgsql.Identifier(_REJECT_TABLE)))
+    rejected.extend({"row": r["_row"], "reason": r["reason"]} for r in await cur.fetchall())
+    return staged, inserted, updated
+
+
+async def _table_columns(db_name: str | None, schema: str, table_name: str) -> list[dict]:
+    """_COLUMNS_SQL rows for table_name in schema; empty when there is no such table."""
+    async with (
+        get_service_db_connection(db_name, autocommit=True) if db_name
+        else get_client_db_connection(autocommit=True)
+    ) as conn:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await set_search_path(cur, schema)
+            await cur.execute(_COLUMNS_SQL, {"table": table_name})
+            return await cur.fetchall()
+
+
+async def copy_records(
+    db_name: str | None,
+    schema: str,
+    table_name: str,
+    records: Iterable[Mapping[str, Any]],
+    columns: Sequence[str] | None = None,
+    conflict_keys: Sequence[str] = (),
+    upsert: bool = False,
+) -> CopyResult:
+    """
+    Bulk-load records into table_name via COPY + a staging table.
+
+    Args:
+        db_name:       None → client DB; str → service DB.
+        schema:        Schema holding table_name.
+        table_name:    Target table.
+        records:       Iterable of dicts keyed by column name; consumed once.
+        columns:       Columns to load. Default: every column that is not an
+                       identity/generated column. Keys outside it are ignored;
+                       missing or empty values become NULL, or the column
+                       default where there is one.
+        conflict_keys: Columns of a unique constraint identifying a row. Enables
+                       in-payload duplicate and "already exists" rejects.
+        upsert:        Update rows whose conflict key exists instead of
+                       rejecting them. Requires conflict_keys.
+
+    Returns:
+        {"inserted": int, "updated": int, "rejected": [{"row", "reason"}]}
+        with rows numbered from 1 in input order. Everything runs in one
+        transaction; rejected rows are simply left out.
+    """
+    if upsert and not conflict_keys:
+        raise ValueError("upsert requires conflict_keys")
+
+    schema_to_set = schema or "public"
+    rejected: list[dict] = []
+
+    # Validated before the load's connection is opened: raised inside it,
+    # the driver would wrap these in a DatabaseException.
+    table_columns = await _table_columns(db_name, schema_to_set, table_name)
+    if not table_columns:
+        raise ValueError(f"Unknown table: {table_name!r}")
+    by_name = {c["name"]: c for c in table_columns}
+    if columns is None:
+        load = [c for c in table_columns if not c["system_valued"]]
+    else:
+        unknown = [n for n in columns if n not in by_name]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {table_name}: {unknown}")
+        load = [by_name[n] for n in columns]
+    missing_keys = [k for k in conflict_keys if k not in {c["name"] for c in load}]
+    if missing_keys:
+        raise ValueError(f"conflict_keys not among loaded columns: {missing_keys}")
+    unsupported = [c["name"] for c in load if c["type_name"] not in _COERCERS]
+    if unsupported:
+        raise psycopg.NotSupportedError(
+            f"COPY ingestion has no coercion for column(s) {unsupported}"
+        )
+
+    async with (
+        get_service_db_connection(db_name) if db_name else get_client_db_connection()
+    ) as conn:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await set_search_path(cur, schema_to_set)
+            staged, inserted, updated = await _stage_and_merge(
+                cur, table_name, load, records, conflict_keys, upsert, rejected
+            )
+
+    result_cache.invalidate_tables(db_name, schema_to_set, {table_name})
+    rejected.sort(key=lambda r: r["row"])
+    logger.info(
+        "bulk copy into %s.%s: staged=%d inserted=%d updated=%d rejected=%d",
+        schema_to_set, table_name, staged, inserted, updated, len(rejected),
+    )
+    return {"inserted": inserted, "updated": updated, "rejected": rejected}
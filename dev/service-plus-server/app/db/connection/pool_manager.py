@@ -1,27 +1,159 @@
 """
-Connection pool manager for GraphQL query resolvers (read-only, SELECT paths).
+Connection pool manager for query-time and mutation-time DB access.
 
-Mutation resolvers use fresh per-request connections via psycopg_driver.py
-and are not affected by this module.
+Each database gets two pools:
+
+* a *query* pool (autocommit) used by the read-only GraphQL resolvers via
+  exec_sql_query / exec_sql_batch_query, and by exec_sql_dml for statements
+  that cannot run inside a transaction block (CREATE/DROP DATABASE);
+* a *transactional* pool (autocommit off) used by every mutation entry point
+  in psycopg_driver.py. The caller commits on clean exit and rolls back on
+  error, exactly like the old per-call connections did.
+
+The two are sized and counted separately so a burst of long mutations can
+never starve the read path (and vice versa).
+
+Tenant (service DB) pools live in an LRU registry with a process-wide
+connection budget:
+
+* every tenant pool starts at a small guaranteed size and may *borrow*
+  capacity — grow towards its ceiling — while it is saturated, as long as
+  the budget has room;
+* when the budget is short, capacity is reclaimed from idle tenants first by
+  shrinking their borrowed capacity, then by evicting least-recently-used
+  tenants outright;
+* a maintenance task closes tenant pools idle past _POOL_IDLE_TTL.
+
+The budget is on reserved capacity (the sum of every pool's max_size).
+Connections above a shrunk pool's new ceiling drain as they go idle.
+
+Pooled sessions keep whatever search_path their last user set. Each
+connection is tagged with that schema (see psycopg_driver.set_search_path)
+so the next user skips the SET when it already matches; there is no
+RESET on return. The tag is dropped — and the next user issues the SET again —
+whenever it may no longer be true:
+
+* any statement text that mentions search_path, RESET ALL or DISCARD runs on
+  the session (the pooled connections use _TaggedCursor, which checks the
+  text before sending it), so a raw SET or set_config() outside
+  set_search_path cannot leave a stale tag;
+* a checkout ends in an exception, since a rolled-back transaction also rolls
+  back any SET made inside it.
+
+The manager also counts committed transactions per database (commit_version):
+a transactional checkout that ends cleanly has committed, and
+psycopg_driver.exec_sql_dml records its autocommit statements. single_flight
+keys in-flight reads on it so a read never joins one that started before a
+write it must see.
 """
 
 import asyncio
+import re
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, AsyncIterator
 
-from psycopg_pool import AsyncConnectionPool
+from psycopg import AsyncConnection, AsyncCursor, AsyncServerCursor
+from psycopg.sql import Composable
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
 
 from app.config import settings
+from app.db.connection.statement_cache import configure_connection
 from app.logger import logger
 
 # _POOL_MIN_SIZE: int = 2
-_POOL_MAX_SIZE: int = 10
+_POOL_BASE_SIZE: int = 4           # guaranteed tenant query-pool size
+_POOL_MAX_SIZE: int = 10           # query-pool ceiling (client pool is fixed at this)
+_TX_POOL_BASE_SIZE: int = 2        # guaranteed tenant tx-pool size
+_TX_POOL_MAX_SIZE: int = 5         # tx-pool ceiling (client tx pool is fixed at this)
+_POOL_GROW_STEP: int = 2           # capacity borrowed per saturation event
 _POOL_MAX_IDLE: float = 60.0       # seconds before an idle connection is closed
 _POOL_MAX_LIFETIME: float = 300.0  # seconds max before a connection is recycled
 _POOL_RECONNECT_TIMEOUT: float = 30.0
 
+_GLOBAL_MAX_CONNECTIONS: int = 120   # process-wide cap on reserved connections
+_MAX_TENANTS: int = 40               # tenant DBs kept open at once
+_POOL_IDLE_TTL: float = 600.0        # seconds before an unused tenant is evicted
+_POOL_EVICT_GRACE: float = 5.0       # never evict a tenant used more recently than this
+_POOL_MAINTENANCE_INTERVAL: float = 30.0
+
+
+# search_path each pooled session is known to be set to; entries vanish
+# with their connection when the pool recycles it.
+_search_paths: "weakref.WeakKeyDictionary[AsyncConnection, str]" = weakref.WeakKeyDictionary()
+
+
+def current_search_path(conn: AsyncConnection) -> str | None:
+    """The schema this session's search_path was last set to, or None if unknown."""
+    return _search_paths.get(conn)
+
+
+def remember_search_path(conn: AsyncConnection, schema: str) -> None:
+    """Tag a session with the schema its search_path now points to."""
+    _search_paths[conn] = schema
+
+
+# Statement text that can change the session's search_path.
+_SEARCH_PATH_CHANGE = re.compile(r"search_path|\bRESET\s+ALL\b|\bDISCARD\b", re.IGNORECASE)
+
+
+def _drop_tag_if_changed(cur: AsyncCursor, query: Any) -> None:
+    if cur.connection not in _search_paths:
+        return
+    if isinstance(query, Composable):
+        query = query.as_string(cur.connection)
+    elif isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    if _SEARCH_PATH_CHANGE.search(query):
+        _search_paths.pop(cur.connection, None)
+
+
+class _TaggedCursor(AsyncCursor):
+    """Client cursor that drops the search_path tag before a statement that may change it."""
 
-async def _reset_conn(conn) -> None:
-    """Reset session state before a connection is returned to the pool."""
-    await conn.execute("RESET search_path")
+    async def execute(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        _drop_tag_if_changed(self, query)
+        return await super().execute(query, *args, **kwargs)
+
+    async def executemany(self, query: Any, *args: Any, **kwargs: Any) -> None:
+        _drop_tag_if_changed(self, query)
+        return await super().executemany(query, *args, **kwargs)
+
+    def stream(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        _drop_tag_if_changed(self, query)
+        return super().stream(query, *args, **kwargs)
+
+
+class _TaggedServerCursor(AsyncServerCursor):
+    """Server-side (named) counterpart of _TaggedCursor."""
+
+    async def execute(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        _drop_tag_if_changed(self, query)
+        return await super().execute(query, *args, **kwargs)
+
+
+async def _configure_connection(conn: AsyncConnection) -> None:
+    """Pool `configure` hook: tag-aware cursors plus the statement-cache setup."""
+    conn.cursor_factory = _TaggedCursor
+    conn.server_cursor_factory = _TaggedServerCursor
+    await configure_connection(conn)
+
+
+@asynccontextmanager
+async def _checkout(pool: AsyncConnectionPool) -> AsyncIterator[AsyncConnection]:
+    """pool.connection(), dropping the search_path tag if the checkout fails."""
+    borrowed: AsyncConnection | None = None
+    try:
+        async with pool.connection() as conn:
+            borrowed = conn
+            yield conn
+    except BaseException:
+        if borrowed is not None:
+            _search_paths.pop(borrowed, None)
+        raise
 
 
 def _build_conninfo(host: str, port: int, user: str, password: str, dbname: str) -> str:
@@ -32,72 +164,287 @@ def _build_conninfo(host: str, port: int, user: str, password: str, dbname: str)
     )
 
 
+def _client_conninfo() -> str:
+    host = settings.client_db_ip_address if settings.app_env == "production" else settings.client_db_host
+    port = settings.client_db_internal_port if settings.app_env == "production" else settings.client_db_port
+    return _build_conninfo(
+        host, port,
+        settings.client_db_user,
+        settings.client_db_password,
+        settings.client_db_name,
+    )
+
+
+def _service_conninfo(db_name: str) -> str:
+    host = settings.service_db_ip_address if settings.app_env == "production" else settings.service_db_host
+    port = settings.service_db_internal_port if settings.app_env == "production" else settings.service_db_port
+    return _build_conninfo(
+        host, port,
+        settings.service_db_user,
+        settings.service_db_password,
+        db_name,
+    )
+
+
+async def _open_pool(
+    conninfo: str, name: str, transactional: bool, max_size: int
+) -> AsyncConnectionPool:
+    """Create and open one pool; `transactional` selects autocommit off."""
+    pool = AsyncConnectionPool(
+        conninfo=conninfo,
+        name=name,
+        min_size=0,
+        max_size=max_size,
+        max_idle=_POOL_MAX_IDLE,
+        max_lifetime=_POOL_MAX_LIFETIME,
+        reconnect_timeout=_POOL_RECONNECT_TIMEOUT,
+        kwargs={"autocommit": not transactional},
+        configure=_configure_connection,
+        check=AsyncConnectionPool.check_connection,
+        open=False,
+    )
+    await pool.open(wait=True)
+    return pool
+
+
+@dataclass
+class _TenantPools:
+    """Registry entry for one service DB: its lazily-opened pools plus LRU bookkeeping."""
+
+    db_name: str
+    query: AsyncConnectionPool | None = None
+    tx: AsyncConnectionPool | None = None
+    query_leases: int = 0
+    tx_leases: int = 0
+    last_used: float = field(default_factory=monotonic)
+
+    @property
+    def leases(self) -> int:
+        return self.query_leases + self.tx_leases
+
+    def is_saturated(self, transactional: bool) -> bool:
+        """True when more callers hold or want a connection than the pool can give."""
+        pool = self.tx if transactional else self.query
+        leases = self.tx_leases if transactional else self.query_leases
+        return pool is not None and leases > pool.max_size
+
+    def pools(self) -> list[AsyncConnectionPool]:
+        return [p for p in (self.query, self.tx) if p is not None]
+
+    def reserved(self) -> int:
+        return sum(p.max_size for p in self.pools())
+
+    def borrowed(self) -> int:
+        return sum(p.max_size - _base_size(p is self.tx) for p in self.pools())
+
+    def idle_for(self) -> float:
+        return monotonic() - self.last_used
+
+
+def _base_size(transactional: bool) -> int:
+    return _TX_POOL_BASE_SIZE if transactional else _POOL_BASE_SIZE
+
+
+def _max_size(transactional: bool) -> int:
+    return _TX_POOL_MAX_SIZE if transactional else _POOL_MAX_SIZE
+
+
 class PoolManager:
-    """Manages AsyncConnectionPool instances for query-time DB access."""
+    """Manages AsyncConnectionPool instances for query-time and mutation-time DB access."""
 
     def __init__(self) -> None:
         self._client_pool: AsyncConnectionPool | None = None
-        self._service_pools: dict[str, AsyncConnectionPool] = {}
+        self._client_tx_pool: AsyncConnectionPool | None = None
+        self._tenants: OrderedDict[str, _TenantPools] = OrderedDict()
         self._lock = asyncio.Lock()
+        self._maintenance_task: asyncio.Task | None = None
+        self._counters: dict[str, int] = {"borrows": 0, "evictions": 0, "reclaims": 0}
+        self._commits: dict[str | None, int] = {}   # db_name (None = client DB) -> commits
 
     async def initialize(self) -> None:
-        """Open the client-DB pool. Call once during application startup."""
-        host = settings.client_db_ip_address if settings.app_env == "production" else settings.client_db_host
-        port = settings.client_db_internal_port if settings.app_env == "production" else settings.client_db_port
-        conninfo = _build_conninfo(
-            host, port,
-            settings.client_db_user,
-            settings.client_db_password,
-            settings.client_db_name,
-        )
-        self._client_pool = AsyncConnectionPool(
-            conninfo=conninfo,
-            min_size= 0,
-            max_size=_POOL_MAX_SIZE,
-            max_idle=_POOL_MAX_IDLE,
-            max_lifetime=_POOL_MAX_LIFETIME,
-            reconnect_timeout=_POOL_RECONNECT_TIMEOUT,
-            kwargs={"autocommit": True},
-            reset=_reset_conn,
-            check=AsyncConnectionPool.check_connection,
-            open=False,
-        )
-        await self._client_pool.open(wait=True)
+        """Open the client-DB pools. Call once during application startup."""
+        conninfo = _client_conninfo()
+        self._client_pool = await _open_pool(conninfo, "client", False, _POOL_MAX_SIZE)
+        self._client_tx_pool = await _open_pool(conninfo, "client-tx", True, _TX_POOL_MAX_SIZE)
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop())
         logger.info(
-            "Client DB connection pool opened (min=%d, max=%d)",
-            0,
+            "Client DB connection pools opened (query max=%d, tx max=%d, budget=%d)",
             _POOL_MAX_SIZE,
+            _TX_POOL_MAX_SIZE,
+            _GLOBAL_MAX_CONNECTIONS,
         )
 
-    async def get_service_pool(self, db_name: str) -> AsyncConnectionPool:
-        """Return the pool for a service/tenant DB, creating it lazily on first use."""
-        if db_name not in self._service_pools:
+    @asynccontextmanager
+    async def connection(
+        self, db_name: str | None, transactional: bool = False
+    ) -> AsyncIterator[AsyncConnection]:
+        """
+        Borrow a connection for the client DB (db_name=None) or a tenant DB.
+
+        The tenant stays pinned in the registry (never evicted) while the
+        connection is out. Raises PoolTimeout when no capacity can be found.
+        """
+        if not db_name:
+            pool = self.client_tx_pool if transactional else self.client_pool
+            async with _checkout(pool) as conn:
+                yield conn
+            if transactional:
+                self.record_commit(None)
+            return
+
+        entry = await self._lease(db_name, transactional)
+        try:
+            pool = entry.tx if transactional else entry.query
+            assert pool is not None
+            if entry.is_saturated(transactional):
+                await self._borrow(entry, transactional)
+            async with _checkout(pool) as conn:
+                yield conn
+            if transactional:
+                self.record_commit(db_name)
+        finally:
+            if transactional:
+                entry.tx_leases -= 1
+            else:
+                entry.query_leases -= 1
+            entry.last_used = monotonic()
+
+    async def _lease(self, db_name: str, transactional: bool) -> _TenantPools:
+        """Return the tenant entry with the requested pool open, marked as in use."""
+        entry = self._tenants.get(db_name)
+        if entry is None or (entry.tx if transactional else entry.query) is None:
             async with self._lock:
-                if db_name not in self._service_pools:
-                    host = settings.service_db_ip_address if settings.app_env == "production" else settings.service_db_host
-                    port = settings.service_db_internal_port if settings.app_env == "production" else settings.service_db_port
-                    conninfo = _build_conninfo(
-                        host, port,
-                        settings.service_db_user,
-                        settings.service_db_password,
-                        db_name,
+                entry = self._tenants.get(db_name)
+                if entry is None:
+                    if len(self._tenants) >= _MAX_TENANTS:
+                        await self._evict_lru(exclude=db_name)
+                    entry = _TenantPools(db_name)
+                    self._tenants[db_name] = entry
+                if (entry.tx if transactional else entry.query) is None:
+                    base = _base_size(transactional)
+                    if not await self._ensure_budget(base, exclude=db_name):
+                        if not entry.pools():
+                            self._tenants.pop(db_name, None)
+                        raise PoolTimeout(
+                            f"connection budget exhausted ({_GLOBAL_MAX_CONNECTIONS}) "
+                            f"opening pool for '{db_name}'"
+                        )
+                    name = f"{db_name}-tx" if transactional else db_name
+                    pool = await _open_pool(
+                        _service_conninfo(db_name), name, transactional, base
                     )
-                    pool = AsyncConnectionPool(
-                        conninfo=conninfo,
-                        min_size= 0,
-                        max_size=_POOL_MAX_SIZE,
-                        max_idle=_POOL_MAX_IDLE,
-                        max_lifetime=_POOL_MAX_LIFETIME,
-                        reconnect_timeout=_POOL_RECONNECT_TIMEOUT,
-                        kwargs={"autocommit": True},
-                        reset=_reset_conn,
-                        check=AsyncConnectionPool.check_connection,
-                        open=False,
+                    if transactional:
+                        entry.tx = pool
+                    else:
+                        entry.query = pool
+                    logger.info(
+                        "Service DB %s pool opened for '%s' (size=%d)",
+                        "tx" if transactional else "query", db_name, base,
                     )
-                    await pool.open(wait=True)
-                    self._service_pools[db_name] = pool
-                    logger.info("Service DB pool opened for '%s'", db_name)
-        return self._service_pools[db_name]
+        self._tenants.move_to_end(db_name)
+        if transactional:
+            entry.tx_leases += 1
+        else:
+            entry.query_leases += 1
+        entry.last_used = monotonic()
+        return entry
+
+    async def _borrow(self, entry: _TenantPools, transactional: bool) -> None:
+        """Grow a saturated tenant pool by _POOL_GROW_STEP if the budget allows."""
+        async with self._lock:
+            pool = entry.tx if transactional else entry.query
+            if pool is None or not entry.is_saturated(transactional):
+                return
+            step = min(_POOL_GROW_STEP, _max_size(transactional) - pool.max_size)
+            if step <= 0 or not await self._ensure_budget(step, exclude=entry.db_name):
+                return
+            await pool.resize(0, pool.max_size + step)
+            self._counters["borrows"] += 1
+            logger.debug("Pool '%s' borrowed %d (max=%d)", pool.name, step, pool.max_size)
+
+    def _reserved(self) -> int:
+        reserved = sum(p.max_size for p in (self._client_pool, self._client_tx_pool) if p)
+        return reserved + sum(e.reserved() for e in self._tenants.values())
+
+    def _idle_candidates(self, exclude: str) -> list[_TenantPools]:
+        """Tenants not in use and not touched within the grace period, LRU first."""
+        return [
+            e for name, e in self._tenants.items()
+            if name != exclude and e.leases == 0 and e.idle_for() >= _POOL_EVICT_GRACE
+        ]
+
+    async def _ensure_budget(self, needed: int, exclude: str) -> bool:
+        """
+        Make `needed` connections of budget available; caller holds self._lock.
+
+        Reclaims borrowed capacity from idle tenants first, then evicts whole
+        idle tenants, least recently used first.
+        """
+        if self._reserved() + needed <= _GLOBAL_MAX_CONNECTIONS:
+            return True
+        for entry in self._idle_candidates(exclude):
+            if entry.borrowed() <= 0:
+                continue
+            for pool in entry.pools():
+                base = _base_size(pool is entry.tx)
+                if pool.max_size > base:
+                    await pool.resize(0, base)
+            self._counters["reclaims"] += 1
+            if self._reserved() + needed <= _GLOBAL_MAX_CONNECTIONS:
+                return True
+        for entry in self._idle_candidates(exclude):
+            await self._close_entry(entry)
+            self._counters["evictions"] += 1
+            if self._reserved() + needed <= _GLOBAL_MAX_CONNECTIONS:
+                return True
+        return False
+
+    async def _evict_lru(self, exclude: str) -> None:
+        """Evict the least recently used idle tenant; caller holds self._lock."""
+        candidates = self._idle_candidates(exclude)
+        if candidates:
+            await self._close_entry(candidates[0])
+            self._counters["evictions"] += 1
+
+    async def _close_entry(self, entry: _TenantPools) -> None:
+        self._tenants.pop(entry.db_name, None)
+        for pool in entry.pools():
+            await pool.close()
+        logger.info(
+            "Service DB pools closed for '%s' (idle %.0fs)", entry.db_name, entry.idle_for()
+        )
+
+    async def _maintenance_loop(self) -> None:
+        """Periodically close tenants idle past the TTL and hand back borrowed capacity."""
+        while True:
+            await asyncio.sleep(_POOL_MAINTENANCE_INTERVAL)
+            try:
+                await self.evict_idle()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Pool maintenance failed: %s", e)
+
+    async def evict_idle(self) -> int:
+        """Close tenants idle past _POOL_IDLE_TTL; shrink other idle tenants to base size."""
+        evicted = 0
+        async with self._lock:
+            for entry in self._idle_candidates(exclude=""):
+                if entry.idle_for() >= _POOL_IDLE_TTL:
+                    await self._close_entry(entry)
+                    self._counters["evictions"] += 1
+                    evicted += 1
+                    continue
+                for pool in entry.pools():
+                    base = _base_size(pool is entry.tx)
+                    if pool.max_size > base and pool.get_stats()["requests_waiting"] == 0:
+                        await pool.resize(0, base)
+        return evicted
+
+    async def discard_service_pools(self, db_name: str) -> None:
+        """Close and forget every pool for a tenant DB (e.g. before DROP DATABASE)."""
+        async with self._lock:
+            entry = self._tenants.get(db_name)
+            if entry is not None:
+                await self._close_entry(entry)
 
     @property
     def client_pool(self) -> AsyncConnectionPool:
@@ -107,12 +454,61 @@ class PoolManager:
             )
         return self._client_pool
 
+    @property
+    def client_tx_pool(self) -> AsyncConnectionPool:
+        if self._client_tx_pool is None:
+            raise RuntimeError(
+                "Pool not initialized — call await pool_manager.initialize() during app startup"
+            )
+        return self._client_tx_pool
+
+    def record_commit(self, db_name: str | None) -> None:
+        """Count a committed write to db_name (None = client DB)."""
+        self._commits[db_name or None] = self._commits.get(db_name or None, 0) + 1
+
+    def commit_version(self, db_name: str | None) -> int:
+        """Committed writes to db_name so far; changes whenever one commits."""
+        return self._commits.get(db_name or None, 0)
+
+    def get_stats(self) -> dict:
+        """Aggregate budget counters plus per-pool psycopg_pool stats."""
+        tenants = {
+            name: {
+                "idle_s": round(entry.idle_for(), 1),
+                "leases": entry.leases,
+                "query": entry.query.get_stats() if entry.query else None,
+                "tx": entry.tx.get_stats() if entry.tx else None,
+            }
+            for name, entry in self._tenants.items()
+        }
+        return {
+            "budget": {
+                "max_connections": _GLOBAL_MAX_CONNECTIONS,
+                "reserved": self._reserved(),
+                "tenants": len(self._tenants),
+                "max_tenants": _MAX_TENANTS,
+                **self._counters,
+            },
+            "client": {
+                "query": self._client_pool.get_stats() if self._client_pool else None,
+                "tx": self._client_tx_pool.get_stats() if self._client_tx_pool else None,
+            },
+            "tenants": tenants,
+        }
+
     async def close_all(self) -> None:
         """Close all pools gracefully. Call during application shutdown."""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
         pools: list[AsyncConnectionPool] = []
         if self._client_pool:
             pools.append(self._client_pool)
-        pools.extend(self._service_pools.values())
+        if self._client_tx_pool:
+            pools.append(self._client_tx_pool)
+        for entry in self._tenants.values():
+            pools.extend(entry.pools())
+        self._tenants.clear()
         for pool in pools:
             await pool.close()
         logger.info("All DB connection pools closed (%d pool(s))", len(pools))
@@ -2,23 +2,40 @@
 Database connection management using psycopg (psycopg3).
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from decimal import Decimal
+from time import perf_counter
 from typing import Any, AsyncGenerator, Required, TypedDict
 import psycopg
 import psycopg.sql as pgsql
 from psycopg_pool import PoolTimeout
-from psycopg.rows import dict_row
+from psycopg.rows import dict_row, tuple_row
 from psycopg.types.datetime import DateLoader, TimestampLoader, TimestamptzLoader
 from psycopg.types.numeric import FloatLoader
-from app.config import settings
 from app.db.sql.sql_base import SqlStore
 from app.core.exceptions import AppMessages, DatabaseException
 from app.logger import logger
 
-from app.db.connection.pool_manager import pool_manager
+from app.db.connection import result_cache
+from app.db.connection.pool_manager import (
+    current_search_path,
+    pool_manager,
+    remember_search_path,
+)
+from app.db.connection.statement_cache import execute_prepared, sql_id_for
 
 _MAX_BULK_PLACEHOLDERS: int = 2000
 
+# Server clock probe queued between pipelined batch items for per-item timing.
+_BATCH_CLOCK_SQL: str = "SELECT extract(epoch FROM clock_timestamp())::float8"
+
+# Upper bound on pool connections one fanned-out batch may hold at once.
+_BATCH_MAX_CONCURRENCY: int = 4
+
+# Rows pulled per FETCH by a streaming (server-side cursor) query.
+_STREAM_CHUNK_SIZE: int = 2000
+
 
 class _IsoDateLoader(DateLoader):  # pylint: disable=too-few-public-methods
     """Returns date values as ISO-formatted strings instead of date objects."""
@@ -50,60 +67,146 @@ class SqlBatchItem(TypedDict, total=False):
     sql_args: dict         # parameterised args; default {}
     schema: str            # search_path schema; default "public"
     text_dates: bool       # return date/timestamp as ISO strings; default False
+    columnar: bool         # return {"columns", "rows"} with tuple rows; default False
+
+
+# (sql_id, sql, sql_args, schema, text_dates, columnar) — see _resolve_batch.
+_ResolvedItem = tuple[str, str, dict, str, bool, bool]
+
+
+async def set_search_path(cur: psycopg.AsyncCursor, schema: str) -> None:
+    """
+    Point the cursor's session at `schema`, skipping the round trip when the
+    pooled connection is already tagged with it.
+
+    Every SET search_path on a pooled connection must go through here so the
+    tag stays truthful.
+    """
+    conn = cur.connection
+    if current_search_path(conn) == schema:
+        return
+    await cur.execute(pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema)))
+    remember_search_path(conn, schema)
+
+
+def _register_loaders(cur: psycopg.AsyncCursor, text_dates: bool) -> None:
+    """Numeric as float always; date/timestamp as ISO strings when text_dates."""
+    cur.adapters.register_loader("numeric", _FloatNumericLoader)
+    if text_dates:
+        cur.adapters.register_loader("date", _IsoDateLoader)
+        cur.adapters.register_loader("timestamp", _IsoTimestampLoader)
+        cur.adapters.register_loader("timestamptz", _IsoTimestamptzLoader)
+
+
+def _columnar_result(cur: psycopg.AsyncCursor, rows: list[tuple]) -> dict[str, list]:
+    """Compact result shape: column names once, then one positional tuple per row."""
+    return {"columns": [col.name for col in cur.description or ()], "rows": rows}
+
+
+def _resolve_batch(items: list[SqlBatchItem]) -> list[_ResolvedItem]:
+    """Resolve sql_ids up front so a bad id fails before a connection is borrowed."""
+    resolved: list[_ResolvedItem] = []
+    for item in items:
+        sql_id = item["sql_id"]
+        sql = getattr(SqlStore, sql_id, None)
+        if sql is None:
+            raise ValueError(f"Unknown sql_id: {sql_id!r}")
+        resolved.append((
+            sql_id,
+            sql,
+            item.get("sql_args") or {},
+            item.get("schema") or "public",
+            item.get("text_dates", False),
+            item.get("columnar", False),
+        ))
+    return resolved
+
+
+async def _run_batch_pipeline(
+    conn: psycopg.AsyncConnection,
+    resolved: list[_ResolvedItem],
+    prepare: bool,
+) -> list[list[Any] | dict | int]:
+    """
+    Run resolved batch items in psycopg pipeline mode: every statement (SETs
+    included) goes out in one flight and results are collected in order.
+
+    A clock probe is queued between items so the server time of each item
+    can be logged without extra round trips. `prepare` routes SqlStore
+    queries through the prepared-statement cache.
+    """
+    started = perf_counter()
+    async with AsyncExitStack() as stack:
+        cursors: list[psycopg.AsyncCursor] = []
+        probes: list[psycopg.AsyncCursor] = []
+        async with conn.pipeline():
+            probes.append(await stack.enter_async_context(conn.cursor()))
+            await probes[-1].execute(_BATCH_CLOCK_SQL)
+            for sql_id, sql, sql_args, schema, text_dates, columnar in resolved:
+                cur = await stack.enter_async_context(
+                    conn.cursor(row_factory=tuple_row if columnar else dict_row)
+                )
+                _register_loaders(cur, text_dates)
+                await set_search_path(cur, schema)
+                if prepare:
+                    await execute_prepared(cur, sql, sql_args, sql_id)
+                else:
+                    await cur.execute(sql, sql_args)
+                cursors.append(cur)
+                probes.append(await stack.enter_async_context(conn.cursor()))
+                await probes[-1].execute(_BATCH_CLOCK_SQL)
+
+        results: list[list[Any] | dict | int] = []
+        for cur, (*_, columnar) in zip(cursors, resolved):
+            if cur.description:
+                rows = await cur.fetchall()
+                results.append(_columnar_result(cur, rows) if columnar else rows)
+            else:
+                results.append(cur.rowcount if cur.rowcount >= 0 else 0)
+        clock = [(await probe.fetchone())[0] for probe in probes]
+
+    logger.debug(
+        "Batch of %d item(s) ran in %.1f ms; server ms per item: %s",
+        len(resolved),
+        (perf_counter() - started) * 1000,
+        ", ".join(
+            f"{sql_id}={(clock[i + 1] - clock[i]) * 1000:.1f}"
+            for i, (sql_id, *_) in enumerate(resolved)
+        ),
+    )
+    return results
 
 
 @asynccontextmanager
-async def _open_db_connection(  # pylint: disable=too-many-arguments,too-many-positional-arguments
-    host: str,
-    port: int,
-    user: str,
-    password: str,
-    dbname: str,
+async def _open_pooled_connection(
+    db_name: str | None,
     label: str,
     autocommit: bool = False,
 ) -> AsyncGenerator[psycopg.AsyncConnection, None]:
     """
-    Private async context manager that opens a psycopg connection.
+    Private async context manager that borrows a psycopg connection from pool_manager.
 
-    Commits automatically on clean exit; rolls back on exception.
-    The connection is always closed in the finally block.
+    For transactional pools the pool's connection context commits on clean exit
+    and rolls back on exception; autocommit pools commit every statement.
+    The connection is always returned to the pool, never closed.
     """
-    conn: psycopg.AsyncConnection | None = None
     try:
-        conn = await psycopg.AsyncConnection.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            dbname=dbname,
-            autocommit=autocommit,
-            connect_timeout=50,
-            keepalives=1,
-            keepalives_idle=30,
-            keepalives_interval=5,
-            keepalives_count=3,
-        )
-        logger.debug("%s database connection opened (autocommit=%s)", label, autocommit)
-        yield conn
+        async with pool_manager.connection(db_name, transactional=not autocommit) as conn:
+            logger.debug("%s pooled connection borrowed (autocommit=%s)", label, autocommit)
+            yield conn
         if not autocommit:
-            await conn.commit()
             logger.debug("%s database transaction committed", label)
+    except PoolTimeout as e:
+        logger.error("%s DB pool timeout: %s", label, e)
+        raise DatabaseException(AppMessages.DATABASE_UNAVAILABLE) from e
     except psycopg.OperationalError as e:
         logger.error("%s: %s", AppMessages.DATABASE_CONNECTION_FAILED, e)
         raise DatabaseException(AppMessages.DATABASE_CONNECTION_FAILED) from e
     except DatabaseException:
-        if not autocommit and conn and not conn.closed:
-            await conn.rollback()
         raise
     except Exception as e:
-        if not autocommit and conn and not conn.closed:
-            await conn.rollback()
         logger.error("Unexpected %s database error: %s", label, e)
         raise DatabaseException(AppMessages.DATABASE_QUERY_FAILED) from e
-    finally:
-        if conn and not conn.closed:
-            await conn.close()
-            logger.debug("%s database connection closed", label)
 
 
 async def exec_sql(
@@ -140,22 +243,15 @@ async def exec_sql(
 
     async with connection as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            cur.adapters.register_loader("numeric", _FloatNumericLoader)
-            if text_dates:
-                cur.adapters.register_loader("date", _IsoDateLoader)
-                cur.adapters.register_loader("timestamp", _IsoTimestampLoader)
-                cur.adapters.register_loader("timestamptz", _IsoTimestamptzLoader)
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(
-                    pgsql.Identifier(schema_to_set)
-                )
-            )
+            _register_loaders(cur, text_dates)
+            await set_search_path(cur, schema_to_set)
             await cur.execute(sql, sql_args)
             if cur.description:
                 records = await cur.fetchall()
             else:
                 records = cur.rowcount
 
+    result_cache.invalidate_statement(db_name, schema_to_set, sql)
     return records
 
 
@@ -195,14 +291,12 @@ async def exec_sql_dml(
 
     async with connection as conn:
         async with conn.cursor() as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(
-                    pgsql.Identifier(schema_to_set)
-                )
-            )
+            await set_search_path(cur, schema_to_set)
             await cur.execute(sql, sql_args)
             row_count = cur.rowcount if cur.rowcount >= 0 else 0
 
+    pool_manager.record_commit(db_name)   # autocommit: not seen by the pool checkout
+    result_cache.invalidate_statement(db_name, schema_to_set, sql)
     return row_count
 
 
@@ -225,26 +319,27 @@ async def exec_sql_object(
     connection = (
         get_service_db_connection(db_name) if db_name else get_client_db_connection()
     )
+    # process_details consumes the xDetails, so collect the tables up front.
+    tables = result_cache.written_tables(sql_object)
 
     async with connection as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(
-                    pgsql.Identifier(schema_to_set)
-                )
-            )
+            await set_search_path(cur, schema_to_set)
             record_id = await process_details(sql_object, cur)
             # closing connection and cursor is handled by the context manager automatically
 
+    # Committed: cached lookups reading these tables are stale now.
+    result_cache.invalidate_tables(db_name, schema_to_set, tables)
     return record_id
 
 
 async def exec_sql_batch(
     db_name: str | None,
     items: list[SqlBatchItem],
-) -> list[list[Any] | int]:
+) -> list[list[Any] | dict | int]:
     """
-    Execute multiple queries on a single shared connection.
+    Execute multiple queries on a single shared connection, pipelined so the
+    whole batch reaches the server in one flight.
 
     Args:
         db_name: None → client DB; str → service DB (same convention as exec_sql).
@@ -260,43 +355,14 @@ async def exec_sql_batch(
     if not items:
         return []
 
-    # Resolve all sql_ids before opening a connection so we fail fast on bad ids
-    resolved: list[tuple[str, dict, str, bool]] = []
-    for item in items:
-        sql_id = item["sql_id"]
-        sql = getattr(SqlStore, sql_id, None)
-        if sql is None:
-            raise ValueError(f"Unknown sql_id: {sql_id!r}")
-        resolved.append((
-            sql,
-            item.get("sql_args") or {},
-            item.get("schema") or "public",
-            item.get("text_dates", False),
-        ))
-
-    results: list[list[Any] | int] = []
+    resolved = _resolve_batch(items)
     connection = get_service_db_connection(db_name) if db_name else get_client_db_connection()
 
     async with connection as conn:
-        current_schema: str | None = None
-        for sql, sql_args, schema, text_dates in resolved:
-            async with conn.cursor(row_factory=dict_row) as cur:
-                cur.adapters.register_loader("numeric", _FloatNumericLoader)
-                if text_dates:
-                    cur.adapters.register_loader("date", _IsoDateLoader)
-                    cur.adapters.register_loader("timestamp", _IsoTimestampLoader)
-                    cur.adapters.register_loader("timestamptz", _IsoTimestamptzLoader)
-                if schema != current_schema:
-                    await cur.execute(
-                        pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema))
-                    )
-                    current_schema = schema
-                await cur.execute(sql, sql_args)
-                if cur.description:
-                    results.append(await cur.fetchall())
-                else:
-                    results.append(cur.rowcount if cur.rowcount >= 0 else 0)
+        results = await _run_batch_pipeline(conn, resolved, prepare=False)
 
+    for _sql_id, sql, _args, schema, _text_dates, _columnar in resolved:
+        result_cache.invalidate_statement(db_name, schema, sql)
     return results
 
 
@@ -306,7 +372,8 @@ async def exec_sql_query(
     sql: str | None = None,
     sql_args: dict | None = None,
     text_dates: bool = False,
-) -> list[Any]:
+    columnar: bool = False,
+) -> list[Any] | dict:
     """
     Pool-based SELECT execution for GraphQL query resolvers.
 
@@ -319,9 +386,12 @@ async def exec_sql_query(
         sql:        The parameterised SQL query to execute.
         sql_args:   Parameters to pass to the SQL query.
         text_dates: When True, date/timestamp columns are returned as ISO strings.
+        columnar:   When True, rows come back as {"columns": [...], "rows": [tuple, ...]}
+                    instead of one dict per row.
 
     Returns:
-        List of dict rows for SELECT queries; empty list for no-result queries.
+        List of dict rows (or the columnar dict) for SELECT queries; empty list
+        for no-result queries.
     """
     if not sql:
         raise ValueError(AppMessages.DATABASE_QUERY_FAILED)
@@ -329,41 +399,124 @@ async def exec_sql_query(
     sql_args = sql_args or {}
     schema_to_set = schema or "public"
 
-    pool = pool_manager.client_pool if not db_name else await pool_manager.get_service_pool(db_name)
-
     try:
-        async with pool.connection() as conn:
-            async with conn.cursor(row_factory=dict_row) as cur:
-                cur.adapters.register_loader("numeric", _FloatNumericLoader)
-                if text_dates:
-                    cur.adapters.register_loader("date", _IsoDateLoader)
-                    cur.adapters.register_loader("timestamp", _IsoTimestampLoader)
-                    cur.adapters.register_loader("timestamptz", _IsoTimestamptzLoader)
-                await cur.execute(
-                    pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_to_set))
-                )
-                await cur.execute(sql, sql_args)
+        async with pool_manager.connection(db_name) as conn:
+            async with conn.cursor(row_factory=tuple_row if columnar else dict_row) as cur:
+                _register_loaders(cur, text_dates)
+                await set_search_path(cur, schema_to_set)
+                sql_id = sql_id_for(sql)
+                await execute_prepared(cur, sql, sql_args, sql_id)
                 if cur.description:
-                    return await cur.fetchall()
+                    rows = await cur.fetchall()
+                    return _columnar_result(cur, rows) if columnar else rows
                 return []
     except PoolTimeout as e:
         logger.error("DB pool timeout (db=%r): %s", db_name, e)
         raise DatabaseException(AppMessages.DATABASE_UNAVAILABLE) from e
 
 
+async def exec_sql_query_stream(
+    db_name: str | None,
+    schema: str = "public",
+    sql: str | None = None,
+    sql_args: dict | None = None,
+    text_dates: bool = False,
+    chunk_size: int = _STREAM_CHUNK_SIZE,
+) -> AsyncGenerator[list[Any], None]:
+    """
+    Pool-based streaming SELECT for result sets too large to hold in memory.
+
+    Declares a named server-side cursor inside a short read transaction on a
+    borrowed pool connection and yields its rows in chunks of `chunk_size`,
+    so only one chunk is ever materialised. The connection stays borrowed
+    until the generator is exhausted or closed — consume it promptly and
+    close it (e.g. contextlib.aclosing) when stopping early.
+
+    Args:
+        db_name:    Service database name; pass None to use the client DB.
+        schema:     PostgreSQL schema to set for the session (default: "public").
+        sql:        The parameterised SQL query to execute.
+        sql_args:   Parameters to pass to the SQL query.
+        text_dates: When True, date/timestamp columns are returned as ISO strings.
+        chunk_size: Rows fetched from the server per round trip.
+
+    Yields:
+        Non-empty lists of dict rows, in query order.
+    """
+    if not sql:
+        raise ValueError(AppMessages.DATABASE_QUERY_FAILED)
+
+    sql_args = sql_args or {}
+    schema_to_set = schema or "public"
+    total = 0
+
+    try:
+        async with pool_manager.connection(db_name) as conn:
+            async with conn.cursor() as cur:
+                await set_search_path(cur, schema_to_set)
+            # DECLARE needs a transaction block; the query pool is autocommit.
+            async with conn.transaction():
+                async with conn.cursor(
+                    f"stream_{sql_id_for(sql) or 'query'}".lower(), row_factory=dict_row
+                ) as cur:
+                    _register_loaders(cur, text_dates)
+                    await cur.execute(sql, sql_args)
+                    while rows := await cur.fetchmany(chunk_size):
+                        total += len(rows)
+                        yield rows
+    except PoolTimeout as e:
+        logger.error("DB pool timeout (db=%r): %s", db_name, e)
+        raise DatabaseException(AppMessages.DATABASE_UNAVAILABLE) from e
+    logger.debug("Streamed %d row(s) in chunks of %d", total, chunk_size)
+
+
+async def _fan_out_batch(
+    db_name: str | None,
+    resolved: list[_ResolvedItem],
+    concurrency: int,
+) -> list[list[Any] | dict | int]:
+    """
+    Run each item on its own pooled connection, at most `concurrency` at a
+    time; results keep the order of `resolved`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run_item(item: _ResolvedItem) -> list[Any] | dict | int:
+        async with semaphore:
+            async with pool_manager.connection(db_name) as conn:
+                return (await _run_batch_pipeline(conn, [item], prepare=True))[0]
+
+    started = perf_counter()
+    results = await asyncio.gather(*(_run_item(item) for item in resolved))
+    logger.debug(
+        "Fanned-out batch of %d item(s) over %d connection(s) ran in %.1f ms",
+        len(resolved), concurrency, (perf_counter() - started) * 1000,
+    )
+    return list(results)
+
+
 async def exec_sql_batch_query(
     db_name: str | None,
     items: list[SqlBatchItem],
-) -> list[list[Any] | int]:
+    parallel: bool = False,
+    concurrency: int | None = None,
+) -> list[list[Any] | dict | int]:
     """
     Pool-based batch SELECT execution for GraphQL query resolvers.
 
-    Runs multiple queries on a single borrowed connection (autocommit).
+    By default runs every query on a single borrowed connection (autocommit)
+    in pipeline mode: one network flight for the whole batch. With parallel
+    the items are treated as independent reads and fanned out over several
+    pool connections instead, so the batch costs roughly its slowest item
+    rather than the sum of all of them.
     Do NOT use this for mutations — use exec_sql_batch() instead.
 
     Args:
-        db_name: None → client DB; str → service DB.
-        items:   Ordered list of SqlBatchItem dicts (same format as exec_sql_batch).
+        db_name:     None → client DB; str → service DB.
+        items:       Ordered list of SqlBatchItem dicts (same format as exec_sql_batch).
+        parallel:    Fan the items out over several pool connections.
+        concurrency: Connections a parallel batch may hold at once; defaults
+                     to and is capped at _BATCH_MAX_CONCURRENCY.
 
     Returns:
         List of results in the same order as items.
@@ -371,71 +524,37 @@ async def exec_sql_batch_query(
     if not items:
         return []
 
-    resolved: list[tuple[str, dict, str, bool]] = []
-    for item in items:
-        sql_id = item["sql_id"]
-        sql = getattr(SqlStore, sql_id, None)
-        if sql is None:
-            raise ValueError(f"Unknown sql_id: {sql_id!r}")
-        resolved.append((
-            sql,
-            item.get("sql_args") or {},
-            item.get("schema") or "public",
-            item.get("text_dates", False),
-        ))
-
-    pool = pool_manager.client_pool if not db_name else await pool_manager.get_service_pool(db_name)
-    results: list[list[Any] | int] = []
+    resolved = _resolve_batch(items)
+    fan_out = 1
+    if parallel:
+        fan_out = min(concurrency or _BATCH_MAX_CONCURRENCY, _BATCH_MAX_CONCURRENCY, len(resolved))
 
     try:
-        async with pool.connection() as conn:
-            current_schema: str | None = None
-            for sql, sql_args, schema, text_dates in resolved:
-                async with conn.cursor(row_factory=dict_row) as cur:
-                    cur.adapters.register_loader("numeric", _FloatNumericLoader)
-                    if text_dates:
-                        cur.adapters.register_loader("date", _IsoDateLoader)
-                        cur.adapters.register_loader("timestamp", _IsoTimestampLoader)
-                        cur.adapters.register_loader("timestamptz", _IsoTimestamptzLoader)
-                    if schema != current_schema:
-                        await cur.execute(
-                            pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema))
-                        )
-                        current_schema = schema
-                    await cur.execute(sql, sql_args)
-                    if cur.description:
-                        results.append(await cur.fetchall())
-                    else:
-                        results.append(cur.rowcount if cur.rowcount >= 0 else 0)
+        if fan_out > 1:
+            return await _fan_out_batch(db_name, resolved, fan_out)
+        async with pool_manager.connection(db_name) as conn:
+            return await _run_batch_pipeline(conn, resolved, prepare=True)
     except PoolTimeout as e:
         logger.error("DB pool timeout (db=%r): %s", db_name, e)
         raise DatabaseException(AppMessages.DATABASE_UNAVAILABLE) from e
 
-    return results
-
 
 @asynccontextmanager
 async def get_client_db_connection(
     autocommit: bool = False,
 ) -> AsyncGenerator[psycopg.AsyncConnection, None]:
     """
-    Async context manager that yields a client database connection.
+    Async context manager that yields a pooled client database connection.
+
+    Transactional work borrows from the client tx pool; autocommit work
+    (statements that cannot run inside a transaction block) borrows from the
+    autocommit query pool.
 
     Usage:
         async with get_client_db_connection() as conn:
             result = await conn.execute(...)
     """
-    host = settings.client_db_ip_address if settings.app_env == "production" else settings.client_db_host
-    port = settings.client_db_internal_port if settings.app_env == "production" else settings.client_db_port
-    async with _open_db_connection(
-        host=host,
-        port=port,
-        user=settings.client_db_user,
-        password=settings.client_db_password,
-        dbname=settings.client_db_name,
-        label="client",
-        autocommit=autocommit,
-    ) as conn:
+    async with _open_pooled_connection(None, label="client", autocommit=autocommit) as conn:
         yield conn
 
 
@@ -461,17 +580,20 @@ def get_insert_sql(
     if fkey_name and fkey_value:
         field_names.append(fkey_name)
 
-    values_list = list(x_data.values())
-    if fkey_name and fkey_value:
-        values_list.append(fkey_value)
-
     logger.debug("Building INSERT SQL for table '%s'", table_name)
     sql = pgsql.SQL("INSERT INTO {} ({}) VALUES ({}) RETURNING id").format(
         pgsql.Identifier(table_name),
         pgsql.SQL(", ").join(pgsql.Identifier(f) for f in field_names),
         pgsql.SQL(", ").join(pgsql.Placeholder() for _ in field_names),
     )
-    return (sql, tuple(values_list))
+    return (sql, _insert_values(x_data, fkey_name, fkey_value))
+
+
+def _insert_values(x_data: dict, fkey_name: str | None, fkey_value: Any) -> tuple:
+    """The parameters of get_insert_sql's statement, in placeholder order."""
+    if fkey_name and fkey_value:
+        return (*x_data.values(), fkey_value)
+    return tuple(x_data.values())
 
 
 @asynccontextmanager
@@ -480,23 +602,13 @@ async def get_service_db_connection(
     autocommit: bool = False,
 ) -> AsyncGenerator[psycopg.AsyncConnection, None]:
     """
-    Async context manager that yields a service database connection.
+    Async context manager that yields a pooled service database connection.
 
     Args:
         db_name:    Name of the service (tenant) database to connect to.
         autocommit: When True, each statement is committed immediately.
     """
-    host = settings.service_db_ip_address if settings.app_env == "production" else settings.service_db_host
-    port = settings.service_db_internal_port if settings.app_env == "production" else settings.service_db_port
-    async with _open_db_connection(
-        host=host,
-        port=port,
-        user=settings.service_db_user,
-        password=settings.service_db_password,
-        dbname=db_name,
-        label="service",
-        autocommit=autocommit,
-    ) as conn:
+    async with _open_pooled_connection(db_name, label="service", autocommit=autocommit) as conn:
         yield conn
 
 
@@ -535,7 +647,7 @@ def get_update_sql(x_data: dict, table_name: str) -> tuple[pgsql.Composed, tuple
         Tuple of (composed SQL, values tuple).
     """
     data_copy = x_data.copy()
-    record_id = data_copy.pop("id")
+    data_copy.pop("id", None)
     set_updated_at = data_copy.pop("to_set_updated_at", False)
 
     logger.debug("Building UPDATE SQL for table '%s'", table_name)
@@ -549,7 +661,25 @@ def get_update_sql(x_data: dict, table_name: str) -> tuple[pgsql.Composed, tuple
         pgsql.Identifier(table_name),
         pgsql.SQL(", ").join(assignments),
     )
-    return (sql, tuple(data_copy.values()) + (record_id,))
+    return (sql, _update_values(x_data))
+
+
+def _update_values(x_data: dict) -> tuple:
+    """The parameters of get_update_sql's statement, in placeholder order."""
+    values = [v for k, v in x_data.items() if k not in ("id", "to_set_updated_at")]
+    values.append(x_data["id"])
+    return tuple(values)
+
+
+def _row_shape(x_data: dict, table_name: str, fkey_name: str | None, fkey_value: Any) -> tuple:
+    """
+    A key equal for exactly those rows for which get_sql builds the same
+    statement, computed without building it.
+    """
+    if x_data.get("id", None) and (not x_data.get("isIdInsert", None)):
+        return ("UPDATE", table_name, tuple(x_data), bool(x_data.get("to_set_updated_at")))
+    columns = tuple(k for k in x_data if k != "isIdInsert")
+    return ("INSERT", table_name, columns, fkey_name if fkey_name and fkey_value else None)
 
 
 async def process_data(
@@ -600,6 +730,9 @@ async def bulk_insert_records(
 ) -> int:
     """
     Fast bulk insert using multi-row INSERT statements.
+
+    Fallback for bulk_copy.copy_records() where COPY cannot be used; unlike
+    it, any bad row aborts the whole insert.
     """
     if not records:
         return 0
@@ -623,9 +756,7 @@ async def bulk_insert_records(
         get_service_db_connection(db_name) if db_name else get_client_db_connection()
     ) as conn:
         async with conn.cursor() as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_to_set))
-            )
+            await set_search_path(cur, schema_to_set)
             for i in range(0, len(normalized), batch_size):
                 batch = normalized[i : i + batch_size]
                 sql = pgsql.SQL("INSERT INTO {} ({}) VALUES {}").format(
@@ -636,6 +767,7 @@ async def bulk_insert_records(
                 values = tuple(v for r in batch for v in r.values())
                 await cur.execute(sql, values)
 
+    result_cache.invalidate_tables(db_name, schema_to_set, {table_name})
     return len(records)
 
 
@@ -660,21 +792,223 @@ async def process_details(
     fkey_value: Any = None,
 ) -> int | None:
     """
-    Dispatch deletions and upserts for one sql_object node.
-    Processes any "deletedIds" first, then delegates "xData" rows to process_data.
+    Save one sql_object tree set-based, one tree level at a time.
+
+    Each level goes to the server as a single pipeline flight: the level's
+    "deletedIds" first, then one executemany(returning=True) per run of
+    consecutive sibling rows sharing a table and statement shape. The
+    returned ids are mapped back onto each row's "xDetails", which become the
+    next level with that id as their fkey value. A document therefore saves
+    in one round trip per nesting level, however many rows it has. Runs of
+    leaf INSERTs go as one multi-row INSERT instead (see _save_level).
+
+    Row semantics are those of process_data (id → UPDATE unless isIdInsert,
+    fkey added on INSERT only when both name and value are set). Rows keep
+    their input order within a level, so generated ids do too; all of a
+    level's rows run before any of their children.
+
     Returns:
-        The id of the last inserted/updated record, or None.
+        The id of the last inserted/updated row of the top-level xData, or None.
     """
+    level: list[tuple[dict, Any]] = [(sql_object, fkey_value)]
     ret = None
-    if "deletedIds" in sql_object:
-        await process_deleted_ids(sql_object, cur)
-    x_data = sql_object.get("xData", None)
-    table_name = sql_object.get("tableName", None)
-    fkey_name = sql_object.get("fkeyName", None)
-    if x_data:
-        if isinstance(x_data, list):
-            for item in x_data:
-                ret = await process_data(item, cur, table_name, fkey_name, fkey_value)
-        else:
-            ret = await process_data(x_data, cur, table_name, fkey_name, fkey_value)
+    top_level = True
+    while level:
+        rows: list[tuple[dict, str, str | None, Any, Any]] = []
+        for node, parent_id in level:
+            x_data = node.get("xData", None)
+            if not x_data:
+                continue
+            for item in x_data if isinstance(x_data, list) else [x_data]:
+                x_details = item.pop("xDetails", None)
+                rows.append((item, node.get("tableName", None), node.get("fkeyName", None), parent_id, x_details))
+
+        record_ids = await _save_level(level, rows, cur)
+        if top_level:
+            ret = record_ids[-1] if record_ids else None
+            top_level = False
+
+        level = []
+        for (_, _, _, _, x_details), record_id in zip(rows, record_ids):
+            if x_details:
+                for child in x_details if isinstance(x_details, list) else [x_details]:
+                    level.append((child, record_id))
     return ret
+
+
+async def _save_level(
+    level: list[tuple[dict, Any]],
+    rows: list[tuple[dict, str, str | None, Any, Any]],
+    cur: psycopg.AsyncCursor,
+) -> list[int | None]:
+    """
+    Run one level of process_details in a single pipeline: deletes, then an
+    executemany per run of same-shaped rows. Returns the ids in `rows` order.
+
+    A run of several leaf INSERTs (no xDetails) is sent instead as one
+    INSERT ... SELECT FROM unnest(...) (see _unnest_insert_sql), so
+    statement-level triggers such as trg_stock_balance_* see a document's
+    lines as one set.
+    """
+    conn = cur.connection
+    runs, leaf_shapes = _group_runs(rows)
+    unnest_sqls: list[pgsql.Composed | None] = []
+    for (_, _, params), shape in zip(runs, leaf_shapes):
+        unnest_sqls.append(
+            await _unnest_insert_sql(conn, shape, params)
+            if shape is not None and len(params) > 1 else None
+        )
+
+    record_ids: list[int | None] = [None] * len(rows)
+    async with AsyncExitStack() as stack:
+        cursors: list[tuple[list[int], psycopg.AsyncCursor, bool]] = []
+        async with conn.pipeline():
+            for node, _ in level:
+                if "deletedIds" in node:
+                    await process_deleted_ids(node, cur)
+            for (sql, indexes, params), unnest_sql in zip(runs, unnest_sqls):
+                run_cur = await stack.enter_async_context(conn.cursor(row_factory=tuple_row))
+                if unnest_sql is not None:
+                    columns = [_unnest_column(params, i) for i in range(len(params[0]))]
+                    await run_cur.execute(unnest_sql, columns)
+                else:
+                    await run_cur.executemany(sql, params, returning=True)
+                cursors.append((indexes, run_cur, unnest_sql is not None))
+
+        for indexes, run_cur, is_unnest in cursors:
+            if is_unnest:
+                for index, row in zip(indexes, await run_cur.fetchall()):
+                    record_ids[index] = row[0]
+                continue
+            for index in indexes:
+                row = await run_cur.fetchone()
+                record_ids[index] = row[0] if row else None
+                run_cur.nextset()
+    return record_ids
+
+
+def _group_runs(
+    rows: list[tuple[dict, str, str | None, Any, Any]],
+) -> tuple[list[tuple[pgsql.Composed, list[int], list[tuple]]], list[tuple | None]]:
+    """
+    Split a level's rows into runs of consecutive same-shaped rows, each as
+    (statement, row indexes, parameter tuples), plus each run's shape when it
+    is a run of leaf INSERTs and None otherwise.
+    """
+    runs: list[tuple[pgsql.Composed, list[int], list[tuple]]] = []
+    leaf_shapes: list[tuple | None] = []
+    last_key = None
+    for index, (x_data, table_name, fkey_name, parent_id, x_details) in enumerate(rows):
+        # get_sql only for the first row of a run: rendering a statement per
+        # row costs more than the server spends inserting it.
+        shape = _row_shape(x_data, table_name, fkey_name, parent_id)
+        key = (shape, not x_details and shape[0] == "INSERT")
+        if key != last_key:
+            sql, values = get_sql(x_data, table_name, fkey_name, parent_id)
+            runs.append((sql, [], []))
+            leaf_shapes.append(shape if key[1] else None)
+            last_key = key
+        elif shape[0] == "INSERT":
+            x_data.pop("isIdInsert", None)
+            values = _insert_values(x_data, fkey_name, parent_id)
+        else:
+            values = _update_values(x_data)
+        runs[-1][1].append(index)
+        runs[-1][2].append(values)
+    return runs, leaf_shapes
+
+
+# Base types of a table's columns, for casting _unnest_insert_sql's arrays.
+_COLUMN_TYPES_SQL: str = """
+    SELECT a.attname, format_type(a.atttypid, NULL)
+      FROM pg_attribute a
+     WHERE a.attrelid = to_regclass(quote_ident(%s))
+       AND a.attnum > 0
+       AND NOT a.attisdropped
+"""
+
+# Column types a fractional number cannot parse as text; runs sending one keep
+# executemany, where the number binds as a number and the assignment cast rounds it.
+_INTEGER_TYPES: frozenset[str] = frozenset(("smallint", "integer", "bigint"))
+
+# (database, schema, table) → {column: base type}, filled by _column_types.
+_column_type_cache: dict[tuple[str, str, str], dict[str, str]] = {}
+
+
+async def _column_types(
+    conn: psycopg.AsyncConnection,
+    table_name: str,
+    columns: tuple,
+) -> dict[str, str]:
+    """
+    Column base types of `table_name` as resolved by the session's
+    search_path. Cached per database and tagged schema; a column missing from
+    the cached entry (added since) refreshes it.
+    """
+    schema = current_search_path(conn)
+    key = (conn.info.dbname, schema, table_name) if schema else None
+    types = _column_type_cache.get(key) if key else None
+    if types is None or not set(columns) <= types.keys():
+        async with conn.cursor(row_factory=tuple_row) as type_cur:
+            await type_cur.execute(_COLUMN_TYPES_SQL, (table_name,))
+            types = dict(await type_cur.fetchall())
+        if key:
+            _column_type_cache[key] = types
+    return types
+
+
+async def _unnest_insert_sql(
+    conn: psycopg.AsyncConnection,
+    shape: tuple,
+    params: list[tuple],
+) -> pgsql.Composed | None:
+    """
+    One INSERT ... SELECT FROM unnest(...) RETURNING id for a run of
+    same-shaped leaf INSERT rows, or None when the run must stay an
+    executemany (array columns, list/dict values, unknown columns, non-int
+    numbers for integer columns).
+
+    Each column goes as a text[] parameter cast to the column's base type, so
+    values parse with the column's input function as text parameters do, and
+    the column's typmod is still enforced on assignment. Rows are inserted in
+    ordinality order, so RETURNING yields their ids in `params` order.
+    """
+    _, table_name, columns, fkey_name = shape
+    field_names = (*columns, fkey_name) if fkey_name else columns
+    if any(isinstance(v, (list, tuple, dict)) for values in params for v in values):
+        return None
+    types = await _column_types(conn, table_name, field_names)
+    if not set(field_names) <= types.keys() or any(types[f].endswith("]") for f in field_names):
+        return None
+    integer_positions = [i for i, f in enumerate(field_names) if types[f] in _INTEGER_TYPES]
+    if any(isinstance(values[i], (float, Decimal)) for values in params for i in integer_positions):
+        return None
+
+    aliases = [pgsql.Identifier(f"c{i}") for i in range(len(field_names))]
+    return pgsql.SQL(
+        "INSERT INTO {table} ({columns}) SELECT {casts} "
+        "FROM unnest({arrays}) WITH ORDINALITY AS u({aliases}, ord) ORDER BY u.ord RETURNING id"
+    ).format(
+        table=pgsql.Identifier(table_name),
+        columns=pgsql.SQL(", ").join(pgsql.Identifier(f) for f in field_names),
+        casts=pgsql.SQL(", ").join(
+            pgsql.SQL("u.{}::{}").format(alias, pgsql.SQL(types[f]))
+            for alias, f in zip(aliases, field_names)
+        ),
+        arrays=pgsql.SQL(", ").join(pgsql.SQL("%s::text[]") for _ in field_names),
+        aliases=pgsql.SQL(", ").join(aliases),
+    )
+
+
+def _unnest_column(params: list[tuple], position: int) -> list[str | None]:
+    """Column `position` of a run's rows in text form, for _unnest_insert_sql."""
+    column: list[str | None] = []
+    for values in params:
+        value = values[position]
+        if value is None or isinstance(value, str):
+            column.append(value)
+        elif isinstance(value, bool):
+            column.append("true" if value else "false")
+        else:
+            column.append(str(value))
+    return column
@@ -0,0 +1,182 @@
+"""
+Read-through result cache for reference-data SqlStore queries.
+
+Lookups such as GET_JOB_STATUSES or GET_ALL_BRANDS run on almost every screen
+load yet change only when an admin edits a master table. A query opts in by
+listing the tables it reads in _CACHED_QUERIES; its rows are then cached per
+(db, schema, sql_id, args, columnar) in one bounded LRU shared by all tenants.
+
+Every write helper of psycopg_driver and bulk_copy invalidates once its
+work has committed. exec_sql_object drops the entries of that (db, schema)
+whose query reads one of the sqlObject tree's tableNames. exec_sql,
+exec_sql_dml and exec_sql_batch do the same for the tables their statement
+text writes (written_by). DDL, DO/CALL blocks and Composable statements
+cannot be read that way, so they drop the whole (db, schema). So do the
+scheduler jobs, whose SQL functions write behind a plain SELECT. A
+per-(db, schema) version guards the read-through against a write committing
+while a read is in flight — a result fetched across a version bump is
+returned but never stored. Writes through a raw pooled connection (the job
+and invoice resolvers, which never touch the cached tables) or by other
+workers are bounded by _RESULT_TTL.
+
+Cached rows are copied on the way in and out, so a caller that edits its
+result cannot change what the next caller gets. The cached lookups return
+flat rows, so a copy of each row is enough.
+"""
+
+import json
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from time import monotonic
+from typing import Any
+
+_RESULT_TTL: float = 300.0     # seconds an entry is trusted without a local write
+_RESULT_MAX_ENTRIES: int = 1024
+
+# sql_id -> the tables its result depends on.
+_CACHED_QUERIES: dict[str, frozenset[str]] = {
+    "GET_ALL_BRANDS":          frozenset({"brand"}),
+    "GET_ALL_MODELS":          frozenset({"product_brand_model", "product", "brand"}),
+    "GET_ALL_PRODUCTS":        frozenset({"product"}),
+    "GET_ALL_TECHNICIANS":     frozenset({"technician", "branch"}),
+    "GET_JOB_RECEIVE_MANNERS": frozenset({"job_receive_manner"}),
+    "GET_JOB_STATUSES":        frozenset({"job_status"}),
+    "GET_JOB_TYPES":           frozenset({"job_type"}),
+}
+
+# Target of INSERT / UPDATE / DELETE / MERGE / COPY, optionally schema-qualified
+# or ONLY. Words after UPDATE in "DO UPDATE SET" or "FOR UPDATE OF" match too;
+# they never name a cached table, so they only cost a no-op.
+_WRITE_TARGET = re.compile(
+    r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|MERGE\s+INTO|COPY)\s+(?:ONLY\s+)?"
+    r'(?:"?\w+"?\.)?"?(\w+)"?',
+    re.IGNORECASE,
+)
+# Statements whose effect is not visible in the text: anything may change.
+_OPAQUE_STATEMENT = re.compile(
+    r"(?:^|;)\s*(?:--[^\n]*\n\s*)*(?:CREATE|ALTER|DROP|TRUNCATE|DO|CALL)\b",
+    re.IGNORECASE,
+)
+
+# key -> (stored_at, rows); key[:2] is (db_name, schema), key[2] the sql_id.
+_results: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+_versions: dict[tuple[str | None, str], int] = {}
+_counters: dict[str, list[int]] = {}   # sql_id -> [hits, misses]
+
+
+def is_cached(sql_id: str) -> bool:
+    return sql_id in _CACHED_QUERIES
+
+
+def result_key(db_name: str | None, schema: str, sql_id: str, sql_args: dict, columnar: bool) -> tuple:
+    return (db_name or None, schema, sql_id, json.dumps(sql_args, sort_keys=True, default=str), columnar)
+
+
+def version(key: tuple) -> int:
+    """The current write version of the key's (db, schema); pass it to remember()."""
+    return _versions.get(key[:2], 0)
+
+
+def cached_result(key: tuple) -> Any | None:
+    """The cached rows for `key`, or None when absent or expired."""
+    counter = _counters.setdefault(key[2], [0, 0])
+    hit = _results.get(key)
+    if hit is not None and monotonic() - hit[0] > _RESULT_TTL:
+        del _results[key]
+        hit = None
+    if hit is None:
+        counter[1] += 1
+        return None
+    counter[0] += 1
+    _results.move_to_end(key)
+    return _copied(hit[1])
+
+
+def remember(key: tuple, read_version: int, rows: Any) -> None:
+    """Store `rows` unless a write to the key's (db, schema) landed since `read_version`."""
+    if version(key) != read_version:
+        return
+    _results[key] = (monotonic(), _copied(rows))
+    _results.move_to_end(key)
+    while len(_results) > _RESULT_MAX_ENTRIES:
+        _results.popitem(last=False)
+
+
+def _copied(rows: Any) -> Any:
+    """A copy of a row list or columnar result that shares no mutable container with it."""
+    if isinstance(rows, list):
+        return [dict(row) if isinstance(row, dict) else row for row in rows]
+    if isinstance(rows, dict):  # columnar: {"columns": [...], "rows": [tuple, ...]}
+        return {name: list(value) if isinstance(value, list) else value for name, value in rows.items()}
+    return rows
+
+
+@lru_cache(maxsize=1024)
+def written_by(sql: str) -> frozenset[str] | None:
+    """The tables `sql` may write, or None when its effect cannot be read from the text."""
+    if _OPAQUE_STATEMENT.search(sql):
+        return None
+    return frozenset(name.lower() for name in _WRITE_TARGET.findall(sql))
+
+
+def written_tables(sql_object: Any) -> set[str]:
+    """Every tableName in a sqlObject tree, nested xDetails included."""
+    tables: set[str] = set()
+    nodes = [sql_object]
+    while nodes:
+        node = nodes.pop()
+        if not isinstance(node, dict):
+            continue
+        if node.get("tableName"):
+            tables.add(node["tableName"])
+        x_data = node.get("xData")
+        for item in x_data if isinstance(x_data, list) else [x_data]:
+            if isinstance(item, dict) and item.get("xDetails"):
+                x_details = item["xDetails"]
+                nodes.extend(x_details if isinstance(x_details, list) else [x_details])
+    return tables
+
+
+def invalidate_tables(db_name: str | None, schema: str, tables: set[str]) -> None:
+    """Drop the (db, schema) entries whose query reads any of `tables`."""
+    sql_ids = {sql_id for sql_id, deps in _CACHED_QUERIES.items() if deps & tables}
+    if not sql_ids:
+        return
+    scope = (db_name or None, schema)
+    _versions[scope] = _versions.get(scope, 0) + 1
+    for key in [k for k in _results if k[:2] == scope and k[2] in sql_ids]:
+        del _results[key]
+
+
+def invalidate_scope(db_name: str | None, schema: str) -> None:
+    """Drop every entry of (db, schema)."""
+    scope = (db_name or None, schema)
+    _versions[scope] = _versions.get(scope, 0) + 1
+    for key in [k for k in _results if k[:2] == scope]:
+        del _results[key]
+
+
+def invalidate_statement(db_name: str | None, schema: str, sql: Any) -> None:
+    """Drop the (db, schema) entries a committed `sql` (str or Composable) may have made stale."""
+    tables = written_by(sql) if isinstance(sql, str) else None
+    if tables is None:
+        invalidate_scope(db_name, schema)
+    elif tables:
+        invalidate_tables(db_name, schema, set(tables))
+
+
+def get_stats() -> dict:
+    """Result-cache size and hit/miss counters, overall and per sql_id."""
+    hits = sum(c[0] for c in _counters.values())
+    misses = sum(c[1] for c in _counters.values())
+    return {
+        "entries":  len(_results),
+        "hits":     hits,
+        "misses":   misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        "by_sql_id": {
+            sql_id: {"hits": c[0], "misses": c[1]}
+            for sql_id, c in sorted(_counters.items())
+        },
+    }
@@ -0,0 +1,110 @@
+"""
+Per-connection prepared-statement cache for SqlStore queries.
+
+Connections prepare each SqlStore sql_id the first time they run it through
+the query path (psycopg ``prepare=True``) and execute the server-side
+statement on every later call. Large CTE queries such as
+GET_JOB_PIPELINE_PAGED are therefore parsed and planned once per pooled
+connection instead of once per request. Postgres re-plans a prepared
+statement by itself when search_path or a referenced table changes, so the
+schema affinity in pool_manager needs no special handling here.
+
+Queries whose generic plan turns out worse than a per-call custom plan are
+listed in _PREPARE_OPT_OUT; they are never prepared, not even by psycopg's
+automatic prepare_threshold, and are not counted.
+
+Hit/miss counters are read from psycopg's own per-connection cache: an
+execution that made psycopg prepare a new statement (first use, or after
+psycopg evicted or deallocated it) is a miss, any other is a hit. There is
+no parallel bookkeeping that could drift from what the server really holds.
+That cache is psycopg-internal (checked against the 3.3 series pinned in
+requirements.txt); should a release drop it, queries still run prepared and
+simply go uncounted.
+
+Ad-hoc SQL (anything that is not a SqlStore constant) keeps psycopg's
+default behaviour.
+"""
+
+from psycopg import AsyncConnection, AsyncCursor
+
+from app.db.sql.sql_base import SqlStore
+
+_PREPARED_MAX: int = 400   # statements kept per connection; above the SqlStore size
+
+# sql_ids that must always run unprepared (generic plan worse than custom).
+_PREPARE_OPT_OUT: frozenset[str] = frozenset()
+
+_counters: dict[str, list[int]] = {}   # sql_id -> [hits, misses]
+_sql_ids: dict[str, str] = {}          # SqlStore SQL text -> sql_id, filled on first use
+
+
+def _build_sql_ids() -> dict[str, str]:
+    sql_ids: dict[str, str] = {}
+    for name in dir(SqlStore):
+        if name.startswith("_"):
+            continue
+        value = getattr(SqlStore, name)
+        if isinstance(value, str):
+            sql_ids.setdefault(value, name)
+    return sql_ids
+
+
+def sql_id_for(sql: str) -> str | None:
+    """The SqlStore attribute holding `sql`, or None for ad-hoc SQL."""
+    if not _sql_ids:
+        _sql_ids.update(_build_sql_ids())
+    return _sql_ids.get(sql)
+
+
+async def configure_connection(conn: AsyncConnection) -> None:
+    """Pool `configure` hook: size psycopg's statement cache for SqlStore."""
+    conn.prepared_max = _PREPARED_MAX
+
+
+def _prepared_serial(conn: AsyncConnection) -> int | None:
+    # psycopg numbers every statement it prepares on a connection (_pg3_<n>);
+    # the counter moves only when an execution had to prepare. None when this
+    # psycopg release does not keep it.
+    prepared = getattr(conn, "_prepared", None)
+    serial = getattr(prepared, "_prepared_idx", None)
+    return serial if isinstance(serial, int) else None
+
+
+async def execute_prepared(
+    cur: AsyncCursor, sql: str, sql_args: dict, sql_id: str | None
+) -> None:
+    """
+    cur.execute() that prepares SqlStore queries (prepare=True) and counts
+    whether the connection already held the statement. Opted-out sql_ids run
+    with prepare=False; they and ad-hoc SQL (psycopg's defaults) are not
+    counted.
+    """
+    if sql_id is None:
+        await cur.execute(sql, sql_args)
+        return
+    if sql_id in _PREPARE_OPT_OUT:
+        await cur.execute(sql, sql_args, prepare=False)
+        return
+    before = _prepared_serial(cur.connection)
+    await cur.execute(sql, sql_args, prepare=True)
+    after = _prepared_serial(cur.connection)
+    if before is None or after is None:
+        return
+    counts = _counters.setdefault(sql_id, [0, 0])
+    counts[0 if after == before else 1] += 1
+
+
+def get_stats() -> dict:
+    """Plan-cache hit/miss counters, overall and per sql_id."""
+    hits = sum(c[0] for c in _counters.values())
+    misses = sum(c[1] for c in _counters.values())
+    return {
+        "hits":     hits,
+        "misses":   misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        "opt_out":  sorted(_PREPARE_OPT_OUT),
+        "by_sql_id": {
+            sql_id: {"hits": c[0], "misses": c[1]}
+            for sql_id, c in sorted(_counters.items())
+        },
+    }
@@ -0,0 +1,101 @@
+"""
+Versioned upgrades of existing BU schemas.
+
+BU_SCHEMA_DDL always builds the current schema. A BU schema created before a
+change needs the matching UPGRADE_* script of BuAdminSql instead. MIGRATIONS
+lists those scripts under fixed, increasing versions, and every BU schema
+records the versions it has in its own schema_migration table.
+
+- New schemas: provisioning calls mark_bu_schema_current() right after
+  BU_SCHEMA_DDL, which records every version without running it.
+- Existing schemas: migrate_bu_schema() applies the versions not yet recorded,
+  oldest first. Each one runs in its own transaction together with its
+  schema_migration row, so a failure rolls back only that version and stops
+  the schema there. Schemas without a schema_migration table start from
+  version 1; the scripts are idempotent, so one that was applied by hand
+  before is simply re-run. `python -m app.db.tools.migrate_bu_schemas` runs
+  this for every active BU.
+
+Append new scripts under the next version. Never renumber or rewrite a
+version that has shipped.
+"""
+
+from contextlib import AbstractAsyncContextManager
+
+import psycopg
+
+from app.db.connection.psycopg_driver import (
+    get_client_db_connection,
+    get_service_db_connection,
+    set_search_path,
+)
+from app.db.sql.sql_base import SqlStore
+from app.logger import logger
+
+# (version, SqlStore attribute name), in the order the changes were made.
+MIGRATIONS: tuple[tuple[int, str], ...] = (
+    (1, "UPGRADE_JOB_KEYSET_INDEXES"),
+    (2, "UPGRADE_JOB_SEARCH_TEXT"),
+    (3, "UPGRADE_JOB_CHILD_COUNTS"),
+    (4, "UPGRADE_JOB_STATUS_COUNTER"),
+    (5, "UPGRADE_DAILY_KPI_ROLLUP"),
+    (6, "UPGRADE_DAILY_STOCK_SNAPSHOT"),
+    (7, "UPGRADE_STOCK_BALANCE_STATEMENT_TRIGGERS"),
+    (8, "UPGRADE_TRANSACTION_PARTITIONING"),
+    (9, "UPGRADE_PAGED_KEYSET_INDEXES"),
+)
+
+
+def _connection(db_name: str | None) -> AbstractAsyncContextManager[psycopg.AsyncConnection]:
+    return get_service_db_connection(db_name) if db_name else get_client_db_connection()
+
+
+async def _applied_versions(cur: psycopg.AsyncCursor) -> set[int]:
+    await cur.execute(SqlStore.GET_SCHEMA_MIGRATION_VERSIONS)
+    return {row[0] for row in await cur.fetchall()}
+
+
+async def mark_bu_schema_current(db_name: str | None, schema: str) -> None:
+    """Record every migration as applied, for a schema just built from BU_SCHEMA_DDL."""
+    async with _connection(db_name) as conn:
+        async with conn.cursor() as cur:
+            await set_search_path(cur, schema)
+            await cur.execute(SqlStore.ENSURE_SCHEMA_MIGRATION)
+            await cur.executemany(
+                SqlStore.INSERT_SCHEMA_MIGRATION,
+                [{"version": version, "name": name} for version, name in MIGRATIONS],
+            )
+
+
+async def pending_migrations(db_name: str | None, schema: str) -> list[tuple[int, str]]:
+    """The migrations `schema` has not applied yet, oldest first. Creates schema_migration if missing."""
+    async with _connection(db_name) as conn:
+        async with conn.cursor() as cur:
+            await set_search_path(cur, schema)
+            await cur.execute(SqlStore.ENSURE_SCHEMA_MIGRATION)
+            applied = await _applied_versions(cur)
+    return [(version, name) for version, name in MIGRATIONS if version not in applied]
+
+
+async def migrate_bu_schema(db_name: str | None, schema: str) -> list[int]:
+    """
+    Apply the pending migrations of one BU schema and return the versions applied.
+
+    A failing version raises DatabaseException after its transaction is rolled
+    back; the versions before it stay applied.
+    """
+    applied: list[int] = []
+    for version, name in await pending_migrations(db_name, schema):
+        async with _connection(db_name) as conn:
+            async with conn.cursor() as cur:
+                await set_search_path(cur, schema)
+                await cur.execute(SqlStore.LOCK_SCHEMA_MIGRATION)
+                if version in await _applied_versions(cur):
+                    continue  # a concurrent runner applied it meanwhile
+                logger.info("Migration %s/%s: applying %d %s", db_name, schema, version, name)
+                await cur.execute(getattr(SqlStore, name))
+                await cur.execute(
+                    SqlStore.INSERT_SCHEMA_MIGRATION, {"version": version, "name": name}
+                )
+        applied.append(version)
+    return applied
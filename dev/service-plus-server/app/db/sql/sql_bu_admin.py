@@ -895,6 +895,1085 @@ class BuAdminSql(BuAdminDdl):
         ) AS exists
     """
 
+    ENSURE_PG_TRGM = """
+        CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA security
+    """
+
+    # Creates the yearly job_transaction / stock_transaction partitions for this
+    # year and the next one that do not exist yet; run at provisioning and by
+    # the monthly scheduler job, so rows never fall into the default partition.
+    ENSURE_TRANSACTION_PARTITIONS = """
+        SELECT fn_ensure_transaction_partitions(CURRENT_DATE, (CURRENT_DATE + interval '1 year')::date) AS partitions_created
+    """
+
+    # ── BU schema migrations ──────────────────────────────────────────────────
+    # The UPGRADE_* scripts below bring a BU schema created before a change up
+    # to BU_SCHEMA_DDL. app/db/schema_migrations.py applies them in version
+    # order and records each one in the schema's schema_migration table.
+
+    ENSURE_SCHEMA_MIGRATION = """
+        CREATE TABLE IF NOT EXISTS schema_migration (
+            version integer NOT NULL,
+            name text NOT NULL,
+            applied_at timestamp with time zone DEFAULT now() NOT NULL,
+            CONSTRAINT schema_migration_pkey PRIMARY KEY (version)
+        )
+    """
+
+    # Serialises concurrent runners on one schema until the transaction ends.
+    LOCK_SCHEMA_MIGRATION = """
+        LOCK TABLE schema_migration IN SHARE ROW EXCLUSIVE MODE
+    """
+
+    GET_SCHEMA_MIGRATION_VERSIONS = """
+        SELECT version FROM schema_migration ORDER BY version
+    """
+
+    INSERT_SCHEMA_MIGRATION = """
+        with
+            "p_version" as (values(%(version)s::integer)),
+            "p_name"    as (values(%(name)s::text))
+        -- with
+        --     "p_version" as (values(1::integer)), -- Test line
+        --     "p_name"    as (values('UPGRADE_JOB_KEYSET_INDEXES'::text)) -- Test line
+        INSERT INTO schema_migration (version, name)
+        VALUES ((table "p_version"), (table "p_name"))
+        ON CONFLICT (version) DO NOTHING
+    """
+
+    # Adds the job indexes that back the keyset (cursor) paging of the job grids
+    # to a BU schema created before they were in BU_SCHEMA_DDL. The builds take
+    # a write lock on job while they run. Idempotent.
+    UPGRADE_JOB_KEYSET_INDEXES = """
+        CREATE INDEX IF NOT EXISTS job_branch_delivery_date_id_idx ON job USING btree (branch_id, delivery_date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS job_branch_job_date_id_idx ON job USING btree (branch_id, job_date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS job_branch_status_job_date_id_idx ON job USING btree (branch_id, job_status_id, job_date DESC, id DESC);
+    """
+
+    # Brings a BU schema created before job.search_text existed up to
+    # BU_SCHEMA_DDL: column, maintenance triggers, trigram index and backfill.
+    # Idempotent; run once per BU schema (search_path = the BU code).
+    UPGRADE_JOB_SEARCH_TEXT = """
+        CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA security;
+
+        ALTER TABLE job ADD COLUMN IF NOT EXISTS search_text text;
+
+        CREATE OR REPLACE FUNCTION fn_job_search_text(p_job_no text, p_alternate_job_no text, p_serial_no text, p_customer_contact_id bigint, p_technician_id bigint, p_product_brand_model_id bigint) RETURNS text
+            LANGUAGE plpgsql STABLE
+            AS $$
+        BEGIN
+            RETURN (
+                SELECT concat_ws(chr(31),
+                           p_job_no, p_alternate_job_no, p_serial_no,
+                           cc.full_name, cc.mobile, cc.email, cc.address_line1, cc.city,
+                           t.name, b.name, p.name, pbm.model_name)
+                FROM (SELECT 1) one
+                LEFT JOIN customer_contact    cc  ON cc.id  = p_customer_contact_id
+                LEFT JOIN technician          t   ON t.id   = p_technician_id
+                LEFT JOIN product_brand_model pbm ON pbm.id = p_product_brand_model_id
+                LEFT JOIN brand               b   ON b.id   = pbm.brand_id
+                LEFT JOIN product             p   ON p.id   = pbm.product_id
+            );
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION fn_refresh_job_search_text() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'customer_contact' THEN
+                UPDATE job j
+                   SET search_text = fn_job_search_text(j.job_no, j.alternate_job_no, j.serial_no,
+                                                        j.customer_contact_id, j.technician_id, j.product_brand_model_id)
+                 WHERE j.customer_contact_id = NEW.id;
+            ELSIF TG_TABLE_NAME = 'technician' THEN
+                UPDATE job j
+                   SET search_text = fn_job_search_text(j.job_no, j.alternate_job_no, j.serial_no,
+                                                        j.customer_contact_id, j.technician_id, j.product_brand_model_id)
+                 WHERE j.technician_id = NEW.id;
+            ELSIF TG_TABLE_NAME = 'product_brand_model' THEN
+                UPDATE job j
+                   SET search_text = fn_job_search_text(j.job_no, j.alternate_job_no, j.serial_no,
+                                                        j.customer_contact_id, j.technician_id, j.product_brand_model_id)
+                 WHERE j.product_brand_model_id = NEW.id;
+            ELSIF TG_TABLE_NAME = 'brand' THEN
+                UPDATE job j
+                   SET search_text = fn_job_search_text(j.job_no, j.alternate_job_no, j.serial_no,
+                                                        j.customer_contact_id, j.technician_id, j.product_brand_model_id)
+                 WHERE j.product_brand_model_id IN (SELECT id FROM product_brand_model WHERE brand_id = NEW.id);
+            ELSIF TG_TABLE_NAME = 'product' THEN
+                UPDATE job j
+                   SET search_text = fn_job_search_text(j.job_no, j.alternate_job_no, j.serial_no,
+                                                        j.customer_contact_id, j.technician_id, j.product_brand_model_id)
+                 WHERE j.product_brand_model_id IN (SELECT id FROM product_brand_model WHERE product_id = NEW.id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION fn_set_job_search_text() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+        BEGIN
+            NEW.search_text := fn_job_search_text(NEW.job_no, NEW.alternate_job_no, NEW.serial_no,
+                                                  NEW.customer_contact_id, NEW.technician_id, NEW.product_brand_model_id);
+            RETURN NEW;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS trg_job_search_text ON job;
+        CREATE TRIGGER trg_job_search_text BEFORE INSERT OR UPDATE OF job_no, alternate_job_no, serial_no, customer_contact_id, technician_id, product_brand_model_id ON job FOR EACH ROW EXECUTE FUNCTION fn_set_job_search_text();
+
+        DROP TRIGGER IF EXISTS trg_brand_job_search_text ON brand;
+        CREATE TRIGGER trg_brand_job_search_text AFTER UPDATE OF name ON brand FOR EACH ROW WHEN ((old.name IS DISTINCT FROM new.name)) EXECUTE FUNCTION fn_refresh_job_search_text();
+
+        DROP TRIGGER IF EXISTS trg_customer_contact_job_search_text ON customer_contact;
+        CREATE TRIGGER trg_customer_contact_job_search_text AFTER UPDATE OF full_name, mobile, email, address_line1, city ON customer_contact FOR EACH ROW WHEN (((old.full_name IS DISTINCT FROM new.full_name) OR (old.mobile IS DISTINCT FROM new.mobile) OR (old.email IS DISTINCT FROM new.email) OR (old.address_line1 IS DISTINCT FROM new.address_line1) OR (old.city IS DISTINCT FROM new.city))) EXECUTE FUNCTION fn_refresh_job_search_text();
+
+        DROP TRIGGER IF EXISTS trg_product_job_search_text ON product;
+        CREATE TRIGGER trg_product_job_search_text AFTER UPDATE OF name ON product FOR EACH ROW WHEN ((old.name IS DISTINCT FROM new.name)) EXECUTE FUNCTION fn_refresh_job_search_text();
+
+        DROP TRIGGER IF EXISTS trg_product_brand_model_job_search_text ON product_brand_model;
+        CREATE TRIGGER trg_product_brand_model_job_search_text AFTER UPDATE OF model_name, brand_id, product_id ON product_brand_model FOR EACH ROW WHEN (((old.model_name IS DISTINCT FROM new.model_name) OR (old.brand_id IS DISTINCT FROM new.brand_id) OR (old.product_id IS DISTINCT FROM new.product_id))) EXECUTE FUNCTION fn_refresh_job_search_text();
+
+        DROP TRIGGER IF EXISTS trg_technician_job_search_text ON technician;
+        CREATE TRIGGER trg_technician_job_search_text AFTER UPDATE OF name ON technician FOR EACH ROW WHEN ((old.name IS DISTINCT FROM new.name)) EXECUTE FUNCTION fn_refresh_job_search_text();
+
+        UPDATE job j
+           SET search_text = fn_job_search_text(j.job_no, j.alternate_job_no, j.serial_no,
+                                                j.customer_contact_id, j.technician_id, j.product_brand_model_id)
+         WHERE j.search_text IS NULL;
+
+        CREATE INDEX IF NOT EXISTS job_search_text_trgm_idx ON job USING gin (search_text security.gin_trgm_ops);
+    """
+
+    # Brings a BU schema created before job.file_count / job.transaction_count
+    # existed up to BU_SCHEMA_DDL. Triggers go in before the recount so no
+    # concurrent write is missed (CREATE TRIGGER blocks writers until commit).
+    # Idempotent; the closing recount alone is also safe to re-run at any time.
+    UPGRADE_JOB_CHILD_COUNTS = """
+        ALTER TABLE job ADD COLUMN IF NOT EXISTS file_count integer DEFAULT 0 NOT NULL;
+        ALTER TABLE job ADD COLUMN IF NOT EXISTS transaction_count integer DEFAULT 0 NOT NULL;
+
+        CREATE OR REPLACE FUNCTION fn_maintain_job_child_counts() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'job_image_doc' THEN
+                IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                    UPDATE job SET file_count = file_count - 1 WHERE id = OLD.job_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    UPDATE job SET file_count = file_count + 1 WHERE id = NEW.job_id;
+                END IF;
+            ELSE
+                IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                    UPDATE job SET transaction_count = transaction_count - 1 WHERE id = OLD.job_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    UPDATE job SET transaction_count = transaction_count + 1 WHERE id = NEW.job_id;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS trg_job_image_doc_file_count ON job_image_doc;
+        CREATE TRIGGER trg_job_image_doc_file_count AFTER INSERT OR DELETE OR UPDATE OF job_id ON job_image_doc FOR EACH ROW EXECUTE FUNCTION fn_maintain_job_child_counts();
+
+        DROP TRIGGER IF EXISTS trg_job_transaction_count ON job_transaction;
+        CREATE TRIGGER trg_job_transaction_count AFTER INSERT OR DELETE OR UPDATE OF job_id ON job_transaction FOR EACH ROW EXECUTE FUNCTION fn_maintain_job_child_counts();
+
+        UPDATE job j
+           SET file_count        = COALESCE(f.n, 0),
+               transaction_count = COALESCE(t.n, 0)
+          FROM job j2
+          LEFT JOIN (SELECT job_id, COUNT(*) AS n FROM job_image_doc   GROUP BY job_id) f ON f.job_id = j2.id
+          LEFT JOIN (SELECT job_id, COUNT(*) AS n FROM job_transaction GROUP BY job_id) t ON t.job_id = j2.id
+         WHERE j.id = j2.id
+           AND (j.file_count, j.transaction_count) IS DISTINCT FROM (COALESCE(f.n, 0), COALESCE(t.n, 0));
+    """
+
+    # Brings a BU schema created before job_status_counter existed up to
+    # BU_SCHEMA_DDL, then fills the counter through the reconcile function.
+    # Idempotent.
+    UPGRADE_JOB_STATUS_COUNTER = """
+        CREATE TABLE IF NOT EXISTS job_status_counter (
+            branch_id bigint NOT NULL,
+            job_status_id smallint NOT NULL,
+            is_final boolean NOT NULL,
+            is_warranty boolean NOT NULL,
+            job_count integer DEFAULT 0 NOT NULL,
+            updated_at timestamp with time zone DEFAULT now() NOT NULL,
+            CONSTRAINT job_status_counter_pkey PRIMARY KEY (branch_id, job_status_id, is_final, is_warranty)
+        );
+
+        CREATE OR REPLACE FUNCTION fn_maintain_job_status_counter() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+        BEGIN
+            -- Statement-level: the rows a statement touched are netted into one delta
+            -- per counter key and applied in key order. A save that leaves the counted
+            -- columns alone nets to zero and takes no counter lock at all.
+
+            IF TG_OP = 'INSERT' THEN
+
+                INSERT INTO job_status_counter (branch_id, job_status_id, is_final, is_warranty, job_count)
+                SELECT n.branch_id, n.job_status_id, n.is_final, COALESCE(jt.code = 'UNDER_WARRANTY', false), COUNT(*)
+                FROM new_rows n
+                LEFT JOIN job_type jt ON jt.id = n.job_type_id
+                GROUP BY 1, 2, 3, 4
+                ORDER BY 1, 2, 3, 4
+                ON CONFLICT (branch_id, job_status_id, is_final, is_warranty)
+                DO UPDATE SET
+                    job_count  = job_status_counter.job_count + EXCLUDED.job_count,
+                    updated_at = now();
+
+            ELSIF TG_OP = 'DELETE' THEN
+
+                INSERT INTO job_status_counter (branch_id, job_status_id, is_final, is_warranty, job_count)
+                SELECT o.branch_id, o.job_status_id, o.is_final, COALESCE(jt.code = 'UNDER_WARRANTY', false), -COUNT(*)
+                FROM old_rows o
+                LEFT JOIN job_type jt ON jt.id = o.job_type_id
+                GROUP BY 1, 2, 3, 4
+                ORDER BY 1, 2, 3, 4
+                ON CONFLICT (branch_id, job_status_id, is_final, is_warranty)
+                DO UPDATE SET
+                    job_count  = job_status_counter.job_count + EXCLUDED.job_count,
+                    updated_at = now();
+
+            ELSIF TG_OP = 'UPDATE' THEN
+
+                -- Old rows count -1 and new rows +1; unchanged rows cancel out.
+                INSERT INTO job_status_counter (branch_id, job_status_id, is_final, is_warranty, job_count)
+                SELECT d.branch_id, d.job_status_id, d.is_final, COALESCE(jt.code = 'UNDER_WARRANTY', false), SUM(d.delta)
+                FROM (
+                    SELECT branch_id, job_status_id, is_final, job_type_id, -1 AS delta FROM old_rows
+                    UNION ALL
+                    SELECT branch_id, job_status_id, is_final, job_type_id, 1 FROM new_rows
+                ) d
+                LEFT JOIN job_type jt ON jt.id = d.job_type_id
+                GROUP BY 1, 2, 3, 4
+                HAVING SUM(d.delta) <> 0
+                ORDER BY 1, 2, 3, 4
+                ON CONFLICT (branch_id, job_status_id, is_final, is_warranty)
+                DO UPDATE SET
+                    job_count  = job_status_counter.job_count + EXCLUDED.job_count,
+                    updated_at = now();
+
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION fn_reconcile_job_status_counter() RETURNS integer
+            LANGUAGE plpgsql
+            AS $$
+        DECLARE
+            v_fixed   integer;
+            v_dropped integer;
+        BEGIN
+
+            LOCK TABLE job_status_counter IN SHARE ROW EXCLUSIVE MODE;
+
+            CREATE TEMP TABLE tmp_job_status_count AS
+                SELECT j.branch_id, j.job_status_id, j.is_final,
+                       (jt.code = 'UNDER_WARRANTY') AS is_warranty,
+                       COUNT(*)::integer            AS job_count
+                FROM job j
+                JOIN job_type jt ON jt.id = j.job_type_id
+                GROUP BY 1, 2, 3, 4;
+
+            INSERT INTO job_status_counter (branch_id, job_status_id, is_final, is_warranty, job_count)
+            SELECT branch_id, job_status_id, is_final, is_warranty, job_count FROM tmp_job_status_count
+            ON CONFLICT (branch_id, job_status_id, is_final, is_warranty)
+            DO UPDATE SET
+                job_count  = EXCLUDED.job_count,
+                updated_at = now()
+            WHERE job_status_counter.job_count <> EXCLUDED.job_count;
+            GET DIAGNOSTICS v_fixed = ROW_COUNT;
+
+            DELETE FROM job_status_counter c
+            WHERE c.job_count <> 0
+              AND NOT EXISTS (
+                  SELECT 1 FROM tmp_job_status_count t
+                  WHERE t.branch_id     = c.branch_id
+                    AND t.job_status_id = c.job_status_id
+                    AND t.is_final      = c.is_final
+                    AND t.is_warranty   = c.is_warranty
+              );
+            GET DIAGNOSTICS v_dropped = ROW_COUNT;
+
+            DROP TABLE tmp_job_status_count;
+
+            RETURN v_fixed + v_dropped;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS trg_job_status_counter ON job;
+        DROP TRIGGER IF EXISTS trg_job_status_counter_update ON job;
+        DROP TRIGGER IF EXISTS trg_job_status_counter_delete ON job;
+        CREATE TRIGGER trg_job_status_counter_delete AFTER DELETE ON job REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_job_status_counter();
+        DROP TRIGGER IF EXISTS trg_job_status_counter_insert ON job;
+        CREATE TRIGGER trg_job_status_counter_insert AFTER INSERT ON job REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_job_status_counter();
+        CREATE TRIGGER trg_job_status_counter_update AFTER UPDATE ON job REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_job_status_counter();
+
+        SELECT fn_reconcile_job_status_counter();
+    """
+
+    # Brings a BU schema created before the daily KPI rollup existed up to
+    # BU_SCHEMA_DDL and backfills the rollup through yesterday. Idempotent.
+    UPGRADE_DAILY_KPI_ROLLUP = """
+        CREATE TABLE IF NOT EXISTS daily_kpi_rollup (
+            kpi_date date NOT NULL,
+            branch_id bigint NOT NULL,
+            jobs_received integer DEFAULT 0 NOT NULL,
+            jobs_received_warranty integer DEFAULT 0 NOT NULL,
+            jobs_delivered integer DEFAULT 0 NOT NULL,
+            job_invoice_count integer DEFAULT 0 NOT NULL,
+            job_invoice_amount numeric DEFAULT 0 NOT NULL,
+            job_invoice_aggregate numeric DEFAULT 0 NOT NULL,
+            job_invoice_aggregate_warranty numeric DEFAULT 0 NOT NULL,
+            job_cost numeric DEFAULT 0 NOT NULL,
+            job_cost_warranty numeric DEFAULT 0 NOT NULL,
+            sales_invoice_count integer DEFAULT 0 NOT NULL,
+            sales_invoice_amount numeric DEFAULT 0 NOT NULL,
+            sales_invoice_aggregate numeric DEFAULT 0 NOT NULL,
+            cgst_amount numeric DEFAULT 0 NOT NULL,
+            sgst_amount numeric DEFAULT 0 NOT NULL,
+            igst_amount numeric DEFAULT 0 NOT NULL,
+            refreshed_at timestamp with time zone DEFAULT now() NOT NULL,
+            CONSTRAINT daily_kpi_rollup_pkey PRIMARY KEY (kpi_date, branch_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS daily_kpi_dirty (
+            kpi_date date NOT NULL,
+            marked_at timestamp with time zone DEFAULT now() NOT NULL,
+            CONSTRAINT daily_kpi_dirty_pkey PRIMARY KEY (kpi_date)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_job_additional_charge_job ON job_additional_charge USING btree (job_id);
+        CREATE INDEX IF NOT EXISTS idx_job_invoice_date ON job_invoice USING btree (invoice_date);
+        CREATE INDEX IF NOT EXISTS idx_job_open_job_date ON job USING btree (job_date) WHERE (is_closed = false);
+        CREATE INDEX IF NOT EXISTS idx_sales_invoice_date ON sales_invoice USING btree (invoice_date);
+
+        CREATE OR REPLACE FUNCTION fn_daily_kpi_facts(p_from date, p_to date, p_days date[] DEFAULT '{}'::date[]) RETURNS TABLE(kpi_date date, branch_id bigint, jobs_received integer, jobs_received_warranty integer, jobs_delivered integer, job_invoice_count integer, job_invoice_amount numeric, job_invoice_aggregate numeric, job_invoice_aggregate_warranty numeric, job_cost numeric, job_cost_warranty numeric, sales_invoice_count integer, sales_invoice_amount numeric, sales_invoice_aggregate numeric, cgst_amount numeric, sgst_amount numeric, igst_amount numeric)
+            LANGUAGE plpgsql STABLE
+            AS $$
+        #variable_conflict use_column
+        DECLARE
+            v_warranty_type_id smallint := (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY');
+        BEGIN
+
+            RETURN QUERY
+            SELECT
+                f.kpi_date,
+                f.branch_id,
+                SUM(f.jobs_received)::integer,
+                SUM(f.jobs_received_warranty)::integer,
+                SUM(f.jobs_delivered)::integer,
+                SUM(f.job_invoice_count)::integer,
+                SUM(f.job_invoice_amount),
+                SUM(f.job_invoice_aggregate),
+                SUM(f.job_invoice_aggregate_warranty),
+                SUM(f.job_cost),
+                SUM(f.job_cost_warranty),
+                SUM(f.sales_invoice_count)::integer,
+                SUM(f.sales_invoice_amount),
+                SUM(f.sales_invoice_aggregate),
+                SUM(f.cgst_amount),
+                SUM(f.sgst_amount),
+                SUM(f.igst_amount)
+            FROM (
+                SELECT j.job_date AS kpi_date, j.branch_id,
+                       1 AS jobs_received,
+                       CASE WHEN j.job_type_id = v_warranty_type_id THEN 1 ELSE 0 END AS jobs_received_warranty,
+                       0 AS jobs_delivered,
+                       0 AS job_invoice_count, 0::numeric AS job_invoice_amount,
+                       0::numeric AS job_invoice_aggregate, 0::numeric AS job_invoice_aggregate_warranty,
+                       0::numeric AS job_cost, 0::numeric AS job_cost_warranty,
+                       0 AS sales_invoice_count, 0::numeric AS sales_invoice_amount, 0::numeric AS sales_invoice_aggregate,
+                       0::numeric AS cgst_amount, 0::numeric AS sgst_amount, 0::numeric AS igst_amount
+                FROM job j
+                WHERE j.job_date BETWEEN p_from AND p_to OR j.job_date = ANY (p_days)
+
+                UNION ALL
+                SELECT j.delivery_date, j.branch_id,
+                       0, 0, 1,
+                       0, 0, 0, 0, 0, 0,
+                       0, 0, 0,
+                       0, 0, 0
+                FROM job j
+                WHERE j.is_closed = true
+                  AND (j.delivery_date BETWEEN p_from AND p_to OR j.delivery_date = ANY (p_days))
+
+                UNION ALL
+                SELECT ji.invoice_date, j.branch_id,
+                       0, 0, 0,
+                       1, ji.amount,
+                       ji.aggregate, CASE WHEN j.job_type_id = v_warranty_type_id THEN ji.aggregate ELSE 0 END,
+                       c.cost, CASE WHEN j.job_type_id = v_warranty_type_id THEN c.cost ELSE 0 END,
+                       0, 0, 0,
+                       ji.cgst_amount, ji.sgst_amount, ji.igst_amount
+                FROM job_invoice ji
+                JOIN job j ON j.id = ji.job_id
+                CROSS JOIN LATERAL (
+                    SELECT COALESCE((SELECT SUM(jpu.cost_price * jpu.qty) FROM job_part_used jpu WHERE jpu.job_id = j.id), 0)
+                         + COALESCE((SELECT SUM(jac.cost_price * jac.qty) FROM job_additional_charge jac WHERE jac.job_id = j.id), 0)
+                           AS cost
+                ) c
+                WHERE ji.invoice_date BETWEEN p_from AND p_to OR ji.invoice_date = ANY (p_days)
+
+                UNION ALL
+                SELECT si.invoice_date, d.branch_id,
+                       0, 0, 0,
+                       0, 0, 0, 0, 0, 0,
+                       1, si.amount, si.aggregate,
+                       si.cgst_amount, si.sgst_amount, si.igst_amount
+                FROM sales_invoice si
+                JOIN division d ON d.id = si.division_id
+                WHERE si.is_return = false
+                  AND (si.invoice_date BETWEEN p_from AND p_to OR si.invoice_date = ANY (p_days))
+            ) f
+            GROUP BY f.kpi_date, f.branch_id;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION fn_daily_kpi_range(p_from date, p_to date) RETURNS TABLE(kpi_date date, branch_id bigint, jobs_received integer, jobs_received_warranty integer, jobs_delivered integer, job_invoice_count integer, job_invoice_amount numeric, job_invoice_aggregate numeric, job_invoice_aggregate_warranty numeric, job_cost numeric, job_cost_warranty numeric, sales_invoice_count integer, sales_invoice_amount numeric, sales_invoice_aggregate numeric, cgst_amount numeric, sgst_amount numeric, igst_amount numeric)
+            LANGUAGE plpgsql STABLE
+            AS $$
+        #variable_conflict use_column
+        DECLARE
+            v_rolled_through date   := (SELECT max(kpi_date) FROM daily_kpi_rollup);
+            v_dirty          date[] := ARRAY(
+                SELECT kpi_date FROM daily_kpi_dirty
+                WHERE kpi_date BETWEEN p_from AND LEAST(p_to, v_rolled_through)
+            );
+        BEGIN
+
+            RETURN QUERY
+            SELECT r.kpi_date, r.branch_id,
+                   r.jobs_received, r.jobs_received_warranty, r.jobs_delivered,
+                   r.job_invoice_count, r.job_invoice_amount, r.job_invoice_aggregate, r.job_invoice_aggregate_warranty,
+                   r.job_cost, r.job_cost_warranty,
+                   r.sales_invoice_count, r.sales_invoice_amount, r.sales_invoice_aggregate,
+                   r.cgst_amount, r.sgst_amount, r.igst_amount
+            FROM daily_kpi_rollup r
+            WHERE r.kpi_date BETWEEN p_from AND LEAST(p_to, v_rolled_through)
+              AND r.kpi_date <> ALL (v_dirty)
+            UNION ALL
+            SELECT * FROM fn_daily_kpi_facts(GREATEST(p_from, v_rolled_through + 1), p_to, v_dirty);
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION fn_mark_daily_kpi_dirty() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+        DECLARE
+            v_days date[] := '{}';
+        BEGIN
+
+            IF TG_TABLE_NAME = 'job' THEN
+                IF TG_OP = 'UPDATE' THEN
+                    -- Only the days whose facts the change moves: a delivery dirties its
+                    -- delivery day, not the intake day or the invoice days.
+                    IF (OLD.job_date, OLD.branch_id, OLD.job_type_id)
+                            IS DISTINCT FROM (NEW.job_date, NEW.branch_id, NEW.job_type_id) THEN
+                        v_days := v_days || ARRAY[OLD.job_date, NEW.job_date];
+                    END IF;
+                    IF (OLD.delivery_date, OLD.is_closed, OLD.branch_id)
+                            IS DISTINCT FROM (NEW.delivery_date, NEW.is_closed, NEW.branch_id) THEN
+                        v_days := v_days || ARRAY[OLD.delivery_date, NEW.delivery_date];
+                    END IF;
+                    IF (OLD.branch_id, OLD.job_type_id) IS DISTINCT FROM (NEW.branch_id, NEW.job_type_id) THEN
+                        v_days := v_days || ARRAY(SELECT invoice_date FROM job_invoice WHERE job_id = NEW.id);
+                    END IF;
+                ELSIF TG_OP = 'DELETE' THEN
+                    v_days := v_days || ARRAY[OLD.job_date, OLD.delivery_date]
+                        || ARRAY(SELECT invoice_date FROM job_invoice WHERE job_id = OLD.id);
+                ELSE
+                    v_days := v_days || ARRAY[NEW.job_date, NEW.delivery_date]
+                        || ARRAY(SELECT invoice_date FROM job_invoice WHERE job_id = NEW.id);
+                END IF;
+
+            ELSIF TG_TABLE_NAME IN ('job_invoice', 'sales_invoice') THEN
+                IF TG_OP <> 'INSERT' THEN
+                    v_days := v_days || OLD.invoice_date;
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    v_days := v_days || NEW.invoice_date;
+                END IF;
+
+            ELSE
+                -- job_part_used / job_additional_charge: cost counts on the job's invoice days
+                IF TG_OP <> 'INSERT' THEN
+                    v_days := v_days || ARRAY(SELECT invoice_date FROM job_invoice WHERE job_id = OLD.job_id);
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    v_days := v_days || ARRAY(SELECT invoice_date FROM job_invoice WHERE job_id = NEW.job_id);
+                END IF;
+            END IF;
+
+            INSERT INTO daily_kpi_dirty (kpi_date)
+            SELECT DISTINCT d FROM unnest(v_days) AS d
+            WHERE d < CURRENT_DATE
+            ON CONFLICT (kpi_date) DO NOTHING;
+
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION fn_refresh_daily_kpi_rollup() RETURNS integer
+            LANGUAGE plpgsql
+            AS $$
+        DECLARE
+            v_from  date;
+            v_to    date := CURRENT_DATE - 1;
+            v_dirty date[];
+            v_days  date[];
+        BEGIN
+
+            LOCK TABLE daily_kpi_rollup IN SHARE ROW EXCLUSIVE MODE;
+
+            SELECT max(kpi_date) + 1 INTO v_from FROM daily_kpi_rollup;
+            IF v_from IS NULL THEN
+                v_from := LEAST(
+                    (SELECT min(job_date)      FROM job),
+                    (SELECT min(delivery_date) FROM job),
+                    (SELECT min(invoice_date)  FROM job_invoice),
+                    (SELECT min(invoice_date)  FROM sales_invoice)
+                );
+            END IF;
+
+            WITH cleared AS (
+                DELETE FROM daily_kpi_dirty WHERE kpi_date <= v_to RETURNING kpi_date
+            )
+            SELECT ARRAY(SELECT kpi_date FROM cleared) INTO v_dirty;
+
+            v_days := ARRAY(
+                SELECT generate_series(v_from, v_to, interval '1 day')::date
+                UNION
+                SELECT unnest(v_dirty)
+            );
+            IF cardinality(v_days) = 0 THEN
+                RETURN 0;
+            END IF;
+
+            DELETE FROM daily_kpi_rollup WHERE kpi_date = ANY (v_days);
+
+            INSERT INTO daily_kpi_rollup (
+                kpi_date, branch_id,
+                jobs_received, jobs_received_warranty, jobs_delivered,
+                job_invoice_count, job_invoice_amount, job_invoice_aggregate, job_invoice_aggregate_warranty,
+                job_cost, job_cost_warranty,
+                sales_invoice_count, sales_invoice_amount, sales_invoice_aggregate,
+                cgst_amount, sgst_amount, igst_amount
+            )
+            SELECT d.kpi_date, b.id,
+                   COALESCE(f.jobs_received, 0), COALESCE(f.jobs_received_warranty, 0), COALESCE(f.jobs_delivered, 0),
+                   COALESCE(f.job_invoice_count, 0), COALESCE(f.job_invoice_amount, 0),
+                   COALESCE(f.job_invoice_aggregate, 0), COALESCE(f.job_invoice_aggregate_warranty, 0),
+                   COALESCE(f.job_cost, 0), COALESCE(f.job_cost_warranty, 0),
+                   COALESCE(f.sales_invoice_count, 0), COALESCE(f.sales_invoice_amount, 0), COALESCE(f.sales_invoice_aggregate, 0),
+                   COALESCE(f.cgst_amount, 0), COALESCE(f.sgst_amount, 0), COALESCE(f.igst_amount, 0)
+            FROM unnest(v_days) AS d(kpi_date)
+            CROSS JOIN branch b
+            LEFT JOIN fn_daily_kpi_facts(v_from, v_to, v_dirty) f
+                   ON f.kpi_date = d.kpi_date AND f.branch_id = b.id;
+
+            RETURN cardinality(v_days);
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS trg_job_daily_kpi ON job;
+        CREATE TRIGGER trg_job_daily_kpi AFTER INSERT OR DELETE OR UPDATE OF branch_id, job_date, delivery_date, is_closed, job_type_id ON job FOR EACH ROW EXECUTE FUNCTION fn_mark_daily_kpi_dirty();
+
+        DROP TRIGGER IF EXISTS trg_job_invoice_daily_kpi ON job_invoice;
+        CREATE TRIGGER trg_job_invoice_daily_kpi AFTER INSERT OR DELETE OR UPDATE OF job_id, invoice_date, amount, aggregate, cgst_amount, sgst_amount, igst_amount ON job_invoice FOR EACH ROW EXECUTE FUNCTION fn_mark_daily_kpi_dirty();
+
+        DROP TRIGGER IF EXISTS trg_job_part_used_daily_kpi ON job_part_used;
+        CREATE TRIGGER trg_job_part_used_daily_kpi AFTER INSERT OR DELETE OR UPDATE OF job_id, cost_price, qty ON job_part_used FOR EACH ROW EXECUTE FUNCTION fn_mark_daily_kpi_dirty();
+
+        DROP TRIGGER IF EXISTS trg_job_additional_charge_daily_kpi ON job_additional_charge;
+        CREATE TRIGGER trg_job_additional_charge_daily_kpi AFTER INSERT OR DELETE OR UPDATE OF job_id, cost_price, qty ON job_additional_charge FOR EACH ROW EXECUTE FUNCTION fn_mark_daily_kpi_dirty();
+
+        DROP TRIGGER IF EXISTS trg_sales_invoice_daily_kpi ON sales_invoice;
+        CREATE TRIGGER trg_sales_invoice_daily_kpi AFTER INSERT OR DELETE OR UPDATE OF division_id, invoice_date, is_return, amount, aggregate, cgst_amount, sgst_amount, igst_amount ON sales_invoice FOR EACH ROW EXECUTE FUNCTION fn_mark_daily_kpi_dirty();
+
+        SELECT fn_refresh_daily_kpi_rollup();
+    """
+
+    # Brings a BU schema with monthly stock_snapshot rows up to BU_SCHEMA_DDL and
+    # rebuilds the snapshot as daily rows from the first stock movement.
+    # Idempotent; the closing rebuild alone is also safe to re-run at any time.
+    UPGRADE_DAILY_STOCK_SNAPSHOT = """
+        CREATE TABLE IF NOT EXISTS stock_snapshot_dirty (
+            part_id bigint NOT NULL,
+            branch_id bigint NOT NULL,
+            from_date date NOT NULL,
+            CONSTRAINT stock_snapshot_dirty_pkey PRIMARY KEY (part_id, branch_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS stock_snapshot_part_id_branch_id_snapshot_date_idx ON stock_snapshot USING btree (part_id, branch_id, snapshot_date DESC);
+
+        CREATE OR REPLACE FUNCTION fn_mark_stock_snapshot_dirty() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+        BEGIN
+            -- Statement-level: one upsert per (part, branch) the statement touched,
+            -- taken in key order like fn_maintain_stock_balance().
+
+            IF TG_OP = 'INSERT' THEN
+
+                INSERT INTO stock_snapshot_dirty (part_id, branch_id, from_date)
+                SELECT part_id, branch_id, min(transaction_date)
+                FROM new_rows
+                WHERE transaction_date < CURRENT_DATE
+                GROUP BY part_id, branch_id
+                ORDER BY part_id, branch_id
+                ON CONFLICT (part_id, branch_id)
+                DO UPDATE SET from_date = EXCLUDED.from_date
+                WHERE stock_snapshot_dirty.from_date > EXCLUDED.from_date;
+
+            ELSIF TG_OP = 'DELETE' THEN
+
+                INSERT INTO stock_snapshot_dirty (part_id, branch_id, from_date)
+                SELECT part_id, branch_id, min(transaction_date)
+                FROM old_rows
+                WHERE transaction_date < CURRENT_DATE
+                GROUP BY part_id, branch_id
+                ORDER BY part_id, branch_id
+                ON CONFLICT (part_id, branch_id)
+                DO UPDATE SET from_date = EXCLUDED.from_date
+                WHERE stock_snapshot_dirty.from_date > EXCLUDED.from_date;
+
+            ELSIF TG_OP = 'UPDATE' THEN
+
+                -- Only rows whose snapshot inputs changed; both their old and new
+                -- (part, branch, date) are marked.
+                WITH changed AS (
+                    SELECT o.part_id AS old_part_id, o.branch_id AS old_branch_id, o.transaction_date AS old_date,
+                           n.part_id, n.branch_id, n.transaction_date
+                    FROM old_rows o
+                    JOIN new_rows n ON n.id = o.id
+                    WHERE (o.part_id, o.branch_id, o.transaction_date, o.stock_transaction_type_id, o.dr_cr, o.qty)
+                          IS DISTINCT FROM
+                          (n.part_id, n.branch_id, n.transaction_date, n.stock_transaction_type_id, n.dr_cr, n.qty)
+                )
+                INSERT INTO stock_snapshot_dirty (part_id, branch_id, from_date)
+                SELECT part_id, branch_id, min(from_date)
+                FROM (
+                    SELECT old_part_id, old_branch_id, old_date FROM changed
+                    UNION ALL
+                    SELECT part_id, branch_id, transaction_date FROM changed
+                ) d (part_id, branch_id, from_date)
+                WHERE from_date < CURRENT_DATE
+                GROUP BY part_id, branch_id
+                ORDER BY part_id, branch_id
+                ON CONFLICT (part_id, branch_id)
+                DO UPDATE SET from_date = EXCLUDED.from_date
+                WHERE stock_snapshot_dirty.from_date > EXCLUDED.from_date;
+
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION fn_refresh_stock_snapshot(p_from date DEFAULT NULL::date) RETURNS integer
+            LANGUAGE plpgsql
+            AS $$
+        DECLARE
+            v_to   date := CURRENT_DATE - 1;
+            v_from date;
+            v_rows integer;
+        BEGIN
+
+            LOCK TABLE stock_snapshot IN SHARE ROW EXCLUSIVE MODE;
+
+            SELECT max(snapshot_date) + 1 INTO v_from FROM stock_snapshot;
+            v_from := LEAST(COALESCE(v_from, (SELECT min(transaction_date) FROM stock_transaction)), p_from);
+
+            CREATE TEMP TABLE tmp_stock_snapshot_pair AS
+                SELECT DISTINCT st.part_id, st.branch_id, v_from AS from_date
+                FROM stock_transaction st
+                WHERE st.transaction_date BETWEEN v_from AND v_to
+                UNION
+                SELECT DISTINCT ss.part_id, ss.branch_id, v_from
+                FROM stock_snapshot ss
+                WHERE ss.snapshot_date >= v_from;
+
+            WITH cleared AS (
+                DELETE FROM stock_snapshot_dirty d
+                WHERE d.from_date <= v_to
+                RETURNING d.part_id, d.branch_id, d.from_date
+            )
+            INSERT INTO tmp_stock_snapshot_pair (part_id, branch_id, from_date)
+            SELECT part_id, branch_id, from_date FROM cleared;
+
+            DELETE FROM stock_snapshot ss
+            USING (
+                SELECT part_id, branch_id, min(from_date) AS from_date
+                FROM tmp_stock_snapshot_pair
+                GROUP BY part_id, branch_id
+            ) p
+            WHERE ss.part_id       = p.part_id
+              AND ss.branch_id     = p.branch_id
+              AND ss.snapshot_date >= p.from_date;
+
+            WITH
+            pair AS (
+                SELECT p.part_id, p.branch_id, p.from_date,
+                       COALESCE((
+                           SELECT ss.closing FROM stock_snapshot ss
+                           WHERE ss.part_id       = p.part_id
+                             AND ss.branch_id     = p.branch_id
+                             AND ss.snapshot_date < p.from_date
+                           ORDER BY ss.snapshot_date DESC
+                           LIMIT 1
+                       ), 0) AS base_closing
+                FROM (
+                    SELECT part_id, branch_id, min(from_date) AS from_date
+                    FROM tmp_stock_snapshot_pair
+                    GROUP BY part_id, branch_id
+                ) p
+            ),
+            movement AS (
+                SELECT
+                    st.transaction_date,
+                    st.part_id,
+                    st.branch_id,
+                    sum(case when st.dr_cr = 'D' then st.qty else -st.qty end)            as net_qty,
+                    sum(case when stt.code = 'PURCHASE'            then st.qty else 0 end) as purchase_in,
+                    sum(case when stt.code = 'PURCHASE_RETURN'     then st.qty else 0 end) as purchase_out,
+                    sum(case when stt.code = 'SALES_RETURN'        then st.qty else 0 end) as sales_in,
+                    sum(case when stt.code = 'SALES'               then st.qty else 0 end) as sales_out,
+                    sum(case when stt.code = 'ADJUSTMENT_IN'       then st.qty else 0 end) as adjust_in,
+                    sum(case when stt.code = 'ADJUSTMENT_OUT'      then st.qty else 0 end) as adjust_out,
+                    sum(case when stt.code = 'LOAN_IN'             then st.qty else 0 end) as loan_in,
+                    sum(case when stt.code = 'LOAN_OUT'            then st.qty else 0 end) as loan_out,
+                    sum(case when stt.code = 'BRANCH_TRANSFER_IN'  then st.qty else 0 end) as branch_transfer_in,
+                    sum(case when stt.code = 'BRANCH_TRANSFER_OUT' then st.qty else 0 end) as branch_transfer_out
+                FROM stock_transaction st
+                JOIN stock_transaction_type stt ON stt.id = st.stock_transaction_type_id
+                JOIN pair p ON p.part_id = st.part_id AND p.branch_id = st.branch_id
+                WHERE st.transaction_date BETWEEN p.from_date AND v_to
+                GROUP BY st.transaction_date, st.part_id, st.branch_id
+            )
+            INSERT INTO stock_snapshot (
+                snapshot_date, part_id, branch_id,
+                opening, closing,
+                purchase_in, purchase_out, sales_in, sales_out,
+                adjust_in, adjust_out, loan_in, loan_out,
+                branch_transfer_in, branch_transfer_out
+            )
+            SELECT
+                m.transaction_date, m.part_id, m.branch_id,
+                p.base_closing + sum(m.net_qty) OVER w - m.net_qty,
+                p.base_closing + sum(m.net_qty) OVER w,
+                m.purchase_in, m.purchase_out, m.sales_in, m.sales_out,
+                m.adjust_in, m.adjust_out, m.loan_in, m.loan_out,
+                m.branch_transfer_in, m.branch_transfer_out
+            FROM movement m
+            JOIN pair p ON p.part_id = m.part_id AND p.branch_id = m.branch_id
+            WINDOW w AS (PARTITION BY m.part_id, m.branch_id ORDER BY m.transaction_date);
+            GET DIAGNOSTICS v_rows = ROW_COUNT;
+
+            DROP TABLE tmp_stock_snapshot_pair;
+
+            RETURN v_rows;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS trg_stock_snapshot_dirty ON stock_transaction;
+        DROP TRIGGER IF EXISTS trg_stock_snapshot_dirty_delete ON stock_transaction;
+        CREATE TRIGGER trg_stock_snapshot_dirty_delete AFTER DELETE ON stock_transaction REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_mark_stock_snapshot_dirty();
+        DROP TRIGGER IF EXISTS trg_stock_snapshot_dirty_insert ON stock_transaction;
+        CREATE TRIGGER trg_stock_snapshot_dirty_insert AFTER INSERT ON stock_transaction REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_mark_stock_snapshot_dirty();
+        DROP TRIGGER IF EXISTS trg_stock_snapshot_dirty_update ON stock_transaction;
+        CREATE TRIGGER trg_stock_snapshot_dirty_update AFTER UPDATE ON stock_transaction REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_mark_stock_snapshot_dirty();
+
+        SELECT fn_refresh_stock_snapshot((SELECT min(transaction_date) FROM stock_transaction));
+    """
+
+    # Swaps the per-row stock_balance triggers of an existing BU schema for the
+    # statement-level ones in BU_SCHEMA_DDL. Balances are unchanged, so there is
+    # nothing to backfill. Idempotent.
+    UPGRADE_STOCK_BALANCE_STATEMENT_TRIGGERS = """
+        CREATE OR REPLACE FUNCTION fn_maintain_stock_balance() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+        BEGIN
+            -- Statement-level: one upsert per (part, branch) touched by the statement,
+            -- taken in key order so concurrent bulk saves lock balances consistently.
+
+            IF TG_OP = 'INSERT' THEN
+
+                INSERT INTO stock_balance (part_id, branch_id, qty)
+                SELECT part_id, branch_id, SUM(CASE dr_cr WHEN 'D' THEN qty ELSE -qty END)
+                FROM new_rows
+                GROUP BY part_id, branch_id
+                ORDER BY part_id, branch_id
+                ON CONFLICT (part_id, branch_id)
+                DO UPDATE SET
+                    qty        = stock_balance.qty + EXCLUDED.qty,
+                    updated_at = now();
+
+            ELSIF TG_OP = 'DELETE' THEN
+
+                -- Reverse the old rows' effect
+                INSERT INTO stock_balance (part_id, branch_id, qty)
+                SELECT part_id, branch_id, SUM(CASE dr_cr WHEN 'D' THEN -qty ELSE qty END)
+                FROM old_rows
+                GROUP BY part_id, branch_id
+                ORDER BY part_id, branch_id
+                ON CONFLICT (part_id, branch_id)
+                DO UPDATE SET
+                    qty        = stock_balance.qty + EXCLUDED.qty,
+                    updated_at = now();
+
+            ELSIF TG_OP = 'UPDATE' THEN
+
+                -- Reverse the old rows and apply the new ones in a single pass
+                -- (handles part_id/branch_id changes too); net-zero keys are skipped.
+                INSERT INTO stock_balance (part_id, branch_id, qty)
+                SELECT part_id, branch_id, SUM(effect)
+                FROM (
+                    SELECT part_id, branch_id, CASE dr_cr WHEN 'D' THEN -qty ELSE qty END AS effect FROM old_rows
+                    UNION ALL
+                    SELECT part_id, branch_id, CASE dr_cr WHEN 'D' THEN qty ELSE -qty END FROM new_rows
+                ) d
+                GROUP BY part_id, branch_id
+                HAVING SUM(effect) <> 0
+                ORDER BY part_id, branch_id
+                ON CONFLICT (part_id, branch_id)
+                DO UPDATE SET
+                    qty        = stock_balance.qty + EXCLUDED.qty,
+                    updated_at = now();
+
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS trg_stock_balance_delete ON stock_transaction;
+        CREATE TRIGGER trg_stock_balance_delete AFTER DELETE ON stock_transaction REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_stock_balance();
+        DROP TRIGGER IF EXISTS trg_stock_balance_insert ON stock_transaction;
+        CREATE TRIGGER trg_stock_balance_insert AFTER INSERT ON stock_transaction REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_stock_balance();
+        DROP TRIGGER IF EXISTS trg_stock_balance_update ON stock_transaction;
+        CREATE TRIGGER trg_stock_balance_update AFTER UPDATE ON stock_transaction REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_stock_balance();
+    """
+
+    # Converts job_transaction and stock_transaction of an existing BU schema to
+    # the yearly range partitions of BU_SCHEMA_DDL: the tables are rebuilt as
+    # partitioned parents, a partition is created for every year that holds rows
+    # (through next year), the rows are copied across with their ids, and the
+    # keys, indexes, foreign keys and triggers are recreated on the parents. The
+    # copy runs before the triggers exist, so balances and counters are untouched.
+    # Both tables are locked for the duration; run it out of hours. The former
+    # NOT VALID transfer-line foreign key is validated (partitioned tables do not
+    # take NOT VALID foreign keys), so orphaned transfer rows abort the upgrade.
+    # Idempotent: a schema whose job_transaction is already partitioned is skipped.
+    UPGRADE_TRANSACTION_PARTITIONING = """
+        CREATE OR REPLACE FUNCTION fn_maintain_job_child_counts() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+        BEGIN
+
+            IF TG_TABLE_NAME = 'job_image_doc' THEN
+
+                IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                    UPDATE job SET file_count = file_count - 1 WHERE id = OLD.job_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    UPDATE job SET file_count = file_count + 1 WHERE id = NEW.job_id;
+                END IF;
+
+            ELSE
+                -- job_transaction: the row trigger fires on its partition, so
+                -- TG_TABLE_NAME is job_transaction_y<YYYY> or job_transaction_default.
+
+                IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                    UPDATE job SET transaction_count = transaction_count - 1 WHERE id = OLD.job_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    UPDATE job SET transaction_count = transaction_count + 1 WHERE id = NEW.job_id;
+                END IF;
+
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION fn_ensure_transaction_partitions(p_from date, p_to date) RETURNS integer
+            LANGUAGE plpgsql
+            AS $$
+        DECLARE
+            v_table  text;
+            v_schema text;
+            v_year   integer;
+            v_start  date;
+            v_end    date;
+            v_part   text;
+            v_stray  boolean;
+            v_count  integer := 0;
+        BEGIN
+            FOREACH v_table IN ARRAY ARRAY['job_transaction', 'stock_transaction'] LOOP
+                SELECT quote_ident(n.nspname) INTO v_schema
+                FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.oid = to_regclass(v_table);
+
+                FOR v_year IN extract(year FROM p_from)::integer .. extract(year FROM p_to)::integer LOOP
+                    v_part  := v_table || '_y' || v_year;
+                    v_start := make_date(v_year, 1, 1);
+                    v_end   := make_date(v_year + 1, 1, 1);
+                    CONTINUE WHEN to_regclass(v_schema || '.' || v_part) IS NOT NULL;
+
+                    EXECUTE 'SELECT EXISTS (SELECT 1 FROM ' || v_schema || '.' || v_table || '_default'
+                            || ' WHERE transaction_date >= $1 AND transaction_date < $2)'
+                        INTO v_stray USING v_start, v_end;
+                    IF v_stray THEN
+                        RAISE NOTICE USING MESSAGE = v_schema || '.' || v_table || '_default holds rows of '
+                                                     || v_year || '; ' || v_part || ' not created';
+                        CONTINUE;
+                    END IF;
+
+                    EXECUTE 'CREATE TABLE ' || v_schema || '.' || v_part
+                            || ' PARTITION OF ' || v_schema || '.' || v_table
+                            || ' FOR VALUES FROM (' || quote_literal(v_start) || ') TO (' || quote_literal(v_end) || ')';
+                    v_count := v_count + 1;
+                END LOOP;
+            END LOOP;
+            RETURN v_count;
+        END;
+        $$;
+
+        DO $$
+        BEGIN
+            IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('job_transaction')) = 'p' THEN
+                RETURN;
+            END IF;
+
+            LOCK TABLE job_transaction, stock_transaction IN ACCESS EXCLUSIVE MODE;
+
+            ALTER TABLE job_transaction RENAME TO job_transaction_unpartitioned;
+            ALTER SEQUENCE job_transaction_id_seq RENAME TO job_transaction_unpartitioned_id_seq;
+
+            CREATE TABLE job_transaction (
+                id bigint GENERATED ALWAYS AS IDENTITY (SEQUENCE NAME job_transaction_id_seq) NOT NULL,
+                job_id bigint NOT NULL,
+                status_id smallint,
+                technician_id bigint,
+                amount numeric(12,2),
+                performed_by_user_id bigint NOT NULL,
+                performed_at timestamp with time zone DEFAULT now() NOT NULL,
+                previous_transaction_id bigint,
+                remarks text,
+                transaction_date date DEFAULT now() NOT NULL
+            )
+            PARTITION BY RANGE (transaction_date);
+            CREATE TABLE job_transaction_default PARTITION OF job_transaction DEFAULT;
+
+            ALTER TABLE stock_transaction RENAME TO stock_transaction_unpartitioned;
+            ALTER SEQUENCE stock_transaction_id_seq RENAME TO stock_transaction_unpartitioned_id_seq;
+
+            CREATE TABLE stock_transaction (
+                id bigint GENERATED ALWAYS AS IDENTITY (SEQUENCE NAME stock_transaction_id_seq) NOT NULL,
+                part_id bigint NOT NULL,
+                branch_id bigint NOT NULL,
+                stock_transaction_type_id smallint NOT NULL,
+                transaction_date date NOT NULL,
+                dr_cr character(1) NOT NULL,
+                qty numeric(12,3) NOT NULL,
+                unit_cost numeric(12,2),
+                remarks text,
+                created_at timestamp with time zone DEFAULT now() NOT NULL,
+                purchase_line_id bigint,
+                sales_line_id bigint,
+                stock_adjustment_line_id bigint,
+                job_part_used_id bigint,
+                stock_branch_transfer_line_id bigint,
+                stock_loan_line_id bigint,
+                stock_opening_balance_line_id bigint,
+                CONSTRAINT stock_transaction_check CHECK ((((((((((purchase_line_id IS NOT NULL))::integer + ((sales_line_id IS NOT NULL))::integer) + ((stock_adjustment_line_id IS NOT NULL))::integer) + ((job_part_used_id IS NOT NULL))::integer) + ((stock_branch_transfer_line_id IS NOT NULL))::integer) + ((stock_loan_line_id IS NOT NULL))::integer) + ((stock_opening_balance_line_id IS NOT NULL))::integer) = 1)),
+                CONSTRAINT stock_transaction_dr_cr_check CHECK ((dr_cr = ANY (ARRAY['D'::bpchar, 'C'::bpchar]))),
+                CONSTRAINT stock_transaction_qty_check CHECK ((qty > (0)::numeric))
+            )
+            PARTITION BY RANGE (transaction_date);
+            CREATE TABLE stock_transaction_default PARTITION OF stock_transaction DEFAULT;
+
+            PERFORM fn_ensure_transaction_partitions(
+                LEAST(CURRENT_DATE,
+                      (SELECT min(transaction_date) FROM job_transaction_unpartitioned),
+                      (SELECT min(transaction_date) FROM stock_transaction_unpartitioned)),
+                (CURRENT_DATE + interval '1 year')::date);
+
+            INSERT INTO job_transaction (id, job_id, status_id, technician_id, amount, performed_by_user_id, performed_at, previous_transaction_id, remarks, transaction_date)
+                OVERRIDING SYSTEM VALUE
+                SELECT id, job_id, status_id, technician_id, amount, performed_by_user_id, performed_at, previous_transaction_id, remarks, transaction_date FROM job_transaction_unpartitioned;
+            DROP TABLE job_transaction_unpartitioned;
+            PERFORM setval('job_transaction_id_seq', COALESCE((SELECT max(id) FROM job_transaction), 0) + 1, false);
+
+            ALTER TABLE job_transaction ADD CONSTRAINT job_transaction_pkey PRIMARY KEY (id, transaction_date);
+            CREATE INDEX idx_job_transaction_job_id ON job_transaction USING btree (job_id);
+            CREATE INDEX idx_job_transaction_performed_at ON job_transaction USING btree (performed_at);
+            CREATE INDEX idx_job_transaction_status ON job_transaction USING btree (status_id);
+            CREATE INDEX job_transaction_transaction_date_idx ON job_transaction USING btree (transaction_date) WITH (deduplicate_items='true');
+            ALTER TABLE job_transaction ADD CONSTRAINT job_transaction_job_fk FOREIGN KEY (job_id) REFERENCES job(id) ON DELETE CASCADE;
+            ALTER TABLE job_transaction ADD CONSTRAINT job_transaction_status_fk FOREIGN KEY (status_id) REFERENCES job_status(id) ON DELETE RESTRICT;
+            ALTER TABLE job_transaction ADD CONSTRAINT job_transaction_technician_fk FOREIGN KEY (technician_id) REFERENCES technician(id) ON DELETE RESTRICT;
+            CREATE TRIGGER trg_job_transaction_count AFTER INSERT OR DELETE OR UPDATE OF job_id ON job_transaction FOR EACH ROW EXECUTE FUNCTION fn_maintain_job_child_counts();
+
+            INSERT INTO stock_transaction (id, part_id, branch_id, stock_transaction_type_id, transaction_date, dr_cr, qty, unit_cost, remarks, created_at, purchase_line_id, sales_line_id, stock_adjustment_line_id, job_part_used_id, stock_branch_transfer_line_id, stock_loan_line_id, stock_opening_balance_line_id)
+                OVERRIDING SYSTEM VALUE
+                SELECT id, part_id, branch_id, stock_transaction_type_id, transaction_date, dr_cr, qty, unit_cost, remarks, created_at, purchase_line_id, sales_line_id, stock_adjustment_line_id, job_part_used_id, stock_branch_transfer_line_id, stock_loan_line_id, stock_opening_balance_line_id FROM stock_transaction_unpartitioned;
+            DROP TABLE stock_transaction_unpartitioned;
+            PERFORM setval('stock_transaction_id_seq', COALESCE((SELECT max(id) FROM stock_transaction), 0) + 1, false);
+
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_pkey PRIMARY KEY (id, transaction_date);
+            CREATE INDEX stock_transaction_part_id_branch_id_transaction_date_idx ON stock_transaction USING btree (part_id, branch_id, transaction_date) WITH (deduplicate_items='true');
+            CREATE INDEX stock_transaction_part_id_idx ON stock_transaction USING btree (part_id) WITH (deduplicate_items='true');
+            CREATE INDEX stock_transaction_stock_transaction_type_id_idx ON stock_transaction USING btree (stock_transaction_type_id) WITH (deduplicate_items='true');
+            CREATE INDEX stock_transaction_transaction_date_idx ON stock_transaction USING btree (transaction_date DESC) WITH (deduplicate_items='true');
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_branch_fk FOREIGN KEY (branch_id) REFERENCES branch(id) ON DELETE RESTRICT;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_job_part_used_id_fkey FOREIGN KEY (job_part_used_id) REFERENCES job_part_used(id) ON DELETE CASCADE;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_part_id_fk FOREIGN KEY (part_id) REFERENCES spare_part_master(id) ON DELETE RESTRICT;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_purchase_line_id_fkey FOREIGN KEY (purchase_line_id) REFERENCES purchase_invoice_line(id) ON DELETE CASCADE;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_sales_line_id_fkey FOREIGN KEY (sales_line_id) REFERENCES sales_invoice_line(id) ON DELETE CASCADE;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_stock_adjustment_line_id_fkey FOREIGN KEY (stock_adjustment_line_id) REFERENCES stock_adjustment_line(id) ON DELETE CASCADE;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_stock_branch_transfer_line_id_fkey FOREIGN KEY (stock_branch_transfer_line_id) REFERENCES stock_branch_transfer_line(id) ON DELETE CASCADE;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_stock_loan_line_id_fkey FOREIGN KEY (stock_loan_line_id) REFERENCES stock_loan_line(id) ON DELETE CASCADE;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_stock_opening_balance_line_id_fkey FOREIGN KEY (stock_opening_balance_line_id) REFERENCES stock_opening_balance_line(id) ON DELETE CASCADE;
+            ALTER TABLE stock_transaction ADD CONSTRAINT stock_transaction_type_fk FOREIGN KEY (stock_transaction_type_id) REFERENCES stock_transaction_type(id) ON DELETE RESTRICT;
+            CREATE TRIGGER trg_stock_balance_delete AFTER DELETE ON stock_transaction REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_stock_balance();
+            CREATE TRIGGER trg_stock_balance_insert AFTER INSERT ON stock_transaction REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_stock_balance();
+            CREATE TRIGGER trg_stock_balance_update AFTER UPDATE ON stock_transaction REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_maintain_stock_balance();
+            CREATE TRIGGER trg_stock_snapshot_dirty_delete AFTER DELETE ON stock_transaction REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_mark_stock_snapshot_dirty();
+            CREATE TRIGGER trg_stock_snapshot_dirty_insert AFTER INSERT ON stock_transaction REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_mark_stock_snapshot_dirty();
+            CREATE TRIGGER trg_stock_snapshot_dirty_update AFTER UPDATE ON stock_transaction REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION fn_mark_stock_snapshot_dirty();
+        END;
+        $$;
+    """
+
+    # Adds the indexes that back the keyset (cursor) paging of the invoice,
+    # payment, stock-document, delivery and stock-overview grids to a BU schema
+    # created before they were in BU_SCHEMA_DDL. Each build takes a write lock on
+    # its table while it runs. Idempotent.
+    UPGRADE_PAGED_KEYSET_INDEXES = """
+        CREATE INDEX IF NOT EXISTS job_branch_updated_at_id_idx ON job USING btree (branch_id, updated_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS job_invoice_invoice_date_id_idx ON job_invoice USING btree (invoice_date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS job_payment_payment_date_id_idx ON job_payment USING btree (payment_date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS purchase_invoice_branch_invoice_date_id_idx ON purchase_invoice USING btree (branch_id, invoice_date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS sales_invoice_invoice_date_id_idx ON sales_invoice USING btree (invoice_date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS spare_part_master_part_name_id_idx ON spare_part_master USING btree (part_name, id);
+        CREATE INDEX IF NOT EXISTS stock_adjustment_branch_adjustment_date_id_idx ON stock_adjustment USING btree (branch_id, adjustment_date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS stock_branch_transfer_transfer_date_id_idx ON stock_branch_transfer USING btree (transfer_date DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS stock_loan_branch_loan_date_id_idx ON stock_loan USING btree (branch_id, loan_date DESC, id DESC);
+    """
+
     # NOTE: security-schema DDL now lives in app/db/sql_security.py (SqlSecurity),
     # generated from service_plus_service.sql by app/db/tools/extract_schema.py.
 
@@ -590,6 +590,7 @@ class InventorySql:
         with
             "p_brand_id" as (values(%(brand_id)s::bigint)),
             "p_search"   as (values(%(search)s::text)),
+            "p_after_part_code" as (values(%(after_part_code)s::text)),
             "p_limit"    as (values(%(limit)s::int)),
             "p_offset"   as (values(%(offset)s::int))
         -- with "p_brand_id" as (values(1::bigint)), "p_search" as (values(''::text)), "p_limit" as (values(50::int)), "p_offset" as (values(0::int)) -- Test line
@@ -604,6 +605,7 @@ class InventorySql:
            OR LOWER(p.part_name)  LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(COALESCE(p.part_description, '')) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(COALESCE(p.model, ''))            LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND p.part_code > COALESCE((table "p_after_part_code"), '')
         ORDER BY p.part_code
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -625,6 +627,8 @@ class InventorySql:
     GET_PARTS_PAGED = """
         with
             "p_search" as (values(%(search)s::text)),
+            "p_after_brand_id"  as (values(%(after_brand_id)s::bigint)),
+            "p_after_part_code" as (values(%(after_part_code)s::text)),
             "p_limit"  as (values(%(limit)s::int)),
             "p_offset" as (values(%(offset)s::int))
         -- with "p_search" as (values(''::text)), "p_limit" as (values(50::int)), "p_offset" as (values(0::int)) -- Test line
@@ -635,13 +639,15 @@ class InventorySql:
             b.name AS brand_name
         FROM spare_part_master p
         JOIN brand b ON b.id = p.brand_id
-        WHERE (table "p_search") = ''
+        WHERE ((table "p_search") = ''
            OR LOWER(p.part_code)  LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(p.part_name)  LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(COALESCE(p.part_description, '')) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(COALESCE(p.category, '')) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(b.name)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-        ORDER BY b.name, p.part_code
+           OR LOWER(b.name)       LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (p.brand_id, p.part_code) > (COALESCE((table "p_after_brand_id"), 0),
+                                           COALESCE((table "p_after_part_code"), ''))
+        ORDER BY p.brand_id, p.part_code
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
     """
@@ -787,6 +793,8 @@ class InventorySql:
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_brand_id"  as (values(%(brand_id)s::bigint)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_part_name" as (values(%(after_part_name)s::text)),
+            "p_after_part_id" as (values(%(after_part_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -810,8 +818,10 @@ class InventorySql:
              LOWER(sp.part_description) ILIKE '%%' || LOWER((table "p_search")) || '%%' OR
              LOWER(sp.category)         ILIKE '%%' || LOWER((table "p_search")) || '%%')
         )
+        AND (sp.part_name, sp.id) > (COALESCE((table "p_after_part_name"), ''),
+                                     COALESCE((table "p_after_part_id"), 0))
         GROUP BY sp.id, sp.part_code, sp.part_name, sp.part_description, b.name, sp.category, sp.uom, sp.cost_price
-        ORDER BY sp.part_name
+        ORDER BY sp.part_name, sp.id
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
     """
@@ -950,6 +960,8 @@ class InventorySql:
             "p_from_date"   as (values(%(from_date)s::date)),
             "p_to_date"     as (values(%(to_date)s::date)),
             "p_search"      as (values(%(search)s::text)),
+            "p_after_invoice_date" as (values(%(after_invoice_date)s::date)),
+            "p_after_id"    as (values(%(after_id)s::bigint)),
             "p_limit"       as (values(%(limit)s::int)),
             "p_offset"      as (values(%(offset)s::int))
         -- with
@@ -987,6 +999,8 @@ class InventorySql:
           AND ((table "p_search") = ''
            OR LOWER(pi.invoice_no)  LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(s.name)         LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (pi.invoice_date, pi.id) < (COALESCE((table "p_after_invoice_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY pi.invoice_date DESC, pi.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1012,6 +1026,8 @@ class InventorySql:
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_is_posted"  as (values(%(is_posted)s::boolean)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_invoice_date" as (values(%(after_invoice_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -1033,6 +1049,8 @@ class InventorySql:
           AND ((table "p_search") = ''
            OR LOWER(pi.invoice_no) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(s.name)        LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (pi.invoice_date, pi.id) < (COALESCE((table "p_after_invoice_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY pi.invoice_date DESC, pi.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1147,6 +1165,8 @@ class InventorySql:
             "p_from_date" as (values(%(from_date)s::date)),
             "p_to_date"   as (values(%(to_date)s::date)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_adjustment_date" as (values(%(after_adjustment_date)s::date)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -1166,6 +1186,8 @@ class InventorySql:
           AND ((table "p_search") = ''
            OR LOWER(sa.adjustment_reason) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(COALESCE(sa.ref_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (sa.adjustment_date, sa.id) < (COALESCE((table "p_after_adjustment_date"), 'infinity'),
+                                             COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY sa.adjustment_date DESC, sa.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1224,6 +1246,8 @@ class InventorySql:
             "p_from_date" as (values(%(from_date)s::date)),
             "p_to_date"   as (values(%(to_date)s::date)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_transfer_date" as (values(%(after_transfer_date)s::date)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -1246,6 +1270,8 @@ class InventorySql:
           AND sbt.transfer_date BETWEEN (table "p_from_date") AND (table "p_to_date")
           AND ((table "p_search") = ''
            OR LOWER(COALESCE(sbt.ref_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (sbt.transfer_date, sbt.id) < (COALESCE((table "p_after_transfer_date"), 'infinity'),
+                                             COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY sbt.transfer_date DESC, sbt.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1313,6 +1339,8 @@ class InventorySql:
             "p_from"      as (values(%(from_date)s::date)),
             "p_to"        as (values(%(to_date)s::date)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_loan_date" as (values(%(after_loan_date)s::date)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -1331,6 +1359,8 @@ class InventorySql:
                   AND sll.loan_to ILIKE '%%' || (table "p_search") || '%%'
             )
           )
+          AND (sl.loan_date, sl.id) < (COALESCE((table "p_after_loan_date"), 'infinity'),
+                                       COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY sl.loan_date DESC, sl.id DESC
         LIMIT (table "p_limit")
         OFFSET (table "p_offset")
@@ -1527,85 +1557,24 @@ class InventorySql:
 
     # ── Stock Snapshot ────────────────────────────────────────────────────────
 
+    # Rebuilds the daily stock_snapshot rows from the 1st of the given month
+    # onwards (closings carry forward, so later days are rebuilt too). Run after
+    # back-dated entries; the nightly SQL_REFRESH_STOCK_SNAPSHOT covers the rest.
     SQL_GENERATE_STOCK_SNAPSHOT = """
         with
             "p_year"  as (values(%(year)s::int)),
-            "p_month" as (values(%(month)s::int)),
+            "p_month" as (values(%(month)s::int))
         -- with
         --     "p_year"  as (values(2026::int)), -- Test line
-        --     "p_month" as (values(3::int)),    -- Test line
-        period as (
-            select
-                date_trunc('month', make_date((table "p_year"), (table "p_month"), 1))::date                                as period_start,
-                (date_trunc('month', make_date((table "p_year"), (table "p_month"), 1)) + interval '1 month - 1 day')::date as period_end,
-                (date_trunc('month', make_date((table "p_year"), (table "p_month"), 1)) + interval '1 month - 1 day')::date as snapshot_date
-        ),
-        prev_snapshot as (
-            select ss.part_id, ss.branch_id, ss.closing
-            from stock_snapshot ss
-            inner join (
-                select part_id, branch_id, max(snapshot_date) as max_date
-                from stock_snapshot
-                where snapshot_date < (select period_start from period)
-                group by part_id, branch_id
-            ) latest on latest.part_id    = ss.part_id
-                    and latest.branch_id  = ss.branch_id
-                    and ss.snapshot_date      = latest.max_date
-        ),
-        tran_summary as (
-            select
-                st.part_id,
-                st.branch_id,
-                sum(case when stt.dr_cr = 'D' then st.qty else -st.qty end)           as net_qty,
-                sum(case when stt.code = 'PURCHASE'            then st.qty else 0 end) as purchase_in,
-                sum(case when stt.code = 'PURCHASE_RETURN'     then st.qty else 0 end) as purchase_out,
-                sum(case when stt.code = 'SALES_RETURN'        then st.qty else 0 end) as sales_in,
-                sum(case when stt.code = 'SALES'               then st.qty else 0 end) as sales_out,
-                sum(case when stt.code = 'ADJUSTMENT_IN'       then st.qty else 0 end) as adjust_in,
-                sum(case when stt.code = 'ADJUSTMENT_OUT'      then st.qty else 0 end) as adjust_out,
-                sum(case when stt.code = 'LOAN_IN'             then st.qty else 0 end) as loan_in,
-                sum(case when stt.code = 'LOAN_OUT'            then st.qty else 0 end) as loan_out,
-                sum(case when stt.code = 'BRANCH_TRANSFER_IN'  then st.qty else 0 end) as branch_transfer_in,
-                sum(case when stt.code = 'BRANCH_TRANSFER_OUT' then st.qty else 0 end) as branch_transfer_out
-            from stock_transaction st
-            join stock_transaction_type stt on stt.id = st.stock_transaction_type_id
-            where st.transaction_date between (select period_start from period)
-                                          and (select period_end   from period)
-            group by st.part_id, st.branch_id
-        )
-        insert into stock_snapshot (
-            snapshot_date, part_id, branch_id,
-            opening, closing,
-            purchase_in, purchase_out, sales_in, sales_out,
-            adjust_in, adjust_out, loan_in, loan_out,
-            branch_transfer_in, branch_transfer_out
-        )
-        select
-            (select snapshot_date from period),
-            ts.part_id, ts.branch_id,
-            coalesce(ps.closing, 0)                  as opening,
-            coalesce(ps.closing, 0) + ts.net_qty     as closing,
-            ts.purchase_in,  ts.purchase_out,
-            ts.sales_in,     ts.sales_out,
-            ts.adjust_in,    ts.adjust_out,
-            ts.loan_in,      ts.loan_out,
-            ts.branch_transfer_in, ts.branch_transfer_out
-        from tran_summary ts
-        left join prev_snapshot ps on ps.part_id = ts.part_id and ps.branch_id = ts.branch_id
-        on conflict (snapshot_date, part_id, branch_id) do update set
-            opening             = excluded.opening,
-            closing             = excluded.closing,
-            purchase_in         = excluded.purchase_in,
-            purchase_out        = excluded.purchase_out,
-            sales_in            = excluded.sales_in,
-            sales_out           = excluded.sales_out,
-            adjust_in           = excluded.adjust_in,
-            adjust_out          = excluded.adjust_out,
-            loan_in             = excluded.loan_in,
-            loan_out            = excluded.loan_out,
-            branch_transfer_in  = excluded.branch_transfer_in,
-            branch_transfer_out = excluded.branch_transfer_out
-        returning part_id
+        --     "p_month" as (values(3::int))     -- Test line
+        select fn_refresh_stock_snapshot(
+            make_date((table "p_year"), (table "p_month"), 1)
+        ) as rows_written
+    """
+
+    # Nightly roll of the days since the last run plus any dirty (part, branch).
+    SQL_REFRESH_STOCK_SNAPSHOT = """
+        select fn_refresh_stock_snapshot() as rows_written
     """
 
     SQL_PART_FINDER_STOCK_SUMMARY = """
@@ -1615,20 +1584,24 @@ class InventorySql:
         -- with
         --     "p_part_id"   as (values(1::bigint)), -- Test line
         --     "p_branch_id" as (values(1::bigint)), -- Test line
+        dirty_from as (
+            select from_date
+            from stock_snapshot_dirty
+            where part_id   = (table "p_part_id")
+              and branch_id = (table "p_branch_id")
+        ),
         last_snap as (
-            select snapshot_date, closing,
-                   purchase_in, purchase_out, sales_in, sales_out,
-                   adjust_in, adjust_out, loan_in, loan_out,
-                   branch_transfer_in, branch_transfer_out
+            select snapshot_date, closing
             from stock_snapshot
             where part_id   = (table "p_part_id")
               and branch_id = (table "p_branch_id")
+              and snapshot_date < coalesce((select from_date from dirty_from), 'infinity'::date)
             order by snapshot_date desc
             limit 1
         ),
         tran_since as (
             select
-                sum(case when stt.dr_cr = 'D' then st.qty else -st.qty end)           as net_qty,
+                sum(case when st.dr_cr = 'D' then st.qty else -st.qty end)            as net_qty,
                 sum(case when stt.code = 'PURCHASE'            then st.qty else 0 end) as purchase_in,
                 sum(case when stt.code = 'PURCHASE_RETURN'     then st.qty else 0 end) as purchase_out,
                 sum(case when stt.code = 'SALES_RETURN'        then st.qty else 0 end) as sales_in,
@@ -241,60 +241,51 @@ class JobsSql:
     # GET_JOB_PIPELINE_PAGED below — they are never written to the DB.
     GET_JOB_PIPELINE_STATUS_COUNTS = """
         with "p_branch_id" as (values(%(branch_id)s::bigint))
+        -- Reads the trigger-maintained job_status_counter, never job itself.
         SELECT status_id, status_name, status_code, count, warranty_count, oow_count
         FROM (
             SELECT
                 js.id   AS status_id,
                 js.name AS status_name,
                 js.code AS status_code,
-                COUNT(j.id) AS count,
-                COUNT(j.id) FILTER (WHERE j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY'))              AS warranty_count,
-                COUNT(j.id) FILTER (WHERE j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')) AS oow_count,
+                COALESCE(SUM(c.job_count), 0)                                     AS count,
+                COALESCE(SUM(c.job_count) FILTER (WHERE c.is_warranty), 0)        AS warranty_count,
+                COALESCE(SUM(c.job_count) FILTER (WHERE NOT c.is_warranty), 0)    AS oow_count,
                 js.display_order AS sort_order
             FROM job_status js
-            LEFT JOIN job j
-                ON j.job_status_id = js.id
-               AND j.branch_id = (table "p_branch_id")
+            LEFT JOIN job_status_counter c
+                ON c.job_status_id = js.id
+               AND c.branch_id = (table "p_branch_id")
             WHERE js.code <> 'COMPLETED_OK'
             GROUP BY js.id, js.name, js.code, js.display_order
 
             UNION ALL
 
             SELECT
-                1001                AS status_id,
-                'Completed OK'      AS status_name,
-                'COMPLETED_OK'      AS status_code,
-                COUNT(j.id) FILTER (WHERE NOT j.is_final)                                                                                          AS count,
-                COUNT(j.id) FILTER (WHERE NOT j.is_final AND j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY'))              AS warranty_count,
-                COUNT(j.id) FILTER (WHERE NOT j.is_final AND j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')) AS oow_count,
+                CASE WHEN f.is_final THEN 1002 ELSE 1001 END                                  AS status_id,
+                CASE WHEN f.is_final THEN 'Completed OK Final' ELSE 'Completed OK' END        AS status_name,
+                CASE WHEN f.is_final THEN 'COMPLETED_OK_FINAL' ELSE 'COMPLETED_OK' END        AS status_code,
+                COALESCE(SUM(c.job_count), 0)                                     AS count,
+                COALESCE(SUM(c.job_count) FILTER (WHERE c.is_warranty), 0)        AS warranty_count,
+                COALESCE(SUM(c.job_count) FILTER (WHERE NOT c.is_warranty), 0)    AS oow_count,
                 js.display_order AS sort_order
             FROM job_status js
-            LEFT JOIN job j
-                ON j.job_status_id = js.id
-               AND j.branch_id = (table "p_branch_id")
+            CROSS JOIN (VALUES (false), (true)) f(is_final)
+            LEFT JOIN job_status_counter c
+                ON c.job_status_id = js.id
+               AND c.branch_id = (table "p_branch_id")
+               AND c.is_final = f.is_final
             WHERE js.code = 'COMPLETED_OK'
-            GROUP BY js.display_order
-
-            UNION ALL
-
-            SELECT
-                1002                    AS status_id,
-                'Completed OK Final'    AS status_name,
-                'COMPLETED_OK_FINAL'    AS status_code,
-                COUNT(j.id) FILTER (WHERE j.is_final)                                                                                          AS count,
-                COUNT(j.id) FILTER (WHERE j.is_final AND j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY'))              AS warranty_count,
-                COUNT(j.id) FILTER (WHERE j.is_final AND j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')) AS oow_count,
-                js.display_order AS sort_order
-            FROM job_status js
-            LEFT JOIN job j
-                ON j.job_status_id = js.id
-               AND j.branch_id = (table "p_branch_id")
-            WHERE js.code = 'COMPLETED_OK'
-            GROUP BY js.display_order
+            GROUP BY f.is_final, js.display_order
         ) x
         ORDER BY sort_order NULLS LAST, status_id
     """
 
+    # Nightly repair of job_status_counter drift; returns the rows corrected.
+    RECONCILE_JOB_STATUS_COUNTER = """
+        SELECT fn_reconcile_job_status_counter() AS drifted
+    """
+
     GET_JOB_PIPELINE_COUNT = """
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
@@ -310,27 +301,12 @@ class JobsSql:
             "p_search"    as (values(%(search)s::text))
         SELECT COUNT(*) AS total
         FROM job j
-        JOIN customer_contact cc ON cc.id = j.customer_contact_id
-        LEFT JOIN product_brand_model pbm ON pbm.id = j.product_brand_model_id
-        LEFT JOIN brand      b ON b.id  = pbm.brand_id
-        LEFT JOIN product    p ON p.id  = pbm.product_id
-        LEFT JOIN technician t ON t.id  = j.technician_id
         WHERE j.branch_id     = (table "p_branch_id")
           AND j.job_status_id = (table "p_job_status_id")
           AND ((table "p_is_final_filter") IS NULL OR j.is_final = (table "p_is_final_filter"))
           AND ((table "p_search") = ''
-           OR  j.job_no::text                   ILIKE '%%' || (table "p_search") || '%%'
-           OR  cc.full_name                      ILIKE '%%' || (table "p_search") || '%%'
-           OR  cc.mobile                         ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.email, '')            ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.address_line1, '')    ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.city, '')             ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(t.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(j.serial_no, '')         ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(b.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(p.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(pbm.model_name, '')      ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(j.alternate_job_no, '')  ILIKE '%%' || (table "p_search") || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
     """
 
     GET_JOB_PIPELINE_PAGED = """
@@ -346,6 +322,8 @@ class JobsSql:
                               ELSE NULL END)::boolean )
             ),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_job_date" as (values(%(after_job_date)s::date)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -373,8 +351,8 @@ class JobsSql:
             j.technician_id,
             t.name         AS technician_name,
             TRIM(CONCAT_WS(' ', p.name, b.name, pbm.model_name, j.serial_no)) AS device_details,
-            (SELECT COUNT(*) FROM job_image_doc   jid WHERE jid.job_id = j.id)  AS file_count,
-            (SELECT COUNT(*) FROM job_transaction jtr WHERE jtr.job_id = j.id)  AS transaction_count,
+            j.file_count,
+            j.transaction_count,
             jrm.name       AS job_receive_manner_name,
             jrc.name       AS job_receive_condition_name,
             j.division_id,
@@ -394,18 +372,10 @@ class JobsSql:
           AND j.job_status_id = (table "p_job_status_id")
           AND ((table "p_is_final_filter") IS NULL OR j.is_final = (table "p_is_final_filter"))
           AND ((table "p_search") = ''
-           OR  j.job_no::text                   ILIKE '%%' || (table "p_search") || '%%'
-           OR  cc.full_name                      ILIKE '%%' || (table "p_search") || '%%'
-           OR  cc.mobile                         ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.email, '')            ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.address_line1, '')    ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.city, '')             ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(t.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(j.serial_no, '')         ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(b.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(p.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(pbm.model_name, '')      ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(j.alternate_job_no, '')  ILIKE '%%' || (table "p_search") || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
+          AND (j.job_date, j.id) < (COALESCE((table "p_after_job_date"), 'infinity'),
+                                    COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY j.job_date DESC, j.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -417,31 +387,18 @@ class JobsSql:
             "p_search"    as (values(%(search)s::text))
         SELECT COUNT(*) AS total
         FROM job j
-        JOIN customer_contact cc ON cc.id = j.customer_contact_id
-        LEFT JOIN product_brand_model pbm ON pbm.id = j.product_brand_model_id
-        LEFT JOIN brand      b ON b.id  = pbm.brand_id
-        LEFT JOIN product    p ON p.id  = pbm.product_id
-        LEFT JOIN technician t ON t.id  = j.technician_id
         WHERE j.branch_id = (table "p_branch_id")
           AND ((table "p_search") = ''
-           OR  j.job_no::text                   ILIKE '%%' || (table "p_search") || '%%'
-           OR  cc.full_name                      ILIKE '%%' || (table "p_search") || '%%'
-           OR  cc.mobile                         ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.email, '')            ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.address_line1, '')    ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.city, '')             ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(t.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(j.serial_no, '')         ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(b.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(p.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(pbm.model_name, '')      ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(j.alternate_job_no, '')  ILIKE '%%' || (table "p_search") || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
     """
 
     GET_JOB_PIPELINE_ALL_PAGED = """
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_job_date" as (values(%(after_job_date)s::date)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -469,8 +426,8 @@ class JobsSql:
             j.technician_id,
             t.name         AS technician_name,
             TRIM(CONCAT_WS(' ', p.name, b.name, pbm.model_name, j.serial_no)) AS device_details,
-            (SELECT COUNT(*) FROM job_image_doc   jid WHERE jid.job_id = j.id)  AS file_count,
-            (SELECT COUNT(*) FROM job_transaction jtr WHERE jtr.job_id = j.id)  AS transaction_count,
+            j.file_count,
+            j.transaction_count,
             jrm.name       AS job_receive_manner_name,
             jrc.name       AS job_receive_condition_name,
             j.division_id,
@@ -488,18 +445,10 @@ class JobsSql:
         LEFT JOIN job_invoice      ji  ON ji.job_id = j.id
         WHERE j.branch_id = (table "p_branch_id")
           AND ((table "p_search") = ''
-           OR  j.job_no::text                   ILIKE '%%' || (table "p_search") || '%%'
-           OR  cc.full_name                      ILIKE '%%' || (table "p_search") || '%%'
-           OR  cc.mobile                         ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.email, '')            ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.address_line1, '')    ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(cc.city, '')             ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(t.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(j.serial_no, '')         ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(b.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(p.name, '')              ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(pbm.model_name, '')      ILIKE '%%' || (table "p_search") || '%%'
-           OR  COALESCE(j.alternate_job_no, '')  ILIKE '%%' || (table "p_search") || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
+          AND (j.job_date, j.id) < (COALESCE((table "p_after_job_date"), 'infinity'),
+                                    COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY j.job_date DESC, j.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -584,22 +533,12 @@ class JobsSql:
             "p_search"    as (values(%(search)s::text))
         SELECT COUNT(*) AS total
         FROM job j
-        JOIN customer_contact cc ON cc.id = j.customer_contact_id
-        LEFT JOIN product_brand_model pbm ON pbm.id = j.product_brand_model_id
-        LEFT JOIN brand            b   ON b.id   = pbm.brand_id
-        LEFT JOIN product          p   ON p.id   = pbm.product_id
         WHERE j.branch_id = (table "p_branch_id")
           AND j.is_opening_job IS NOT TRUE
           AND j.job_date BETWEEN (table "p_from_date") AND (table "p_to_date")
           AND ((table "p_search") = ''
-           OR LOWER(j.job_no)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.mobile)      LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.full_name)   LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(p.name)         LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(b.name)         LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(pbm.model_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(j.serial_no)    LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(COALESCE(j.alternate_job_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
     """
 
     GET_JOBS_PAGED = """
@@ -608,6 +547,8 @@ class JobsSql:
             "p_from_date" as (values(%(from_date)s::date)),
             "p_to_date"   as (values(%(to_date)s::date)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_job_date" as (values(%(after_job_date)s::date)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -631,8 +572,8 @@ class JobsSql:
             t.name        AS technician_name,
             j.batch_no    AS batch_no,
             j.division_id,
-            (SELECT COUNT(*) FROM job_image_doc   jid WHERE jid.job_id = j.id) AS file_count,
-            (SELECT COUNT(*) FROM job_transaction jtr WHERE jtr.job_id = j.id) AS transaction_count
+            j.file_count,
+            j.transaction_count
         FROM job j
         JOIN customer_contact cc ON cc.id = j.customer_contact_id
         JOIN job_type          jt ON jt.id = j.job_type_id
@@ -646,14 +587,10 @@ class JobsSql:
           AND j.is_opening_job IS NOT TRUE
           AND j.job_date BETWEEN (table "p_from_date") AND (table "p_to_date")
           AND ((table "p_search") = ''
-           OR LOWER(j.job_no)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.mobile)      LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.full_name)   LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(p.name)         LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(b.name)         LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(pbm.model_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(j.serial_no)    LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(COALESCE(j.alternate_job_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
+          AND (j.job_date, j.id) < (COALESCE((table "p_after_job_date"), 'infinity'),
+                                    COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY j.job_date DESC, j.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -665,27 +602,19 @@ class JobsSql:
             "p_search"    as (values(%(search)s::text))
         SELECT COUNT(*) AS total
         FROM job j
-        JOIN customer_contact cc ON cc.id = j.customer_contact_id
-        LEFT JOIN product_brand_model pbm ON pbm.id = j.product_brand_model_id
-        LEFT JOIN brand            b   ON b.id   = pbm.brand_id
-        LEFT JOIN product          p   ON p.id   = pbm.product_id
         WHERE j.branch_id = (table "p_branch_id")
           AND j.is_opening_job = true
           AND ((table "p_search") = ''
-           OR LOWER(j.job_no)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.mobile)      LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.full_name)   LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(p.name)         LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(b.name)         LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(pbm.model_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(j.serial_no)    LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(COALESCE(j.alternate_job_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
     """
 
     GET_OPENING_JOBS_PAGED = """
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_job_date" as (values(%(after_job_date)s::date)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -709,8 +638,8 @@ class JobsSql:
             t.name        AS technician_name,
             j.batch_no    AS batch_no,
             j.division_id,
-            (SELECT COUNT(*) FROM job_image_doc   jid WHERE jid.job_id = j.id) AS file_count,
-            (SELECT COUNT(*) FROM job_transaction jtr WHERE jtr.job_id = j.id) AS transaction_count
+            j.file_count,
+            j.transaction_count
         FROM job j
         JOIN customer_contact cc ON cc.id = j.customer_contact_id
         JOIN job_type          jt ON jt.id = j.job_type_id
@@ -723,14 +652,10 @@ class JobsSql:
         WHERE j.branch_id = (table "p_branch_id")
           AND j.is_opening_job = true
           AND ((table "p_search") = ''
-           OR LOWER(j.job_no)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.mobile)      LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.full_name)   LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(p.name)         LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(b.name)         LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(pbm.model_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(j.serial_no)    LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(COALESCE(j.alternate_job_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
+          AND (j.job_date, j.id) < (COALESCE((table "p_after_job_date"), 'infinity'),
+                                    COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY j.job_date DESC, j.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -744,25 +669,15 @@ class JobsSql:
             "p_status_id"   as (values(%(status_id)s::bigint))
         SELECT COUNT(*) AS total
         FROM job j
-        JOIN customer_contact cc ON cc.id = j.customer_contact_id
         JOIN job_status        js ON js.id = j.job_status_id
-        LEFT JOIN product_brand_model pbm ON pbm.id = j.product_brand_model_id
-        LEFT JOIN brand            b   ON b.id   = pbm.brand_id
-        LEFT JOIN product          p   ON p.id   = pbm.product_id
         WHERE j.branch_id = (table "p_branch_id")
           AND ((table "p_show_closed") IS NULL
                OR (CASE WHEN js.code IN ('DELIVERED_OK', 'DELIVERED_NOT_OK', 'DISPOSED')
                         THEN true ELSE j.is_closed END) = (table "p_show_closed"))
           AND ((table "p_status_id")   IS NULL OR j.job_status_id = (table "p_status_id"))
           AND ((table "p_search") = ''
-           OR LOWER(j.job_no)     LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.mobile)    LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.full_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(p.name)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(b.name)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(pbm.model_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(j.serial_no)  LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(COALESCE(j.alternate_job_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
      """
 
     GET_JOB_SEARCH_PAGED = """
@@ -771,6 +686,8 @@ class JobsSql:
             "p_search"      as (values(%(search)s::text)),
             "p_show_closed" as (values(%(show_closed)s::boolean)),
             "p_status_id"   as (values(%(status_id)s::bigint)),
+            "p_after_sort_date" as (values(%(after_sort_date)s::date)),
+            "p_after_id"    as (values(%(after_id)s::bigint)),
             "p_limit"       as (values(%(limit)s::int)),
             "p_offset"      as (values(%(offset)s::int))
         SELECT
@@ -800,8 +717,9 @@ class JobsSql:
             t.name       AS technician_name,
             j.division_id,
             ji.is_posted AS invoice_is_posted,
-            (SELECT COUNT(*) FROM job_image_doc   jid WHERE jid.job_id = j.id) AS file_count,
-            (SELECT COUNT(*) FROM job_transaction  jtr WHERE jtr.job_id = j.id) AS transaction_count
+            k.sort_date,
+            j.file_count,
+            j.transaction_count
         FROM job j
         JOIN customer_contact cc ON cc.id = j.customer_contact_id
         JOIN job_type          jt ON jt.id = j.job_type_id
@@ -811,22 +729,21 @@ class JobsSql:
         LEFT JOIN product_brand_model pbm ON pbm.id = j.product_brand_model_id
         LEFT JOIN brand            b   ON b.id   = pbm.brand_id
         LEFT JOIN product          p   ON p.id   = pbm.product_id
+        CROSS JOIN LATERAL (
+            SELECT CASE WHEN (table "p_show_closed") IS TRUE THEN j.delivery_date ELSE j.job_date END AS sort_date
+        ) k
         WHERE j.branch_id = (table "p_branch_id")
           AND ((table "p_show_closed") IS NULL
                OR (CASE WHEN js.code IN ('DELIVERED_OK', 'DELIVERED_NOT_OK', 'DISPOSED')
                         THEN true ELSE j.is_closed END) = (table "p_show_closed"))
           AND ((table "p_status_id")   IS NULL OR j.job_status_id = (table "p_status_id"))
           AND ((table "p_search") = ''
-           OR LOWER(j.job_no)     LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.mobile)    LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(cc.full_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(p.name)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(b.name)       LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(pbm.model_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(j.serial_no)  LIKE '%%' || LOWER((table "p_search")) || '%%'
-           OR LOWER(COALESCE(j.alternate_job_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
-         ORDER BY CASE WHEN (table "p_show_closed") IS TRUE THEN j.delivery_date ELSE j.job_date END DESC,
-                  j.id DESC
+           OR  j.id IN (SELECT sj.id FROM job sj
+                        WHERE sj.search_text ILIKE '%%' || (table "p_search") || '%%'))
+          -- NULL delivery dates sort first under DESC, i.e. as 'infinity'.
+          AND (COALESCE(k.sort_date, 'infinity'), j.id) < (COALESCE((table "p_after_sort_date"), 'infinity'),
+                                                           COALESCE((table "p_after_id"), 9223372036854775807))
+         ORDER BY k.sort_date DESC, j.id DESC
          LIMIT  (table "p_limit")
          OFFSET (table "p_offset")
      """
@@ -854,7 +771,7 @@ class JobsSql:
             pbm.model_name,
             bn.name        AS brand_name,
             p.name        AS product_name,
-            (SELECT COUNT(*) FROM job_image_doc jid WHERE jid.job_id = j.id) AS file_count
+            j.file_count
         FROM job j
         JOIN customer_contact      cc  ON cc.id  = j.customer_contact_id
         LEFT JOIN state            s   ON s.id   = cc.state_id
@@ -1094,6 +1011,7 @@ class JobsSql:
             "p_from_date"  as (values(%(from_date)s::date)),
             "p_to_date"    as (values(%(to_date)s::date)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_batch_no" as (values(%(after_batch_no)s::integer)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -1113,6 +1031,7 @@ class JobsSql:
            OR  LOWER(cc.full_name) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(cc.mobile)    LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  CAST(j.batch_no AS text) LIKE '%%' || (table "p_search") || '%%')
+          AND j.batch_no < COALESCE((table "p_after_batch_no"), 2147483647)
         GROUP BY j.batch_no, cc.full_name, cc.mobile
         ORDER BY j.batch_no DESC
         LIMIT  (table "p_limit")
@@ -1177,8 +1096,8 @@ class JobsSql:
             js.id                                           AS job_status_id,
             t.name                                          AS technician_name,
             j.division_id,
-            (SELECT COUNT(*) FROM job_image_doc   jid WHERE jid.job_id = j.id) AS file_count,
-            (SELECT COUNT(*) FROM job_transaction jtr WHERE jtr.job_id = j.id) AS transaction_count
+            j.file_count,
+            j.transaction_count
         FROM job j
         JOIN paged_batches           pb  ON pb.batch_no = j.batch_no
         JOIN customer_contact        cc  ON cc.id       = j.customer_contact_id
@@ -1229,8 +1148,8 @@ class JobsSql:
             pbm.model_name,
             b.name        AS brand_name,
             p.name        AS product_name,
-            (SELECT COUNT(*) FROM job_transaction jtr WHERE jtr.job_id = j.id) AS transaction_count,
-            (SELECT COUNT(*) FROM job_image_doc  jd  WHERE jd.job_id  = j.id) AS file_count
+            j.transaction_count,
+            j.file_count
         FROM job j
         JOIN customer_contact      cc  ON cc.id  = j.customer_contact_id
         LEFT JOIN state            s   ON s.id   = cc.state_id
@@ -1270,7 +1189,7 @@ class JobsSql:
                  ELSE NULL END                              AS device_details,
             j.serial_no,
             j.division_id,
-            (SELECT COUNT(*) FROM job_image_doc jid WHERE jid.job_id = j.id) AS file_count
+            j.file_count
         FROM job j
         JOIN customer_contact      cc  ON cc.id  = j.customer_contact_id
         JOIN job_type              jt  ON jt.id  = j.job_type_id
@@ -1362,6 +1281,8 @@ class JobsSql:
             "p_from_date"  as (values(%(from_date)s::date)),
             "p_to_date"    as (values(%(to_date)s::date)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_payment_date" as (values(%(after_payment_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT jp.id, jp.job_id, jp.receipt_no, j.job_no, j.alternate_job_no, j.is_opening_job, j.job_date, cc.full_name AS customer_name, cc.gstin AS customer_gstin, cc.mobile,
@@ -1371,7 +1292,7 @@ class JobsSql:
                jt.name AS job_type_name, jt.code AS job_type_code,
                TRIM(CONCAT_WS(' ', p.name, b.name, pbm.model_name, j.serial_no)) AS device_details,
                ji.is_posted AS invoice_is_posted,
-               (SELECT COUNT(*) FROM job_image_doc jid WHERE jid.job_id = j.id) AS file_count
+               j.file_count
         FROM job_payment jp
         JOIN job j ON j.id = jp.job_id
         JOIN job_status js ON js.id = j.job_status_id
@@ -1390,6 +1311,8 @@ class JobsSql:
            OR  LOWER(jp.payment_mode) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(jp.reference_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(jp.receipt_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (jp.payment_date, jp.id) < (COALESCE((table "p_after_payment_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY jp.payment_date DESC, jp.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1433,6 +1356,8 @@ class JobsSql:
             "p_branch_id"   as (values(%(branch_id)s::bigint)),
             "p_division_id" as (values(%(division_id)s::bigint)),
             "p_search"      as (values(%(search)s::text)),
+            "p_after_job_date" as (values(%(after_job_date)s::date)),
+            "p_after_id"    as (values(%(after_id)s::bigint)),
             "p_limit"       as (values(%(limit)s::int)),
             "p_offset"      as (values(%(offset)s::int))
         SELECT
@@ -1455,7 +1380,7 @@ class JobsSql:
             jt.code       AS job_type_code,
             t.name        AS technician_name,
             TRIM(CONCAT_WS(' / ', NULLIF(p.name, ''), NULLIF(b.name, ''), NULLIF(pbm.model_name, ''))) AS device_details,
-            (SELECT COUNT(*) FROM job_image_doc jid WHERE jid.job_id = j.id) AS file_count
+            j.file_count
         FROM job j
         JOIN customer_contact     cc  ON cc.id  = j.customer_contact_id
         JOIN job_type             jt  ON jt.id  = j.job_type_id
@@ -1480,6 +1405,8 @@ class JobsSql:
            OR  LOWER(COALESCE(p.name, ''))               LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(b.name, ''))               LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(pbm.model_name, ''))       LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (j.job_date, j.id) < (COALESCE((table "p_after_job_date"), 'infinity'),
+                                    COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY j.job_date DESC, j.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1538,6 +1465,8 @@ class JobsSql:
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_is_posted"  as (values(%(is_posted)s::boolean)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_invoice_date" as (values(%(after_invoice_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -1564,6 +1493,8 @@ class JobsSql:
            OR  j.job_no::text         ILIKE '%%' || (table "p_search") || '%%'
            OR  LOWER(ji.invoice_no)    LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(cc.full_name)     LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (ji.invoice_date, ji.id) < (COALESCE((table "p_after_invoice_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY ji.invoice_date DESC, ji.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1610,9 +1541,12 @@ class JobsSql:
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_updated_at" as (values(%(after_updated_at)s::timestamptz)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT j.id, j.job_no, j.alternate_job_no, j.is_opening_job, j.job_date, j.purchase_date, j.amount, j.last_transaction_id,
+               j.updated_at,
                j.division_id, j.batch_no, j.serial_no,
                TRIM(CONCAT_WS(' ', p.name, b.name, pbm.model_name, j.serial_no)) AS device_details,
                cc.full_name  AS customer_name, cc.gstin AS customer_gstin, cc.mobile,
@@ -1633,7 +1567,7 @@ class JobsSql:
                    (SELECT SUM(jp2.amount) FROM job_payment jp2 WHERE jp2.job_id = j.id),
                    0
                )              AS total_paid,
-               (SELECT COUNT(*) FROM job_image_doc jid WHERE jid.job_id = j.id) AS file_count
+               j.file_count
         FROM job j
         JOIN customer_contact      cc  ON cc.id  = j.customer_contact_id
         JOIN job_status            js  ON js.id  = j.job_status_id
@@ -1658,6 +1592,8 @@ class JobsSql:
            OR  LOWER(COALESCE(b.name, ''))             LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(p.name, ''))             LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(pbm.model_name, ''))     LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (j.updated_at, j.id) < (COALESCE((table "p_after_updated_at"), 'infinity'),
+                                      COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY j.updated_at DESC, j.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1696,6 +1632,8 @@ class JobsSql:
             "p_branch_id"      as (values(%(branch_id)s::bigint)),
             "p_search"         as (values(%(search)s::text)),
             "p_delivery_date"  as (values(%(delivery_date)s::date)),
+            "p_after_delivery_date" as (values(%(after_delivery_date)s::date)),
+            "p_after_id"       as (values(%(after_id)s::bigint)),
             "p_limit"          as (values(%(limit)s::int)),
             "p_offset"         as (values(%(offset)s::int))
         SELECT j.id, j.job_no, j.alternate_job_no, j.is_opening_job, j.job_date, j.purchase_date, j.delivery_date,
@@ -1719,7 +1657,7 @@ class JobsSql:
                ji.amount     AS invoice_total,
                ji.invoice_no,
                ji.is_posted  AS invoice_is_posted,
-               (SELECT COUNT(*) FROM job_image_doc jid WHERE jid.job_id = j.id) AS file_count
+               j.file_count
         FROM job j
         JOIN customer_contact      cc  ON cc.id  = j.customer_contact_id
         JOIN job_status            js  ON js.id  = j.job_status_id
@@ -1745,6 +1683,8 @@ class JobsSql:
            OR  LOWER(COALESCE(b.name, ''))             LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(p.name, ''))             LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(pbm.model_name, ''))     LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (COALESCE(j.delivery_date, 'infinity'), j.id) < (COALESCE((table "p_after_delivery_date"), 'infinity'),
+                                                               COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY j.delivery_date DESC, j.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -1949,6 +1889,8 @@ class JobsSql:
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_search"    as (values(%(search)s::text)),
+            "p_after_job_date" as (values(%(after_job_date)s::date)),
+            "p_after_id"  as (values(%(after_id)s::bigint)),
             "p_limit"     as (values(%(limit)s::int)),
             "p_offset"    as (values(%(offset)s::int))
         SELECT
@@ -1982,6 +1924,8 @@ class JobsSql:
            OR  LOWER(COALESCE(j.alternate_job_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(cc.full_name)                     LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(cc.mobile)                        LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (j.job_date, j.id) < (COALESCE((table "p_after_job_date"), 'infinity'),
+                                    COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY j.job_date DESC, j.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -5,50 +5,61 @@ Split from app/db/sql_store.py — see plans/plan.md Step 3.
 
 
 class ReportsAuditSql:
-    """SQL constants for the reports audit domain."""
+    """SQL constants for the reports audit domain.
+
+    Range filters on job_transaction.transaction_date and
+    stock_transaction.transaction_date (the partition keys) bind the dates
+    directly instead of through a "p_from" / "p_to" CTE, so the planner can
+    prune the yearly partitions at plan time.
+    """
 
     # ── Reports — Dashboard ───────────────────────────────────────────────────
 
     GET_DASHBOARD_KPIS = """
         with
             "p_from" as (values(%(from)s::date)),
-            "p_to"   as (values(%(to)s::date))
-        SELECT
-            COUNT(DISTINCT j.id) FILTER (
-                WHERE j.job_date BETWEEN (table "p_from") AND (table "p_to")
-            ) AS jobs_received,
-            COUNT(DISTINCT j.id) FILTER (
-                WHERE j.job_date BETWEEN (table "p_from") AND (table "p_to")
-                  AND j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-            ) AS jobs_received_warranty,
-            COUNT(DISTINCT j.id) FILTER (
-                WHERE j.job_date BETWEEN (table "p_from") AND (table "p_to")
-                  AND j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-            ) AS jobs_received_oow,
-            COUNT(DISTINCT j.id) FILTER (
-                WHERE j.delivery_date BETWEEN (table "p_from") AND (table "p_to")
-                  AND j.is_closed = true
-            ) AS jobs_delivered,
-            COUNT(DISTINCT j.id) FILTER (
-                WHERE j.is_closed = false
-            ) AS jobs_open,
-            COUNT(DISTINCT j.id) FILTER (
-                WHERE j.is_closed = false
-                  AND j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-            ) AS jobs_open_warranty,
-            COUNT(DISTINCT j.id) FILTER (
-                WHERE j.is_closed = false
-                  AND j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-            ) AS jobs_open_oow,
-            COUNT(DISTINCT j.id) FILTER (
+            "p_to"   as (values(%(to)s::date)),
+            "p_warranty_type_id" as (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY'),
+            "kpi" as (
+                SELECT
+                    COALESCE(SUM(f.jobs_received), 0)          AS jobs_received,
+                    COALESCE(SUM(f.jobs_received_warranty), 0) AS jobs_received_warranty,
+                    COALESCE(SUM(f.jobs_delivered), 0)         AS jobs_delivered,
+                    COALESCE(SUM(f.job_invoice_amount), 0)     AS revenue
+                FROM fn_daily_kpi_range((table "p_from"), (table "p_to")) f
+            ),
+            "open_jobs" as (
+                SELECT
+                    COUNT(*) AS jobs_open,
+                    COUNT(*) FILTER (
+                        WHERE j.job_type_id = (table "p_warranty_type_id")
+                    ) AS jobs_open_warranty,
+                    COUNT(*) FILTER (
+                        WHERE j.job_type_id IS DISTINCT FROM (table "p_warranty_type_id")
+                    ) AS jobs_open_oow,
+                    COUNT(*) FILTER (
+                        WHERE j.job_date < (CURRENT_DATE - INTERVAL '7 days')
+                    ) AS jobs_overdue
+                FROM job j
                 WHERE j.is_closed = false
-                  AND j.job_date < (CURRENT_DATE - INTERVAL '7 days')
-            ) AS jobs_overdue,
-            COALESCE(SUM(ji.amount) FILTER (
-                WHERE ji.invoice_date BETWEEN (table "p_from") AND (table "p_to")
-            ), 0) AS revenue
-        FROM job j
-        LEFT JOIN job_invoice ji ON ji.job_id = j.id
+            )
+        SELECT
+            k.jobs_received,
+            k.jobs_received_warranty,
+            k.jobs_received - k.jobs_received_warranty AS jobs_received_oow,
+            k.jobs_delivered,
+            o.jobs_open,
+            o.jobs_open_warranty,
+            o.jobs_open_oow,
+            o.jobs_overdue,
+            k.revenue
+        FROM "kpi" k
+        CROSS JOIN "open_jobs" o
+    """
+
+    # Nightly roll-up of closed days into daily_kpi_rollup; returns the days rebuilt.
+    REFRESH_DAILY_KPI_ROLLUP = """
+        SELECT fn_refresh_daily_kpi_rollup() AS days_refreshed
     """
 
     GET_DASHBOARD_OPEN_JOBS_BY_PRODUCT = """
@@ -451,7 +462,7 @@ class ReportsAuditSql:
                     end as event_name
                 from job_transaction jt
                 join job_status js on js.id = jt.status_id
-                where jt.transaction_date between (table "p_from") and (table "p_to")
+                where jt.transaction_date between %(from)s::date and %(to)s::date
                   -- Received is counted from job.job_date below, one row per job —
                   -- matches the Dashboard / Jobs Summary "received" count instead of
                   -- job_transaction's per-status-change row (which double-counts a
@@ -547,7 +558,7 @@ class ReportsAuditSql:
             left join parts   on parts.job_id   = j.id
             left join charges on charges.job_id = j.id
             where (table "p_event_name") <> 'Received'
-              and jt.transaction_date between (table "p_from") and (table "p_to")
+              and jt.transaction_date between %(from)s::date and %(to)s::date
               and (
                     ((table "p_event_name") = 'Finalize' and js.code = 'COMPLETED_OK')
                  or ((table "p_event_name") = 'Deliver' and js.code in ('DELIVERED_OK', 'DELIVERED_NOT_OK'))
@@ -667,9 +678,6 @@ class ReportsAuditSql:
     """
 
     GET_JOB_TRANSACTIONS_BY_STATUS_RANGE_SPLIT = """
-        with
-            "p_from" as (values(%(from)s::date)),
-            "p_to"   as (values(%(to)s::date))
         SELECT
             js.name AS category_name,
             COUNT(*) FILTER (WHERE j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY'))              AS warranty_count,
@@ -678,7 +686,7 @@ class ReportsAuditSql:
         FROM job_transaction jt
         JOIN job_status js ON js.id = jt.status_id
         JOIN job j ON j.id = jt.job_id
-        WHERE jt.transaction_date BETWEEN (table "p_from") AND (table "p_to")
+        WHERE jt.transaction_date BETWEEN %(from)s::date AND %(to)s::date
         GROUP BY js.name
     """
 
@@ -688,8 +696,6 @@ class ReportsAuditSql:
     # of the same status within a range (e.g. a status corrected back-and-forth).
     GET_JOB_TRANSACTIONS_DETAIL = """
         with
-            "p_from"     as (values(%(from)s::date)),
-            "p_to"       as (values(%(to)s::date)),
             "p_category" as (values(%(category_name)s::text))
         SELECT
             't-' || jt.id as row_key, j.id, j.job_no, jt.transaction_date as event_date,
@@ -702,7 +708,7 @@ class ReportsAuditSql:
         LEFT JOIN product_brand_model pbm ON pbm.id = j.product_brand_model_id
         LEFT JOIN brand b ON b.id = pbm.brand_id
         LEFT JOIN product p ON p.id = pbm.product_id
-        WHERE jt.transaction_date BETWEEN (table "p_from") AND (table "p_to")
+        WHERE jt.transaction_date BETWEEN %(from)s::date AND %(to)s::date
           AND js.name = (table "p_category")
         ORDER BY jt.transaction_date DESC, j.job_no
     """
@@ -748,9 +754,6 @@ class ReportsAuditSql:
     """
 
     GET_JOB_TRANSACTION_LEDGER_RANGE = """
-        with
-            "p_from" as (values(%(from)s::date)),
-            "p_to"   as (values(%(to)s::date))
         SELECT
             jt.id,
             jt.transaction_date,
@@ -763,7 +766,7 @@ class ReportsAuditSql:
         JOIN job              j  ON j.id  = jt.job_id
         LEFT JOIN job_status  js ON js.id = jt.status_id
         LEFT JOIN technician  t  ON t.id  = jt.technician_id
-        WHERE jt.transaction_date::date BETWEEN (table "p_from") AND (table "p_to")
+        WHERE jt.transaction_date BETWEEN %(from)s::date AND %(to)s::date
         ORDER BY jt.transaction_date DESC, jt.id DESC
     """
 
@@ -836,45 +839,17 @@ class ReportsAuditSql:
             "p_from" as (values(%(from)s::date)),
             "p_to"   as (values(%(to)s::date))
         SELECT
-            COALESCE(SUM(ji.aggregate), 0)                        AS total_revenue,
-            COALESCE(SUM(parts.parts_cost), 0)
-              + COALESCE(SUM(charges.charges_cost), 0)         AS total_cost,
-            COALESCE(SUM(ji.aggregate), 0)
-              - COALESCE(SUM(parts.parts_cost), 0)
-              - COALESCE(SUM(charges.charges_cost), 0)         AS total_profit,
-            COALESCE(SUM(ji.aggregate) FILTER (
-                WHERE j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-            ), 0)                                              AS warranty_revenue,
-            COALESCE(SUM(ji.aggregate) FILTER (
-                WHERE j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-            ), 0)                                              AS oow_revenue,
-            COALESCE(SUM(ji.aggregate) FILTER (
-                WHERE j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-            ), 0)
-              - COALESCE(SUM(parts.parts_cost) FILTER (
-                  WHERE j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-                ), 0)
-              - COALESCE(SUM(charges.charges_cost) FILTER (
-                  WHERE j.job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-                ), 0)                                          AS warranty_profit,
-            COALESCE(SUM(ji.aggregate) FILTER (
-                WHERE j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-            ), 0)
-              - COALESCE(SUM(parts.parts_cost) FILTER (
-                  WHERE j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-                ), 0)
-              - COALESCE(SUM(charges.charges_cost) FILTER (
-                  WHERE j.job_type_id IS DISTINCT FROM (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
-                ), 0)                                          AS oow_profit
-        FROM job j
-        LEFT JOIN job_invoice ji ON ji.job_id = j.id
-        LEFT JOIN (
-            SELECT job_id, SUM(cost_price * qty) AS parts_cost FROM job_part_used GROUP BY job_id
-        ) parts ON parts.job_id = j.id
-        LEFT JOIN (
-            SELECT job_id, SUM(cost_price * qty) AS charges_cost FROM job_additional_charge GROUP BY job_id
-        ) charges ON charges.job_id = j.id
-        WHERE ji.invoice_date BETWEEN (table "p_from") AND (table "p_to")
+            COALESCE(SUM(f.job_invoice_aggregate), 0)                  AS total_revenue,
+            COALESCE(SUM(f.job_cost), 0)                               AS total_cost,
+            COALESCE(SUM(f.job_invoice_aggregate - f.job_cost), 0)     AS total_profit,
+            COALESCE(SUM(f.job_invoice_aggregate_warranty), 0)         AS warranty_revenue,
+            COALESCE(SUM(f.job_invoice_aggregate
+                       - f.job_invoice_aggregate_warranty), 0)         AS oow_revenue,
+            COALESCE(SUM(f.job_invoice_aggregate_warranty
+                       - f.job_cost_warranty), 0)                      AS warranty_profit,
+            COALESCE(SUM(f.job_invoice_aggregate - f.job_invoice_aggregate_warranty
+                       - f.job_cost + f.job_cost_warranty), 0)         AS oow_profit
+        FROM fn_daily_kpi_range((table "p_from"), (table "p_to")) f
     """
 
     GET_REVENUE_RANGE = """
@@ -882,21 +857,12 @@ class ReportsAuditSql:
             "p_from" as (values(%(from)s::date)),
             "p_to"   as (values(%(to)s::date))
         SELECT
-            COALESCE((SELECT SUM(amount) FROM job_invoice
-                      WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")), 0) AS job_invoice_total,
-            COALESCE((SELECT SUM(amount) FROM sales_invoice
-                      WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")
-                        AND is_return = false), 0)                                         AS sales_invoice_total,
-            COALESCE((SELECT SUM(cgst_amount + sgst_amount + igst_amount) FROM job_invoice
-                      WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")), 0)
-              + COALESCE((SELECT SUM(cgst_amount + sgst_amount + igst_amount) FROM sales_invoice
-                      WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")
-                        AND is_return = false), 0)                                         AS gst_total,
-            COALESCE((SELECT COUNT(*) FROM job_invoice
-                      WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")), 0) AS job_invoice_count,
-            COALESCE((SELECT COUNT(*) FROM sales_invoice
-                      WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")
-                        AND is_return = false), 0)                                         AS sales_invoice_count
+            COALESCE(SUM(f.job_invoice_amount), 0)                          AS job_invoice_total,
+            COALESCE(SUM(f.sales_invoice_amount), 0)                        AS sales_invoice_total,
+            COALESCE(SUM(f.cgst_amount + f.sgst_amount + f.igst_amount), 0) AS gst_total,
+            COALESCE(SUM(f.job_invoice_count), 0)                           AS job_invoice_count,
+            COALESCE(SUM(f.sales_invoice_count), 0)                         AS sales_invoice_count
+        FROM fn_daily_kpi_range((table "p_from"), (table "p_to")) f
     """
 
     GET_REVENUE_BY_MONTH_RANGE = """
@@ -904,18 +870,12 @@ class ReportsAuditSql:
             "p_from" as (values(%(from)s::date)),
             "p_to"   as (values(%(to)s::date))
         SELECT
-            to_char(date_trunc('month', invoice_date), 'YYYY-MM') AS month,
-            COALESCE(SUM(amount), 0)                              AS revenue
-        FROM (
-            SELECT invoice_date, amount FROM job_invoice
-              WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")
-            UNION ALL
-            SELECT invoice_date, amount FROM sales_invoice
-              WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")
-                AND is_return = false
-        ) x
-        GROUP BY date_trunc('month', invoice_date)
-        ORDER BY date_trunc('month', invoice_date)
+            to_char(date_trunc('month', f.kpi_date), 'YYYY-MM')              AS month,
+            COALESCE(SUM(f.job_invoice_amount + f.sales_invoice_amount), 0) AS revenue
+        FROM fn_daily_kpi_range((table "p_from"), (table "p_to")) f
+        GROUP BY date_trunc('month', f.kpi_date)
+        HAVING SUM(f.job_invoice_count + f.sales_invoice_count) > 0
+        ORDER BY date_trunc('month', f.kpi_date)
     """
 
     GET_CASH_REGISTER_RANGE = """
@@ -969,24 +929,16 @@ class ReportsAuditSql:
             "p_from" as (values(%(from)s::date)),
             "p_to"   as (values(%(to)s::date))
         SELECT
-            to_char(date_trunc('month', invoice_date), 'YYYY-MM') AS month,
-            COALESCE(SUM(cgst_amount), 0) AS cgst,
-            COALESCE(SUM(sgst_amount), 0) AS sgst,
-            COALESCE(SUM(igst_amount), 0) AS igst,
-            COALESCE(SUM(cgst_amount + sgst_amount + igst_amount), 0) AS total_gst,
-            COALESCE(SUM(aggregate), 0) AS aggregate
-        FROM (
-            SELECT invoice_date, cgst_amount, sgst_amount, igst_amount, aggregate
-              FROM job_invoice
-              WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")
-            UNION ALL
-            SELECT invoice_date, cgst_amount, sgst_amount, igst_amount, aggregate
-              FROM sales_invoice
-              WHERE invoice_date BETWEEN (table "p_from") AND (table "p_to")
-                AND is_return = false
-        ) x
-        GROUP BY date_trunc('month', invoice_date)
-        ORDER BY date_trunc('month', invoice_date)
+            to_char(date_trunc('month', f.kpi_date), 'YYYY-MM') AS month,
+            COALESCE(SUM(f.cgst_amount), 0) AS cgst,
+            COALESCE(SUM(f.sgst_amount), 0) AS sgst,
+            COALESCE(SUM(f.igst_amount), 0) AS igst,
+            COALESCE(SUM(f.cgst_amount + f.sgst_amount + f.igst_amount), 0) AS total_gst,
+            COALESCE(SUM(f.job_invoice_aggregate + f.sales_invoice_aggregate), 0) AS aggregate
+        FROM fn_daily_kpi_range((table "p_from"), (table "p_to")) f
+        GROUP BY date_trunc('month', f.kpi_date)
+        HAVING SUM(f.job_invoice_count + f.sales_invoice_count) > 0
+        ORDER BY date_trunc('month', f.kpi_date)
     """
 
     # ── Reports — Performance ─────────────────────────────────────────────────
@@ -1090,9 +1042,6 @@ class ReportsAuditSql:
     """
 
     GET_TECH_PRODUCTIVITY_HEATMAP_RANGE = """
-        with
-            "p_from" as (values(%(from)s::date)),
-            "p_to"   as (values(%(to)s::date))
         SELECT
             t.id                                  AS technician_id,
             t.name                                AS technician_name,
@@ -1100,7 +1049,7 @@ class ReportsAuditSql:
             COUNT(DISTINCT jt.job_id)             AS jobs_touched
         FROM job_transaction jt
         JOIN technician t ON t.id = jt.technician_id
-        WHERE jt.transaction_date::date BETWEEN (table "p_from") AND (table "p_to")
+        WHERE jt.transaction_date BETWEEN %(from)s::date AND %(to)s::date
           AND t.is_active = true
         GROUP BY t.id, t.name, jt.transaction_date::date
         ORDER BY t.name, day
@@ -1195,9 +1144,6 @@ class ReportsAuditSql:
     # ── Reports — Inventory ───────────────────────────────────────────────────
 
     GET_PARTS_LEDGER_FY = """
-        with
-            "p_from" as (values(%(from)s::date)),
-            "p_to"   as (values(%(to)s::date))
         SELECT
             spm.id                       AS part_id,
             spm.part_code,
@@ -1218,7 +1164,7 @@ class ReportsAuditSql:
             SELECT st.part_id,
                    SUM(CASE WHEN st.dr_cr = 'D' THEN st.qty ELSE -st.qty END) AS opening_qty
             FROM stock_transaction st
-            WHERE st.transaction_date < (table "p_from")
+            WHERE st.transaction_date < %(from)s::date
             GROUP BY st.part_id
         ) opening ON opening.part_id = spm.id
         LEFT JOIN (
@@ -1226,7 +1172,7 @@ class ReportsAuditSql:
                    SUM(CASE WHEN st.dr_cr = 'D' THEN st.qty ELSE 0 END) AS dr_qty,
                    SUM(CASE WHEN st.dr_cr = 'C' THEN st.qty ELSE 0 END) AS cr_qty
             FROM stock_transaction st
-            WHERE st.transaction_date BETWEEN (table "p_from") AND (table "p_to")
+            WHERE st.transaction_date BETWEEN %(from)s::date AND %(to)s::date
             GROUP BY st.part_id
         ) tx ON tx.part_id = spm.id
         WHERE spm.is_active = true
@@ -1310,8 +1256,6 @@ class ReportsAuditSql:
 
     GET_STOCK_LEDGER_RANGE = """
         with
-            "p_from"    as (values(%(from)s::date)),
-            "p_to"      as (values(%(to)s::date)),
             "p_part_id" as (values(%(part_id)s::bigint))
         SELECT
             st.id,
@@ -1327,14 +1271,11 @@ class ReportsAuditSql:
         FROM stock_transaction st
         JOIN stock_transaction_type stt ON stt.id = st.stock_transaction_type_id
         WHERE st.part_id = (table "p_part_id")
-          AND st.transaction_date BETWEEN (table "p_from") AND (table "p_to")
+          AND st.transaction_date BETWEEN %(from)s::date AND %(to)s::date
         ORDER BY st.transaction_date, st.id
     """
 
     GET_STOCK_MOVEMENT_SUMMARY_RANGE = """
-        with
-            "p_from" as (values(%(from)s::date)),
-            "p_to"   as (values(%(to)s::date))
         SELECT
             stt.code                  AS txn_type_code,
             stt.name                  AS txn_type_name,
@@ -1343,7 +1284,7 @@ class ReportsAuditSql:
             COUNT(*)                  AS total_lines
         FROM stock_transaction st
         JOIN stock_transaction_type stt ON stt.id = st.stock_transaction_type_id
-        WHERE st.transaction_date BETWEEN (table "p_from") AND (table "p_to")
+        WHERE st.transaction_date BETWEEN %(from)s::date AND %(to)s::date
         GROUP BY stt.code, stt.name, stt.dr_cr
         ORDER BY total_qty DESC
     """
@@ -168,6 +168,8 @@ class SalesAccountsSql:
             "p_from_date"   as (values(%(from_date)s::date)),
             "p_to_date"     as (values(%(to_date)s::date)),
             "p_search"      as (values(%(search)s::text)),
+            "p_after_invoice_date" as (values(%(after_invoice_date)s::date)),
+            "p_after_id"    as (values(%(after_id)s::bigint)),
             "p_limit"       as (values(%(limit)s::int)),
             "p_offset"      as (values(%(offset)s::int))
         SELECT
@@ -198,6 +200,8 @@ class SalesAccountsSql:
           AND ((table "p_search") = ''
            OR LOWER(si.invoice_no)    LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(si.customer_name) LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (si.invoice_date, si.id) < (COALESCE((table "p_after_invoice_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY si.invoice_date DESC, si.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -223,6 +227,8 @@ class SalesAccountsSql:
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_is_posted"  as (values(%(is_posted)s::boolean)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_invoice_date" as (values(%(after_invoice_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -246,6 +252,8 @@ class SalesAccountsSql:
           AND ((table "p_search") = ''
            OR LOWER(si.invoice_no)    LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(si.customer_name) LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (si.invoice_date, si.id) < (COALESCE((table "p_after_invoice_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY si.invoice_date DESC, si.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -331,6 +339,8 @@ class SalesAccountsSql:
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_payment_date" as (values(%(after_payment_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -357,6 +367,8 @@ class SalesAccountsSql:
            OR  LOWER(cc.full_name)               LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(jp.payment_mode)            LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(jp.receipt_no,'')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (jp.payment_date, jp.id) < (COALESCE((table "p_after_payment_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY jp.payment_date DESC, jp.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -395,6 +407,8 @@ class SalesAccountsSql:
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_invoice_date" as (values(%(after_invoice_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -415,6 +429,8 @@ class SalesAccountsSql:
           AND ((table "p_search") = ''
            OR LOWER(pi.invoice_no) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(s.name)        LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (pi.invoice_date, pi.id) < (COALESCE((table "p_after_invoice_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY pi.invoice_date DESC, pi.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -453,6 +469,8 @@ class SalesAccountsSql:
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_invoice_date" as (values(%(after_invoice_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -473,6 +491,8 @@ class SalesAccountsSql:
           AND ((table "p_search") = ''
            OR LOWER(si.invoice_no)    LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR LOWER(si.customer_name) LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (si.invoice_date, si.id) < (COALESCE((table "p_after_invoice_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY si.invoice_date DESC, si.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -516,6 +536,8 @@ class SalesAccountsSql:
         with
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_invoice_date" as (values(%(after_invoice_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -543,6 +565,8 @@ class SalesAccountsSql:
            OR  LOWER(COALESCE(j.alternate_job_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(ji.invoice_no)  LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(cc.full_name)   LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (ji.invoice_date, ji.id) < (COALESCE((table "p_after_invoice_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY ji.invoice_date DESC, ji.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -571,6 +595,8 @@ class SalesAccountsSql:
             "p_branch_id" as (values(%(branch_id)s::bigint)),
             "p_is_posted"  as (values(%(is_posted)s::boolean)),
             "p_search"     as (values(%(search)s::text)),
+            "p_after_payment_date" as (values(%(after_payment_date)s::date)),
+            "p_after_id"   as (values(%(after_id)s::bigint)),
             "p_limit"      as (values(%(limit)s::int)),
             "p_offset"     as (values(%(offset)s::int))
         SELECT
@@ -595,6 +621,8 @@ class SalesAccountsSql:
            OR  LOWER(cc.full_name)             LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(jp.payment_mode)          LIKE '%%' || LOWER((table "p_search")) || '%%'
            OR  LOWER(COALESCE(jp.receipt_no, '')) LIKE '%%' || LOWER((table "p_search")) || '%%')
+          AND (jp.payment_date, jp.id) < (COALESCE((table "p_after_payment_date"), 'infinity'),
+                                          COALESCE((table "p_after_id"), 9223372036854775807))
         ORDER BY jp.payment_date DESC, jp.id DESC
         LIMIT  (table "p_limit")
         OFFSET (table "p_offset")
@@ -0,0 +1,150 @@
+"""
+Benchmarks the job-grid search predicate: the legacy per-column ILIKE OR-chain
+over five joined tables against the denormalised job.search_text document
+(trigram-indexed, maintained by the trg_*_job_search_text triggers).
+
+Builds a throwaway BU schema from BU_SCHEMA_DDL in an existing service
+database, seeds synthetic lookup rows and jobs, backfills search_text, then
+times GET_JOB_PIPELINE_ALL_COUNT both ways for a few search terms. The schema
+is dropped afterwards unless --keep is given. Seeding runs with
+session_replication_role = replica (FKs and triggers off), so the connecting
+role must be a superuser — point it at a scratch database, never production.
+
+    python -m app.db.tools.bench_job_search --dsn "host=... dbname=... user=... password=..." --jobs 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import psycopg
+from psycopg import sql as pgsql
+
+from app.db.sql.sql_base import SqlStore
+
+# GET_JOB_PIPELINE_ALL_COUNT as it was before job.search_text existed.
+_LEGACY_PIPELINE_ALL_COUNT = """
+    with
+        "p_branch_id" as (values(%(branch_id)s::bigint)),
+        "p_search"    as (values(%(search)s::text))
+    SELECT COUNT(*) AS total
+    FROM job j
+    JOIN customer_contact cc ON cc.id = j.customer_contact_id
+    LEFT JOIN product_brand_model pbm ON pbm.id = j.product_brand_model_id
+    LEFT JOIN brand      b ON b.id  = pbm.brand_id
+    LEFT JOIN product    p ON p.id  = pbm.product_id
+    LEFT JOIN technician t ON t.id  = j.technician_id
+    WHERE j.branch_id = (table "p_branch_id")
+      AND ((table "p_search") = ''
+       OR  j.job_no::text                   ILIKE '%%' || (table "p_search") || '%%'
+       OR  cc.full_name                      ILIKE '%%' || (table "p_search") || '%%'
+       OR  cc.mobile                         ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(cc.email, '')            ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(cc.address_line1, '')    ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(cc.city, '')             ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(t.name, '')              ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(j.serial_no, '')         ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(b.name, '')              ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(p.name, '')              ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(pbm.model_name, '')      ILIKE '%%' || (table "p_search") || '%%'
+       OR  COALESCE(j.alternate_job_no, '')  ILIKE '%%' || (table "p_search") || '%%')
+"""
+
+_SEED_LOOKUPS = (
+    """INSERT INTO brand (id, code, name) OVERRIDING SYSTEM VALUE
+        SELECT g, 'B_' || chr(64 + g), 'Brand ' || chr(64 + g) FROM generate_series(1, 20) g""",
+    """INSERT INTO product (id, name) OVERRIDING SYSTEM VALUE
+        SELECT g, 'PRODUCT_' || chr(64 + g) FROM generate_series(1, 20) g""",
+    """INSERT INTO product_brand_model (id, brand_id, product_id, model_name) OVERRIDING SYSTEM VALUE
+        SELECT g, 1 + g % 20, 1 + g % 20, 'Model ' || g FROM generate_series(1, 500) g""",
+    """INSERT INTO technician (id, branch_id, code, name) OVERRIDING SYSTEM VALUE
+        SELECT g, 1, 'T' || g, 'Technician ' || g FROM generate_series(1, 50) g""",
+)
+
+_SEED_CUSTOMERS = """
+    INSERT INTO customer_contact (id, customer_type_id, full_name, mobile, email, address_line1, state_id, city)
+        OVERRIDING SYSTEM VALUE
+        SELECT g, 1, 'Customer ' || md5(g::text), (9000000000 + g)::text,
+               'c' || g || '@example.com', 'Street ' || g, 1, 'City ' || (g %% 200)
+        FROM generate_series(1, %(customers)s) g
+"""
+
+_SEED_JOBS = """
+    INSERT INTO job (id, job_no, alternate_job_no, customer_contact_id, branch_id, job_status_id, job_type_id,
+                     job_receive_manner_id, product_brand_model_id, technician_id, division_id, job_date, serial_no)
+        OVERRIDING SYSTEM VALUE
+        SELECT g, 'J' || g, CASE WHEN g %% 7 = 0 THEN 'ALT' || g END, 1 + g %% %(customers)s, 1 + g %% 2,
+               1, 1, 1, 1 + g %% 500, 1 + g %% 50, 1, date '2020-01-01' + g %% 2000, 'SN' || md5(g::text)
+        FROM generate_series(1, %(jobs)s) g
+"""
+
+_BACKFILL = """
+    UPDATE job j
+       SET search_text = fn_job_search_text(j.job_no, j.alternate_job_no, j.serial_no,
+                                            j.customer_contact_id, j.technician_id, j.product_brand_model_id)
+"""
+
+_TERMS = ("J1234", "customer 4f", "9000001", "model 42", "no-such-job")
+
+
+def _time_ms(conn: psycopg.Connection, query: str, args: dict, repeat: int) -> float:
+    """Median wall time of `query` over `repeat` runs, after one warm-up run."""
+    conn.execute(query, args).fetchall()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(query, args).fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _bench(conn: psycopg.Connection, schema: str, jobs: int, repeat: int) -> None:
+    ident = pgsql.Identifier(schema)
+    conn.execute(pgsql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(ident))
+    conn.execute(pgsql.SQL("CREATE SCHEMA {}").format(ident))
+    conn.execute(pgsql.SQL("SET search_path TO {}, security").format(ident))
+    conn.execute(SqlStore.ENSURE_PG_TRGM)
+    conn.execute(SqlStore.BU_SCHEMA_DDL)
+
+    started = time.perf_counter()
+    customers = max(jobs // 10, 1)
+    conn.execute("SET session_replication_role = replica")
+    for statement in _SEED_LOOKUPS:
+        conn.execute(statement)
+    conn.execute(_SEED_CUSTOMERS, {"customers": customers})
+    conn.execute(_SEED_JOBS, {"customers": customers, "jobs": jobs})
+    conn.execute("SET session_replication_role = origin")
+    conn.execute(_BACKFILL)
+    conn.execute("ANALYZE")
+    print(f"\n{jobs:,} jobs seeded and indexed in {time.perf_counter() - started:.1f}s")
+
+    print(f"  {'search':<14} {'legacy ms':>10} {'search_text ms':>15} {'speed-up':>9}")
+    for term in _TERMS:
+        args = {"branch_id": 1, "search": term}
+        legacy = _time_ms(conn, _LEGACY_PIPELINE_ALL_COUNT, args, repeat)
+        current = _time_ms(conn, SqlStore.GET_JOB_PIPELINE_ALL_COUNT, args, repeat)
+        print(f"  {term:<14} {legacy:>10.1f} {current:>15.1f} {legacy / current:>8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", required=True, help="libpq conninfo of a scratch service database")
+    parser.add_argument("--schema", default="bench_job_search", help="throwaway BU schema name")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[100_000], help="job counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query (median reported)")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema afterwards")
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        try:
+            for jobs in args.jobs:
+                _bench(conn, args.schema, jobs, args.repeat)
+        finally:
+            if not args.keep:
+                conn.execute(pgsql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(pgsql.Identifier(args.schema)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmarks rendering large genericQuery responses: Starlette's stdlib
+JSONResponse against FastJSONResponse (orjson), for result sets shaped like
+the ones genericQuery returns — ints, NUMERIC floats, ISO date strings,
+text and NULLs — as row objects and in the columnar format. For reference it
+also times the Pydantic dump_json path FastAPI uses for response_model
+routes such as /api/public/parts. Every variant must decode to the same
+value. Needs no database.
+
+    python -m app.db.tools.bench_json_responses --rows 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Any
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from app.core.json_response import FastJSONResponse, orjson
+
+
+def _rows(count: int) -> list[dict]:
+    """Rows as genericQuery returns them with text_dates=True."""
+    start = datetime(2025, 4, 1, 9, 30)
+    return [
+        {
+            "id": i,
+            "job_no": f"J-{i:07d}",
+            "job_date": (date(2025, 4, 1) + timedelta(days=i % 365)).isoformat(),
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+            "customer_name": f"Customer {i % 977}",
+            "mobile": f"98{i:08d}"[:10],
+            "amount": round(i * 1.37 % 10000, 2),
+            "qty": float(i % 17),
+            "branch_id": 1 + i % 4,
+            "technician_name": None if i % 5 == 0 else f"Tech {i % 23}",
+            "is_closed": i % 3 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def _columnar(rows: list[dict]) -> dict:
+    columns = list(rows[0])
+    return {"columns": columns, "rows": [[row[c] for c in columns] for row in rows]}
+
+
+def _ms(render, repeat: int) -> tuple[float, bytes]:
+    body = render()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), body
+
+
+def _bench(rows: int, repeat: int) -> None:
+    data = _rows(rows)
+    adapter = TypeAdapter(Any)
+    for shape, payload in (("rows", data), ("columnar", _columnar(data))):
+        envelope = {"data": {"genericQuery": payload}}
+        stdlib, stdlib_body = _ms(lambda envelope=envelope: JSONResponse(envelope).body, repeat)
+        fast, fast_body = _ms(lambda envelope=envelope: FastJSONResponse(envelope).body, repeat)
+        dump, dump_body = _ms(partial(adapter.dump_json, envelope), repeat)
+        same = json.loads(stdlib_body) == json.loads(fast_body) and json.loads(dump_body) == envelope
+        print(f"  {rows:>8,} {shape:<9} {stdlib:>9.1f} {fast:>9.1f} {stdlib / fast:>7.1f}x "
+              f"{dump:>9.1f} {len(stdlib_body) / 1e6:>7.2f}  {'match' if same else 'DIFFER'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="result-set sizes to render")
+    parser.add_argument("--repeat", type=int, default=7, help="timed renders per variant (median reported)")
+    args = parser.parse_args()
+    print(f"\n  serializer: {'orjson ' + orjson.__version__ if orjson else 'stdlib json (orjson not installed)'}")
+    print(f"\n  {'rows':>8} {'shape':<9} {'json (ms)':>9} {'fast (ms)':>9} {'speed-up':>8} "
+          f"{'pydantic':>9} {'MB':>7}  body")
+    for rows in args.rows:
+        _bench(rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+"""
+Query-plan regression harness for the SqlStore constants.
+
+Builds a throwaway BU schema from BU_SCHEMA_DDL in an existing service
+database, seeds the lookup tables (BU_SEED_SQL) plus synthetic jobs,
+customers, parts, invoices and the stock / job ledgers at --scale jobs, and
+backfills the trigger-maintained columns and rollups. Every explainable
+sql_id (a single SELECT / WITH / INSERT / UPDATE / DELETE) is then run under
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) with representative arguments, each
+inside a rolled-back transaction. Arguments are derived from the placeholder
+names and casts; _ARG_OVERRIDES pins the ones that need a specific value.
+
+For every sql_id the harness records the median planning + execution time,
+the shared buffers touched, the plan shape and the large relations (at least
+--large-rows rows) read by a sequential scan. With --update-baseline the
+results are written to the baseline file; otherwise they are compared with
+it and the run exits non-zero when a query
+  - fails although it ran in the baseline,
+  - is slower than --threshold times its baseline and by more than
+    --min-delta-ms, or
+  - starts sequentially scanning a large relation.
+Plan-shape changes are reported but do not fail the run on their own.
+
+A compare run without a baseline file exits non-zero too.
+
+Seeding runs with session_replication_role = replica (FKs and triggers off),
+so the connecting role must be a superuser — point it at a scratch database,
+never production. With --create-db NAME, --dsn may name any database on the
+server: the harness creates NAME (with the security schema and pg_trgm the BU
+DDL needs), runs there and drops it again. Otherwise --dsn must be an existing
+service database, and only the seeded schema is dropped afterwards. --keep
+skips both drops.
+
+    python -m app.db.tools.bench_sql_plans --dsn "host=... dbname=postgres user=... password=..." --create-db plans_scratch --update-baseline
+    python -m app.db.tools.bench_sql_plans --dsn "host=... dbname=... user=... password=..." --only GET_JOB_
+
+No baseline is committed. Latency only compares on the same machine and
+PostgreSQL version, so CI records the baseline from the target branch and
+checks the change against it on the same runner, in the same job:
+
+    git checkout origin/main
+    python -m app.db.tools.bench_sql_plans --dsn "$DSN" --create-db plans_ci --baseline "$RUNNER_TEMP/plans.json" --update-baseline
+    git checkout "$CHANGE_SHA"
+    python -m app.db.tools.bench_sql_plans --dsn "$DSN" --create-db plans_ci --baseline "$RUNNER_TEMP/plans.json"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import psycopg
+from psycopg import sql as pgsql
+from psycopg.conninfo import make_conninfo
+
+from app.db.seeds.seed_bu_data import SeedBuData
+from app.db.sql.sql_base import SqlStore
+
+_DEFAULT_BASELINE = Path(__file__).with_name("sql_plan_baseline.json")
+
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s(?:::(\w+(?:\[\])?))?")
+
+# Seed volumes relative to --scale (the job count). Dates spread over the last
+# three years so range reports and the yearly partitions see realistic data;
+# translate() keeps codes within the letters-only CHECK constraints.
+_SEED = (
+    """INSERT INTO branch (id, code, name, address_line1, state_id, pincode) OVERRIDING SYSTEM VALUE
+        VALUES (2, 'BR2', 'Branch 2', 'Street 2', 29, '700002')""",
+    """INSERT INTO division (id, code, name, address_line1, state_id, branch_id) OVERRIDING SYSTEM VALUE
+        SELECT g, 'D' || g, 'Division ' || g, 'Street ' || g, 29, g FROM generate_series(1, 2) g""",
+    """INSERT INTO brand (id, code, name) OVERRIDING SYSTEM VALUE
+        SELECT g, 'B_' || translate(g::text, '0123456789', 'ABCDEFGHIJ'), 'Brand ' || g FROM generate_series(1, 50) g""",
+    """INSERT INTO product (id, name) OVERRIDING SYSTEM VALUE
+        SELECT g, 'PRODUCT_' || translate(g::text, '0123456789', 'ABCDEFGHIJ') FROM generate_series(1, 30) g""",
+    """INSERT INTO product_brand_model (id, brand_id, product_id, model_name) OVERRIDING SYSTEM VALUE
+        SELECT g, 1 + g %% 50, 1 + g %% 30, 'Model ' || g FROM generate_series(1, 2000) g""",
+    """INSERT INTO technician (id, branch_id, code, name) OVERRIDING SYSTEM VALUE
+        SELECT g, 1 + g %% 2, 'T' || g, 'Technician ' || g FROM generate_series(1, 40) g""",
+    """INSERT INTO stock_location_master (id, branch_id, name) OVERRIDING SYSTEM VALUE
+        SELECT g, g, 'Store ' || g FROM generate_series(1, 2) g""",
+    """INSERT INTO supplier (id, name, state_id) OVERRIDING SYSTEM VALUE
+        SELECT g, 'Supplier ' || g, 29 FROM generate_series(1, 50) g""",
+    """INSERT INTO customer_contact (id, customer_type_id, full_name, mobile, email, address_line1, state_id, city)
+        OVERRIDING SYSTEM VALUE
+        SELECT g, 1, 'Customer ' || md5(g::text), (9000000000 + g)::text,
+               'c' || g || '@example.com', 'Street ' || g, 29, 'City ' || (g %% 200)
+        FROM generate_series(1, %(customers)s) g""",
+    """INSERT INTO spare_part_master (id, brand_id, part_code, part_name) OVERRIDING SYSTEM VALUE
+        SELECT g, 1 + g %% 50, 'P' || lpad(g::text, 7, '0'), 'Part ' || md5(g::text)
+        FROM generate_series(1, %(parts)s) g""",
+    """INSERT INTO job (id, job_no, job_date, customer_contact_id, branch_id, division_id, technician_id,
+                     job_status_id, job_type_id, job_receive_manner_id, product_brand_model_id, serial_no,
+                     is_closed, is_final, delivery_date, last_transaction_id)
+        OVERRIDING SYSTEM VALUE
+        SELECT g, 'J' || g, %(start)s::date + (g::bigint * %(days)s / %(jobs)s)::int,
+               1 + g %% %(customers)s, 1 + g %% 2, 1 + g %% 2, CASE WHEN g %% 5 <> 0 THEN 1 + g %% 40 END,
+               1 + g %% 17, 1 + g %% 11, 1 + g %% 3, 1 + g %% 2000, 'SN' || md5(g::text),
+               g %% 17 IN (12, 13, 14, 15), g %% 17 IN (10, 12, 13),
+               CASE WHEN g %% 17 IN (12, 13) THEN %(start)s::date + (g::bigint * %(days)s / %(jobs)s)::int + 3 END,
+               4 * g
+        FROM generate_series(1, %(jobs)s) g""",
+    """INSERT INTO job_transaction (id, job_id, status_id, technician_id, performed_by_user_id, performed_at,
+                                 previous_transaction_id, transaction_date)
+        OVERRIDING SYSTEM VALUE
+        SELECT 4 * (j.id - 1) + s, j.id, CASE WHEN s = 4 THEN j.job_status_id ELSE s END, j.technician_id, 1,
+               (j.job_date + s)::timestamptz, NULLIF(4 * (j.id - 1) + s - 1, 4 * (j.id - 1)), j.job_date + s
+        FROM job j, generate_series(1, 4) s""",
+    """INSERT INTO job_image_doc (job_id, url, about)
+        SELECT 1 + (g * 2) %% %(jobs)s, 'https://files.example.com/' || g, 'Photo ' || g
+        FROM generate_series(1, %(jobs)s / 2) g""",
+    """INSERT INTO job_part_used (id, job_id, part_id, qty, cost_price, selling_price) OVERRIDING SYSTEM VALUE
+        SELECT g, 1 + (g * 3) %% %(jobs)s, 1 + g %% %(parts)s, 1 + g %% 3, 100 + g %% 50, 150 + g %% 50
+        FROM generate_series(1, %(jobs)s / 2) g""",
+    """INSERT INTO job_invoice (id, job_id, invoice_no, invoice_date, supply_state_code, aggregate, cgst_amount,
+                             sgst_amount, amount) OVERRIDING SYSTEM VALUE
+        SELECT j.id, j.id, 'JI' || j.id, j.delivery_date, '19', 1000, 90, 90, 1180
+        FROM job j WHERE j.delivery_date IS NOT NULL""",
+    """INSERT INTO purchase_invoice (id, supplier_id, invoice_no, invoice_date, aggregate_amount, total_tax,
+                                  total_amount, branch_id, brand_id, division_id) OVERRIDING SYSTEM VALUE
+        SELECT g, 1 + g %% 50, 'PI' || g, %(start)s::date + (g::bigint * %(days)s / (%(jobs)s / 50))::int,
+               10000, 1800, 11800, 1 + g %% 2, 1 + g %% 50, 1 + g %% 2
+        FROM generate_series(1, %(jobs)s / 50) g""",
+    """INSERT INTO purchase_invoice_line (id, purchase_invoice_id, part_id, hsn_code, qty, unit_price,
+                                       aggregate_amount, total_amount) OVERRIDING SYSTEM VALUE
+        SELECT 10 * (p.id - 1) + l, p.id, 1 + (p.id * 10 + l) %% %(parts)s, '8471', 10, 100, 1000, 1180
+        FROM purchase_invoice p, generate_series(1, 10) l""",
+    """INSERT INTO sales_invoice (id, invoice_no, invoice_date, customer_contact_id, customer_name,
+                               customer_state_code, aggregate, cgst_amount, sgst_amount, amount, division_id,
+                               brand_id) OVERRIDING SYSTEM VALUE
+        SELECT g, 'SI' || g, %(start)s::date + (g::bigint * %(days)s / (%(jobs)s / 20))::int,
+               1 + g %% %(customers)s, 'Customer ' || g, '19', 500, 45, 45, 590, 1 + g %% 2, 1 + g %% 50
+        FROM generate_series(1, %(jobs)s / 20) g""",
+    """INSERT INTO sales_invoice_line (id, sales_invoice_id, part_id, item_description, hsn_code, qty, price,
+                                    amount) OVERRIDING SYSTEM VALUE
+        SELECT 3 * (s.id - 1) + l, s.id, 1 + (s.id * 3 + l) %% %(parts)s, 'Part', '8471', 1, 200, 200
+        FROM sales_invoice s, generate_series(1, 3) l""",
+    """INSERT INTO stock_transaction (part_id, branch_id, stock_transaction_type_id, transaction_date, dr_cr, qty,
+                                   unit_cost, purchase_line_id)
+        SELECT l.part_id, p.branch_id, 2, p.invoice_date, 'D', l.qty, l.unit_price, l.id
+        FROM purchase_invoice_line l JOIN purchase_invoice p ON p.id = l.purchase_invoice_id""",
+    """INSERT INTO stock_transaction (part_id, branch_id, stock_transaction_type_id, transaction_date, dr_cr, qty,
+                                   sales_line_id)
+        SELECT l.part_id, d.branch_id, 3, s.invoice_date, 'C', l.qty, l.id
+        FROM sales_invoice_line l
+        JOIN sales_invoice s ON s.id = l.sales_invoice_id
+        JOIN division d ON d.id = s.division_id""",
+    """INSERT INTO stock_transaction (part_id, branch_id, stock_transaction_type_id, transaction_date, dr_cr, qty,
+                                   job_part_used_id)
+        SELECT u.part_id, j.branch_id, 1, j.job_date + 1, 'C', u.qty, u.id
+        FROM job_part_used u JOIN job j ON j.id = u.job_id""",
+)
+
+# What the maintenance triggers would have written had they been on while seeding.
+_BACKFILL = (
+    """UPDATE job j
+          SET search_text       = fn_job_search_text(j.job_no, j.alternate_job_no, j.serial_no,
+                                                     j.customer_contact_id, j.technician_id, j.product_brand_model_id),
+              transaction_count = 4,
+              file_count        = (SELECT COUNT(*) FROM job_image_doc d WHERE d.job_id = j.id)""",
+    """INSERT INTO stock_balance (part_id, branch_id, qty)
+        SELECT part_id, branch_id, SUM(CASE dr_cr WHEN 'D' THEN qty ELSE -qty END)
+        FROM stock_transaction GROUP BY part_id, branch_id""",
+    "SELECT fn_refresh_stock_snapshot((SELECT min(transaction_date) FROM stock_transaction))",
+    SqlStore.RECONCILE_JOB_STATUS_COUNTER,
+    SqlStore.REFRESH_DAILY_KPI_ROLLUP,
+)
+
+# Moves every identity sequence past the explicit ids written by _SEED, so the
+# INSERT sql_ids do not collide with seeded rows.
+_RESET_IDENTITIES = """
+    SELECT format('SELECT setval(%%L, COALESCE((SELECT max(%%I) FROM %%I.%%I), 0) + 1, false)',
+                  pg_get_serial_sequence(format('%%I.%%I', n.nspname, c.relname), a.attname),
+                  a.attname, n.nspname, c.relname)
+    FROM pg_attribute a
+    JOIN pg_class c     ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = %(schema)s AND a.attidentity <> '' AND c.relkind IN ('r', 'p')
+"""
+
+_RELATIONS = """
+    SELECT c.relname, c.reltuples::bigint, COALESCE(p.relname, c.relname) AS parent
+    FROM pg_class c
+    JOIN pg_namespace n      ON n.oid = c.relnamespace
+    LEFT JOIN pg_inherits i  ON i.inhrelid = c.oid
+    LEFT JOIN pg_class p     ON p.oid = i.inhparent
+    WHERE n.nspname IN (%(schema)s, 'security') AND c.relkind IN ('r', 'p', 'm')
+"""
+
+# Arguments by placeholder name; anything else falls back to its cast type.
+_TODAY = date.today()
+_ARG_DEFAULTS: dict[str, object] = {
+    "from": _TODAY - timedelta(days=90),
+    "from_date": _TODAY - timedelta(days=90),
+    "start_date": _TODAY - timedelta(days=90),
+    "to": _TODAY,
+    "to_date": _TODAY,
+    "end_date": _TODAY,
+    "limit": 50,
+    "offset": 0,
+    "search": "",
+    "year": _TODAY.year,
+    "month": _TODAY.month,
+    "months_back": 12,
+    "years_back": 3,
+    "fy_start_month": 4,
+    "overdue_days": 7,
+    "age_min": 0,
+    "age_max": 30,
+}
+
+_TYPE_DEFAULTS: dict[str | None, object] = {
+    "date": _TODAY,
+    "smallint": 1,
+    "int": 1,
+    "integer": 1,
+    "bigint": 1,
+    "numeric": 0,
+    "text": "",
+    "boolean": False,
+    "jsonb": "{}",
+    "text[]": [],
+    "bigint[]": [1, 2, 3],
+}
+
+# sql_ids whose representative arguments are not derivable from the names.
+_ARG_OVERRIDES: dict[str, dict[str, object]] = {
+    "REMOVE_SPARE_PART_WEB_IMAGE": {"url": "https://files.example.com/1"},
+    "SET_PART_LOCATIONS": {"part_ids": [1, 2, 3], "location_ids": [1, 1, 1]},
+}
+
+
+def _args_for(sql_id: str, query: str) -> dict:
+    args: dict[str, object] = {}
+    for name, cast in _PLACEHOLDER.findall(query):
+        if name in _ARG_DEFAULTS:
+            args[name] = _ARG_DEFAULTS[name]
+        elif cast:
+            args[name] = _TYPE_DEFAULTS.get(cast)
+        elif name.endswith("_ids"):
+            args[name] = [1, 2, 3]
+        elif name == "id" or name.endswith("_id"):
+            args[name] = 1
+        elif name.startswith("is_"):
+            args[name] = False
+        else:
+            args[name] = 0
+    args.update(_ARG_OVERRIDES.get(sql_id, {}))
+    return args
+
+
+def _explainable(query: str) -> bool:
+    body = re.sub(r"--[^\n]*", "", query).strip().rstrip(";")
+    return body.split(None, 1)[0].upper() in _EXPLAINABLE and ";" not in body and "$$" not in body
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def _shape(node: dict, parents: dict[str, str]) -> str:
+    """Node types (and relations, partitions folded into their parent) as a nested string."""
+    label = node["Node Type"]
+    if "Relation Name" in node:
+        label += " " + parents.get(node["Relation Name"], node["Relation Name"])
+    children = [_shape(child, parents) for child in node.get("Plans", [])]
+    return f"{label}({', '.join(children)})" if children else label
+
+
+def _measure(conn: psycopg.Connection, query: str, args: dict, repeat: int, timeout_ms: int) -> list[dict]:
+    """EXPLAIN ANALYZE output of one warm-up and `repeat` timed runs, each rolled back."""
+    plans = []
+    for _ in range(repeat + 1):
+        with conn.transaction(force_rollback=True):
+            conn.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            row = conn.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, args).fetchone()
+        plans.append(row[0][0])
+    return plans[1:]
+
+
+def _profile(conn: psycopg.Connection, sql_id: str, relations: dict, large_rows: int,
+             repeat: int, timeout_ms: int) -> dict:
+    query = getattr(SqlStore, sql_id)
+    if not _explainable(query):
+        return {"status": "skipped"}
+    try:
+        plans = _measure(conn, query, _args_for(sql_id, query), repeat, timeout_ms)
+    except psycopg.Error as exc:
+        return {"status": "error", "error": str(exc).splitlines()[0]}
+
+    parents = {name: parent for name, (_, parent) in relations.items()}
+    root = plans[-1]["Plan"]
+    seq_scans = sorted({
+        parents.get(node["Relation Name"], node["Relation Name"])
+        for node in _walk(root)
+        if node["Node Type"] == "Seq Scan" and relations.get(node["Relation Name"], (0, ""))[0] >= large_rows
+    })
+    return {
+        "status": "ok",
+        "ms": round(statistics.median(p["Planning Time"] + p["Execution Time"] for p in plans), 3),
+        "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "shape": _shape(root, parents),
+        "seq_scans": seq_scans,
+    }
+
+
+def _compare(sql_id: str, current: dict, baseline: dict | None, threshold: float,
+             min_delta_ms: float) -> tuple[list[str], list[str]]:
+    """(regressions, notes) of one sql_id against its baseline entry."""
+    if not baseline or baseline["status"] != "ok":
+        return [], []
+    if current["status"] != "ok":
+        return [f"{sql_id}: {current['status']} ({current.get('error', '')}), ran in the baseline"], []
+
+    regressions, notes = [], []
+    if current["ms"] > baseline["ms"] * threshold and current["ms"] - baseline["ms"] > min_delta_ms:
+        regressions.append(f"{sql_id}: {baseline['ms']:.1f} ms -> {current['ms']:.1f} ms")
+    new_scans = sorted(set(current["seq_scans"]) - set(baseline["seq_scans"]))
+    if new_scans:
+        regressions.append(f"{sql_id}: new sequential scan on {', '.join(new_scans)}")
+    if current["shape"] != baseline["shape"]:
+        notes.append(f"{sql_id}: plan shape changed")
+    return regressions, notes
+
+
+def _create_database(dsn: str, name: str) -> None:
+    """Create an empty scratch service database; fails if `name` already exists."""
+    with psycopg.connect(dsn, autocommit=True) as admin:
+        admin.execute(pgsql.SQL("CREATE DATABASE {}").format(pgsql.Identifier(name)))
+    with psycopg.connect(make_conninfo(dsn, dbname=name), autocommit=True) as conn:
+        conn.execute("CREATE SCHEMA security")
+
+
+def _seed(conn: psycopg.Connection, schema: str, scale: int) -> None:
+    ident = pgsql.Identifier(schema)
+    conn.execute(pgsql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(ident))
+    conn.execute(pgsql.SQL("CREATE SCHEMA {}").format(ident))
+    conn.execute(pgsql.SQL("SET search_path TO {}, security").format(ident))
+    conn.execute(SqlStore.ENSURE_PG_TRGM)
+    conn.execute(SqlStore.BU_SCHEMA_DDL)
+    conn.execute(SeedBuData.BU_SEED_SQL)
+
+    days = 3 * 365
+    start = _TODAY - timedelta(days=days)
+    conn.execute("SELECT fn_ensure_transaction_partitions(%s, %s)", (start, _TODAY + timedelta(days=365)))
+    args = {"jobs": scale, "customers": max(scale // 4, 1), "parts": max(scale // 5, 1000),
+            "start": start, "days": days}
+    conn.execute("SET session_replication_role = replica")
+    for statement in _SEED:
+        conn.execute(statement, args)
+    conn.execute("SET session_replication_role = origin")
+    for statement in _BACKFILL:
+        conn.execute(statement)
+    for (statement,) in conn.execute(_RESET_IDENTITIES, {"schema": schema}).fetchall():
+        conn.execute(statement)
+    conn.execute("ANALYZE")
+
+
+def _run(conn: psycopg.Connection, args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    _seed(conn, args.schema, args.scale)
+    print(f"\n{args.scale:,} jobs seeded in {time.perf_counter() - started:.1f}s")
+    relations = {name: (rows, parent)
+                 for name, rows, parent in conn.execute(_RELATIONS, {"schema": args.schema}).fetchall()}
+
+    sql_ids = sorted(name for name in dir(SqlStore)
+                     if name.isupper() and isinstance(getattr(SqlStore, name), str)
+                     and any(name.startswith(prefix) for prefix in args.only or [""]))
+    results = {sql_id: _profile(conn, sql_id, relations, args.large_rows, args.repeat, args.timeout_ms)
+               for sql_id in sql_ids}
+
+    counts = {status: sum(r["status"] == status for r in results.values()) for status in ("ok", "error", "skipped")}
+    print(f"{len(results)} sql_ids at scale {args.scale:,}: {counts['ok']} explained, "
+          f"{counts['error']} failed, {counts['skipped']} not explainable")
+    slowest = sorted((r["ms"], sql_id) for sql_id, r in results.items() if r["status"] == "ok")[-10:]
+    for ms, sql_id in reversed(slowest):
+        print(f"  {ms:>10.1f} ms  {sql_id}  {' '.join(results[sql_id]['seq_scans'])}")
+
+    baseline_path = Path(args.baseline)
+    stored = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {"queries": {}}
+    if args.update_baseline:
+        stored["meta"] = {"scale": args.scale, "server_version": conn.info.server_version}
+        stored["queries"].update(results)
+        baseline_path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not stored["queries"]:
+        print(f"No baseline at {baseline_path}; run with --update-baseline first")
+        return 1
+    if stored["meta"]["scale"] != args.scale:
+        print(f"  warning: baseline was recorded at scale {stored['meta']['scale']:,}")
+
+    regressions, notes = [], []
+    for sql_id, current in results.items():
+        failed, noted = _compare(sql_id, current, stored["queries"].get(sql_id), args.threshold, args.min_delta_ms)
+        regressions += failed
+        notes += noted
+    for line in notes:
+        print(f"  note: {line}")
+    for line in regressions:
+        print(f"  REGRESSION: {line}")
+    print(f"{len(regressions)} regressions against {baseline_path}")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", required=True,
+                        help="libpq conninfo of a scratch service database, or of any database with --create-db")
+    parser.add_argument("--create-db", metavar="NAME", help="create this scratch database, run there and drop it")
+    parser.add_argument("--schema", default="bench_sql_plans", help="throwaway BU schema name")
+    parser.add_argument("--scale", type=int, default=50_000, help="jobs to seed; other tables scale with it")
+    parser.add_argument("--only", nargs="+", metavar="PREFIX", help="profile only sql_ids with these prefixes")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per sql_id (median reported)")
+    parser.add_argument("--timeout-ms", type=int, default=30_000, help="statement_timeout per run")
+    parser.add_argument("--large-rows", type=int, default=10_000,
+                        help="relations with at least this many rows count as large for seq-scan checks")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slow-down factor against the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="slow-downs smaller than this many ms never count as regressions")
+    parser.add_argument("--baseline", default=str(_DEFAULT_BASELINE), help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema afterwards")
+    args = parser.parse_args()
+
+    dsn = args.dsn
+    if args.create_db:
+        _create_database(args.dsn, args.create_db)
+        dsn = make_conninfo(args.dsn, dbname=args.create_db)
+    try:
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            try:
+                status = _run(conn, args)
+            finally:
+                if not args.keep:
+                    conn.execute(pgsql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(pgsql.Identifier(args.schema)))
+    finally:
+        if args.create_db and not args.keep:
+            with psycopg.connect(args.dsn, autocommit=True) as admin:
+                admin.execute(pgsql.SQL("DROP DATABASE IF EXISTS {}").format(pgsql.Identifier(args.create_db)))
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
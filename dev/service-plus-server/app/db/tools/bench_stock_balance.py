@@ -0,0 +1,228 @@
+"""
+Benchmarks saving a large stock document against stock_balance maintenance:
+the legacy FOR EACH ROW trg_stock_balance_* triggers (one upsert per stock
+line) against the statement-level ones in BU_SCHEMA_DDL (one aggregated
+upsert per part and branch, fed by the statement's transition tables).
+
+Builds a throwaway BU schema from BU_SCHEMA_DDL in an existing service
+database and seeds a branch, brand, spare parts and opening balances. Each
+timed run then saves a stock_adjustment with --lines lines, each carrying its
+stock_transaction row, through process_details exactly as the client sends
+it, and rolls back; a second timing writes the same stock rows with a single
+INSERT ... SELECT, which isolates the trigger cost from the client round
+trips. Both trigger variants must leave identical balances. The
+schema is dropped afterwards unless --keep is given. Seeding runs with
+session_replication_role = replica (FKs and triggers off), so the connecting
+role must be a superuser — point it at a scratch database, never production.
+
+    python -m app.db.tools.bench_stock_balance --dsn "host=... dbname=... user=... password=..." --lines 500 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date
+
+import psycopg
+from psycopg import sql as pgsql
+
+from app.db.connection.psycopg_driver import process_details
+from app.db.sql.sql_base import SqlStore
+
+# fn_maintain_stock_balance and its triggers as they were before the
+# statement-level rewrite.
+_LEGACY_ROW_TRIGGERS = """
+    CREATE OR REPLACE FUNCTION fn_maintain_stock_balance() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+    DECLARE
+        v_effect NUMERIC(12,3);
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            v_effect := CASE OLD.dr_cr WHEN 'D' THEN -OLD.qty ELSE OLD.qty END;
+            INSERT INTO stock_balance (part_id, branch_id, qty)
+            VALUES (OLD.part_id, OLD.branch_id, v_effect)
+            ON CONFLICT (part_id, branch_id)
+            DO UPDATE SET qty = stock_balance.qty + EXCLUDED.qty, updated_at = now();
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            v_effect := CASE NEW.dr_cr WHEN 'D' THEN NEW.qty ELSE -NEW.qty END;
+            INSERT INTO stock_balance (part_id, branch_id, qty)
+            VALUES (NEW.part_id, NEW.branch_id, v_effect)
+            ON CONFLICT (part_id, branch_id)
+            DO UPDATE SET qty = stock_balance.qty + EXCLUDED.qty, updated_at = now();
+        END IF;
+        RETURN NULL;
+    END;
+    $$;
+
+    DROP TRIGGER trg_stock_balance_delete ON stock_transaction;
+    CREATE TRIGGER trg_stock_balance_delete AFTER DELETE ON stock_transaction FOR EACH ROW EXECUTE FUNCTION fn_maintain_stock_balance();
+    DROP TRIGGER trg_stock_balance_insert ON stock_transaction;
+    CREATE TRIGGER trg_stock_balance_insert AFTER INSERT ON stock_transaction FOR EACH ROW EXECUTE FUNCTION fn_maintain_stock_balance();
+    DROP TRIGGER trg_stock_balance_update ON stock_transaction;
+    CREATE TRIGGER trg_stock_balance_update AFTER UPDATE ON stock_transaction FOR EACH ROW EXECUTE FUNCTION fn_maintain_stock_balance();
+"""
+
+_PARTS = 2000
+
+_SEED = (
+    """INSERT INTO state (id, code, name) OVERRIDING SYSTEM VALUE VALUES (1, 'KA', 'Karnataka')""",
+    """INSERT INTO branch (id, code, name, address_line1, state_id, pincode) OVERRIDING SYSTEM VALUE
+        VALUES (1, 'HO', 'Head office', 'Street 1', 1, '560001')""",
+    """INSERT INTO brand (id, code, name) OVERRIDING SYSTEM VALUE VALUES (1, 'B_A', 'Brand A')""",
+    """INSERT INTO stock_transaction_type (id, code, name, dr_cr, is_system)
+        VALUES (1, 'ADJ_IN', 'Adjustment in', 'D', true), (2, 'ADJ_OUT', 'Adjustment out', 'C', true)""",
+    f"""INSERT INTO spare_part_master (id, brand_id, part_code, part_name) OVERRIDING SYSTEM VALUE
+        SELECT g, 1, 'P' || g, 'Part ' || g FROM generate_series(1, {_PARTS}) g""",
+    f"""INSERT INTO stock_balance (part_id, branch_id, qty)
+        SELECT g, 1, 1000 FROM generate_series(1, {_PARTS}) g""",
+)
+
+# The same movement as one set-based statement, as bulk imports and transfers
+# write it: the header and lines exist, only the stock rows are timed.
+_SEED_LINES = (
+    """INSERT INTO stock_adjustment (id, branch_id, brand_id, adjustment_date, adjustment_reason) OVERRIDING SYSTEM VALUE
+        VALUES (0, 1, 1, current_date, 'Bench')""",
+    f"""INSERT INTO stock_adjustment_line (id, stock_adjustment_id, part_id, dr_cr, qty) OVERRIDING SYSTEM VALUE
+        SELECT -g, 0, 1 + (g * 7) %% {_PARTS}, CASE WHEN g %% 3 = 0 THEN 'C' ELSE 'D' END, 1 + g %% 5
+        FROM generate_series(1, %(lines)s) g""",
+)
+
+_BULK_INSERT = """
+    INSERT INTO stock_transaction (part_id, branch_id, stock_transaction_type_id, transaction_date, dr_cr, qty,
+                                   stock_adjustment_line_id)
+        SELECT part_id, 1, CASE dr_cr WHEN 'D' THEN 1 ELSE 2 END, current_date, dr_cr, qty, id
+        FROM stock_adjustment_line WHERE stock_adjustment_id = 0
+"""
+
+_BALANCES = "SELECT part_id, branch_id, qty FROM stock_balance ORDER BY part_id, branch_id"
+
+
+def _document(lines: int) -> dict:
+    """A stock_adjustment sql_object as the client sends it, with `lines` lines."""
+    today = date.today().isoformat()
+    line_payload = []
+    for i in range(lines):
+        dr_cr = "D" if i % 3 else "C"
+        part_id = 1 + (i * 7) % _PARTS
+        line_payload.append({
+            "part_id": part_id,
+            "dr_cr": dr_cr,
+            "qty": 1 + i % 5,
+            "xDetails": [{
+                "tableName": "stock_transaction",
+                "fkeyName": "stock_adjustment_line_id",
+                "xData": [{
+                    "branch_id": 1,
+                    "part_id": part_id,
+                    "dr_cr": dr_cr,
+                    "qty": 1 + i % 5,
+                    "transaction_date": today,
+                    "stock_transaction_type_id": 1 if dr_cr == "D" else 2,
+                }],
+            }],
+        })
+    return {
+        "tableName": "stock_adjustment",
+        "xData": {
+            "branch_id": 1,
+            "brand_id": 1,
+            "adjustment_date": today,
+            "adjustment_reason": "Bench",
+            "xDetails": {
+                "tableName": "stock_adjustment_line",
+                "fkeyName": "stock_adjustment_id",
+                "xData": line_payload,
+            },
+        },
+    }
+
+
+async def _save_ms(conn: psycopg.AsyncConnection, lines: int, repeat: int) -> tuple[float, list[tuple]]:
+    """Median save time over `repeat` rolled-back runs after one warm-up, plus the balances it leaves."""
+    samples = []
+    balances: list[tuple] = []
+    for run in range(repeat + 1):
+        async with conn.transaction(force_rollback=True):
+            async with conn.cursor() as cur:
+                started = time.perf_counter()
+                await process_details(_document(lines), cur)
+                elapsed = (time.perf_counter() - started) * 1000
+                await cur.execute(_BALANCES)
+                balances = await cur.fetchall()
+        if run:
+            samples.append(elapsed)
+    return statistics.median(samples), balances
+
+
+async def _bulk_ms(conn: psycopg.AsyncConnection, lines: int, repeat: int) -> float:
+    """Median time of _BULK_INSERT over `repeat` rolled-back runs after one warm-up."""
+    samples = []
+    for run in range(repeat + 1):
+        async with conn.transaction(force_rollback=True):
+            for statement in _SEED_LINES:
+                await conn.execute(statement, {"lines": lines})
+            started = time.perf_counter()
+            await conn.execute(_BULK_INSERT)
+            if run:
+                samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def _run_variant(conn: psycopg.AsyncConnection, lines: int, repeat: int) -> tuple[float, float, list[tuple]]:
+    save, balances = await _save_ms(conn, lines, repeat)
+    return save, await _bulk_ms(conn, lines, repeat), balances
+
+
+async def _bench(conn: psycopg.AsyncConnection, schema: str, lines_list: list[int], repeat: int) -> None:
+    ident = pgsql.Identifier(schema)
+    await conn.execute(pgsql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(ident))
+    await conn.execute(pgsql.SQL("CREATE SCHEMA {}").format(ident))
+    await conn.execute(pgsql.SQL("SET search_path TO {}, security").format(ident))
+    await conn.execute(SqlStore.ENSURE_PG_TRGM)
+    await conn.execute(SqlStore.BU_SCHEMA_DDL)
+
+    await conn.execute("SET session_replication_role = replica")
+    for statement in _SEED:
+        await conn.execute(statement)
+    await conn.execute("SET session_replication_role = origin")
+    await conn.execute("ANALYZE")
+
+    print(f"\n  {'':>7} {'document save (ms)':^28} {'bulk INSERT ... SELECT (ms)':^28}")
+    print(f"  {'lines':>7} {'row':>9} {'statement':>9} {'speed-up':>8} "
+          f"{'row':>9} {'statement':>9} {'speed-up':>8}  balances")
+    for lines in lines_list:
+        save, bulk, balances = await _run_variant(conn, lines, repeat)
+        async with conn.transaction(force_rollback=True):
+            await conn.execute(_LEGACY_ROW_TRIGGERS)
+            legacy_save, legacy_bulk, legacy_balances = await _run_variant(conn, lines, repeat)
+        match = "match" if legacy_balances == balances else "DIFFER"
+        print(f"  {lines:>7,} {legacy_save:>9.1f} {save:>9.1f} {legacy_save / save:>7.1f}x "
+              f"{legacy_bulk:>9.1f} {bulk:>9.1f} {legacy_bulk / bulk:>7.1f}x  {match}")
+
+
+async def _main(args: argparse.Namespace) -> None:
+    async with await psycopg.AsyncConnection.connect(args.dsn, autocommit=True) as conn:
+        try:
+            await _bench(conn, args.schema, args.lines, args.repeat)
+        finally:
+            if not args.keep:
+                await conn.execute(pgsql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(pgsql.Identifier(args.schema)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", required=True, help="libpq conninfo of a scratch service database")
+    parser.add_argument("--schema", default="bench_stock_balance", help="throwaway BU schema name")
+    parser.add_argument("--lines", type=int, nargs="+", default=[500, 5000], help="document line counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="timed saves per variant (median reported)")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema afterwards")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Applies the pending BU schema migrations of app/db/schema_migrations.py to
+every BU schema of every active client, or to the one schema given.
+
+    python -m app.db.tools.migrate_bu_schemas
+    python -m app.db.tools.migrate_bu_schemas --db service_plus_demo --schema demo1
+    python -m app.db.tools.migrate_bu_schemas --dry-run
+
+Some upgrades lock and rewrite large tables (UPGRADE_TRANSACTION_PARTITIONING
+rebuilds both transaction tables), so run it out of hours. --dry-run only
+lists what would run (it does create a missing schema_migration table).
+Exits non-zero when any schema fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+
+from app.core.exceptions import DatabaseException
+from app.db.connection.pool_manager import pool_manager
+from app.db.schema_migrations import migrate_bu_schema, pending_migrations
+from app.scheduler import _active_bu_schemas
+
+
+async def _schemas(args: argparse.Namespace):
+    if args.schema:
+        yield args.db, args.schema
+        return
+    async for db_name, schema in _active_bu_schemas("schema migration"):
+        yield db_name, schema
+
+
+async def _main(args: argparse.Namespace) -> int:
+    await pool_manager.initialize()
+    failed = 0
+    try:
+        async for db_name, schema in _schemas(args):
+            try:
+                if args.dry_run:
+                    pending = await pending_migrations(db_name, schema)
+                    names = ", ".join(f"{version} {name}" for version, name in pending)
+                    print(f"  {db_name}/{schema}: {names or 'up to date'}")
+                else:
+                    applied = await migrate_bu_schema(db_name, schema)
+                    print(f"  {db_name}/{schema}: applied {applied or 'nothing'}")
+            except DatabaseException as exc:
+                failed += 1
+                print(f"  {db_name}/{schema}: FAILED {exc}")
+    finally:
+        await pool_manager.close_all()
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="service database of --schema (omit for the client DB)")
+    parser.add_argument("--schema", help="migrate only this BU schema")
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations without applying them")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
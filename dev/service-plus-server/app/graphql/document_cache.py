@@ -0,0 +1,152 @@
+"""
+Parsed-document, validation and persisted-query cache for the GraphQL endpoint.
+
+The frontend sends a small, fixed set of operations (genericQuery,
+genericBatchQuery, genericUpdate, ...) thousands of times per minute. Plain
+Ariadne parses and validates each document from scratch; here the parsed
+DocumentNode and its validation errors are kept in one bounded LRU keyed by
+the SHA-256 of the query text, so a known operation skips both steps.
+
+The same hash serves automatic persisted queries (the Apollo APQ protocol):
+a client may send only `extensions.persistedQuery.sha256Hash`. An unknown
+hash answers PersistedQueryNotFound, the client retries once with the full
+query and the hash, and the server checks the two match before remembering
+the query. Entries are per process; an evicted or restarted one is simply
+re-registered by the next client that misses.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any
+
+from ariadne.asgi.handlers import GraphQLHTTPHandler
+from ariadne.types import GraphQLResult
+from graphql import DocumentNode, GraphQLError, GraphQLSchema, parse, validate
+
+from app.core.exceptions import format_graphql_error
+
+_DOCUMENT_MAX_ENTRIES: int = 512
+
+
+class _Entry:
+    __slots__ = ("query", "document", "rules", "errors")
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.document: DocumentNode | None = None
+        self.rules: Any = None
+        self.errors: list[GraphQLError] | None = None
+
+
+_entries: OrderedDict[str, _Entry] = OrderedDict()   # sha256 hex -> entry
+_by_document: dict[int, _Entry] = {}                  # id(document) -> entry, for the validator
+_counters: dict[str, list[int]] = {                   # step -> [hits, misses]
+    "parse": [0, 0],
+    "validate": [0, 0],
+    "persisted": [0, 0],
+}
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def _remember(digest: str, query: str) -> _Entry:
+    entry = _entries.get(digest)
+    if entry is None:
+        entry = _entries[digest] = _Entry(query)
+        while len(_entries) > _DOCUMENT_MAX_ENTRIES:
+            _, evicted = _entries.popitem(last=False)
+            if evicted.document is not None:
+                _by_document.pop(id(evicted.document), None)
+    _entries.move_to_end(digest)
+    return entry
+
+
+def parse_query(_context: Any, data: dict) -> DocumentNode:
+    """Ariadne `query_parser`: the cached DocumentNode for data["query"]."""
+    query: str = data["query"]
+    entry = _remember(query_hash(query), query)
+    if entry.document is not None:
+        _counters["parse"][0] += 1
+        return entry.document
+    _counters["parse"][1] += 1
+    entry.document = parse(query)
+    _by_document[id(entry.document)] = entry
+    return entry.document
+
+
+def validate_query(
+    schema: GraphQLSchema,
+    document_ast: DocumentNode,
+    rules: Any = None,
+    max_errors: int | None = None,
+    type_info: Any = None,
+) -> list[GraphQLError]:
+    """Ariadne `query_validator`: reuse the errors of a cached document validated under the same rules."""
+    entry = _by_document.get(id(document_ast))
+    if entry is not None and entry.document is document_ast and entry.errors is not None and entry.rules == rules:
+        _counters["validate"][0] += 1
+        return entry.errors
+    _counters["validate"][1] += 1
+    errors = validate(schema, document_ast, rules=rules, max_errors=max_errors, type_info=type_info)
+    if entry is not None and entry.document is document_ast and max_errors is None and type_info is None:
+        entry.rules, entry.errors = rules, errors
+    return errors
+
+
+def _error(message: str, code: str) -> GraphQLResult:
+    return False, {"errors": [format_graphql_error(GraphQLError(message, extensions={"code": code}))]}
+
+
+class PersistedQueryHTTPHandler(GraphQLHTTPHandler):
+    """GraphQLHTTPHandler that resolves APQ hashes to query text before execution."""
+
+    async def execute_graphql_query(
+        self,
+        request: Any,
+        data: Any,
+        *,
+        context_value: Any = None,
+        query_document: DocumentNode | None = None,
+    ) -> GraphQLResult:
+        extensions = data.get("extensions") if isinstance(data, dict) else None
+        persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+        if isinstance(persisted, dict):
+            if persisted.get("version") != 1:
+                return _error("Unsupported persisted query version", "PERSISTED_QUERY_NOT_SUPPORTED")
+            digest = persisted.get("sha256Hash")
+            query = data.get("query")
+            if isinstance(query, str) and query:
+                if query_hash(query) != digest:
+                    return _error("provided sha does not match query", "BAD_USER_INPUT")
+                _remember(digest, query)
+            else:
+                entry = _entries.get(digest) if isinstance(digest, str) else None
+                if entry is None:
+                    _counters["persisted"][1] += 1
+                    # Answered with 200 per the APQ protocol: the client retries
+                    # with the full query instead of treating it as a failure.
+                    _, result = _error("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+                    return True, result
+                _counters["persisted"][0] += 1
+                _entries.move_to_end(digest)
+                data = {**data, "query": entry.query}
+        return await super().execute_graphql_query(
+            request, data, context_value=context_value, query_document=query_document,
+        )
+
+
+def get_stats() -> dict:
+    """Cache size and hit/miss counters for parse, validation and persisted-hash lookups."""
+    return {
+        "entries": len(_entries),
+        **{
+            step: {
+                "hits":     c[0],
+                "misses":   c[1],
+                "hit_rate": round(c[0] / (c[0] + c[1]), 4) if c[0] + c[1] else None,
+            }
+            for step, c in _counters.items()
+        },
+    }
@@ -30,7 +30,7 @@ def _build_reset_link(request: Any, token: str) -> str:
     return f"{base}/reset-password?token={token}"
 
 async def resolve_mail_business_user_credentials_helper(
-    db_name: str, schema: str, value: str, request: Any = None
+    db_name: str, schema: str, value: str | dict, request: Any = None
 ) -> dict:
     """
     Decode value payload, generate a new temporary password for the business user,
@@ -99,7 +99,7 @@ async def resolve_mail_business_user_credentials_helper(
     return {"email_error": email_error, "email_sent": email_sent, "id": id_}
 
 async def resolve_mail_admin_credentials_helper(
-    db_name: str, schema: str, value: str, request: Any = None
+    db_name: str, schema: str, value: str | dict, request: Any = None
 ) -> dict:
     """
     Decode value payload, generate a password-reset JWT, and email the reset link
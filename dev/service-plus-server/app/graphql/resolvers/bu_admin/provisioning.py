@@ -8,7 +8,9 @@ import psycopg.sql as pgsql
 
 from app.core.audit_log import AuditAction, audit_logger
 from app.core.email import send_email
+from app.db.connection.pool_manager import pool_manager
 from app.db.connection.psycopg_driver import exec_sql, exec_sql_dml, exec_sql_object
+from app.db.schema_migrations import mark_bu_schema_current
 from app.db.seeds.seed_bu_data import SeedBuData
 from app.db.seeds.seed_security_data import SeedSecurityData
 from app.db.sql.sql_base import SqlStore
@@ -27,7 +29,7 @@ BU_ADMIN_GENERIC_UPDATE_TABLE_RIGHTS: dict[str, str] = {
 
 
 async def resolve_create_bu_schema_and_feed_seed_data_helper(
-    db_name: str, schema: str, value: str
+    db_name: str, schema: str, value: str | dict
 ) -> dict:
     """
     Create a new BU row in security.bu, then create a new schema named after the BU code,
@@ -120,6 +122,14 @@ async def resolve_create_bu_schema_and_feed_seed_data_helper(
         sql=pgsql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(pgsql.Identifier(code)),
     )
 
+    # 7a. pg_trgm backs the job search index in BU_SCHEMA_DDL. It lives in the
+    # security schema, since new service databases have no public schema.
+    await exec_sql(
+        db_name=db_name,
+        schema="security",
+        sql=SqlStore.ENSURE_PG_TRGM,
+    )
+
     # 8. Create all BU tables in the new schema
     logger.info("Running BU_SCHEMA_DDL in schema '%s'", code)
     await exec_sql(
@@ -128,6 +138,18 @@ async def resolve_create_bu_schema_and_feed_seed_data_helper(
         sql=SqlStore.BU_SCHEMA_DDL,
     )
 
+    # 8a. BU_SCHEMA_DDL is already the latest schema: record every upgrade
+    # as applied so app.db.tools.migrate_bu_schemas never runs one here.
+    await mark_bu_schema_current(db_name, code)
+
+    # 8b. Yearly transaction partitions for this year and the next; the monthly
+    # scheduler job keeps them ahead from here on.
+    await exec_sql(
+        db_name=db_name,
+        schema=code,
+        sql=SqlStore.ENSURE_TRANSACTION_PARTITIONS,
+    )
+
     # 9. Seed lookup data
     logger.info("Seeding lookup data in schema '%s'", code)
     await exec_sql(
@@ -146,7 +168,7 @@ async def resolve_create_bu_schema_and_feed_seed_data_helper(
     logger.info("BU '%s' created successfully with schema and seed data", code)
     return {"code": code, "id": bu_id, "name": name}
 
-async def resolve_create_client_helper(db_name: str, schema: str, value: str) -> dict:
+async def resolve_create_client_helper(db_name: str, schema: str, value: str | dict) -> dict:
     """
     Decode value payload, insert a new client row, and optionally send a welcome
     email to the client's email address if one was provided.
@@ -214,7 +236,7 @@ async def resolve_create_client_helper(db_name: str, schema: str, value: str) ->
     return {"email_sent": email_sent, "id": record_id}
 
 async def resolve_create_service_db_helper(
-    db_name: str, schema: str, value: str
+    db_name: str, schema: str, value: str | dict
 ) -> dict:
     """
     Decode value payload, create a new PostgreSQL service database with the security
@@ -310,7 +332,7 @@ async def resolve_create_service_db_helper(
     return {"db_name": new_db_name, "id": client_id}
 
 async def resolve_feed_bu_seed_data_helper(
-    db_name: str, schema: str, value: str
+    db_name: str, schema: str, value: str | dict
 ) -> dict:
     """
     Feed seed data into an existing BU schema without recreating the schema or tables.
@@ -369,7 +391,7 @@ async def resolve_feed_bu_seed_data_helper(
     return {"code": code}
 
 async def resolve_seed_security_data_helper(
-    db_name: str, schema: str, value: str
+    db_name: str, schema: str, value: str | dict
 ) -> dict:
     """
     Feed seed data into an already-provisioned client's security schema without
@@ -409,7 +431,7 @@ async def resolve_seed_security_data_helper(
     return {"db_name": db_name}
 
 async def resolve_delete_bu_schema_helper(
-    db_name: str, schema: str, value: str
+    db_name: str, schema: str, value: str | dict
 ) -> dict:
     """
     Drop a BU schema from the database and optionally delete the security.bu row.
@@ -467,7 +489,7 @@ async def resolve_delete_bu_schema_helper(
     logger.info("Schema '%s' dropped successfully", code)
     return {"code": code, "delete_bu_row": delete_bu_row}
 
-async def resolve_delete_client_helper(db_name: str, schema: str, value: str) -> dict:
+async def resolve_delete_client_helper(db_name: str, schema: str, value: str | dict) -> dict:
     """
     Decode value payload, guard that client is inactive, drop its database,
     then delete the client row.
@@ -505,6 +527,8 @@ async def resolve_delete_client_helper(db_name: str, schema: str, value: str) ->
     db_name_val = client.get("db_name")
     if db_name_val:
         logger.info("Dropping client database: %s", db_name_val)
+        # Pooled connections to the tenant DB would otherwise block DROP DATABASE.
+        await pool_manager.discard_service_pools(db_name_val)
         await exec_sql_dml(
             db_name=None,
             schema="public",
@@ -530,7 +554,7 @@ async def resolve_delete_client_helper(db_name: str, schema: str, value: str) ->
     )
     return {"id": client_id}
 
-async def resolve_drop_database_helper(db_name: str, schema: str, value: str) -> dict:
+async def resolve_drop_database_helper(db_name: str, schema: str, value: str | dict) -> dict:
     """
     Decode value payload and physically drop an orphan PostgreSQL database.
 
@@ -584,6 +608,7 @@ async def resolve_drop_database_helper(db_name: str, schema: str, value: str) ->
 
     # 4. DROP DATABASE (requires autocommit)
     logger.info("Dropping orphan database: %s", target_db)
+    await pool_manager.discard_service_pools(target_db)
     await exec_sql_dml(
         db_name=None,
         schema="public",
@@ -4,7 +4,6 @@ user BU role. Split from mutation_helper.py — see plans/plan.md Step 4."""
 import secrets
 from typing import Any
 
-import psycopg.sql as pgsql
 from psycopg.rows import dict_row
 
 from app.core.audit_log import AuditAction, audit_logger
@@ -15,6 +14,7 @@ from app.db.connection.psycopg_driver import (
     exec_sql_object,
     get_service_db_connection,
     process_details,
+    set_search_path,
 )
 from app.db.sql.sql_base import SqlStore
 from app.core.exceptions import AppMessages, ValidationException
@@ -24,7 +24,7 @@ from app.logger import logger
 
 
 async def resolve_create_admin_user_helper(
-    db_name: str, schema: str, value: str, request: Any = None
+    db_name: str, schema: str, value: str | dict, request: Any = None
 ) -> dict:
     """
     Decode value payload, create an admin user (is_admin=True) with a random unusable
@@ -101,7 +101,7 @@ async def resolve_create_admin_user_helper(
     return {"email_sent": email_sent, "id": record_id}
 
 async def resolve_create_business_user_helper(
-    db_name: str, schema: str, value: str, request: Any = None
+    db_name: str, schema: str, value: str | dict, request: Any = None
 ) -> dict:
     """
     Decode value payload, hash a temp password, create a business user (is_admin=False)
@@ -186,9 +186,7 @@ async def resolve_create_business_user_helper(
     connection = get_service_db_connection(db_name)
     async with connection as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
             record_id = await process_details(sql_object, cur)
             for bu_id in bu_ids:
                 await cur.execute(
@@ -227,7 +225,7 @@ async def resolve_create_business_user_helper(
     return {"email_sent": email_sent, "id": record_id}
 
 async def resolve_set_user_bu_role_helper(
-    db_name: str, schema: str, value: str
+    db_name: str, schema: str, value: str | dict
 ) -> dict:
     """
     Decode value payload and replace all BU/role associations for a business user.
@@ -267,9 +265,7 @@ async def resolve_set_user_bu_role_helper(
     connection = get_service_db_connection(db_name)
     async with connection as conn:
         async with conn.cursor() as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
             # Delete existing associations
             await cur.execute(
                 "DELETE FROM user_bu_role WHERE user_id = %s",
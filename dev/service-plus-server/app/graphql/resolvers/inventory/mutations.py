@@ -1,10 +1,13 @@
 """Inventory mutation resolvers: spare parts cleanup and bulk import. Split
 from mutation_helper.py — see plans/plan.md Step 4."""
 
+import psycopg
+
+from app.db.connection.bulk_copy import copy_records
 from app.db.connection.psycopg_driver import bulk_insert_records, exec_sql
 from app.db.sql.sql_base import SqlStore
 from app.core.exceptions import AppMessages, ValidationException
-from app.graphql.resolvers.shared.generic_query import _decode_value
+from app.graphql.resolvers.shared.generic_query import _decode_json, _decode_value
 from app.logger import logger
 
 # genericUpdate access rights for tables owned by the Masters and Inventory
@@ -38,6 +41,12 @@ INVENTORY_GENERIC_UPDATE_TABLE_RIGHTS: dict[str, str] = {
     "stock_opening_balance": "INVENTORY_OPENING_STOCK",
 }
 
+# spare_part_master columns importSpareParts accepts; anything else in a record is ignored.
+_SPARE_PART_IMPORT_COLUMNS: tuple[str, ...] = (
+    "brand_id", "part_code", "part_name", "part_description", "category", "model",
+    "uom", "cost_price", "mrp", "hsn_code", "gst_rate",
+)
+
 # genericUpdateScript access rights, keyed by sql_id rather than tableName.
 INVENTORY_GENERIC_UPDATE_SCRIPT_SQL_ID_RIGHTS: dict[str, str] = {
     "SET_PART_LOCATIONS": "INVENTORY_SET_PART_LOCATION",
@@ -45,7 +54,7 @@ INVENTORY_GENERIC_UPDATE_SCRIPT_SQL_ID_RIGHTS: dict[str, str] = {
 
 
 async def resolve_delete_unused_parts_by_brand_helper(
-    db_name: str, schema: str, value: str
+    db_name: str, schema: str, value: str | dict
 ) -> dict:
     """
     Delete all spare parts for a brand that are not referenced in any
@@ -79,21 +88,28 @@ async def resolve_delete_unused_parts_by_brand_helper(
     return {"deleted_count": deleted_count}
 
 async def resolve_import_spare_parts_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict | list = ""
 ) -> dict:
     """
-    Fast bulk import of spare parts using a single multi-row INSERT.
+    Fast bulk import of spare parts, streamed into the table with COPY.
 
     Args:
         db_name: Target service database name.
         schema:  Database schema (default: "public").
-        value:   URL-encoded JSON array of part record dicts.
+        value:   URL-encoded JSON: either an array of part record dicts, or
+                 { records: [...], upsert: bool } to update parts whose
+                 (brand_id, part_code) already exists instead of rejecting them.
 
     Returns:
-        {"success_count": int}
+        {"success_count": int, "updated_count": int,
+         "rejected": [{"row": int, "reason": str}]}  (rows numbered from 1)
     """
-    payload = _decode_value(value, "importSpareParts")
+    payload = _decode_json(value, "importSpareParts")
 
+    upsert = False
+    if isinstance(payload, dict):
+        upsert = bool(payload.get("upsert"))
+        payload = payload.get("records")
     if not isinstance(payload, list):
         raise ValidationException(
             message=AppMessages.INVALID_INPUT,
@@ -102,17 +118,46 @@ async def resolve_import_spare_parts_helper(
 
     db_name_arg: str = db_name or ""
     logger.info(
-        "Bulk importing %d spare parts into: %s",
+        "Bulk importing %d spare parts into: %s (upsert=%s)",
         len(payload),
         db_name_arg or "client_db",
+        upsert,
     )
 
-    count = await bulk_insert_records(
-        db_name=db_name_arg,
-        schema=schema or "public",
-        table_name="spare_part_master",
-        records=payload,
-    )
+    try:
+        result = await copy_records(
+            db_name=db_name_arg,
+            schema=schema or "public",
+            table_name="spare_part_master",
+            records=payload,
+            columns=_SPARE_PART_IMPORT_COLUMNS,
+            conflict_keys=("brand_id", "part_code"),
+            upsert=upsert,
+        )
+    except psycopg.NotSupportedError as e:
+        if upsert:
+            raise
+        # copy_records has no coercion for a column type of spare_part_master
+        # (the table has been altered) — fall back to the multi-row INSERT,
+        # where any bad row aborts the whole import.
+        logger.warning("COPY import unavailable, falling back to INSERT: %s", e)
+        count = await bulk_insert_records(
+            db_name=db_name_arg,
+            schema=schema or "public",
+            table_name="spare_part_master",
+            records=[
+                {k: r[k] for k in _SPARE_PART_IMPORT_COLUMNS if k in r}
+                for r in payload if isinstance(r, dict)
+            ],
+        )
+        result = {"inserted": count, "updated": 0, "rejected": []}
 
-    logger.info("Bulk import complete: %d rows inserted", count)
-    return {"success_count": count}
+    logger.info(
+        "Bulk import complete: %d inserted, %d updated, %d rejected",
+        result["inserted"], result["updated"], len(result["rejected"]),
+    )
+    return {
+        "success_count": result["inserted"],
+        "updated_count": result["updated"],
+        "rejected":      result["rejected"],
+    }
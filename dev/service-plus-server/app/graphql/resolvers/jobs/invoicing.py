@@ -3,10 +3,13 @@ mutation_helper.py — see plans/plan.md Step 4."""
 
 from typing import Any
 
-import psycopg.sql as pgsql
 from psycopg.rows import dict_row
 
-from app.db.connection.psycopg_driver import get_service_db_connection, process_data
+from app.db.connection.psycopg_driver import (
+    get_service_db_connection,
+    process_data,
+    set_search_path,
+)
 from app.db.sql.sql_base import SqlStore
 from app.core.exceptions import AppMessages, ValidationException
 from app.graphql.resolvers.shared.generic_query import _decode_value
@@ -14,7 +17,7 @@ from app.logger import logger
 
 
 async def resolve_create_job_invoice_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """
     Create a job invoice and atomically generate the invoice number in a single transaction.
@@ -50,9 +53,7 @@ async def resolve_create_job_invoice_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             # 1. Idempotency check — return existing invoice if already created
             await cur.execute(
@@ -101,7 +102,7 @@ async def resolve_create_job_invoice_helper(
     return invoice_id
 
 async def resolve_regenerate_job_invoice_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """
     Regenerate a job invoice atomically: delete existing lines, update header amounts
@@ -129,9 +130,7 @@ async def resolve_regenerate_job_invoice_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
             await cur.execute(
                 SqlStore.DELETE_JOB_INVOICE_LINES_BY_INVOICE, {"invoice_id": invoice_id}
             )
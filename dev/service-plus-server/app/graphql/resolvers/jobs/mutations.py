@@ -6,13 +6,13 @@ import json
 from typing import Any
 from urllib.parse import unquote
 
-import psycopg.sql as pgsql
 from psycopg.rows import dict_row
 
 from app.db.connection.psycopg_driver import (
     get_service_db_connection,
     process_data,
     process_details,
+    set_search_path,
 )
 from app.db.sql.sql_base import SqlStore
 from app.core.exceptions import AppMessages, ValidationException
@@ -28,7 +28,7 @@ JOBS_GENERIC_UPDATE_TABLE_RIGHTS: dict[str, str] = {
 
 
 async def resolve_create_job_payment_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Record a payment against a job and update its status."""
     # pylint: disable=too-many-locals
@@ -48,9 +48,7 @@ async def resolve_create_job_payment_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
             await cur.execute(
                 SqlStore.CLAIM_NEXT_RECEIPT_NUMBER,
                 {"branch_id": branch_id, "job_id": job_id},
@@ -75,7 +73,7 @@ async def resolve_create_job_payment_helper(
     return payment_id
 
 async def resolve_create_single_job_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """
     Create a single job and atomically increment the document sequence.
@@ -85,15 +83,17 @@ async def resolve_create_single_job_helper(
             message=AppMessages.INVALID_INPUT,
             extensions={"detail": AppMessages.INVALID_JSON_OBJECT},
         )
-    value_string = unquote(value)
-    try:
-        payload: dict = json.loads(value_string)
-    except json.JSONDecodeError as e:
-        logger.error("Invalid JSON in createSingleJob value: %s", e)
-        raise ValidationException(
-            message=AppMessages.INVALID_INPUT,
-            extensions={"detail": AppMessages.INVALID_JSON_OBJECT},
-        ) from e
+    if isinstance(value, str):
+        try:
+            payload: dict = json.loads(unquote(value))
+        except json.JSONDecodeError as e:
+            logger.error("Invalid JSON in createSingleJob value: %s", e)
+            raise ValidationException(
+                message=AppMessages.INVALID_INPUT,
+                extensions={"detail": AppMessages.INVALID_JSON_OBJECT},
+            ) from e
+    else:
+        payload = value
 
     x_data = payload.get("xData", {})
     performed_by_user_id = x_data.pop("performed_by_user_id", None)
@@ -110,9 +110,7 @@ async def resolve_create_single_job_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             # 1. Claim next sequence number atomically
             await cur.execute(
@@ -171,7 +169,7 @@ async def resolve_create_single_job_helper(
     return job_id
 
 async def resolve_update_opening_job_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """
     Update an Opening Job.
@@ -203,9 +201,7 @@ async def resolve_update_opening_job_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             await cur.execute("SELECT job_status_id FROM job WHERE id = %s", (job_id,))
             current = await cur.fetchone()
@@ -242,7 +238,7 @@ async def resolve_update_opening_job_helper(
     return job_id
 
 async def resolve_update_job_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Update fields on an existing job record."""
     # pylint: disable=too-many-locals
@@ -294,9 +290,7 @@ async def resolve_update_job_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             # 1. Guard: block division change on a finalised job
             if "division_id" in x_data:
@@ -350,7 +344,7 @@ _STATUS_FLAGS: dict[int, dict[str, bool]] = {
 
 
 async def resolve_undo_job_transaction_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Undo the last transaction on a job and restore its previous state."""
     # pylint: disable=too-many-locals
@@ -363,9 +357,7 @@ async def resolve_undo_job_transaction_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             # 1. Stale guard — confirm this txn is still job.last_transaction_id
             await cur.execute(
@@ -431,7 +423,7 @@ async def resolve_undo_job_transaction_helper(
     return {"job_id": job_id, "restored_transaction_id": prev_txn_id}
 
 async def resolve_undeliver_job_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Undeliver a job: restore the status it had before delivery and reopen it.
 
@@ -447,9 +439,7 @@ async def resolve_undeliver_job_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             # 1. Find the state the job was in just before it was delivered
             await cur.execute(
@@ -486,7 +476,7 @@ async def resolve_undeliver_job_helper(
     return {"job_id": job_id, "restored_status_id": status_id}
 
 async def resolve_deliver_job_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Mark a job as delivered and record the delivery transaction."""
     # pylint: disable=too-many-locals
@@ -531,9 +521,7 @@ async def resolve_deliver_job_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             # 1. Insert job_payment if amount > 0
             if payment_amount > 0:
@@ -572,7 +560,7 @@ async def resolve_deliver_job_helper(
     return new_txn_id
 
 async def resolve_create_job_batch_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Create a batch of jobs from shared data and per-job overrides."""
     # pylint: disable=too-many-locals
@@ -599,9 +587,7 @@ async def resolve_create_job_batch_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
             await cur.execute(SqlStore.CLAIM_NEXT_BATCH_NUMBER)
             batch_no = (await cur.fetchone())["batch_no"]
             logger.info("Assigned batch_no=%s", batch_no)
@@ -658,7 +644,7 @@ async def resolve_create_job_batch_helper(
     return {"batch_no": batch_no, "job_ids": job_ids, "job_nos": job_nos}
 
 async def resolve_update_job_batch_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Update header and line items for an existing job batch."""
     # pylint: disable=too-many-locals
@@ -675,9 +661,7 @@ async def resolve_update_job_batch_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             await cur.execute(
                 "UPDATE job SET job_date=%s, customer_contact_id=%s,"
@@ -789,7 +773,7 @@ async def resolve_update_job_batch_helper(
     return {"batch_no": batch_no}
 
 async def resolve_delete_job_batch_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Delete a job batch and its associated job records."""
     payload = _decode_value(value, "deleteJobBatch")
@@ -800,9 +784,7 @@ async def resolve_delete_job_batch_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
             await cur.execute("SELECT id FROM job WHERE batch_no = %s", (batch_no,))
             job_ids = [r["id"] for r in await cur.fetchall()]
 
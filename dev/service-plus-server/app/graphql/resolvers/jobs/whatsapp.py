@@ -66,7 +66,7 @@ async def _send_completion_for_customer(
 
 
 async def resolve_send_whatsapp_completion_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> dict[str, Any]:
     """Send the JOB_COMPLETION text-only WhatsApp message, grouped one message per
     customer (never one per job), for every eligible job in the request."""
@@ -103,10 +103,16 @@ GENERIC_UPDATE_SCRIPT_SQL_ID_RIGHTS: dict[str, str] = {
 }
 
 
-def _require_generic_update_table_right(info, value: str) -> None:
+def _payload_key(value: str | dict, key: str) -> Any:
+    """`key` of a genericUpdate/genericUpdateScript value, native or URL-encoded JSON."""
+    payload = json.loads(unquote(value)) if isinstance(value, str) else value
+    return payload.get(key)
+
+
+def _require_generic_update_table_right(info, value: str | dict) -> None:
     """Gate genericUpdate calls that target a table listed in GENERIC_UPDATE_TABLE_RIGHTS."""
     try:
-        table_name = json.loads(unquote(value)).get("tableName")
+        table_name = _payload_key(value, "tableName")
     except (ValueError, AttributeError):
         return
     right = GENERIC_UPDATE_TABLE_RIGHTS.get(table_name)
@@ -114,10 +120,10 @@ def _require_generic_update_table_right(info, value: str) -> None:
         require_access_right(info, right)
 
 
-def _require_generic_update_script_right(info, value: str) -> None:
+def _require_generic_update_script_right(info, value: str | dict) -> None:
     """Gate genericUpdateScript calls whose sql_id is listed in GENERIC_UPDATE_SCRIPT_SQL_ID_RIGHTS."""
     try:
-        sql_id = json.loads(unquote(value)).get("sql_id")
+        sql_id = _payload_key(value, "sql_id")
     except (ValueError, AttributeError):
         return
     right = GENERIC_UPDATE_SCRIPT_SQL_ID_RIGHTS.get(sql_id)
@@ -128,7 +134,7 @@ def _require_generic_update_script_right(info, value: str) -> None:
 @mutation.field("createAdminUser")
 @handle_graphql_errors("Error creating admin user")
 async def resolve_create_admin_user(
-    _, info, db_name: str = "", schema: str = "security", value: str = ""
+    _, info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Create an admin user and email a password-reset link."""
     return await resolve_create_admin_user_helper(
@@ -139,7 +145,7 @@ async def resolve_create_admin_user(
 @mutation.field("createBuSchemaAndFeedSeedData")
 @handle_graphql_errors("Error creating BU schema", AppMessages.BU_SCHEMA_CREATE_FAILED)
 async def resolve_create_bu_schema_and_feed_seed_data(
-    _, _info, db_name: str = "", schema: str = "security", value: str = ""
+    _, _info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Create a BU schema and seed its lookup tables."""
     return await resolve_create_bu_schema_and_feed_seed_data_helper(db_name, schema, value)
@@ -148,7 +154,7 @@ async def resolve_create_bu_schema_and_feed_seed_data(
 @mutation.field("createClient")
 @handle_graphql_errors("Error creating client")
 async def resolve_create_client(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Insert a new client record."""
     return await resolve_create_client_helper(db_name, schema, value)
@@ -157,7 +163,7 @@ async def resolve_create_client(
 @mutation.field("createBusinessUser")
 @handle_graphql_errors("Error creating business user")
 async def resolve_create_business_user(
-    _, info, db_name: str = "", schema: str = "security", value: str = ""
+    _, info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Create a business user in the security schema."""
     return await resolve_create_business_user_helper(
@@ -168,7 +174,7 @@ async def resolve_create_business_user(
 @mutation.field("createServiceDb")
 @handle_graphql_errors("Error creating service database")
 async def resolve_create_service_db(
-    _, _info, db_name: str = "", schema: str = "security", value: str = ""
+    _, _info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Create a new PostgreSQL service database for a client."""
     return await resolve_create_service_db_helper(db_name, schema, value)
@@ -177,7 +183,7 @@ async def resolve_create_service_db(
 @mutation.field("feedBuSeedData")
 @handle_graphql_errors("Error feeding BU seed data", AppMessages.BU_SEED_FEED_FAILED)
 async def resolve_feed_bu_seed_data(
-    _, _info, db_name: str = "", schema: str = "security", value: str = ""
+    _, _info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Feed seed data into an existing BU schema."""
     return await resolve_feed_bu_seed_data_helper(db_name, schema, value)
@@ -186,7 +192,7 @@ async def resolve_feed_bu_seed_data(
 @mutation.field("seedSecurityData")
 @handle_graphql_errors("Error seeding security data", AppMessages.SECURITY_SEED_FEED_FAILED)
 async def resolve_seed_security_data(
-    _, _info, db_name: str = "", schema: str = "security", value: str = ""
+    _, _info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Feed seed data into an existing client's security schema."""
     return await resolve_seed_security_data_helper(db_name, schema, value)
@@ -195,7 +201,7 @@ async def resolve_seed_security_data(
 @mutation.field("deleteBuSchema")
 @handle_graphql_errors("Error dropping BU schema", AppMessages.BU_SCHEMA_DROP_FAILED)
 async def resolve_delete_bu_schema(
-    _, _info, db_name: str = "", schema: str = "security", value: str = ""
+    _, _info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Drop a BU schema and optionally delete its security.bu row."""
     return await resolve_delete_bu_schema_helper(db_name, schema, value)
@@ -204,7 +210,7 @@ async def resolve_delete_bu_schema(
 @mutation.field("deleteClient")
 @handle_graphql_errors("Error deleting client")
 async def resolve_delete_client(
-    _, _info, db_name: str = "", schema: str = "security", value: str = ""
+    _, _info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Guard inactive state, drop client database, delete client row."""
     return await resolve_delete_client_helper(db_name, schema, value)
@@ -213,7 +219,7 @@ async def resolve_delete_client(
 @mutation.field("dropDatabase")
 @handle_graphql_errors("Error dropping database", AppMessages.DB_DROP_FAILED)
 async def resolve_drop_database(
-    _, _info, db_name: str = "", schema: str = "security", value: str = ""
+    _, _info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Physically drop an orphan PostgreSQL database."""
     return await resolve_drop_database_helper(db_name, schema, value)
@@ -238,7 +244,7 @@ async def resolve_generic_update_script(_, info, db_name="", schema="public", va
 @mutation.field("deleteUnusedPartsByBrand")
 @handle_graphql_errors("Error deleting unused parts by brand")
 async def resolve_delete_unused_parts_by_brand(
-    _, _info, db_name: str = "", schema: str = "", value: str = ""
+    _, _info, db_name: str = "", schema: str = "", value: str | dict = ""
 ) -> Any:
     """Delete spare parts that have no job usage for a given brand."""
     return await resolve_delete_unused_parts_by_brand_helper(db_name, schema, value)
@@ -254,7 +260,7 @@ async def resolve_import_spare_parts(_, _info, db_name="", schema="public", valu
 @mutation.field("mailAdminCredentials")
 @handle_graphql_errors("Error mailing admin credentials")
 async def resolve_mail_admin_credentials(
-    _, info, db_name: str = "", schema: str = "security", value: str = ""
+    _, info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Email login credentials to an admin user."""
     return await resolve_mail_admin_credentials_helper(
@@ -265,7 +271,7 @@ async def resolve_mail_admin_credentials(
 @mutation.field("mailBusinessUserCredentials")
 @handle_graphql_errors("Error mailing business user credentials")
 async def resolve_mail_business_user_credentials(
-    _, info, db_name: str = "", schema: str = "security", value: str = ""
+    _, info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Email login credentials to a business user."""
     return await resolve_mail_business_user_credentials_helper(
@@ -276,7 +282,7 @@ async def resolve_mail_business_user_credentials(
 @mutation.field("setUserBuRole")
 @handle_graphql_errors("Error setting user BU/role")
 async def resolve_set_user_bu_role(
-    _, _info, db_name: str = "", schema: str = "security", value: str = ""
+    _, _info, db_name: str = "", schema: str = "security", value: str | dict = ""
 ) -> Any:
     """Assign a BU and role to a business user."""
     return await resolve_set_user_bu_role_helper(db_name, schema, value)
@@ -285,7 +291,7 @@ async def resolve_set_user_bu_role(
 @mutation.field("createSingleJob")
 @handle_graphql_errors("Error creating single job")
 async def resolve_create_single_job(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Create a single job record."""
     return await resolve_create_single_job_helper(db_name, schema, value)
@@ -294,7 +300,7 @@ async def resolve_create_single_job(
 @mutation.field("updateJob")
 @handle_graphql_errors("Error updating job")
 async def resolve_update_job(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Update an existing job record."""
     return await resolve_update_job_helper(db_name, schema, value)
@@ -303,7 +309,7 @@ async def resolve_update_job(
 @mutation.field("updateOpeningJob")
 @handle_graphql_errors("Error updating opening job")
 async def resolve_update_opening_job(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Update an Opening Job, recording a job_transaction row when its status changes."""
     return await resolve_update_opening_job_helper(db_name, schema, value)
@@ -312,7 +318,7 @@ async def resolve_update_opening_job(
 @mutation.field("createJobBatch")
 @handle_graphql_errors("Error creating job batch")
 async def resolve_create_job_batch(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Create a batch of jobs."""
     return await resolve_create_job_batch_helper(db_name, schema, value)
@@ -321,7 +327,7 @@ async def resolve_create_job_batch(
 @mutation.field("updateJobBatch")
 @handle_graphql_errors("Error updating job batch")
 async def resolve_update_job_batch(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Update a job batch record."""
     return await resolve_update_job_batch_helper(db_name, schema, value)
@@ -330,7 +336,7 @@ async def resolve_update_job_batch(
 @mutation.field("deleteJobBatch")
 @handle_graphql_errors("Error deleting job batch")
 async def resolve_delete_job_batch(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Delete a job batch record."""
     return await resolve_delete_job_batch_helper(db_name, schema, value)
@@ -339,7 +345,7 @@ async def resolve_delete_job_batch(
 @mutation.field("deliverJob")
 @handle_graphql_errors("Error delivering job")
 async def resolve_deliver_job(
-    _, info, db_name: str = "", schema: str = "public", value: str = ""
+    _, info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Mark a job as delivered."""
     require_access_right(info, "JOBS_DELIVER_JOB")
@@ -349,7 +355,7 @@ async def resolve_deliver_job(
 @mutation.field("undoJobTransaction")
 @handle_graphql_errors("Error undoing job transaction")
 async def resolve_undo_job_transaction(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Undo the last transaction on a job."""
     return await resolve_undo_job_transaction_helper(db_name, schema, value)
@@ -358,7 +364,7 @@ async def resolve_undo_job_transaction(
 @mutation.field("undeliverJob")
 @handle_graphql_errors("Error undelivering job")
 async def resolve_undeliver_job(
-    _, info, db_name: str = "", schema: str = "public", value: str = ""
+    _, info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Undeliver a job and restore its pre-delivery status."""
     require_access_right(info, "JOBS_DELIVER_JOB")
@@ -368,7 +374,7 @@ async def resolve_undeliver_job(
 @mutation.field("createSalesInvoice")
 @handle_graphql_errors("Error creating sales invoice")
 async def resolve_create_sales_invoice(
-    _, info, db_name: str = "", schema: str = "public", value: str = ""
+    _, info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Create a sales invoice."""
     require_access_right(info, "INVENTORY_SALES_ENTRY")
@@ -378,7 +384,7 @@ async def resolve_create_sales_invoice(
 @mutation.field("createJobInvoice")
 @handle_graphql_errors("Error creating job invoice")
 async def resolve_create_job_invoice(
-    _, info, db_name: str = "", schema: str = "public", value: str = ""
+    _, info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Create an invoice for a job."""
     require_access_right(info, "JOBS_DELIVER_JOB")
@@ -388,7 +394,7 @@ async def resolve_create_job_invoice(
 @mutation.field("regenerateJobInvoice")
 @handle_graphql_errors("Error regenerating job invoice")
 async def resolve_regenerate_job_invoice(
-    _, info, db_name: str = "", schema: str = "public", value: str = ""
+    _, info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Regenerate an existing job invoice."""
     require_access_right(info, "JOBS_DELIVER_JOB")
@@ -398,7 +404,7 @@ async def resolve_regenerate_job_invoice(
 @mutation.field("createJobPayment")
 @handle_graphql_errors("Error creating job payment")
 async def resolve_create_job_payment(
-    _, info, db_name: str = "", schema: str = "public", value: str = ""
+    _, info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Record a payment against a job."""
     # Called from both the Receipts screen and the Deliver Job payment
@@ -410,7 +416,7 @@ async def resolve_create_job_payment(
 @mutation.field("accountsPosting")
 @handle_graphql_errors("Error in accountsPosting")
 async def resolve_accounts_posting(
-    _, info, db_name: str = "", schema: str = "public", value: str = ""
+    _, info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Post unposted money receipts to trace-plus accounts."""
     require_access_right(info, "JOBS_ACCOUNTS_POSTING")
@@ -420,7 +426,7 @@ async def resolve_accounts_posting(
 @mutation.field("sendWhatsappCompletion")
 @handle_graphql_errors("Error sending WhatsApp completion message")
 async def resolve_send_whatsapp_completion(
-    _, _info, db_name: str = "", schema: str = "public", value: str = ""
+    _, _info, db_name: str = "", schema: str = "public", value: str | dict = ""
 ) -> Any:
     """Send the job-completion WhatsApp message, one per customer. Called from
     both the finalize-job form (single job) and the Customer Connect bulk screen
@@ -61,8 +61,12 @@ async def resolve_audit_log_stats(
 
 @query.field("genericBatchQuery")
 @handle_query_errors("Unexpected genericBatchQuery failure")
-async def resolve_generic_batch_query(_, info, db_name="", items=None) -> Any:
-    return await resolve_generic_batch_query_helper(db_name, items or [])
+async def resolve_generic_batch_query(
+    _, info, db_name="", items=None, parallel=False, concurrency=None
+) -> Any:
+    return await resolve_generic_batch_query_helper(
+        db_name, items or [], parallel=bool(parallel), concurrency=concurrency
+    )
 
 
 @query.field("genericQuery")
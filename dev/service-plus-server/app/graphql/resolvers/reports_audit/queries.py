@@ -10,8 +10,12 @@ from pathlib import Path
 
 from app.config import settings
 from app.core.audit_log import audit_logger
+from app.db.connection import result_cache, statement_cache
+from app.db.connection.pool_manager import pool_manager
 from app.db.connection.psycopg_driver import exec_sql_query, exec_sql_batch_query
 from app.db.sql.sql_base import SqlStore
+from app.graphql import document_cache
+from app.graphql.resolvers.shared import single_flight
 from app.logger import logger
 
 _MODULE_LOAD_TIME: float = _time.time()
@@ -316,9 +320,14 @@ async def resolve_usage_health_helper() -> dict:
     logger.debug("Usage health data assembled successfully")
     return {
         "audit_log":      audit_stats,
+        "coalesced_queries": single_flight.get_stats(),
+        "db_pools":       pool_manager.get_stats(),
         "db_sizes":       db_sizes,
+        "graphql_documents": document_cache.get_stats(),
         "overall_status": overall_status,
         "platform_stats": platform_stats,
+        "prepared_statements": statement_cache.get_stats(),
+        "result_cache":        result_cache.get_stats(),
         "server_info": {
             "algorithm":   settings.algorithm,
             "app_name":    settings.app_name,
@@ -9,11 +9,15 @@ from typing import Any
 from urllib.parse import quote
 
 import httpx
-import psycopg.sql as pgsql
 from psycopg.rows import dict_row
 
 from app.config import settings
-from app.db.connection.psycopg_driver import exec_sql, get_service_db_connection, process_data
+from app.db.connection.psycopg_driver import (
+    exec_sql,
+    get_service_db_connection,
+    process_data,
+    set_search_path,
+)
 from app.db.sql.sql_base import SqlStore
 from app.core.exceptions import AppMessages, ValidationException
 from app.graphql.pubsub import pubsub
@@ -22,7 +26,7 @@ from app.logger import logger
 
 
 async def resolve_create_sales_invoice_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """
     Create a sales invoice and atomically generate the invoice number in a single transaction.
@@ -50,9 +54,7 @@ async def resolve_create_sales_invoice_helper(
 
     async with get_service_db_connection(db_name_arg) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema_name))
-            )
+            await set_search_path(cur, schema_name)
 
             # 1. Claim next invoice number atomically
             await cur.execute(
@@ -449,7 +451,7 @@ async def _post_tran_h_to_trace_plus(
     return resp.json()
 
 async def resolve_accounts_posting_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> dict:
     """Post unposted money receipts, purchase invoices, job invoices, and sales invoices for every division in a branch.
 
@@ -4,21 +4,38 @@ mutation_helper.py — see plans/plan.md Step 4."""
 
 import json
 from datetime import date, datetime
+from typing import Any
 from urllib.parse import unquote
 
+from app.db.connection import result_cache
 from app.db.connection.psycopg_driver import SqlBatchItem, exec_sql_query, exec_sql_batch_query
 from app.db.sql.sql_base import SqlStore
 from app.core.exceptions import AppMessages, ValidationException
+from app.graphql.resolvers.shared.keyset import KEYSET_PAGED, next_cursor, with_keyset_args
+from app.graphql.resolvers.shared.paged_total import (
+    cached_total,
+    count_twin,
+    remember_total,
+    total_key,
+)
+from app.graphql.resolvers.shared.single_flight import coalesce, flight_key
 from app.logger import logger
 
 
-def _decode_value(value: str, context: str) -> dict:
-    """Decode a URL-encoded JSON value string into a dict."""
+def _decode_json(value: str | dict | list, context: str) -> Any:
+    """
+    Decode a resolver's `value` argument without checking its shape.
+
+    The Generic scalar delivers JSON as-is; the legacy URL-encoded JSON string
+    is still unquoted and parsed while clients migrate.
+    """
     if not value:
         raise ValidationException(
             message=AppMessages.REQUIRED_FIELD_MISSING,
             extensions={"field": "value"},
         )
+    if not isinstance(value, str):
+        return value
     try:
         return json.loads(unquote(value))
     except (json.JSONDecodeError, ValueError) as e:
@@ -29,28 +46,88 @@ def _decode_value(value: str, context: str) -> dict:
         ) from e
 
 
+def _decode_value(value: str | dict, context: str) -> dict:
+    """
+    Decode a resolver's `value` argument into a dict (see _decode_json).
+
+    Anything that is not, or does not decode to, a JSON object is rejected
+    like malformed JSON.
+    """
+    decoded = _decode_json(value, context)
+    if not isinstance(decoded, dict):
+        logger.error("%s value is a JSON %s, not an object", context, type(decoded).__name__)
+        raise ValidationException(
+            message=AppMessages.INVALID_INPUT,
+            extensions={"detail": AppMessages.INVALID_JSON_VALUE},
+        )
+    return decoded
+
+
 def _serialize_row(row: dict) -> dict:
     return {k: v.isoformat() if isinstance(v, (date, datetime)) else v for k, v in row.items()}
 
 
-async def resolve_generic_query_helper(db_name: str, schema: str = "public", value: str = ""):
-    """Execute a generic SQL query from SqlStore with provided arguments."""
-    logger.debug("Generic query requested")
-
-    if not value:
-        raise ValidationException(
-            message=AppMessages.REQUIRED_FIELD_MISSING,
-            extensions={"field": "value"},
+async def _read(
+    db_name: str | None, schema: str, sql_id: str, sql: str, sql_args: dict,
+    columnar: bool, count_sql_id: str | None,
+) -> tuple[list | dict, int | None]:
+    """One genericQuery read: the rows, plus the *_COUNT total when asked for."""
+    total: int | None = None
+    if count_sql_id:
+        key = total_key(db_name, schema, count_sql_id, sql_args)
+        total = cached_total(key)
+
+    if count_sql_id and total is None:
+        rows, counted = await exec_sql_batch_query(db_name, [
+            SqlBatchItem(sql_id=sql_id, sql_args=sql_args, schema=schema,
+                         text_dates=True, columnar=columnar),
+            SqlBatchItem(sql_id=count_sql_id, sql_args=sql_args, schema=schema),
+        ])
+        # The twins' single column is mostly "total", but not always ("count").
+        total = int(next(iter(counted[0].values()))) if counted else 0
+        remember_total(key, total)
+    elif result_cache.is_cached(sql_id):
+        key = result_cache.result_key(db_name, schema, sql_id, sql_args, columnar)
+        rows = result_cache.cached_result(key)
+        if rows is None:
+            read_version = result_cache.version(key)
+            rows = await exec_sql_query(
+                db_name, schema, sql, sql_args, text_dates=True, columnar=columnar,
+            )
+            result_cache.remember(key, read_version, rows)
+    else:
+        rows = await exec_sql_query(
+            db_name, schema, sql, sql_args, text_dates=True, columnar=columnar,
         )
+    return rows, total
 
-    try:
-        params: dict = json.loads(unquote(value))
-    except (json.JSONDecodeError, ValueError) as e:
-        logger.error("Invalid JSON in genericQuery value: %s", e)
-        raise ValidationException(
-            message=AppMessages.INVALID_INPUT,
-            extensions={"detail": AppMessages.INVALID_JSON_VALUE},
-        )
+
+async def resolve_generic_query_helper(db_name: str, schema: str = "public", value: str | dict = ""):
+    """
+    Execute a generic SQL query from SqlStore with provided arguments.
+
+    `"columnar": true` in the value returns {"columns": [...], "rows": [[...], ...]}
+    instead of a list of row objects — much smaller for wide or long results.
+
+    For the keyset-capable *_PAGED queries (see keyset.KEYSET_PAGED), a
+    `"cursor"` key switches to keyset paging: null for the first page, then the
+    `next_cursor` of the previous response. The result is then
+    {"rows": <rows>, "next_cursor": str | None}.
+
+    For any *_PAGED query, `"withTotal": true` also returns the row total of
+    its *_COUNT twin as `"total"` in the same {"rows": ...} envelope — counted
+    in the page's own round trip, then reused for the same filter (see
+    paged_total).
+
+    Reference-data lookups listed in result_cache are served from memory
+    until a write through the driver touches one of the tables they read.
+
+    Identical reads arriving while one is in flight share its execution and
+    result (see single_flight).
+    """
+    logger.debug("Generic query requested")
+
+    params: dict = _decode_value(value, "genericQuery")
 
     sql_id:   str  = params.get("sqlId", "")
     logger.debug(sql_id)
@@ -64,26 +141,58 @@ async def resolve_generic_query_helper(db_name: str, schema: str = "public", val
             extensions={"detail": f"Unknown sqlId: {sql_id}"},
         )
 
+    cursor_mode = "cursor" in params
+    if cursor_mode and sql_id not in KEYSET_PAGED:
+        raise ValidationException(
+            message=AppMessages.INVALID_INPUT,
+            extensions={"detail": f"sqlId does not support cursor paging: {sql_id}"},
+        )
+    sql_args = with_keyset_args(sql_id, sql_args, params.get("cursor"))
+    with_total = bool(params.get("withTotal"))
+    count_sql_id = count_twin(sql_id) if with_total else None
+    if with_total and not count_sql_id:
+        raise ValidationException(
+            message=AppMessages.INVALID_INPUT,
+            extensions={"detail": f"sqlId has no *_COUNT twin: {sql_id}"},
+        )
+
     db_name_arg = db_name if db_name else None
-    rows = await exec_sql_query(db_name_arg, schema or "public", sql, sql_args, text_dates=True)
+    schema = schema or "public"
+    columnar = bool(params.get("columnar"))
+    rows, total = await coalesce(
+        flight_key(db_name_arg, schema, sql_id, sql_args, columnar, count_sql_id),
+        lambda: _read(db_name_arg, schema, sql_id, sql, sql_args, columnar, count_sql_id),
+    )
 
     logger.debug("Generic query completed: sqlId=%r", sql_id)
-    return rows
-
-
-async def resolve_generic_batch_query_helper(db_name: str, items: list[str]) -> list:
-    """Execute multiple SQL queries in one DB connection, returning results in order."""
-    logger.debug("Generic batch query requested: %d items", len(items))
+    if not (cursor_mode or with_total):
+        return rows
+    result: dict = {"rows": rows}
+    if cursor_mode:
+        result["next_cursor"] = next_cursor(sql_id, rows, sql_args.get("limit"))
+    if with_total:
+        result["total"] = total
+    return result
+
+
+async def resolve_generic_batch_query_helper(
+    db_name: str,
+    items: list[str | dict],
+    parallel: bool = False,
+    concurrency: int | None = None,
+) -> list:
+    """
+    Execute multiple SQL queries, returning results in order.
+
+    Items share one pipelined DB connection unless `parallel` is set, in which
+    case independent read-only items fan out over several pool connections,
+    up to `concurrency` at a time (capped server-side).
+    """
+    logger.debug("Generic batch query requested: %d items (parallel=%s)", len(items), parallel)
 
     batch: list[SqlBatchItem] = []
     for raw in items:
-        try:
-            params: dict = json.loads(unquote(raw))
-        except (json.JSONDecodeError, ValueError) as e:
-            raise ValidationException(
-                message=AppMessages.INVALID_INPUT,
-                extensions={"detail": AppMessages.INVALID_JSON_VALUE},
-            ) from e
+        params: dict = _decode_value(raw, "genericBatchQuery")
         sql_id: str = params.get("sqlId", "")
         if not getattr(SqlStore, sql_id, None):
             logger.error("Unknown sqlId in genericBatchQuery: %r", sql_id)
@@ -93,12 +202,20 @@ async def resolve_generic_batch_query_helper(db_name: str, items: list[str]) ->
             )
         batch.append(SqlBatchItem(
             sql_id=sql_id,
-            sql_args=params.get("sqlArgs") or {},
+            sql_args=with_keyset_args(sql_id, params.get("sqlArgs") or {}),
             schema=params.get("schema") or "public",
             text_dates=params.get("textDates", True),
+            columnar=bool(params.get("columnar")),
         ))
 
     db_name_arg = db_name if db_name else None
-    results = await exec_sql_batch_query(db_name_arg, batch)
+    if concurrency is not None and concurrency < 1:
+        raise ValidationException(
+            message=AppMessages.INVALID_INPUT,
+            extensions={"detail": "concurrency must be a positive integer"},
+        )
+    results = await exec_sql_batch_query(
+        db_name_arg, batch, parallel=parallel, concurrency=concurrency
+    )
     logger.debug("Generic batch query completed: %d items", len(items))
     return results
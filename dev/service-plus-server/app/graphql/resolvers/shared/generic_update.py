@@ -2,9 +2,7 @@
 an arbitrary insert/update or pre-defined SqlStore script. Split from
 mutation_helper.py — see plans/plan.md Step 4."""
 
-import json
 from typing import Any
-from urllib.parse import unquote
 
 from app.db.connection.psycopg_driver import exec_sql, exec_sql_object
 from app.db.sql.sql_base import SqlStore
@@ -14,34 +12,15 @@ from app.logger import logger
 
 
 async def resolve_generic_update_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> int | None:
     """
     Decode, validate and execute a generic update SQL object.
     """
-    if not value:
-        raise ValidationException(
-            message=AppMessages.REQUIRED_FIELD_MISSING,
-            extensions={"field": "value"},
-        )
-
     db_name_arg: str = db_name or ""
     logger.debug("Updating database entry in: %s", db_name_arg or "client_db")
 
-    value_string = unquote(value)
-    try:
-        sql_object: dict = json.loads(value_string)
-    except json.JSONDecodeError as e:
-        logger.error("Invalid JSON in value parameter: %s", e)
-        raise ValidationException(
-            message=AppMessages.INVALID_INPUT,
-            extensions={"detail": AppMessages.INVALID_JSON_VALUE},
-        ) from e
-    if not isinstance(sql_object, dict):
-        raise ValidationException(
-            message=AppMessages.INVALID_INPUT,
-            extensions={"detail": AppMessages.INVALID_JSON_OBJECT},
-        )
+    sql_object: dict = _decode_value(value, "genericUpdate")
 
     record_id = await exec_sql_object(db_name_arg, schema or "public", sql_object)
 
@@ -50,7 +29,7 @@ async def resolve_generic_update_helper(
 
 
 async def resolve_generic_update_script_helper(
-    db_name: str, schema: str = "public", value: str = ""
+    db_name: str, schema: str = "public", value: str | dict = ""
 ) -> Any:
     """
     Execute a pre-defined SQL script from SqlStore with optional named parameters.
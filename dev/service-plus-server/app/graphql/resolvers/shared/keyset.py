@@ -0,0 +1,116 @@
+"""Keyset (cursor) pagination for the *_PAGED SqlStore queries.
+
+A keyset-capable query filters on its own sort key — `(job_date, id) <
+(after_job_date, after_id)` and the like — so the next page is an index range
+scan from the last row seen instead of OFFSET re-reading and discarding every
+earlier row. The `after_*` args are NULL on the first page, which also keeps
+plain OFFSET paging (jump-to-page) working unchanged.
+
+Clients never build the after_* args themselves: genericQuery hands back an
+opaque `next_cursor` (the sort-key tuple of the last row) to send back as-is.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from app.core.exceptions import AppMessages, ValidationException
+
+# sql_id -> result columns forming the query's ORDER BY key, in order. Each
+# column <col> is bound back into the query as the %(after_<col>)s arg.
+KEYSET_PAGED: dict[str, tuple[str, ...]] = {
+    "GET_COMPLETED_JOBS_PAGED":                ("job_date", "id"),
+    "GET_DELIVERABLE_JOBS_PAGED":              ("updated_at", "id"),
+    "GET_DELIVERED_JOBS_PAGED":                ("delivery_date", "id"),
+    "GET_JOBS_PAGED":                          ("job_date", "id"),
+    "GET_JOB_BATCHES_PAGED":                   ("batch_no",),
+    "GET_JOB_INVOICES_FOR_POSTING_PAGED":      ("invoice_date", "id"),
+    "GET_JOB_INVOICES_POST_UNPOST_PAGED":      ("invoice_date", "id"),
+    "GET_JOB_PAYMENTS_FOR_POSTING_PAGED":      ("payment_date", "id"),
+    "GET_JOB_PAYMENTS_PAGED":                  ("payment_date", "id"),
+    "GET_JOB_PAYMENTS_POST_UNPOST_PAGED":      ("payment_date", "id"),
+    "GET_JOB_PIPELINE_ALL_PAGED":              ("job_date", "id"),
+    "GET_JOB_PIPELINE_PAGED":                  ("job_date", "id"),
+    "GET_JOB_SEARCH_PAGED":                    ("sort_date", "id"),
+    "GET_OPENING_JOBS_PAGED":                  ("job_date", "id"),
+    "GET_PARTS_BY_BRAND_PAGED":                ("part_code",),
+    "GET_PARTS_PAGED":                         ("brand_id", "part_code"),
+    "GET_PURCHASE_INVOICES_FOR_POSTING_PAGED": ("invoice_date", "id"),
+    "GET_PURCHASE_INVOICES_PAGED":             ("invoice_date", "id"),
+    "GET_PURCHASE_INVOICES_POST_UNPOST_PAGED": ("invoice_date", "id"),
+    "GET_SALES_INVOICES_FOR_POSTING_PAGED":    ("invoice_date", "id"),
+    "GET_SALES_INVOICES_PAGED":                ("invoice_date", "id"),
+    "GET_SALES_INVOICES_POST_UNPOST_PAGED":    ("invoice_date", "id"),
+    "GET_STOCK_ADJUSTMENTS_PAGED":             ("adjustment_date", "id"),
+    "GET_STOCK_BRANCH_TRANSFERS_PAGED":        ("transfer_date", "id"),
+    "GET_STOCK_LOANS_PAGED":                   ("loan_date", "id"),
+    "GET_STOCK_OVERVIEW_PAGED":                ("part_name", "part_id"),
+    "GET_WHATSAPP_ELIGIBLE_JOBS_PAGED":        ("job_date", "id"),
+}
+
+# Paged queries left on OFFSET paging:
+# - GET_JOB_BATCHES_WITH_JOBS_PAGED: LIMIT counts batches but the rows are jobs,
+#   so a page's row count cannot tell whether another page follows.
+# - PART_FINDER_PAGED: its COUNT(*) OVER () total would shrink to the rows past
+#   the cursor.
+# - GET_OPENING_STOCK_PAGED: one opening-stock entry per branch, so never more
+#   than one page.
+
+
+def _invalid_cursor() -> ValidationException:
+    return ValidationException(
+        message=AppMessages.INVALID_INPUT,
+        extensions={"detail": "Invalid pagination cursor"},
+    )
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Opaque cursor for a sort-key tuple."""
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sql_id: str, cursor: str) -> list[Any]:
+    """Sort-key tuple from a cursor issued for `sql_id`; raises ValidationException."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise _invalid_cursor() from e
+    if not isinstance(values, list) or len(values) != len(KEYSET_PAGED[sql_id]):
+        raise _invalid_cursor()
+    return values
+
+
+def with_keyset_args(sql_id: str, sql_args: dict, cursor: str | None = None) -> dict:
+    """
+    `sql_args` plus the after_* args of a keyset-capable query: taken from
+    `cursor` when given (and the offset reset to 0), else defaulted to NULL so
+    offset-mode callers need not know about them. Other sql_ids pass through.
+    """
+    key = KEYSET_PAGED.get(sql_id)
+    if key is None:
+        return sql_args
+    args = dict(sql_args)
+    if cursor:
+        args.update({f"after_{col}": value for col, value in zip(key, decode_cursor(sql_id, cursor))})
+        args["offset"] = 0
+    else:
+        for col in key:
+            args.setdefault(f"after_{col}", None)
+    return args
+
+
+def next_cursor(sql_id: str, result: list | dict, limit: int | None) -> str | None:
+    """
+    Cursor for the page after `result`, or None when it was the last page.
+    `result` is either a list of dict rows or the columnar {"columns", "rows"} shape.
+    """
+    if isinstance(result, dict):
+        columns, rows = result["columns"], result["rows"]
+        if not rows or (limit is not None and len(rows) < limit):
+            return None
+        return encode_cursor([rows[-1][columns.index(col)] for col in KEYSET_PAGED[sql_id]])
+    if not result or (limit is not None and len(result) < limit):
+        return None
+    return encode_cursor([result[-1][col] for col in KEYSET_PAGED[sql_id]])
@@ -0,0 +1,60 @@
+"""Row totals for the *_PAGED SqlStore queries, fetched with the page.
+
+Every *_PAGED query has a *_COUNT twin that repeats its joins and filter.
+Rather than the client sending both for each page view, genericQuery runs
+the twin in the same pipeline flight as the page and caches the total per
+(db, schema, count sql_id, filter args) for a short TTL. Paging through the
+same filter, or walking it by keyset cursor, then costs one query per page
+instead of two. The TTL bounds how stale a total can get after writes.
+"""
+
+import json
+from collections import OrderedDict
+from time import monotonic
+
+from app.db.sql.sql_base import SqlStore
+
+_TOTAL_TTL: float = 30.0      # seconds a cached total is trusted
+_TOTAL_MAX_ENTRIES: int = 2048
+
+# Paging args: they move the window, not the filter, so they never key a total.
+_PAGING_ARGS: frozenset[str] = frozenset({"limit", "offset"})
+
+_totals: OrderedDict[tuple, tuple[float, int]] = OrderedDict()
+
+
+def count_twin(sql_id: str) -> str | None:
+    """The *_COUNT sql_id paired with a *_PAGED sql_id, if SqlStore has one."""
+    if not sql_id.endswith("_PAGED"):
+        return None
+    twin = sql_id.removesuffix("_PAGED") + "_COUNT"
+    return twin if getattr(SqlStore, twin, None) else None
+
+
+def total_key(db_name: str | None, schema: str, count_sql_id: str, sql_args: dict) -> tuple:
+    """Cache key for a total: the filter args only, minus paging and keyset args."""
+    filters = {
+        k: v for k, v in sql_args.items()
+        if k not in _PAGING_ARGS and not k.startswith("after_")
+    }
+    return (db_name, schema, count_sql_id, json.dumps(filters, sort_keys=True, default=str))
+
+
+def cached_total(key: tuple) -> int | None:
+    """The cached total for `key`, or None when absent or expired."""
+    hit = _totals.get(key)
+    if hit is None:
+        return None
+    stored_at, total = hit
+    if monotonic() - stored_at > _TOTAL_TTL:
+        del _totals[key]
+        return None
+    _totals.move_to_end(key)
+    return total
+
+
+def remember_total(key: tuple, total: int) -> None:
+    _totals[key] = (monotonic(), total)
+    _totals.move_to_end(key)
+    while len(_totals) > _TOTAL_MAX_ENTRIES:
+        _totals.popitem(last=False)
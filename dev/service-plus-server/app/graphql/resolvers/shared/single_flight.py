@@ -0,0 +1,75 @@
+"""Single-flight coalescing of identical concurrent genericQuery reads.
+
+When a branch opens the morning pipeline, dozens of clients send the same
+genericQuery within milliseconds. The first caller for a key starts the read
+as its own task; every identical call arriving while it is still in flight
+awaits that task instead of borrowing another pool connection, and all of
+them receive the same result (or the same exception). Nothing is kept once
+the flight lands.
+
+A read that joins a flight gets a result that may have been fetched before
+the read arrived. That must never hide a write the caller already saw commit,
+so the key includes pool_manager.commit_version of the database. A commit
+through this process changes the key, and every read arriving after it starts
+a fresh flight instead of joining one that may predate it. Reads already
+waiting keep their flight, as they arrived before the commit. Commits by
+other worker processes are not counted; a joined read there can lag them by
+up to one query's run time.
+
+The flight is shielded, so a client that disconnects cancels only its own
+wait, never the read the others are sharing.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable
+
+from app.db.connection.pool_manager import pool_manager
+
+_flights: dict[tuple, asyncio.Task] = {}
+_counters: dict[str, list[int]] = {}   # sql_id -> [executed, joined]
+
+
+def _land(key: tuple, task: asyncio.Task) -> None:
+    if _flights.get(key) is task:
+        del _flights[key]
+    if not task.cancelled():
+        task.exception()   # retrieved, even if every waiter has gone away
+
+
+def flight_key(db_name: str | None, schema: str, sql_id: str, sql_args: dict, *options: Any) -> tuple:
+    """Key of a read: everything that can change its result, including the last commit."""
+    return (
+        db_name or None, schema, sql_id, json.dumps(sql_args, sort_keys=True, default=str),
+        *options, pool_manager.commit_version(db_name),
+    )
+
+
+async def coalesce(key: tuple, run: Callable[[], Awaitable[Any]]) -> Any:
+    """Await the in-flight read for `key`, starting `run()` if there is none."""
+    counter = _counters.setdefault(key[2], [0, 0])
+    task = _flights.get(key)
+    if task is None:
+        counter[0] += 1
+        task = asyncio.ensure_future(run())
+        _flights[key] = task
+        task.add_done_callback(lambda t: _land(key, t))
+    else:
+        counter[1] += 1
+    return await asyncio.shield(task)
+
+
+def get_stats() -> dict:
+    """Executed vs joined reads, overall and per sql_id, with the coalescing ratio."""
+    executed = sum(c[0] for c in _counters.values())
+    joined = sum(c[1] for c in _counters.values())
+    return {
+        "executed":   executed,
+        "joined":     joined,
+        "in_flight":  len(_flights),
+        "coalescing_ratio": round(joined / (executed + joined), 4) if executed + joined else None,
+        "by_sql_id": {
+            sql_id: {"executed": c[0], "joined": c[1]}
+            for sql_id, c in sorted(_counters.items())
+        },
+    }
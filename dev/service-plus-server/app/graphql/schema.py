@@ -1,6 +1,7 @@
 """
 GraphQL schema loader and configuration.
 """
+from http import HTTPStatus
 from pathlib import Path
 from typing import Any
 from ariadne import make_executable_schema, load_schema_from_path
@@ -8,8 +9,10 @@ from ariadne.asgi import GraphQL
 from ariadne.asgi.handlers import GraphQLTransportWSHandler
 from app.logger import logger
 from app.core.exceptions import format_graphql_error, AuthorizationException
+from app.core.json_response import FastJSONResponse
 from app.config import settings
 from app.core.security import decode_token
+from app.graphql.document_cache import PersistedQueryHTTPHandler, parse_query, validate_query
 from app.graphql.resolvers.query import query
 from app.graphql.resolvers.mutation import mutation
 from app.graphql.resolvers.subscription import subscription
@@ -62,6 +65,34 @@ async def get_graphql_context(request: Any, _data: Any) -> dict:
     return context
 
 
+class GraphQLHTTPHandler(PersistedQueryHTTPHandler):
+    """HTTP handler for the GraphQL app: APQ plus FastJSONResponse bodies."""
+
+    async def create_json_response(self, request: Any, result: dict, success: bool) -> FastJSONResponse:
+        # Same status rule as Ariadne's JSONResponse path.
+        if success or result.get("data") is not None:
+            return FastJSONResponse(result, status_code=HTTPStatus.OK)
+        return FastJSONResponse(result, status_code=HTTPStatus.BAD_REQUEST)
+
+
+# Native-JSON argument → the legacy argument its resolvers read.
+_JSON_ARGUMENTS: dict[str, str] = {"valueJson": "value", "itemsJson": "items"}
+
+
+def fold_json_arguments(resolver: Any, obj: Any, info: Any, **args: Any) -> Any:
+    """
+    Middleware passing `valueJson` / `itemsJson` to resolvers as `value` /
+    `items`, so every resolver takes either form under one name. The
+    native argument wins when a document sends both.
+    """
+    for native, legacy in _JSON_ARGUMENTS.items():
+        if native in args:
+            json_value = args.pop(native)
+            if json_value is not None:
+                args[legacy] = json_value
+    return resolver(obj, info, **args)
+
+
 # Get the path to the schema file
 SCHEMA_PATH = Path(__file__).parent / "schema.graphql"
 
@@ -110,10 +141,15 @@ def create_graphql_app() -> GraphQL:
         # Use the graphql-transport-ws handler to match the client's `graphql-ws`
         # library (Ariadne defaults to the legacy subscriptions-transport-ws protocol,
         # which is incompatible and silently delivers no subscription events).
+        # Parsed and validated documents are cached by query hash, which also
+        # lets clients send automatic persisted queries (see document_cache).
         graphql_app = GraphQL(
             schema,
             context_value=get_graphql_context,
             debug=settings.debug,
+            query_parser=parse_query,
+            query_validator=validate_query,
+            http_handler=GraphQLHTTPHandler(middleware=[fold_json_arguments]),
             websocket_handler=GraphQLTransportWSHandler(),
             error_formatter=lambda error, debug: format_graphql_error(error, debug)
         )
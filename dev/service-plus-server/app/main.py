@@ -18,6 +18,7 @@ from app.routers.base_router import router as base_router
 from app.routers.media.image_router import router as image_router
 from app.routers.notifications.whatsapp_router import router as whatsapp_router
 from app.routers.public.website_router import router as website_router
+from app.routers.reports.export_router import router as report_export_router
 from app.scheduler import start_scheduler, stop_scheduler
 
 
@@ -80,6 +81,7 @@ app.include_router(base_router)
 app.include_router(image_router)
 app.include_router(whatsapp_router)
 app.include_router(website_router)
+app.include_router(report_export_router)
 
 # Mount GraphQL application
 graphql_app = create_graphql_app()
@@ -24,7 +24,6 @@ import html
 from dataclasses import dataclass
 from typing import Callable
 
-import psycopg.sql as pgsql
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from psycopg.rows import dict_row
 from pydantic import BaseModel, Field
@@ -33,7 +32,11 @@ from app.config import settings
 from app.core.dependencies import require_website_key
 from app.core.email import send_email
 from app.core.rate_limit import rate_limit
-from app.db.connection.psycopg_driver import exec_sql_query, get_service_db_connection
+from app.db.connection.psycopg_driver import (
+    exec_sql_query,
+    get_service_db_connection,
+    set_search_path,
+)
 from app.db.sql.sql_base import SqlStore
 from app.db.sql.sql_public import PublicSql
 from app.logger import logger
@@ -463,9 +466,7 @@ async def _insert_part_order(
     manual cursor use on one connection, same primitives exec_sql itself uses)."""
     async with get_service_db_connection(db_name) as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(schema))
-            )
+            await set_search_path(cur, schema)
             await cur.execute(
                 PublicSql.INSERT_SPARE_PART_WEB_ORDER,
                 {
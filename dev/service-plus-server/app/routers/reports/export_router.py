@@ -0,0 +1,104 @@
+"""
+Streaming export of large report result sets.
+
+Endpoints:
+    GET /api/reports/export/{sql_id} - Stream a whitelisted report as NDJSON or CSV
+
+Rows are pulled from a server-side cursor in chunks (exec_sql_query_stream)
+and written to the response as they arrive, so memory stays bounded by one
+chunk however many rows a financial-year ledger holds. Only the report
+sql_ids in _EXPORTABLE_SQL_IDS can be exported, and always against the
+caller's own service DB (the db_name claim of their token).
+"""
+import csv
+import io
+import json
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Literal
+from urllib.parse import unquote
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.core.dependencies import get_current_user
+from app.db.connection.psycopg_driver import exec_sql_query_stream
+from app.db.sql.sql_base import SqlStore
+from app.logger import logger
+
+router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+# Row-level report queries that may be exported; aggregates stay on GraphQL.
+_EXPORTABLE_SQL_IDS: frozenset[str] = frozenset({
+    "GET_CASH_REGISTER_RANGE",
+    "GET_DELIVERED_JOBS_DETAILED_RANGE",
+    "GET_JOBS_DELIVERED_OK_DETAIL",
+    "GET_JOBS_RECEIVED_DETAIL",
+    "GET_JOBS_REPAIRED_OK_DETAIL",
+    "GET_JOB_TRANSACTIONS_DETAIL",
+    "GET_JOB_TRANSACTION_LEDGER_RANGE",
+    "GET_PARTS_CONSUMPTION_RANGE",
+    "GET_PARTS_LEDGER_FY",
+    "GET_SALES_REPORT_RANGE",
+    "GET_STOCK_LEDGER_RANGE",
+    "GET_WARRANTY_JOBS_LIST_RANGE",
+})
+
+_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _ndjson_lines(chunks: AsyncIterator[list[Any]]) -> AsyncIterator[str]:
+    async with aclosing(chunks):
+        async for rows in chunks:
+            yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+
+
+async def _csv_lines(chunks: AsyncIterator[list[Any]]) -> AsyncIterator[str]:
+    async with aclosing(chunks):
+        buffer = io.StringIO()
+        writer: csv.DictWriter | None = None
+        async for rows in chunks:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+                writer.writeheader()
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+
+@router.get("/export/{sql_id}")
+async def export_report(
+    sql_id: str,
+    schema: str = Query(..., min_length=1),
+    args: str = Query(default="{}", description="URL-encoded JSON sqlArgs"),
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    current_user: dict[str, Any] = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream a whitelisted report query for the caller's service DB."""
+    db_name: str | None = current_user.get("db_name")
+    if not db_name:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Report export requires a business-unit user",
+        )
+    sql = getattr(SqlStore, sql_id, None) if sql_id in _EXPORTABLE_SQL_IDS else None
+    if not sql:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown report: {sql_id}")
+    try:
+        sql_args = json.loads(unquote(args))
+    except (json.JSONDecodeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail="args must be a JSON object") from e
+    if not isinstance(sql_args, dict):
+        raise HTTPException(status_code=422, detail="args must be a JSON object")
+
+    logger.info("Report export requested: sqlId=%r format=%s db=%r", sql_id, fmt, db_name)
+    chunks = exec_sql_query_stream(db_name, schema, sql, sql_args, text_dates=True)
+    lines = _ndjson_lines(chunks) if fmt == "ndjson" else _csv_lines(chunks)
+    return StreamingResponse(
+        lines,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{sql_id.lower()}.{fmt}"'},
+    )
@@ -1,13 +1,22 @@
 """
-Monthly stock snapshot scheduler.
-
-Runs on the 1st of every month at 00:05 and generates stock snapshots
-for all active client databases and their BU schemas.
+Background maintenance scheduler.
+
+- Daily stock snapshot: runs every day at 00:05 and rolls the previous day's
+  stock movement (plus any back-dated changes) into stock_snapshot for all
+  active client databases and their BU schemas.
+- Nightly KPI rollup: runs every day at 00:20 and rolls the day just closed
+  (plus any back-dated changes) into daily_kpi_rollup of every BU schema.
+- Nightly counter reconciliation: runs every day at 03:15 and repairs any
+  drift in the trigger-maintained job_status_counter of every BU schema.
+- Monthly partition maintenance: runs on the 1st of every month at 00:35 and
+  creates the yearly job_transaction / stock_transaction partitions of every
+  BU schema a year ahead.
 """
-from datetime import datetime
+from collections.abc import AsyncIterator
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from app.db.connection import result_cache
 from app.db.connection.psycopg_driver import exec_sql
 from app.db.sql.sql_base import SqlStore
 from app.core.exceptions import DatabaseException
@@ -16,71 +25,196 @@ from app.logger import logger
 _scheduler: dict[str, AsyncIOScheduler | None] = {"instance": None}
 
 
-async def generate_snapshot_for_client(db_name: str, schema: str, year: int, month: int) -> int:
-    """Run SQL_GENERATE_STOCK_SNAPSHOT for one client schema. Returns row count."""
+async def _active_bu_schemas(job_name: str) -> AsyncIterator[tuple[str, str]]:
+    """Yield (db_name, schema) for every BU schema of every active client."""
+    try:
+        client_rows = await exec_sql(db_name=None, schema="public", sql=SqlStore.GET_ACTIVE_CLIENTS)
+    except DatabaseException as exc:
+        logger.error("Failed to fetch active clients for %s: %s", job_name, exc)
+        return
+
+    for client in client_rows:
+        db_name: str = client["db_name"]
+        try:
+            schema_rows = await exec_sql(db_name=db_name,
+                schema="security", sql=SqlStore.GET_ACTIVE_SCHEMAS)
+        except DatabaseException as exc:
+            logger.error("Failed to fetch schemas for %s: %s", db_name, exc)
+            continue
+
+        for schema_row in schema_rows:
+            yield db_name, schema_row["code"]
+            # Jobs write through SQL functions the statement parser of
+            # result_cache cannot see into, so drop the whole scope.
+            result_cache.invalidate_scope(db_name, schema_row["code"])
+
+
+async def generate_snapshot_for_client(db_name: str, schema: str) -> int:
+    """Run SQL_REFRESH_STOCK_SNAPSHOT for one client schema. Returns rows written."""
     try:
         rows = await exec_sql(
             db_name=db_name,
             schema=schema,
-            sql=SqlStore.SQL_GENERATE_STOCK_SNAPSHOT,
-            sql_args={"year": year, "month": month},
+            sql=SqlStore.SQL_REFRESH_STOCK_SNAPSHOT,
         )
-        count = len(rows) if isinstance(rows, list) else (rows or 0)
-        logger.info("Snapshot %d/%d → %s/%s: %d rows", year, month, db_name, schema, count)
+        count = rows[0]["rows_written"] if rows else 0
+        logger.info("Snapshot → %s/%s: %d rows", db_name, schema, count)
         return count
     except DatabaseException as exc:
         logger.error("Snapshot failed for %s/%s: %s", db_name, schema, exc)
         return 0
 
 
-async def run_monthly_snapshot() -> None:
+async def run_daily_snapshot() -> None:
     """
-    Job executed on the 1st of every month.
-    Snapshots the previous month for all active clients and their BU schemas.
+    Job executed every night, just after midnight.
+    Rolls the days since the last run into stock_snapshot for all active
+    clients and their BU schemas; a missed night is caught up on the next.
     """
-    now = datetime.now()
-    month = now.month - 1 if now.month > 1 else 12
-    year  = now.year if now.month > 1 else now.year - 1
+    logger.info("Daily snapshot job started")
+
+    total = 0
+    async for db_name, schema in _active_bu_schemas("snapshot"):
+        total += await generate_snapshot_for_client(db_name, schema)
+
+    logger.info("Daily snapshot job completed. Total rows: %d", total)
 
-    logger.info("Monthly snapshot job started for %d/%d", year, month)
 
+async def refresh_kpi_rollup_for_client(db_name: str, schema: str) -> int:
+    """Run REFRESH_DAILY_KPI_ROLLUP for one client schema. Returns days rebuilt."""
     try:
-        client_rows = await exec_sql(db_name=None, schema="public", sql=SqlStore.GET_ACTIVE_CLIENTS)
+        rows = await exec_sql(
+            db_name=db_name,
+            schema=schema,
+            sql=SqlStore.REFRESH_DAILY_KPI_ROLLUP,
+        )
+        days = rows[0]["days_refreshed"] if rows else 0
+        logger.info("KPI rollup → %s/%s: %d days refreshed", db_name, schema, days)
+        return days
     except DatabaseException as exc:
-        logger.error("Failed to fetch active clients for snapshot: %s", exc)
-        return
+        logger.error("KPI rollup failed for %s/%s: %s", db_name, schema, exc)
+        return 0
+
+
+async def run_nightly_kpi_rollup() -> None:
+    """
+    Job executed every night, just after midnight.
+    Refreshes daily_kpi_rollup for all active clients and their BU schemas.
+    """
+    logger.info("Nightly KPI rollup job started")
 
     total = 0
-    for client in client_rows:
-        db_name: str = client["db_name"]
-        try:
-            schema_rows = await exec_sql(db_name=db_name,
-                schema="security", sql=SqlStore.GET_ACTIVE_SCHEMAS)
-        except DatabaseException as exc:
-            logger.error("Failed to fetch schemas for %s: %s", db_name, exc)
-            continue
+    async for db_name, schema in _active_bu_schemas("KPI rollup"):
+        total += await refresh_kpi_rollup_for_client(db_name, schema)
 
-        for schema_row in schema_rows:
-            schema: str = schema_row["code"]
-            total += await generate_snapshot_for_client(db_name, schema, year, month)
+    logger.info("Nightly KPI rollup job completed. Days refreshed: %d", total)
 
-    logger.info("Monthly snapshot job completed. Total rows: %d", total)
+
+async def reconcile_counters_for_client(db_name: str, schema: str) -> int:
+    """Run RECONCILE_JOB_STATUS_COUNTER for one client schema. Returns drifted row count."""
+    try:
+        rows = await exec_sql(
+            db_name=db_name,
+            schema=schema,
+            sql=SqlStore.RECONCILE_JOB_STATUS_COUNTER,
+        )
+        drifted = rows[0]["drifted"] if rows else 0
+        if drifted:
+            logger.warning("Counter reconcile → %s/%s: %d drifted rows repaired", db_name, schema, drifted)
+        return drifted
+    except DatabaseException as exc:
+        logger.error("Counter reconcile failed for %s/%s: %s", db_name, schema, exc)
+        return 0
+
+
+async def run_nightly_counter_reconcile() -> None:
+    """
+    Job executed every night.
+    Recounts job_status_counter from job for all active clients and their BU schemas.
+    """
+    logger.info("Nightly counter reconcile job started")
+
+    total = 0
+    async for db_name, schema in _active_bu_schemas("counter reconcile"):
+        total += await reconcile_counters_for_client(db_name, schema)
+
+    logger.info("Nightly counter reconcile job completed. Drifted rows: %d", total)
+
+
+async def ensure_partitions_for_client(db_name: str, schema: str) -> int:
+    """Run ENSURE_TRANSACTION_PARTITIONS for one client schema. Returns partitions created."""
+    try:
+        rows = await exec_sql(
+            db_name=db_name,
+            schema=schema,
+            sql=SqlStore.ENSURE_TRANSACTION_PARTITIONS,
+        )
+        created = rows[0]["partitions_created"] if rows else 0
+        if created:
+            logger.info("Partitions → %s/%s: %d created", db_name, schema, created)
+        return created
+    except DatabaseException as exc:
+        logger.error("Partition maintenance failed for %s/%s: %s", db_name, schema, exc)
+        return 0
+
+
+async def run_monthly_partition_maintenance() -> None:
+    """
+    Job executed on the first of every month.
+    Creates the next year's transaction partitions for all active clients and
+    their BU schemas well before the first row for that year arrives.
+    """
+    logger.info("Monthly partition maintenance job started")
+
+    total = 0
+    async for db_name, schema in _active_bu_schemas("partition maintenance"):
+        total += await ensure_partitions_for_client(db_name, schema)
+
+    logger.info("Monthly partition maintenance job completed. Partitions created: %d", total)
 
 
 def start_scheduler() -> None:
-    """Initialize and start the background scheduler for monthly tasks."""
+    """Initialize and start the background scheduler for the nightly tasks."""
     _scheduler["instance"] = AsyncIOScheduler()
     _scheduler["instance"].add_job(
-        run_monthly_snapshot,
+        run_daily_snapshot,
         trigger="cron",
-        day=1,
         hour=0,
         minute=5,
-        id="monthly_stock_snapshot",
+        id="daily_stock_snapshot",
+        replace_existing=True,
+    )
+    _scheduler["instance"].add_job(
+        run_nightly_kpi_rollup,
+        trigger="cron",
+        hour=0,
+        minute=20,
+        id="nightly_kpi_rollup",
+        replace_existing=True,
+    )
+    _scheduler["instance"].add_job(
+        run_nightly_counter_reconcile,
+        trigger="cron",
+        hour=3,
+        minute=15,
+        id="nightly_counter_reconcile",
+        replace_existing=True,
+    )
+    _scheduler["instance"].add_job(
+        run_monthly_partition_maintenance,
+        trigger="cron",
+        day=1,
+        hour=0,
+        minute=35,
+        id="monthly_partition_maintenance",
         replace_existing=True,
     )
     _scheduler["instance"].start()
-    logger.info("Stock snapshot scheduler started (runs on 1st of each month at 00:05)")
+    logger.info(
+        "Maintenance scheduler started (stock snapshot daily 00:05, "
+        "KPI rollup daily 00:20, counter reconcile daily 03:15, "
+        "partition maintenance monthly on the 1st 00:35)"
+    )
 
 
 def stop_scheduler() -> None:
@@ -88,4 +222,4 @@ def stop_scheduler() -> None:
     instance = _scheduler["instance"]
     if instance and instance.running:
         instance.shutdown(wait=False)
-        logger.info("Stock snapshot scheduler stopped")
+        logger.info("Maintenance scheduler stopped")
@@ -0,0 +1,46 @@
+"""
+Shared fixtures for tests that need a real database.
+
+`scratch_schema` creates a throwaway schema in the client DB configured in
+app/config.py's .env, opens the client pools for the driver helpers, and
+drops the schema again afterwards. Tests using it are skipped when the DB is
+unreachable, so nothing here touches existing client data.
+
+The connection comes from CLIENT_DB_HOST, CLIENT_DB_PORT, CLIENT_DB_NAME,
+CLIENT_DB_USER and CLIENT_DB_PASSWORD. That user needs CREATE on the database.
+See the Tests section of .env.example for the other settings every test run needs.
+"""
+import uuid
+
+import psycopg
+import psycopg.sql as pgsql
+import pytest
+
+from app.db.connection.pool_manager import _client_conninfo, pool_manager
+
+
+@pytest.fixture
+async def scratch_schema():
+    try:
+        admin = await psycopg.AsyncConnection.connect(_client_conninfo(), autocommit=True)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"dev DB unreachable: {e}")
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    async with admin:
+        await admin.execute(pgsql.SQL("CREATE SCHEMA {}").format(pgsql.Identifier(schema)))
+        await pool_manager.initialize()
+        try:
+            yield schema
+        finally:
+            await pool_manager.close_all()
+            await admin.execute(
+                pgsql.SQL("DROP SCHEMA {} CASCADE").format(pgsql.Identifier(schema))
+            )
+
+
+@pytest.fixture
+async def scratch_db(scratch_schema):
+    """An autocommit connection whose search_path is the scratch schema, for setup and checks."""
+    async with await psycopg.AsyncConnection.connect(_client_conninfo(), autocommit=True) as conn:
+        await conn.execute(pgsql.SQL("SET search_path TO {}").format(pgsql.Identifier(scratch_schema)))
+        yield conn
@@ -0,0 +1,399 @@
+"""
+BU schema triggers: the denormalised columns and summary tables that
+BU_SCHEMA_DDL (app/db/sql/sql_bu_admin_ddl.py) keeps in step with their
+source rows — job.search_text, job.file_count / transaction_count,
+job_status_counter, daily_kpi_dirty / daily_kpi_rollup, stock_balance and
+stock_snapshot_dirty.
+
+Builds the full BU schema in a throwaway schema of the dev DB (see
+tests/conftest.py), drives it with multi-row statements and checks every
+summary against a recount of the rows it summarises. The job search index
+needs pg_trgm in the security schema, as provisioning installs it; the tests
+are skipped when the DB is unreachable or pg_trgm is not available.
+"""
+import pytest
+
+from app.db.seeds.seed_bu_data import SeedBuData
+from app.db.sql.sql_base import SqlStore
+
+_MASTERS = """
+    INSERT INTO branch (code, name, address_line1, state_id, pincode)
+    VALUES ('BR2', 'Branch Two', '4 Side St', 29, '700002');
+    INSERT INTO division (id, name, address_line1, state_id, branch_id, code)
+    SELECT id, 'Service ' || code, address_line1, state_id, id, 'SVC' FROM branch;
+    INSERT INTO customer_contact (customer_type_id, full_name, mobile, address_line1, state_id, city)
+    VALUES (1, 'Asha Rao', '9800000001', '12 Lake Rd', 29, 'Kolkata');
+    INSERT INTO technician (branch_id, code, name) SELECT id, 'T1', 'Ravi' FROM branch WHERE code = 'HO';
+    INSERT INTO product (name) VALUES ('TELEVISION');
+    INSERT INTO brand (code, name) VALUES ('ACME', 'Acme');
+    INSERT INTO product_brand_model (product_id, brand_id, model_name)
+    SELECT p.id, b.id, 'X100' FROM product p CROSS JOIN brand b;
+    INSERT INTO spare_part_master (brand_id, part_code, part_name)
+    SELECT b.id, v.part_code, 'Part ' || v.part_code FROM brand b CROSS JOIN (VALUES ('P1'), ('P2')) v (part_code);
+    INSERT INTO stock_adjustment (adjustment_date, adjustment_reason, branch_id, brand_id)
+    SELECT CURRENT_DATE, 'Count', b.id, br.id FROM branch b CROSS JOIN brand br;
+"""
+
+# Jobs as (job_no, day offset from today, branch code, status code, job type code).
+_INSERT_JOBS = """
+    INSERT INTO job (job_no, job_date, branch_id, division_id, customer_contact_id, technician_id,
+                     job_status_id, job_type_id, job_receive_manner_id, product_brand_model_id)
+    SELECT v.job_no, CURRENT_DATE + v.days, b.id, d.id, cc.id, t.id, js.id, jt.id, 1, pbm.id
+    FROM unnest(%s::text[], %s::int[], %s::text[], %s::text[], %s::text[])
+             WITH ORDINALITY AS v (job_no, days, branch_code, status_code, type_code, ord)
+    JOIN branch b      ON b.code = v.branch_code
+    JOIN division d    ON d.branch_id = b.id
+    JOIN job_status js ON js.code = v.status_code
+    JOIN job_type jt   ON jt.code = v.type_code
+    CROSS JOIN customer_contact cc
+    CROSS JOIN technician t
+    CROSS JOIN product_brand_model pbm
+    ORDER BY v.ord
+"""
+
+# Stock movements as (part code, branch code, day offset from today, dr_cr, qty).
+# A stock_transaction row must come from exactly one source line, so each
+# movement goes in as a line of its branch's 'Count' stock_adjustment.
+_INSERT_STOCK = """
+    WITH v AS (
+        SELECT a.id AS adjustment_id, a.branch_id, p.id AS part_id,
+               CURRENT_DATE + v.days AS day, v.dr_cr, v.qty, v.ord
+        FROM unnest(%s::text[], %s::text[], %s::int[], %s::text[], %s::numeric[])
+                 WITH ORDINALITY AS v (part_code, branch_code, days, dr_cr, qty, ord)
+        JOIN spare_part_master p ON p.part_code = v.part_code
+        JOIN branch b            ON b.code = v.branch_code
+        JOIN stock_adjustment a  ON a.branch_id = b.id AND a.adjustment_reason = 'Count'
+    ),
+    line AS (
+        INSERT INTO stock_adjustment_line (stock_adjustment_id, part_id, dr_cr, qty, remarks)
+        SELECT adjustment_id, part_id, dr_cr, qty, ord::text FROM v
+        RETURNING id, remarks
+    )
+    INSERT INTO stock_transaction (part_id, branch_id, stock_transaction_type_id, transaction_date,
+                                   dr_cr, qty, stock_adjustment_line_id)
+    SELECT v.part_id, v.branch_id, stt.id, v.day, v.dr_cr, v.qty, line.id
+    FROM v
+    JOIN line ON line.remarks = v.ord::text
+    JOIN stock_transaction_type stt
+      ON stt.code = CASE v.dr_cr WHEN 'D' THEN 'ADJUSTMENT_IN' ELSE 'ADJUSTMENT_OUT' END
+"""
+
+# (part, branch) pairs whose stock_balance differs from a recount of stock_transaction.
+_BALANCE_DRIFT = """
+    SELECT part_id, branch_id, b.qty, r.qty
+    FROM stock_balance b
+    FULL JOIN (
+        SELECT part_id, branch_id, sum(CASE dr_cr WHEN 'D' THEN qty ELSE -qty END) AS qty
+        FROM stock_transaction
+        GROUP BY part_id, branch_id
+    ) r USING (part_id, branch_id)
+    WHERE COALESCE(b.qty, 0) <> COALESCE(r.qty, 0)
+"""
+
+# stock_snapshot rows whose closing differs from a recount up to their day.
+_SNAPSHOT_DRIFT = """
+    SELECT ss.snapshot_date, ss.part_id, ss.branch_id, ss.closing, r.closing
+    FROM stock_snapshot ss
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(sum(CASE st.dr_cr WHEN 'D' THEN st.qty ELSE -st.qty END), 0) AS closing
+        FROM stock_transaction st
+        WHERE st.part_id = ss.part_id
+          AND st.branch_id = ss.branch_id
+          AND st.transaction_date <= ss.snapshot_date
+    ) r
+    WHERE ss.closing <> r.closing
+"""
+
+_THIS_YEAR = "date_trunc('year', CURRENT_DATE)::date"
+
+
+async def _ensure_pg_trgm(conn) -> None:
+    """Install pg_trgm in the security schema as provisioning does, or skip."""
+    cur = await conn.execute(
+        "SELECT n.nspname FROM pg_extension e JOIN pg_namespace n ON n.oid = e.extnamespace "
+        "WHERE e.extname = 'pg_trgm'"
+    )
+    installed = await cur.fetchone()
+    if installed is None:
+        cur = await conn.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if await cur.fetchone() is None:
+            pytest.skip("pg_trgm is not available on the dev DB")
+        await conn.execute("CREATE SCHEMA IF NOT EXISTS security")
+        await conn.execute(SqlStore.ENSURE_PG_TRGM)
+    elif installed[0] != "security":
+        pytest.skip(f"pg_trgm is installed in schema {installed[0]}; BU_SCHEMA_DDL needs it in security")
+
+
+@pytest.fixture
+async def bu(scratch_db, scratch_schema):
+    """The scratch schema provisioned as a BU schema, with a few masters to hang rows on."""
+    await _ensure_pg_trgm(scratch_db)
+    await scratch_db.execute(SqlStore.BU_SCHEMA_DDL)
+    await scratch_db.execute(SqlStore.ENSURE_TRANSACTION_PARTITIONS)
+    await scratch_db.execute(SeedBuData.BU_SEED_SQL)
+    await scratch_db.execute(_MASTERS)
+    return scratch_schema
+
+
+async def _fetch(conn, sql: str) -> list[tuple]:
+    cur = await conn.execute(sql)
+    return await cur.fetchall()
+
+
+async def _insert_jobs(conn, *jobs: tuple) -> None:
+    await conn.execute(_INSERT_JOBS, [list(column) for column in zip(*jobs)])
+
+
+async def _insert_stock(conn, *movements: tuple) -> None:
+    await conn.execute(_INSERT_STOCK, [list(column) for column in zip(*movements)])
+
+
+async def _kpi_drift(conn) -> tuple[list[tuple], list[tuple]]:
+    """fn_daily_kpi_range and raw fn_daily_kpi_facts over the last month, zero rows dropped."""
+    rolled = await _fetch(conn, "SELECT * FROM fn_daily_kpi_range(CURRENT_DATE - 30, CURRENT_DATE) ORDER BY 1, 2")
+    raw = await _fetch(conn, "SELECT * FROM fn_daily_kpi_facts(CURRENT_DATE - 30, CURRENT_DATE) ORDER BY 1, 2")
+    return [row for row in rolled if any(row[2:])], raw
+
+
+@pytest.mark.asyncio
+async def test_job_search_text_follows_lookup_edits(bu, scratch_db):
+    await _insert_jobs(scratch_db, ("J-1", 0, "HO", "RECEIVED", "MAKE_READY"))
+
+    # product_brand_model first: its trigger rebuilds the whole document and
+    # would cover for any of the later ones.
+    await scratch_db.execute("""
+        UPDATE product_brand_model SET model_name = 'Z200';
+        UPDATE customer_contact SET full_name = 'Asha Sen', city = 'Howrah';
+        UPDATE technician SET name = 'Kiran';
+        UPDATE brand SET name = 'Zenith';
+        UPDATE product SET name = 'MONITOR';
+    """)
+
+    (search_text,), = await _fetch(scratch_db, "SELECT search_text FROM job")
+    assert search_text.split(chr(31)) == [
+        "J-1", "Asha Sen", "9800000001", "12 Lake Rd", "Howrah", "Kiran", "Zenith", "MONITOR", "Z200",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_job_child_counts_follow_files_and_transactions(bu, scratch_db):
+    await _insert_jobs(
+        scratch_db,
+        ("J-1", 0, "HO", "RECEIVED", "MAKE_READY"),
+        ("J-2", 0, "HO", "RECEIVED", "MAKE_READY"),
+    )
+
+    await scratch_db.execute(f"""
+        INSERT INTO job_image_doc (job_id, url, about)
+        SELECT j.id, j.job_no || '/' || n, 'photo' FROM job j CROSS JOIN generate_series(1, 3) n;
+        INSERT INTO job_transaction (job_id, status_id, performed_by_user_id, transaction_date)
+        SELECT j.id, j.job_status_id, 1, v.day
+        FROM job j CROSS JOIN (VALUES (CURRENT_DATE - 400), (CURRENT_DATE)) v (day);
+
+        UPDATE job_image_doc SET job_id = (SELECT id FROM job WHERE job_no = 'J-2')
+        WHERE url IN ('J-1/2', 'J-1/3');
+        DELETE FROM job_transaction
+        WHERE transaction_date < {_THIS_YEAR} AND job_id = (SELECT id FROM job WHERE job_no = 'J-1');
+        -- out of the default partition into this year's
+        UPDATE job_transaction SET transaction_date = {_THIS_YEAR} WHERE transaction_date < {_THIS_YEAR};
+    """)
+
+    assert await _fetch(scratch_db, """
+        SELECT j.job_no, j.file_count, j.transaction_count,
+               (SELECT count(*) FROM job_image_doc d WHERE d.job_id = j.id),
+               (SELECT count(*) FROM job_transaction t WHERE t.job_id = j.id)
+        FROM job j ORDER BY j.job_no
+    """) == [("J-1", 1, 1, 1, 1), ("J-2", 5, 2, 5, 2)]
+
+
+@pytest.mark.asyncio
+async def test_job_status_counter_matches_a_recount(bu, scratch_db):
+    await _insert_jobs(
+        scratch_db,
+        ("J-1", 0, "HO", "RECEIVED", "MAKE_READY"),
+        ("J-2", 0, "HO", "RECEIVED", "UNDER_WARRANTY"),
+        ("J-3", 0, "HO", "IN_PROGRESS", "MAKE_READY"),
+        ("J-4", 0, "BR2", "RECEIVED", "UNDER_WARRANTY"),
+        ("J-5", 0, "BR2", "IN_PROGRESS", "ESTIMATE"),
+        ("J-6", 0, "BR2", "RECEIVED", "MAKE_READY"),
+    )
+
+    async with scratch_db.transaction():
+        await scratch_db.execute("""
+            UPDATE job SET job_status_id = (SELECT id FROM job_status WHERE code = 'DELIVERED_OK'), is_final = true
+            WHERE job_no IN ('J-1', 'J-2', 'J-4')
+        """)
+        await scratch_db.execute("""
+            UPDATE job SET job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')
+            WHERE job_no IN ('J-3', 'J-5')
+        """)
+        await scratch_db.execute("""
+            UPDATE job SET branch_id = d.branch_id, division_id = d.id
+            FROM division d JOIN branch b ON b.id = d.branch_id AND b.code = 'HO'
+            WHERE job.job_no = 'J-6'
+        """)
+        await scratch_db.execute("UPDATE job SET remarks = 'checked'")
+    await scratch_db.execute("DELETE FROM job WHERE job_no IN ('J-2', 'J-5')")
+
+    assert await _fetch(scratch_db, "SELECT fn_reconcile_job_status_counter()") == [(0,)]
+    assert await _fetch(scratch_db, "SELECT sum(job_count)::int FROM job_status_counter") == [(4,)]
+
+
+@pytest.mark.asyncio
+async def test_daily_kpi_range_matches_the_raw_facts(bu, scratch_db):
+    await _insert_jobs(
+        scratch_db,
+        ("J-1", -10, "HO", "RECEIVED", "MAKE_READY"),
+        ("J-2", -9, "HO", "RECEIVED", "UNDER_WARRANTY"),
+        ("J-3", -9, "BR2", "RECEIVED", "MAKE_READY"),
+        ("J-4", -8, "BR2", "RECEIVED", "ESTIMATE"),
+        ("J-6", -20, "BR2", "RECEIVED", "MAKE_READY"),
+    )
+    await scratch_db.execute("""
+        INSERT INTO job_invoice (job_id, invoice_no, invoice_date, supply_state_code, aggregate, cgst_amount, sgst_amount, amount)
+        SELECT id, 'JI-' || job_no, job_date + 2, '19', 1000, 90, 90, 1180 FROM job WHERE job_no IN ('J-1', 'J-2', 'J-3', 'J-6');
+        INSERT INTO job_additional_charge (job_id, charge_name, cost_price, qty)
+        SELECT id, 'Transport', 150, 2 FROM job;
+    """)
+    await scratch_db.execute("SELECT fn_refresh_daily_kpi_rollup()")
+    assert await _fetch(scratch_db, "SELECT count(*) FROM daily_kpi_dirty") == [(0,)]
+
+    await _insert_jobs(scratch_db, ("J-5", -9, "HO", "RECEIVED", "MAKE_READY"))
+    # J-6's invoice days are touched by nothing but its own invoice edits.
+    await scratch_db.execute("""
+        UPDATE job_invoice SET aggregate = aggregate + 100, amount = amount + 100 WHERE invoice_no IN ('JI-J-1', 'JI-J-6');
+        UPDATE job_invoice SET invoice_date = invoice_date - 1 WHERE invoice_no IN ('JI-J-2', 'JI-J-6');
+        UPDATE job SET job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY') WHERE job_no = 'J-1';
+        UPDATE job SET is_closed = true, delivery_date = CURRENT_DATE - 2 WHERE job_no IN ('J-2', 'J-3');
+        UPDATE job_additional_charge SET cost_price = 40
+        WHERE job_id = (SELECT id FROM job WHERE job_no = 'J-3');
+        DELETE FROM job WHERE job_no = 'J-4';
+    """)
+
+    rolled, raw = await _kpi_drift(scratch_db)
+    assert rolled == raw
+
+    await scratch_db.execute("SELECT fn_refresh_daily_kpi_rollup()")
+    assert await _fetch(scratch_db, "SELECT count(*) FROM daily_kpi_dirty") == [(0,)]
+    rolled, raw = await _kpi_drift(scratch_db)
+    assert rolled == raw
+
+
+@pytest.mark.asyncio
+async def test_stock_balance_matches_a_recount(bu, scratch_db):
+    await _insert_stock(
+        scratch_db,
+        ("P1", "HO", -400, "D", 10),
+        ("P1", "HO", -3, "C", 2),
+        ("P1", "BR2", -400, "D", 7),
+        ("P1", "BR2", 0, "C", 1),
+        ("P2", "HO", -3, "D", 5),
+        ("P2", "BR2", 0, "D", 4),
+        ("P2", "BR2", 0, "C", 3),
+    )
+    assert await _fetch(scratch_db, _BALANCE_DRIFT) == []
+
+    async with scratch_db.transaction():
+        await scratch_db.execute("UPDATE stock_transaction SET qty = qty + 1 WHERE dr_cr = 'D'")
+        # out of the default partition into this year's
+        await scratch_db.execute(
+            f"UPDATE stock_transaction SET transaction_date = {_THIS_YEAR}, qty = qty * 2 "
+            f"WHERE transaction_date < {_THIS_YEAR}"
+        )
+        await scratch_db.execute("""
+            UPDATE stock_transaction SET part_id = (SELECT id FROM spare_part_master WHERE part_code = 'P2')
+            WHERE dr_cr = 'C' AND branch_id = (SELECT id FROM branch WHERE code = 'BR2')
+        """)
+        await scratch_db.execute(
+            "DELETE FROM stock_transaction WHERE dr_cr = 'C' AND branch_id = (SELECT id FROM branch WHERE code = 'HO')"
+        )
+    assert await _fetch(scratch_db, _BALANCE_DRIFT) == []
+
+    await scratch_db.execute("""
+        INSERT INTO stock_adjustment (adjustment_date, adjustment_reason, branch_id, brand_id)
+        SELECT CURRENT_DATE, 'Audit', b.id, br.id FROM branch b CROSS JOIN brand br WHERE b.code = 'HO';
+        INSERT INTO stock_adjustment_line (stock_adjustment_id, part_id, dr_cr, qty)
+        SELECT a.id, p.id, 'D', 6 FROM stock_adjustment a CROSS JOIN spare_part_master p
+        WHERE a.adjustment_reason = 'Audit';
+        INSERT INTO stock_transaction (part_id, branch_id, stock_transaction_type_id, transaction_date,
+                                       dr_cr, qty, stock_adjustment_line_id)
+        SELECT l.part_id, a.branch_id, (SELECT id FROM stock_transaction_type WHERE code = 'ADJUSTMENT_IN'),
+               a.adjustment_date, l.dr_cr, l.qty, l.id
+        FROM stock_adjustment_line l JOIN stock_adjustment a ON a.id = l.stock_adjustment_id
+        WHERE a.adjustment_reason = 'Audit';
+    """)
+    assert await _fetch(scratch_db, _BALANCE_DRIFT) == []
+
+    # Cascades through stock_adjustment_line into stock_transaction
+    await scratch_db.execute("DELETE FROM stock_adjustment WHERE adjustment_reason = 'Audit'")
+    assert await _fetch(scratch_db, "SELECT count(*) FROM stock_transaction") == [(6,)]
+    assert await _fetch(scratch_db, _BALANCE_DRIFT) == []
+
+
+@pytest.mark.asyncio
+async def test_back_dated_stock_moves_queue_their_snapshot_rebuild(bu, scratch_db):
+    await _insert_stock(
+        scratch_db,
+        ("P1", "HO", -10, "D", 20),
+        ("P1", "HO", -5, "C", 4),
+        ("P1", "BR2", -3, "D", 6),
+        ("P2", "HO", -400, "D", 9),
+    )
+    await scratch_db.execute("SELECT fn_refresh_stock_snapshot()")
+    assert await _fetch(scratch_db, "SELECT count(*) FROM stock_snapshot_dirty") == [(0,)]
+
+    await _insert_stock(
+        scratch_db,
+        ("P1", "HO", -7, "C", 3),
+        ("P1", "HO", -8, "D", 1),
+        ("P2", "BR2", 0, "D", 2),
+    )
+    await scratch_db.execute(
+        f"UPDATE stock_transaction SET transaction_date = {_THIS_YEAR} WHERE transaction_date < {_THIS_YEAR}"
+    )
+    await scratch_db.execute("UPDATE stock_transaction SET remarks = 'counted' WHERE transaction_date = CURRENT_DATE - 3")
+
+    assert await _fetch(scratch_db, """
+        SELECT p.part_code, b.code, CURRENT_DATE - d.from_date
+        FROM stock_snapshot_dirty d
+        JOIN spare_part_master p ON p.id = d.part_id
+        JOIN branch b ON b.id = d.branch_id
+        ORDER BY 1, 2
+    """) == [("P1", "HO", 8), ("P2", "HO", 400)]
+
+    await scratch_db.execute("SELECT fn_refresh_stock_snapshot()")
+    assert await _fetch(scratch_db, "SELECT count(*) FROM stock_snapshot_dirty") == [(0,)]
+    assert await _fetch(scratch_db, _SNAPSHOT_DRIFT) == []
+    assert await _fetch(
+        scratch_db, "SELECT count(*) FROM stock_snapshot WHERE snapshot_date IN (CURRENT_DATE - 8, CURRENT_DATE - 7)"
+    ) == [(2,)]
+
+
+@pytest.mark.asyncio
+async def test_a_job_update_dirties_only_the_kpi_days_it_moves(bu, scratch_db):
+    await _insert_jobs(scratch_db, ("J-1", -10, "HO", "RECEIVED", "MAKE_READY"))
+    await scratch_db.execute("""
+        INSERT INTO job_invoice (job_id, invoice_no, invoice_date, supply_state_code, aggregate, amount)
+        SELECT id, 'JI-J-1', CURRENT_DATE - 6, '19', 1000, 1000 FROM job;
+    """)
+    await scratch_db.execute("SELECT fn_refresh_daily_kpi_rollup()")
+
+    async def dirty_days(sql: str) -> list[int]:
+        await scratch_db.execute(sql)
+        days = await _fetch(scratch_db, "SELECT CURRENT_DATE - kpi_date FROM daily_kpi_dirty ORDER BY 1")
+        rolled, raw = await _kpi_drift(scratch_db)
+        assert rolled == raw
+        await scratch_db.execute("SELECT fn_refresh_daily_kpi_rollup()")
+        return [day for day, in days]
+
+    assert await dirty_days("UPDATE job SET is_closed = true, delivery_date = CURRENT_DATE - 4") == [4]
+    assert await dirty_days("UPDATE job SET job_date = job_date, delivery_date = delivery_date, is_closed = is_closed") == []
+    assert await dirty_days("UPDATE job SET delivery_date = CURRENT_DATE - 3") == [3, 4]
+    assert await dirty_days("UPDATE job SET job_date = CURRENT_DATE - 11") == [10, 11]
+    assert await dirty_days(
+        "UPDATE job SET job_type_id = (SELECT id FROM job_type WHERE code = 'UNDER_WARRANTY')"
+    ) == [6, 11]
+    assert await dirty_days("""
+        UPDATE job SET branch_id = d.branch_id, division_id = d.id
+        FROM division d JOIN branch b ON b.id = d.branch_id AND b.code = 'BR2'
+    """) == [3, 6, 11]
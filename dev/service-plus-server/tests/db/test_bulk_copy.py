@@ -0,0 +1,154 @@
+"""
+COPY staging engine: app/db/connection/bulk_copy.py.
+
+Runs copy_records against tables created in a throwaway schema of the dev DB
+(see tests/conftest.py) and is skipped when the DB is unreachable.
+"""
+import psycopg
+import pytest
+
+from app.db.connection.bulk_copy import copy_records
+
+_TABLES = """
+    CREATE TABLE brand (id bigint PRIMARY KEY);
+    INSERT INTO brand VALUES (1), (2);
+    CREATE TABLE part (
+        id         bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        brand_id   bigint NOT NULL REFERENCES brand (id),
+        part_code  varchar(8) NOT NULL,
+        part_name  text NOT NULL,
+        uom        text NOT NULL DEFAULT 'NOS',
+        mrp        numeric(6, 2) CHECK (mrp >= 0),
+        is_active  boolean NOT NULL DEFAULT true,
+        UNIQUE (brand_id, part_code)
+    );
+"""
+
+
+@pytest.fixture
+async def tables(scratch_db, scratch_schema):
+    await scratch_db.execute(_TABLES)
+    return scratch_schema
+
+
+async def _parts(conn) -> list[tuple]:
+    cur = await conn.execute(
+        "SELECT brand_id, part_code, part_name, uom, mrp, is_active FROM part ORDER BY part_code"
+    )
+    return await cur.fetchall()
+
+
+@pytest.mark.asyncio
+async def test_stages_and_inserts_records_from_a_generator(tables, scratch_db):
+    records = (
+        {"brand_id": str(b), "part_code": f"P{i}", "part_name": f"Part {i}", "mrp": "12.5", "extra": 1}
+        for i, b in enumerate((1, 2, 1), start=1)
+    )
+
+    result = await copy_records(None, tables, "part", records, conflict_keys=("brand_id", "part_code"))
+
+    assert result == {"inserted": 3, "updated": 0, "rejected": []}
+    rows = await _parts(scratch_db)
+    assert [r[:4] for r in rows] == [
+        (1, "P1", "Part 1", "NOS"), (2, "P2", "Part 2", "NOS"), (1, "P3", "Part 3", "NOS"),
+    ]
+    assert all(r[5] is True for r in rows)
+
+
+@pytest.mark.asyncio
+async def test_bad_rows_are_rejected_and_the_rest_is_committed(tables, scratch_db):
+    await scratch_db.execute(
+        "INSERT INTO part (brand_id, part_code, part_name) VALUES (1, 'OLD', 'Existing')"
+    )
+    records = [
+        {"brand_id": 1, "part_code": "OK1", "part_name": "Good"},          # 1
+        {"brand_id": 1, "part_code": "BADMRP", "part_name": "x", "mrp": "abc"},   # 2
+        {"brand_id": 1, "part_code": "NONAME"},                               # 3
+        {"brand_id": 1, "part_code": "TOO-LONG-CODE", "part_name": "x"},      # 4
+        {"brand_id": 1, "part_code": "WIDE", "part_name": "x", "mrp": 10000},     # 5
+        {"brand_id": 1, "part_code": "NEG", "part_name": "x", "mrp": -1},         # 6
+        {"brand_id": 9, "part_code": "NOBRAND", "part_name": "x"},            # 7
+        {"brand_id": 1, "part_code": "OK1", "part_name": "Again"},            # 8
+        {"brand_id": 1, "part_code": "OLD", "part_name": "Clash"},            # 9
+        "not a record",                                                       # 10
+        {"brand_id": 2, "part_code": "OK2", "part_name": "Good too"},         # 11
+    ]
+
+    result = await copy_records(
+        None, tables, "part", records,
+        columns=("brand_id", "part_code", "part_name", "mrp"),
+        conflict_keys=("brand_id", "part_code"),
+    )
+
+    assert result["inserted"] == 2
+    assert result["updated"] == 0
+    assert result["rejected"] == [
+        {"row": 2, "reason": "invalid value for mrp"},
+        {"row": 3, "reason": "missing part_name"},
+        {"row": 4, "reason": "part_code longer than 8 characters"},
+        {"row": 5, "reason": "mrp out of range for numeric(6,2)"},
+        {"row": 6, "reason": "violates part_mrp_check"},
+        {"row": 7, "reason": "unknown brand_id"},
+        {"row": 8, "reason": "duplicate of row 1"},
+        {"row": 9, "reason": "already exists"},
+        {"row": 10, "reason": "record is not an object"},
+    ]
+    assert [r[1] for r in await _parts(scratch_db)] == ["OK1", "OK2", "OLD"]
+
+
+@pytest.mark.asyncio
+async def test_upsert_updates_existing_rows_and_inserts_new_ones(tables, scratch_db):
+    await scratch_db.execute(
+        "INSERT INTO part (brand_id, part_code, part_name, uom, mrp) "
+        "VALUES (1, 'A', 'Old A', 'BOX', 5), (1, 'B', 'Old B', 'NOS', 7)"
+    )
+    records = [
+        {"brand_id": 1, "part_code": "A", "part_name": "New A"},           # mrp, uom kept
+        {"brand_id": 1, "part_code": "C", "part_name": "New C", "mrp": 3},
+        {"brand_id": 1, "part_code": "B", "part_name": "x", "mrp": -2},    # rejected, B untouched
+    ]
+
+    result = await copy_records(
+        None, tables, "part", records,
+        columns=("brand_id", "part_code", "part_name", "uom", "mrp"),
+        conflict_keys=("brand_id", "part_code"),
+        upsert=True,
+    )
+
+    assert result == {
+        "inserted": 1,
+        "updated": 1,
+        "rejected": [{"row": 3, "reason": "violates part_mrp_check"}],
+    }
+    assert [r[:5] for r in await _parts(scratch_db)] == [
+        (1, "A", "New A", "BOX", 5.0),
+        (1, "B", "Old B", "NOS", 7.0),
+        (1, "C", "New C", "NOS", 3.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_upsert_requires_conflict_keys(tables):
+    with pytest.raises(ValueError):
+        await copy_records(None, tables, "part", [], upsert=True)
+
+
+@pytest.mark.asyncio
+async def test_uncoercible_column_type_raises_not_supported_before_staging(tables, scratch_db):
+    await scratch_db.execute("CREATE TABLE host (name text NOT NULL, addr inet)")
+
+    with pytest.raises(psycopg.NotSupportedError):
+        await copy_records(None, tables, "host", [{"name": "a", "addr": "10.0.0.1"}])
+
+    cur = await scratch_db.execute("SELECT count(*) FROM host")
+    assert await cur.fetchone() == (0,)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("table_name, columns", [
+    ("no_such_table", None),
+    ("part", ["part_code", "no_such_column"]),
+])
+async def test_unknown_table_or_column_raises_value_error_unwrapped(tables, table_name, columns):
+    with pytest.raises(ValueError):
+        await copy_records(None, tables, table_name, [{"part_code": "A"}], columns=columns)
@@ -0,0 +1,188 @@
+"""
+Tenant pool registry and search_path tagging: app/db/connection/pool_manager.py.
+
+The registry tests replace _open_pool with in-memory pools, so LRU eviction,
+budget reclaim and idle close run without a database. The tagging test needs
+the dev DB from app/config.py's .env and is skipped when it is unreachable.
+"""
+from contextlib import asynccontextmanager
+
+import psycopg
+import pytest
+
+from app.db.connection import pool_manager as pm
+
+
+class _FakeConnection:
+    pass
+
+
+class _FakePool:
+    def __init__(self, name: str, max_size: int) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.closed = False
+
+    @asynccontextmanager
+    async def connection(self):
+        yield _FakeConnection()
+
+    async def resize(self, min_size: int, max_size: int) -> None:
+        self.max_size = max_size
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def get_stats(self) -> dict:
+        return {"pool_max": self.max_size, "requests_waiting": 0}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    async def open_pool(_conninfo, name, _transactional, max_size):
+        return _FakePool(name, max_size)
+
+    monkeypatch.setattr(pm, "_open_pool", open_pool)
+    monkeypatch.setattr(pm, "_POOL_EVICT_GRACE", 0.0)
+    return pm.PoolManager()
+
+
+async def _touch(manager: pm.PoolManager, db_name: str, transactional: bool = False) -> None:
+    async with manager.connection(db_name, transactional=transactional):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_opening_past_max_tenants_evicts_least_recently_used(manager, monkeypatch):
+    monkeypatch.setattr(pm, "_MAX_TENANTS", 3)
+    for name in ("t0", "t1", "t2"):
+        await _touch(manager, name)
+    first = manager._tenants["t0"].query
+    await _touch(manager, "t0")          # t1 is now the least recently used
+
+    await _touch(manager, "t3")
+
+    assert list(manager._tenants) == ["t2", "t0", "t3"]
+    assert not first.closed
+    assert manager.get_stats()["budget"]["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tenant_in_use_is_never_evicted(manager, monkeypatch):
+    monkeypatch.setattr(pm, "_MAX_TENANTS", 1)
+    async with manager.connection("busy"):
+        await _touch(manager, "other")
+        assert "busy" in manager._tenants
+    assert manager.get_stats()["budget"]["evictions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_borrows_within_global_cap(manager, monkeypatch):
+    monkeypatch.setattr(pm, "_GLOBAL_MAX_CONNECTIONS", 7)
+    async with manager.connection("a"):
+        held = [manager.connection("a") for _ in range(pm._POOL_BASE_SIZE)]
+        for ctx in held:                  # one lease more than the pool holds
+            await ctx.__aenter__()
+        pool = manager._tenants["a"].query
+        assert pool.max_size == pm._POOL_BASE_SIZE + pm._POOL_GROW_STEP
+        for ctx in held:
+            await ctx.__aexit__(None, None, None)
+
+    async with manager.connection("a"):
+        held = [manager.connection("a") for _ in range(pool.max_size)]
+        for ctx in held:                  # the next step would exceed the cap
+            await ctx.__aenter__()
+        assert pool.max_size == pm._POOL_BASE_SIZE + pm._POOL_GROW_STEP
+        for ctx in held:
+            await ctx.__aexit__(None, None, None)
+    assert manager.get_stats()["budget"]["borrows"] == 1
+
+
+@pytest.mark.asyncio
+async def test_budget_reclaims_borrowed_capacity_before_evicting(manager, monkeypatch):
+    monkeypatch.setattr(pm, "_GLOBAL_MAX_CONNECTIONS", 9)
+    async with manager.connection("a"):
+        held = [manager.connection("a") for _ in range(pm._POOL_BASE_SIZE)]
+        for ctx in held:
+            await ctx.__aenter__()
+        for ctx in held:
+            await ctx.__aexit__(None, None, None)
+    assert manager._tenants["a"].query.max_size == pm._POOL_BASE_SIZE + pm._POOL_GROW_STEP
+
+    await _touch(manager, "b")           # 6 + 4 > 9: shrink a back to its base
+
+    assert manager._tenants["a"].query.max_size == pm._POOL_BASE_SIZE
+    assert set(manager._tenants) == {"a", "b"}
+    budget = manager.get_stats()["budget"]
+    assert (budget["reclaims"], budget["evictions"], budget["reserved"]) == (1, 0, 8)
+
+
+@pytest.mark.asyncio
+async def test_budget_evicts_idle_tenant_when_reclaim_is_not_enough(manager, monkeypatch):
+    monkeypatch.setattr(pm, "_GLOBAL_MAX_CONNECTIONS", pm._POOL_BASE_SIZE + pm._TX_POOL_BASE_SIZE)
+    await _touch(manager, "a")
+    await _touch(manager, "a", transactional=True)
+
+    await _touch(manager, "b")
+
+    assert list(manager._tenants) == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_evict_idle_closes_tenants_past_ttl_only(manager, monkeypatch):
+    await _touch(manager, "stale")
+    await _touch(manager, "fresh")
+    stale = manager._tenants["stale"].query
+    manager._tenants["stale"].last_used -= pm._POOL_IDLE_TTL
+
+    assert await manager.evict_idle() == 1
+
+    assert stale.closed
+    assert list(manager._tenants) == ["fresh"]
+
+
+@pytest.mark.asyncio
+async def test_evict_idle_returns_borrowed_capacity_of_active_tenants(manager):
+    async with manager.connection("a"):
+        held = [manager.connection("a") for _ in range(pm._POOL_BASE_SIZE)]
+        for ctx in held:
+            await ctx.__aenter__()
+        for ctx in held:
+            await ctx.__aexit__(None, None, None)
+
+    assert await manager.evict_idle() == 0
+
+    assert manager._tenants["a"].query.max_size == pm._POOL_BASE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_only_clean_transactional_checkouts_count_as_commits(manager):
+    await _touch(manager, "a")
+    await _touch(manager, "a", transactional=True)
+    with pytest.raises(RuntimeError):
+        async with manager.connection("a", transactional=True):
+            raise RuntimeError("rolled back")
+
+    assert manager.commit_version("a") == 1
+    assert manager.commit_version("b") == 0
+
+
+@pytest.mark.asyncio
+async def test_raw_set_search_path_drops_the_tag():
+    try:
+        conn = await psycopg.AsyncConnection.connect(pm._client_conninfo(), autocommit=True)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"dev DB unreachable: {e}")
+    async with conn:
+        await pm._configure_connection(conn)
+        pm.remember_search_path(conn, "public")
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT 1")
+            assert pm.current_search_path(conn) == "public"
+
+            await cur.execute("SELECT set_config('search_path', 'pg_catalog', false)")
+            assert pm.current_search_path(conn) is None
+
+        pm.remember_search_path(conn, "public")
+        await conn.execute("SET search_path TO pg_catalog")
+        assert pm.current_search_path(conn) is None
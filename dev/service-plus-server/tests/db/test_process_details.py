@@ -0,0 +1,196 @@
+"""
+Set-based sqlObject saves: process_details via exec_sql_object in
+app/db/connection/psycopg_driver.py.
+
+Saves nested documents into tables created in a throwaway schema of the dev
+DB (see tests/conftest.py) and is skipped when the DB is unreachable.
+"""
+import pytest
+
+from app.core.exceptions import DatabaseException
+from app.db.connection.psycopg_driver import exec_sql_object
+
+_TABLES = """
+    CREATE TABLE invoice (
+        id          bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        invoice_no  text NOT NULL
+    );
+    CREATE TABLE invoice_line (
+        id          bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        invoice_id  bigint NOT NULL REFERENCES invoice (id),
+        product     text NOT NULL,
+        qty         numeric(10, 2) NOT NULL
+    );
+    CREATE TABLE invoice_line_serial (
+        id              bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        invoice_line_id bigint NOT NULL REFERENCES invoice_line (id),
+        serial_no       text NOT NULL,
+        received_on     date,
+        detail          jsonb,
+        units           integer
+    );
+    CREATE TABLE serial_statement_log (rows_inserted int NOT NULL);
+    CREATE FUNCTION log_serial_statement() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO serial_statement_log SELECT count(*) FROM new_rows;
+        RETURN NULL;
+    END;
+    $$;
+    CREATE TRIGGER trg_log_serial_statement AFTER INSERT ON invoice_line_serial
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION log_serial_statement();
+"""
+
+
+def _serials(*serial_nos: str | None) -> dict:
+    return {
+        "tableName": "invoice_line_serial",
+        "fkeyName": "invoice_line_id",
+        "xData": [{"serial_no": s} for s in serial_nos],
+    }
+
+
+def _invoice(invoice_no: str, lines: list[dict]) -> dict:
+    return {
+        "tableName": "invoice",
+        "xData": {
+            "invoice_no": invoice_no,
+            "xDetails": [{"tableName": "invoice_line", "fkeyName": "invoice_id", "xData": lines}],
+        },
+    }
+
+
+@pytest.fixture
+async def tables(scratch_db, scratch_schema):
+    await scratch_db.execute(_TABLES)
+    return scratch_schema
+
+
+async def _fetch(conn, sql: str) -> list[tuple]:
+    cur = await conn.execute(sql)
+    return await cur.fetchall()
+
+
+@pytest.mark.asyncio
+async def test_nested_invoice_wires_every_level_to_its_parent(tables, scratch_db):
+    document = _invoice("INV-1", [
+        {"product": "Panel", "qty": 1, "xDetails": _serials("P-1")},
+        {"product": "Cable", "qty": 3},
+        {"product": "Battery", "qty": 2, "xDetails": [_serials("B-1", "B-2")]},
+    ])
+
+    invoice_id = await exec_sql_object(None, tables, document)
+
+    assert await _fetch(scratch_db, "SELECT id, invoice_no FROM invoice") == [(invoice_id, "INV-1")]
+    lines = await _fetch(scratch_db, "SELECT id, invoice_id, product FROM invoice_line ORDER BY id")
+    assert [(inv, product) for _, inv, product in lines] == [
+        (invoice_id, "Panel"), (invoice_id, "Cable"), (invoice_id, "Battery"),
+    ]
+    line_ids = {product: line_id for line_id, _, product in lines}
+    assert await _fetch(
+        scratch_db, "SELECT invoice_line_id, serial_no FROM invoice_line_serial ORDER BY id"
+    ) == [(line_ids["Panel"], "P-1"), (line_ids["Battery"], "B-1"), (line_ids["Battery"], "B-2")]
+
+
+@pytest.mark.asyncio
+async def test_leaf_rows_of_a_level_insert_as_one_statement(tables, scratch_db):
+    panel, battery = _serials("P-1", "P-2"), _serials("B-1")
+    panel["xData"][0].update(received_on="2026-03-01", detail='{"grade": "A"}')
+    for row in panel["xData"][1:] + battery["xData"]:
+        row.update(received_on=None, detail=None)
+    document = _invoice("INV-4", [
+        {"product": "Panel", "qty": 1, "xDetails": panel},
+        {"product": "Battery", "qty": 2, "xDetails": battery},
+    ])
+
+    await exec_sql_object(None, tables, document)
+
+    assert await _fetch(scratch_db, "SELECT rows_inserted FROM serial_statement_log") == [(3,)]
+    rows = await _fetch(
+        scratch_db,
+        "SELECT l.product, s.serial_no, s.received_on::text, s.detail->>'grade' "
+        "FROM invoice_line_serial s JOIN invoice_line l ON l.id = s.invoice_line_id ORDER BY s.id",
+    )
+    assert rows == [
+        ("Panel", "P-1", "2026-03-01", "A"),
+        ("Panel", "P-2", None, None),
+        ("Battery", "B-1", None, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fractional_numbers_for_an_integer_column_round_as_before(tables, scratch_db):
+    serials = _serials("P-1", "P-2", "P-3")
+    for row, units in zip(serials["xData"], (2.0, 3.6, 4)):
+        row["units"] = units
+
+    await exec_sql_object(None, tables, _invoice("INV-5", [{"product": "Panel", "qty": 1, "xDetails": serials}]))
+
+    assert await _fetch(scratch_db, "SELECT serial_no, units FROM invoice_line_serial ORDER BY id") == [
+        ("P-1", 2), ("P-2", 4), ("P-3", 4),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_returns_the_last_top_level_id(tables, scratch_db):
+    document = {
+        "tableName": "invoice",
+        "xData": [{"invoice_no": "A"}, {"invoice_no": "B"}],
+    }
+
+    last_id = await exec_sql_object(None, tables, document)
+
+    assert await _fetch(scratch_db, "SELECT max(id) FROM invoice") == [(last_id,)]
+
+
+@pytest.mark.asyncio
+async def test_updates_deletes_and_inserts_in_one_document(tables, scratch_db):
+    invoice_id = await exec_sql_object(None, tables, _invoice("INV-2", [
+        {"product": "Keep", "qty": 1},
+        {"product": "Drop", "qty": 1},
+    ]))
+    (keep_id, drop_id), = await _fetch(
+        scratch_db,
+        "SELECT min(id) FILTER (WHERE product = 'Keep'), min(id) FILTER (WHERE product = 'Drop') "
+        "FROM invoice_line",
+    )
+
+    document = {
+        "tableName": "invoice",
+        "xData": {
+            "id": invoice_id,
+            "invoice_no": "INV-2R",
+            "xDetails": {
+                "tableName": "invoice_line",
+                "fkeyName": "invoice_id",
+                "deletedIds": [drop_id],
+                "xData": [
+                    {"id": keep_id, "qty": 5, "xDetails": _serials("K-1")},
+                    {"product": "New", "qty": 2, "xDetails": _serials("N-1")},
+                ],
+            },
+        },
+    }
+    assert await exec_sql_object(None, tables, document) == invoice_id
+
+    assert await _fetch(scratch_db, "SELECT invoice_no FROM invoice") == [("INV-2R",)]
+    lines = await _fetch(scratch_db, "SELECT id, invoice_id, product, qty FROM invoice_line ORDER BY id")
+    assert [(line[1], line[2], float(line[3])) for line in lines] == [
+        (invoice_id, "Keep", 5.0), (invoice_id, "New", 2.0),
+    ]
+    assert await _fetch(
+        scratch_db, "SELECT invoice_line_id, serial_no FROM invoice_line_serial ORDER BY id"
+    ) == [(keep_id, "K-1"), (lines[1][0], "N-1")]
+
+
+@pytest.mark.asyncio
+async def test_a_failing_row_rolls_back_the_whole_document(tables, scratch_db):
+    document = _invoice("INV-3", [
+        {"product": "Panel", "qty": 1, "xDetails": _serials("P-1")},
+        {"product": "Battery", "qty": 1, "xDetails": _serials("B-1", None)},
+    ])
+
+    with pytest.raises(DatabaseException):
+        await exec_sql_object(None, tables, document)
+
+    for table in ("invoice", "invoice_line", "invoice_line_serial"):
+        assert await _fetch(scratch_db, f"SELECT count(*) FROM {table}") == [(0,)]
@@ -0,0 +1,163 @@
+"""
+Reference-data result cache: app/db/connection/result_cache.py.
+
+Most tests drive the module directly and need no database. The last one runs
+a cached genericQuery read against the scratch schema from tests/conftest.py
+and is skipped when the dev DB is unreachable.
+"""
+from collections import OrderedDict
+
+import psycopg.sql as pgsql
+import pytest
+
+from app.db.connection import result_cache
+from app.db.connection.psycopg_driver import exec_sql, exec_sql_dml
+from app.db.sql.sql_base import SqlStore
+from app.graphql.resolvers.shared import generic_query
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(result_cache, "_results", OrderedDict())
+    monkeypatch.setattr(result_cache, "_versions", {})
+    monkeypatch.setattr(result_cache, "_counters", {})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache, "monotonic", lambda: now[0])
+    return now
+
+
+def _key(sql_id: str = "GET_JOB_STATUSES", schema: str = "bu1", db_name: str | None = "db1") -> tuple:
+    return result_cache.result_key(db_name, schema, sql_id, {}, False)
+
+
+def _store(key: tuple, rows) -> None:
+    result_cache.remember(key, result_cache.version(key), rows)
+
+
+def test_miss_then_hit_is_counted():
+    key = _key()
+    assert result_cache.cached_result(key) is None
+    _store(key, [{"id": 1}])
+
+    assert result_cache.cached_result(key) == [{"id": 1}]
+    assert result_cache.get_stats()["by_sql_id"]["GET_JOB_STATUSES"] == {"hits": 1, "misses": 1}
+
+
+def test_entry_expires_after_ttl(clock):
+    key = _key()
+    _store(key, [{"id": 1}])
+
+    clock[0] += result_cache._RESULT_TTL
+    assert result_cache.cached_result(key) == [{"id": 1}]
+    clock[0] += 1
+    assert result_cache.cached_result(key) is None
+    assert result_cache.get_stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    monkeypatch.setattr(result_cache, "_RESULT_MAX_ENTRIES", 2)
+    first, second, third = _key(schema="bu1"), _key(schema="bu2"), _key(schema="bu3")
+    _store(first, [{"id": 1}])
+    _store(second, [{"id": 2}])
+    result_cache.cached_result(first)   # now second is the oldest
+    _store(third, [{"id": 3}])
+
+    assert result_cache.cached_result(second) is None
+    assert result_cache.cached_result(first) == [{"id": 1}]
+    assert result_cache.cached_result(third) == [{"id": 3}]
+
+
+def test_returned_rows_are_copies():
+    key = _key()
+    rows = [{"id": 1, "name": "Open"}]
+    _store(key, rows)
+    rows[0]["name"] = "edited by the caller before storing"
+
+    result_cache.cached_result(key)[0]["name"] = "edited by a reader"
+    assert result_cache.cached_result(key) == [{"id": 1, "name": "Open"}]
+
+    columnar = _key(sql_id="GET_JOB_TYPES")
+    _store(columnar, {"columns": ["id"], "rows": [(1,)]})
+    result_cache.cached_result(columnar)["rows"].append((2,))
+    assert result_cache.cached_result(columnar) == {"columns": ["id"], "rows": [(1,)]}
+
+
+def test_invalidate_tables_drops_only_dependent_entries_of_the_scope():
+    statuses, types, other_bu = _key(), _key(sql_id="GET_JOB_TYPES"), _key(schema="bu2")
+    for key in (statuses, types, other_bu):
+        _store(key, [{"id": 1}])
+
+    result_cache.invalidate_tables("db1", "bu1", {"job_status"})
+
+    assert result_cache.cached_result(statuses) is None
+    assert result_cache.cached_result(types) == [{"id": 1}]
+    assert result_cache.cached_result(other_bu) == [{"id": 1}]
+
+
+def test_invalidate_scope_drops_every_entry_of_the_scope():
+    statuses, types, other_bu = _key(), _key(sql_id="GET_JOB_TYPES"), _key(schema="bu2")
+    for key in (statuses, types, other_bu):
+        _store(key, [{"id": 1}])
+
+    result_cache.invalidate_scope("db1", "bu1")
+
+    assert result_cache.cached_result(statuses) is None
+    assert result_cache.cached_result(types) is None
+    assert result_cache.cached_result(other_bu) == [{"id": 1}]
+
+
+@pytest.mark.parametrize("sql, dropped", [
+    ("UPDATE job_status SET name = %(name)s WHERE id = %(id)s", True),
+    ('INSERT INTO bu1."job_status" (code) VALUES (%(code)s)', True),
+    ("DELETE FROM ONLY job_status WHERE id = 1", True),
+    ("UPDATE job SET remarks = '' WHERE id = 1", False),
+    ("SELECT id FROM job_status FOR UPDATE", False),
+    ("TRUNCATE job_type", True),
+    ("DO $$ BEGIN PERFORM 1; END $$", True),
+    (pgsql.SQL("UPDATE {} SET name = ''").format(pgsql.Identifier("brand")), True),
+])
+def test_invalidate_statement(sql, dropped):
+    key = _key()
+    _store(key, [{"id": 1}])
+
+    result_cache.invalidate_statement("db1", "bu1", sql)
+
+    assert (result_cache.cached_result(key) is None) is dropped
+
+
+def test_read_that_overlaps_a_write_is_not_stored():
+    key = _key()
+    read_version = result_cache.version(key)
+    result_cache.invalidate_tables("db1", "bu1", {"job_status"})   # write commits mid-read
+    result_cache.remember(key, read_version, [{"id": 1, "name": "stale"}])
+
+    assert result_cache.cached_result(key) is None
+
+
+@pytest.mark.asyncio
+async def test_exec_sql_write_invalidates_cached_lookup(scratch_schema, scratch_db):
+    await scratch_db.execute("""
+        CREATE TABLE job_status (
+            id serial PRIMARY KEY, code text, name text, description text,
+            display_order int, is_active boolean DEFAULT true, is_system boolean DEFAULT false
+        )
+    """)
+    await scratch_db.execute("INSERT INTO job_status (code, name) VALUES ('OPEN', 'Open')")
+
+    async def statuses() -> list[str]:
+        rows, _ = await generic_query._read(
+            None, scratch_schema, "GET_JOB_STATUSES", SqlStore.GET_JOB_STATUSES, {}, False, None,
+        )
+        return [row["code"] for row in rows]
+
+    assert await statuses() == ["OPEN"]
+    assert await statuses() == ["OPEN"]
+    await exec_sql(None, scratch_schema, "INSERT INTO job_status (code, name) VALUES ('CLOSED', 'Closed')")
+    assert await statuses() == ["CLOSED", "OPEN"]
+    await exec_sql_dml(None, scratch_schema, "DELETE FROM job_status WHERE code = 'OPEN'")
+    assert await statuses() == ["CLOSED"]
+    assert result_cache.get_stats()["hits"] == 1
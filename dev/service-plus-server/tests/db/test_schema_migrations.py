@@ -0,0 +1,69 @@
+"""
+Versioned BU schema migrations: app/db/schema_migrations.py.
+
+MIGRATIONS is replaced by small scripts run against the scratch schema from
+tests/conftest.py, so the tests need the dev DB from app/config.py's .env and
+are skipped when it is unreachable.
+"""
+import pytest
+
+from app.core.exceptions import DatabaseException
+from app.db import schema_migrations
+from app.db.sql.sql_base import SqlStore
+
+
+@pytest.fixture
+def migrations(monkeypatch):
+    scripts = {
+        "UPGRADE_TEST_TABLE": "CREATE TABLE IF NOT EXISTS widget (id integer)",
+        "UPGRADE_TEST_COLUMN": "ALTER TABLE widget ADD COLUMN IF NOT EXISTS name text; INSERT INTO widget VALUES (1, 'a')",
+        "UPGRADE_TEST_BROKEN": "CREATE TABLE gadget (id integer); SELECT 1 / 0",
+    }
+    for name, sql in scripts.items():
+        monkeypatch.setattr(SqlStore, name, sql, raising=False)
+    monkeypatch.setattr(schema_migrations, "MIGRATIONS", ((1, "UPGRADE_TEST_TABLE"), (2, "UPGRADE_TEST_COLUMN")))
+    return monkeypatch
+
+
+async def _recorded(scratch_db) -> list[tuple]:
+    cur = await scratch_db.execute("SELECT version, name FROM schema_migration ORDER BY version")
+    return await cur.fetchall()
+
+
+async def _exists(scratch_db, table: str) -> bool:
+    cur = await scratch_db.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+    return (await cur.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_migrate_applies_pending_versions_once_in_order(migrations, scratch_schema, scratch_db):
+    assert await schema_migrations.migrate_bu_schema(None, scratch_schema) == [1, 2]
+    assert await schema_migrations.migrate_bu_schema(None, scratch_schema) == []
+
+    assert await _recorded(scratch_db) == [(1, "UPGRADE_TEST_TABLE"), (2, "UPGRADE_TEST_COLUMN")]
+    cur = await scratch_db.execute("SELECT count(*) FROM widget")
+    assert (await cur.fetchone())[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_new_schema_is_marked_current_without_running_scripts(migrations, scratch_schema, scratch_db):
+    await schema_migrations.mark_bu_schema_current(None, scratch_schema)
+
+    assert await schema_migrations.pending_migrations(None, scratch_schema) == []
+    assert [v for v, _ in await _recorded(scratch_db)] == [1, 2]
+    assert not await _exists(scratch_db, "widget")
+
+
+@pytest.mark.asyncio
+async def test_failing_version_rolls_back_and_stops(migrations, scratch_schema, scratch_db):
+    migrations.setattr(schema_migrations, "MIGRATIONS", (
+        (1, "UPGRADE_TEST_TABLE"), (2, "UPGRADE_TEST_BROKEN"), (3, "UPGRADE_TEST_COLUMN"),
+    ))
+
+    with pytest.raises(DatabaseException):
+        await schema_migrations.migrate_bu_schema(None, scratch_schema)
+
+    assert [v for v, _ in await _recorded(scratch_db)] == [1]
+    assert await _exists(scratch_db, "widget")
+    assert not await _exists(scratch_db, "gadget")
+    assert [v for v, _ in await schema_migrations.pending_migrations(None, scratch_schema)] == [2, 3]
@@ -0,0 +1,90 @@
+"""
+Prepared-statement hit/miss accounting: app/db/connection/statement_cache.py.
+
+Runs against the dev DB from app/config.py's .env (read-only statements) and
+is skipped when it is unreachable.
+"""
+import psycopg
+import pytest
+
+from app.db.connection import statement_cache
+from app.db.connection.pool_manager import _client_conninfo
+
+
+@pytest.fixture
+async def conn():
+    try:
+        connection = await psycopg.AsyncConnection.connect(_client_conninfo(), autocommit=True)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"dev DB unreachable: {e}")
+    await statement_cache.configure_connection(connection)
+    async with connection:
+        yield connection
+
+
+def _counts(sql_id: str) -> list[int]:
+    return statement_cache._counters.pop(sql_id, [0, 0])
+
+
+@pytest.mark.asyncio
+async def test_second_execution_on_a_connection_is_a_hit(conn):
+    async with conn.cursor() as cur:
+        for value in (1, 2, 3):
+            await statement_cache.execute_prepared(cur, "SELECT %(v)s::int", {"v": value}, "TEST_HIT")
+            assert await cur.fetchone() == (value,)
+
+    assert _counts("TEST_HIT") == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_statement_evicted_by_psycopg_counts_as_miss_again(conn):
+    conn.prepared_max = 1
+    async with conn.cursor() as cur:
+        await statement_cache.execute_prepared(cur, "SELECT 1 AS a", {}, "TEST_EVICT_A")
+        await statement_cache.execute_prepared(cur, "SELECT 2 AS b", {}, "TEST_EVICT_B")
+        await statement_cache.execute_prepared(cur, "SELECT 1 AS a", {}, "TEST_EVICT_A")
+
+    assert _counts("TEST_EVICT_A") == [0, 2]
+    assert _counts("TEST_EVICT_B") == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_deallocate_all_counts_as_miss_again(conn):
+    async with conn.cursor() as cur:
+        await statement_cache.execute_prepared(cur, "SELECT 1", {}, "TEST_DEALLOC")
+        await cur.execute("DEALLOCATE ALL")
+        await statement_cache.execute_prepared(cur, "SELECT 1", {}, "TEST_DEALLOC")
+
+    assert _counts("TEST_DEALLOC") == [0, 2]
+
+
+@pytest.mark.asyncio
+async def test_ad_hoc_sql_is_not_counted(conn):
+    async with conn.cursor() as cur:
+        await statement_cache.execute_prepared(cur, "SELECT 1", {}, None)
+
+    assert None not in statement_cache._counters
+
+
+@pytest.mark.asyncio
+async def test_opted_out_sql_id_is_never_prepared(conn, monkeypatch):
+    monkeypatch.setattr(statement_cache, "_PREPARE_OPT_OUT", frozenset({"TEST_OPT_OUT"}))
+    async with conn.cursor() as cur:
+        # More runs than psycopg's prepare_threshold, which would otherwise prepare it.
+        for _ in range(conn.prepare_threshold + 2):
+            await statement_cache.execute_prepared(cur, "SELECT 41 + 1", {}, "TEST_OPT_OUT")
+        await cur.execute("SELECT count(*) FROM pg_prepared_statements WHERE statement = 'SELECT 41 + 1'")
+        assert await cur.fetchone() == (0,)
+
+    assert "TEST_OPT_OUT" not in statement_cache._counters
+    assert statement_cache.get_stats()["opt_out"] == ["TEST_OPT_OUT"]
+
+
+@pytest.mark.asyncio
+async def test_missing_psycopg_counter_skips_counting(conn, monkeypatch):
+    monkeypatch.setattr(statement_cache, "_prepared_serial", lambda _conn: None)
+    async with conn.cursor() as cur:
+        await statement_cache.execute_prepared(cur, "SELECT 1", {}, "TEST_UNCOUNTED")
+        assert await cur.fetchone() == (1,)
+
+    assert "TEST_UNCOUNTED" not in statement_cache._counters
@@ -0,0 +1,139 @@
+"""
+Parsed-document, validation and persisted-query cache: app/graphql/document_cache.py.
+
+Uses a two-field schema served by Ariadne's ASGI app in-process; no DB access.
+"""
+from collections import OrderedDict
+
+import httpx
+import pytest
+from ariadne import QueryType, make_executable_schema
+from ariadne.asgi import GraphQL
+from graphql import parse, specified_rules
+
+from app.graphql import document_cache
+from app.graphql.document_cache import (
+    PersistedQueryHTTPHandler,
+    parse_query,
+    query_hash,
+    validate_query,
+)
+
+_QUERY = "query Hello($name: String) { hello(name: $name) }"
+
+_query = QueryType()
+
+
+@_query.field("hello")
+def _resolve_hello(*_, name=None):
+    return f"hello {name or 'world'}"
+
+
+_schema = make_executable_schema(
+    "type Query { hello(name: String): String  other: Int }", _query
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(document_cache, "_entries", OrderedDict())
+    monkeypatch.setattr(document_cache, "_by_document", {})
+    monkeypatch.setattr(document_cache, "_counters", {
+        "parse": [0, 0], "validate": [0, 0], "persisted": [0, 0],
+    })
+
+
+@pytest.fixture
+async def client():
+    app = GraphQL(
+        _schema,
+        query_parser=parse_query,
+        query_validator=validate_query,
+        http_handler=PersistedQueryHTTPHandler(),
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+def _apq(digest: str) -> dict:
+    return {"persistedQuery": {"version": 1, "sha256Hash": digest}}
+
+
+def test_same_query_text_parses_once():
+    first = parse_query(None, {"query": _QUERY})
+
+    assert parse_query(None, {"query": _QUERY}) is first
+    assert document_cache.get_stats()["parse"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_validation_errors_are_reused_only_under_the_same_rules():
+    document = parse_query(None, {"query": "{ hello missing }"})
+
+    errors = validate_query(_schema, document, specified_rules)
+    assert len(errors) == 1
+    assert validate_query(_schema, document, specified_rules) is errors
+    assert validate_query(_schema, document, ()) == []
+
+    assert document_cache.get_stats()["validate"]["hits"] == 1
+
+
+def test_documents_not_from_the_cache_are_validated_every_time():
+    document = parse(_QUERY)
+    validate_query(_schema, document, specified_rules)
+    validate_query(_schema, document, specified_rules)
+
+    assert document_cache.get_stats()["validate"] == {"hits": 0, "misses": 2, "hit_rate": 0.0}
+
+
+def test_evicted_entry_releases_its_document(monkeypatch):
+    monkeypatch.setattr(document_cache, "_DOCUMENT_MAX_ENTRIES", 2)
+    documents = [parse_query(None, {"query": f"{{ hello(name: \"{n}\") }}"}) for n in "abc"]
+
+    assert list(document_cache._entries) == [
+        query_hash(f"{{ hello(name: \"{n}\") }}") for n in "bc"
+    ]
+    assert id(documents[0]) not in document_cache._by_document
+    assert document_cache.get_stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_hash_answers_persisted_query_not_found(client):
+    response = await client.post("/", json={"extensions": _apq(query_hash(_QUERY))})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+    assert document_cache.get_stats()["persisted"]["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_registered_hash_runs_the_remembered_query(client):
+    digest = query_hash(_QUERY)
+    registered = await client.post("/", json={
+        "query": _QUERY, "variables": {"name": "a"}, "extensions": _apq(digest),
+    })
+    assert registered.json() == {"data": {"hello": "hello a"}}
+
+    response = await client.post("/", json={"variables": {"name": "b"}, "extensions": _apq(digest)})
+
+    assert response.json() == {"data": {"hello": "hello b"}}
+    assert document_cache.get_stats()["persisted"]["hits"] == 1
+    assert document_cache.get_stats()["parse"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hash_that_does_not_match_the_query_is_rejected(client):
+    response = await client.post("/", json={"query": _QUERY, "extensions": _apq(query_hash("{ other }"))})
+
+    assert response.status_code == 400
+    assert response.json()["errors"][0]["extensions"]["code"] == "BAD_USER_INPUT"
+    assert query_hash(_QUERY) not in document_cache._entries
+
+
+@pytest.mark.asyncio
+async def test_unsupported_persisted_query_version_is_rejected(client):
+    response = await client.post("/", json={
+        "extensions": {"persistedQuery": {"version": 2, "sha256Hash": query_hash(_QUERY)}},
+    })
+
+    assert response.json()["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_SUPPORTED"
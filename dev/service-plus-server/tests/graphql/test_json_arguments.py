@@ -0,0 +1,86 @@
+"""
+Legacy and native-JSON resolver arguments: `value`/`valueJson` and
+`items`/`itemsJson` in schema.graphql, folded by fold_json_arguments in
+app/graphql/schema.py.
+
+Runs documents against the real schema with the generic query helpers
+replaced by recorders; no DB access.
+"""
+import pytest
+from ariadne import graphql
+
+from app.graphql.resolvers import query as query_module
+from app.graphql.schema import create_schema, fold_json_arguments
+
+_schema = create_schema()
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    recorded: list[tuple[str, object]] = []
+
+    async def generic_query(db_name, schema="public", value=""):
+        recorded.append(("value", value))
+        return []
+
+    async def generic_batch_query(db_name, items, parallel=False, concurrency=None):
+        recorded.append(("items", items))
+        return []
+
+    monkeypatch.setattr(query_module, "resolve_generic_query_helper", generic_query)
+    monkeypatch.setattr(query_module, "resolve_generic_batch_query_helper", generic_batch_query)
+    return recorded
+
+
+async def _run(document: str, variables: dict) -> dict:
+    _, result = await graphql(
+        _schema,
+        {"query": document, "variables": variables},
+        middleware=[fold_json_arguments],
+    )
+    return result
+
+
+@pytest.mark.asyncio
+async def test_legacy_string_document_still_validates(calls):
+    result = await _run(
+        """
+        query GenericQuery($db_name: String!, $schema: String, $value: String!) {
+            genericQuery(db_name: $db_name, schema: $schema, value: $value)
+        }
+        """,
+        {"db_name": "d", "schema": "s", "value": "%7B%22sqlId%22%3A%22X%22%7D"},
+    )
+
+    assert "errors" not in result
+    assert calls == [("value", "%7B%22sqlId%22%3A%22X%22%7D")]
+
+
+@pytest.mark.asyncio
+async def test_value_json_reaches_the_resolver_as_value(calls):
+    result = await _run(
+        """
+        query GenericQuery($db_name: String!, $value: Generic!) {
+            genericQuery(db_name: $db_name, valueJson: $value)
+        }
+        """,
+        {"db_name": "d", "value": {"sqlId": "X", "sqlArgs": {"id": 1}}},
+    )
+
+    assert "errors" not in result
+    assert calls == [("value", {"sqlId": "X", "sqlArgs": {"id": 1}})]
+
+
+@pytest.mark.asyncio
+async def test_items_json_reaches_the_resolver_as_items(calls):
+    result = await _run(
+        """
+        query GenericBatchQuery($db_name: String!, $items: [Generic!]!) {
+            genericBatchQuery(db_name: $db_name, itemsJson: $items)
+        }
+        """,
+        {"db_name": "d", "items": [{"sqlId": "X"}, {"sqlId": "Y"}]},
+    )
+
+    assert "errors" not in result
+    assert calls == [("items", [{"sqlId": "X"}, {"sqlId": "Y"}])]
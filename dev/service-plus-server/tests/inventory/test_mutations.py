@@ -7,12 +7,17 @@ mutates real client data — see plans/plan.md Step 6.2.
 
 To actually exercise this against a disposable dev DB, remove the skip mark and
 set _DEV_CLIENT_DB below to a throwaway client database.
+
+The other tests import into a spare_part_master created in a throwaway schema
+(see tests/conftest.py) and are skipped when the DB is unreachable.
 """
 import json
 from urllib.parse import quote
 
+import psycopg
 import pytest
 
+from app.graphql.resolvers.inventory import mutations
 from app.graphql.resolvers.inventory.mutations import resolve_import_spare_parts_helper
 
 _DEV_CLIENT_DB = "service_plus_demo"
@@ -25,11 +30,75 @@ _DEV_CLIENT_DB = "service_plus_demo"
 @pytest.mark.asyncio
 async def test_import_spare_parts_bulk_inserts_records():
     parts = [
-        {"code": "TEST-PART-1", "name": "Test Part 1", "brand_id": 1},
-        {"code": "TEST-PART-2", "name": "Test Part 2", "brand_id": 1},
+        {"part_code": "TEST-PART-1", "part_name": "Test Part 1", "brand_id": 1},
+        {"part_code": "TEST-PART-2", "part_name": "Test Part 2", "brand_id": 1},
     ]
     value = quote(json.dumps(parts))
 
     result = await resolve_import_spare_parts_helper(_DEV_CLIENT_DB, "public", value)
 
-    assert result == {"success_count": 2}
+    assert result == {"success_count": 2, "updated_count": 0, "rejected": []}
+
+
+_SPARE_PART_MASTER = """
+    CREATE TABLE spare_part_master (
+        id          bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        brand_id    bigint NOT NULL,
+        part_code   text NOT NULL,
+        part_name   text NOT NULL,
+        part_description text,
+        category    text,
+        model       text,
+        uom         text DEFAULT 'NOS' NOT NULL,
+        cost_price  numeric(12,2),
+        mrp         numeric(12,2),
+        hsn_code    text,
+        gst_rate    numeric(5,2),
+        is_active   boolean DEFAULT true NOT NULL,
+        CONSTRAINT spare_part_code_brand_unique UNIQUE (brand_id, part_code)
+    );
+    INSERT INTO spare_part_master (brand_id, part_code, part_name) VALUES (1, 'OLD', 'Existing');
+"""
+
+
+@pytest.mark.asyncio
+async def test_import_spare_parts_reports_rejected_rows(scratch_db, scratch_schema):
+    await scratch_db.execute(_SPARE_PART_MASTER)
+    parts = [
+        {"part_code": "NEW-1", "part_name": "New 1", "brand_id": 1, "mrp": "10.5"},
+        {"part_code": "OLD", "part_name": "Clash", "brand_id": 1},
+        {"part_code": "NEW-2", "part_name": "New 2", "brand_id": 1, "gst_rate": "eighteen"},
+    ]
+
+    result = await resolve_import_spare_parts_helper("", scratch_schema, parts)
+
+    assert result == {
+        "success_count": 1,
+        "updated_count": 0,
+        "rejected": [
+            {"row": 2, "reason": "already exists"},
+            {"row": 3, "reason": "invalid value for gst_rate"},
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_import_spare_parts_falls_back_to_insert_when_copy_is_not_supported(
+    scratch_db, scratch_schema, monkeypatch
+):
+    await scratch_db.execute(_SPARE_PART_MASTER)
+
+    async def copy_not_supported(**_kwargs):
+        raise psycopg.NotSupportedError("COPY ingestion has no coercion for column(s) ['model']")
+
+    monkeypatch.setattr(mutations, "copy_records", copy_not_supported)
+    parts = [
+        {"part_code": "NEW-1", "part_name": "New 1", "brand_id": 1, "not_a_column": "x"},
+        {"part_code": "NEW-2", "part_name": "New 2", "brand_id": 1},
+    ]
+
+    result = await resolve_import_spare_parts_helper("", scratch_schema, quote(json.dumps(parts)))
+
+    assert result == {"success_count": 2, "updated_count": 0, "rejected": []}
+    cur = await scratch_db.execute("SELECT part_code FROM spare_part_master ORDER BY part_code")
+    assert await cur.fetchall() == [("NEW-1",), ("NEW-2",), ("OLD",)]
@@ -0,0 +1,55 @@
+"""
+Resolver `value` decoding: _decode_value / _decode_json in
+shared/generic_query.py. Pure, no DB.
+"""
+import json
+from urllib.parse import quote
+
+import pytest
+
+from app.core.exceptions import AppMessages, ValidationException
+from app.graphql.resolvers.shared.generic_query import _decode_json, _decode_value
+
+
+def test_object_passes_through():
+    value = {"sql_id": "GET_JOB_STATUSES", "sql_args": {}}
+
+    assert _decode_value(value, "test") is value
+
+
+def test_url_encoded_json_string_is_decoded():
+    value = {"sql_id": "GET_JOB_STATUSES", "sql_args": {"name": "a & b"}}
+
+    assert _decode_value(quote(json.dumps(value)), "test") == value
+
+
+@pytest.mark.parametrize("value", [
+    [{"sql_id": "GET_JOB_STATUSES"}],
+    42,
+    True,
+    quote(json.dumps([1, 2])),
+    quote(json.dumps("GET_JOB_STATUSES")),
+    "7",
+    "{not json",
+])
+def test_anything_but_an_object_is_invalid_input(value):
+    with pytest.raises(ValidationException) as exc_info:
+        _decode_value(value, "test")
+
+    assert exc_info.value.message == AppMessages.INVALID_INPUT
+    assert exc_info.value.extensions == {"detail": AppMessages.INVALID_JSON_VALUE}
+
+
+@pytest.mark.parametrize("value", ["", {}, None])
+def test_missing_value_is_reported_as_missing(value):
+    with pytest.raises(ValidationException) as exc_info:
+        _decode_value(value, "test")
+
+    assert exc_info.value.message == AppMessages.REQUIRED_FIELD_MISSING
+
+
+def test_decode_json_leaves_the_shape_to_the_caller():
+    records = [{"part_code": "P-1"}]
+
+    assert _decode_json(records, "test") is records
+    assert _decode_json(quote(json.dumps(records)), "test") == records
@@ -0,0 +1,155 @@
+"""
+Keyset (cursor) pagination: app/graphql/resolvers/shared/keyset.py.
+
+The cursor helpers are pure and need no DB. The paging test walks
+GET_JOB_SEARCH_PAGED page by page through genericQuery against minimal job
+tables in a throwaway schema of the dev DB (see tests/conftest.py), and is
+skipped when the DB is unreachable.
+"""
+import pytest
+
+from app.core.exceptions import ValidationException
+from app.db.sql.sql_base import SqlStore
+from app.graphql.resolvers.shared.generic_query import resolve_generic_query_helper
+from app.graphql.resolvers.shared.keyset import (
+    KEYSET_PAGED,
+    decode_cursor,
+    encode_cursor,
+    next_cursor,
+    with_keyset_args,
+)
+
+
+def test_cursor_round_trips_and_is_url_safe():
+    cursor = encode_cursor(["2025-04-01", 9007199254740993])
+
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor("GET_JOBS_PAGED", cursor) == ["2025-04-01", 9007199254740993]
+
+
+def test_cursor_keeps_null_sort_values():
+    assert decode_cursor("GET_JOB_SEARCH_PAGED", encode_cursor([None, 17])) == [None, 17]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    encode_cursor(["2025-04-01"]),                  # too short for (job_date, id)
+    encode_cursor(["2025-04-01", 1, 2]),            # too long
+    "eyJqb2JfZGF0ZSI6MX0",                          # {"job_date":1}: not a list
+])
+def test_malformed_cursor_is_a_validation_error(cursor):
+    with pytest.raises(ValidationException):
+        decode_cursor("GET_JOBS_PAGED", cursor)
+
+
+def test_args_of_other_queries_pass_through_untouched():
+    args = {"branch_id": 1, "limit": 50, "offset": 100}
+
+    assert with_keyset_args("GET_ALL_BRANDS", args, encode_cursor([1])) is args
+
+
+def test_offset_mode_defaults_after_args_to_null_and_keeps_the_offset():
+    args = {"branch_id": 1, "limit": 50, "offset": 100}
+
+    result = with_keyset_args("GET_JOBS_PAGED", args)
+
+    assert result == {**args, "after_job_date": None, "after_id": None}
+    assert "after_id" not in args
+
+
+def test_cursor_sets_after_args_and_resets_the_offset():
+    args = {"branch_id": 1, "limit": 50, "offset": 100}
+
+    result = with_keyset_args("GET_PARTS_PAGED", args, encode_cursor([3, "P-7"]))
+
+    assert result == {
+        "branch_id": 1, "limit": 50, "offset": 0,
+        "after_brand_id": 3, "after_part_code": "P-7",
+    }
+
+
+@pytest.mark.parametrize("sql_id", sorted(KEYSET_PAGED))
+def test_keyset_query_binds_every_after_arg(sql_id):
+    sql = getattr(SqlStore, sql_id)
+
+    for col in KEYSET_PAGED[sql_id]:
+        assert f"%(after_{col})s" in sql
+
+
+def test_next_cursor_from_row_objects():
+    rows = [{"id": 9, "job_date": "2025-04-02"}, {"id": 7, "job_date": "2025-04-01"}]
+
+    assert decode_cursor("GET_JOBS_PAGED", next_cursor("GET_JOBS_PAGED", rows, 2)) == ["2025-04-01", 7]
+
+
+def test_next_cursor_from_columnar_result():
+    result = {"columns": ["job_date", "job_no", "id"], "rows": [["2025-04-02", "J9", 9], ["2025-04-01", "J7", 7]]}
+
+    assert decode_cursor("GET_JOBS_PAGED", next_cursor("GET_JOBS_PAGED", result, 2)) == ["2025-04-01", 7]
+
+
+@pytest.mark.parametrize("result", [
+    [],
+    [{"id": 9, "job_date": "2025-04-02"}],
+    {"columns": ["job_date", "id"], "rows": []},
+    {"columns": ["job_date", "id"], "rows": [["2025-04-02", 9]]},
+])
+def test_short_or_empty_page_has_no_next_cursor(result):
+    assert next_cursor("GET_JOBS_PAGED", result, 2) is None
+
+
+_JOB_TABLES = """
+    CREATE TABLE customer_contact (id bigint PRIMARY KEY, full_name text, gstin text, mobile text);
+    CREATE TABLE job_type (id bigint PRIMARY KEY, code text, name text);
+    CREATE TABLE job_status (id bigint PRIMARY KEY, code text, name text);
+    CREATE TABLE job_invoice (job_id bigint, is_posted boolean);
+    CREATE TABLE technician (id bigint PRIMARY KEY, name text);
+    CREATE TABLE product_brand_model (id bigint PRIMARY KEY, brand_id bigint, product_id bigint, model_name text);
+    CREATE TABLE brand (id bigint PRIMARY KEY, name text);
+    CREATE TABLE product (id bigint PRIMARY KEY, name text);
+    CREATE TABLE job (
+        id bigint PRIMARY KEY, job_no text, alternate_job_no text, is_opening_job boolean,
+        job_date date NOT NULL, purchase_date date, delivery_date date, is_closed boolean,
+        is_final boolean, amount numeric, estimate_amount numeric, batch_no int,
+        last_transaction_id bigint, technician_id bigint, job_status_id bigint,
+        job_type_id bigint, customer_contact_id bigint, product_brand_model_id bigint,
+        serial_no text, division_id bigint, file_count int, transaction_count int,
+        branch_id bigint, search_text text
+    );
+    INSERT INTO customer_contact VALUES (1, 'Customer', NULL, '9000000000');
+    INSERT INTO job_type VALUES (1, 'CHARGEABLE', 'Chargeable');
+    INSERT INTO job_status VALUES (1, 'DELIVERED_OK', 'Delivered OK');
+    -- Closed jobs sort by delivery_date DESC: NULLs first, then ties broken by id DESC.
+    INSERT INTO job (id, job_no, job_date, delivery_date, is_closed, job_status_id,
+                     job_type_id, customer_contact_id, branch_id)
+    SELECT g, 'J' || g, date '2025-01-01' + g,
+           CASE WHEN g % 4 = 0 THEN NULL ELSE date '2025-03-01' + g / 3 END,
+           true, 1, 1, 1, 1
+      FROM generate_series(1, 23) g;
+"""
+
+
+@pytest.mark.asyncio
+async def test_cursor_walk_matches_the_single_query_order_with_null_sort_dates(
+    scratch_db, scratch_schema
+):
+    await scratch_db.execute(_JOB_TABLES)
+    cur = await scratch_db.execute(
+        "SELECT id FROM job ORDER BY delivery_date DESC NULLS FIRST, id DESC"
+    )
+    expected = [row[0] for row in await cur.fetchall()]
+    sql_args = {"branch_id": 1, "search": "", "show_closed": True, "status_id": None,
+                "limit": 4, "offset": 0}
+
+    walked: list[int] = []
+    cursor = None
+    for _ in range(len(expected)):
+        page = await resolve_generic_query_helper(
+            "", scratch_schema, {"sqlId": "GET_JOB_SEARCH_PAGED", "sqlArgs": sql_args, "cursor": cursor},
+        )
+        walked.extend(row["id"] for row in page["rows"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert walked == expected
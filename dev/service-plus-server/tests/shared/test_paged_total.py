@@ -0,0 +1,95 @@
+"""
+Cached *_COUNT totals for *_PAGED queries: app/graphql/resolvers/shared/paged_total.py.
+
+Pure in-memory logic; no DB access.
+"""
+from collections import OrderedDict
+
+import pytest
+
+from app.graphql.resolvers.shared import paged_total
+from app.graphql.resolvers.shared.paged_total import (
+    cached_total,
+    count_twin,
+    remember_total,
+    total_key,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(paged_total, "_totals", OrderedDict())
+    monkeypatch.setattr(paged_total, "monotonic", clock)
+    return clock
+
+
+def test_count_twin_pairs_paged_queries_with_their_count():
+    assert count_twin("GET_JOBS_PAGED") == "GET_JOBS_COUNT"
+    assert count_twin("GET_PARTS_PAGED") == "GET_PARTS_COUNT"
+
+
+def test_count_twin_is_none_without_a_twin_or_paged_suffix():
+    assert count_twin("GET_ALL_BRANDS") is None
+    assert count_twin("GET_NO_SUCH_QUERY_PAGED") is None
+
+
+def test_total_key_ignores_paging_and_keyset_args():
+    first = total_key("db", "bu1", "GET_JOBS_COUNT", {"branch_id": 1, "search": "", "limit": 50, "offset": 0})
+    later = total_key("db", "bu1", "GET_JOBS_COUNT", {
+        "search": "", "branch_id": 1, "limit": 50, "offset": 150,
+        "after_job_date": "2025-04-01", "after_id": 7,
+    })
+
+    assert first == later
+
+
+@pytest.mark.parametrize("other", [
+    ("db", "bu1", "GET_JOBS_COUNT", {"branch_id": 2, "search": ""}),
+    ("db", "bu2", "GET_JOBS_COUNT", {"branch_id": 1, "search": ""}),
+    ("db2", "bu1", "GET_JOBS_COUNT", {"branch_id": 1, "search": ""}),
+    ("db", "bu1", "GET_PARTS_COUNT", {"branch_id": 1, "search": ""}),
+])
+def test_total_key_separates_filters_schemas_and_queries(other):
+    assert total_key("db", "bu1", "GET_JOBS_COUNT", {"branch_id": 1, "search": ""}) != total_key(*other)
+
+
+def test_total_is_served_until_the_ttl_expires(clock):
+    key = total_key(None, "bu1", "GET_JOBS_COUNT", {"branch_id": 1})
+    assert cached_total(key) is None
+
+    remember_total(key, 42)
+    clock.now += paged_total._TOTAL_TTL
+    assert cached_total(key) == 42
+
+    clock.now += 0.001
+    assert cached_total(key) is None
+    assert key not in paged_total._totals
+
+
+def test_zero_is_a_cached_total(clock):
+    key = total_key(None, "bu1", "GET_JOBS_COUNT", {"branch_id": 1})
+    remember_total(key, 0)
+
+    assert cached_total(key) == 0
+
+
+def test_least_recently_used_total_is_evicted_first(clock, monkeypatch):
+    monkeypatch.setattr(paged_total, "_TOTAL_MAX_ENTRIES", 2)
+    keys = [total_key(None, "bu1", "GET_JOBS_COUNT", {"branch_id": b}) for b in (1, 2, 3)]
+    remember_total(keys[0], 10)
+    remember_total(keys[1], 20)
+    assert cached_total(keys[0]) == 10      # keys[1] is now the least recently used
+
+    remember_total(keys[2], 30)
+
+    assert cached_total(keys[1]) is None
+    assert (cached_total(keys[0]), cached_total(keys[2])) == (10, 30)
@@ -0,0 +1,88 @@
+"""
+Single-flight coalescing of genericQuery reads: shared/single_flight.py.
+
+The reads are plain coroutines gated on events, so a write can be committed
+at an exact point of a flight. The last test commits through exec_sql on the
+scratch schema from tests/conftest.py and is skipped when the dev DB is
+unreachable.
+"""
+import asyncio
+
+import pytest
+
+from app.db.connection.pool_manager import pool_manager
+from app.db.connection.psycopg_driver import exec_sql
+from app.graphql.resolvers.shared import single_flight
+
+
+@pytest.fixture(autouse=True)
+def no_flights(monkeypatch):
+    monkeypatch.setattr(single_flight, "_flights", {})
+    monkeypatch.setattr(single_flight, "_counters", {})
+    monkeypatch.setattr(pool_manager, "_commits", {})
+
+
+class _Table:
+    """A one-value 'table' whose reads block until released."""
+
+    def __init__(self) -> None:
+        self.value = "before"
+        self.reads = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def read(self) -> str:
+        self.reads += 1
+        seen = self.value
+        self.started.set()
+        await self.release.wait()
+        return seen
+
+
+def _key() -> tuple:
+    return single_flight.flight_key("db1", "bu1", "GET_JOBS", {"branch_id": 1})
+
+
+@pytest.mark.asyncio
+async def test_identical_reads_share_one_execution():
+    table = _Table()
+    first = asyncio.ensure_future(single_flight.coalesce(_key(), table.read))
+    second = asyncio.ensure_future(single_flight.coalesce(_key(), table.read))
+    await table.started.wait()
+    table.release.set()
+
+    assert await asyncio.gather(first, second) == ["before", "before"]
+    assert table.reads == 1
+    assert single_flight.get_stats()["by_sql_id"]["GET_JOBS"] == {"executed": 1, "joined": 1}
+
+
+@pytest.mark.asyncio
+async def test_read_after_a_commit_does_not_join_the_earlier_flight():
+    table = _Table()
+    before = asyncio.ensure_future(single_flight.coalesce(_key(), table.read))
+    await table.started.wait()              # the flight has read "before" and is still out
+
+    table.value = "after"                   # a write commits meanwhile
+    pool_manager.record_commit("db1")
+    after = asyncio.ensure_future(single_flight.coalesce(_key(), table.read))
+    table.release.set()
+
+    assert await before == "before"
+    assert await after == "after"
+    assert table.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_commit_to_another_database_keeps_coalescing():
+    key = _key()
+    pool_manager.record_commit("db2")
+    pool_manager.record_commit(None)
+
+    assert _key() == key
+
+
+@pytest.mark.asyncio
+async def test_exec_sql_commit_moves_the_flight_key(scratch_schema):
+    key = single_flight.flight_key(None, scratch_schema, "GET_JOBS", {})
+    await exec_sql(None, scratch_schema, "SELECT 1")
+    assert single_flight.flight_key(None, scratch_schema, "GET_JOBS", {}) != key